@@ -9,6 +9,9 @@ Installation:
 Usage:
     python3 airtable_webhook_server.py
 
+Superseded by execution/webhook_gateway.py, which serves the same
+POST /webhook without blocking on Modal (answers 202 with the call ID).
+
 Then in Airtable Automations:
     - Create automation with trigger "When Status changes to X"
     - Action: Send HTTP request
@@ -0,0 +1,295 @@
+"""
+Fakes: In-process HTTP stand-ins for the benchmark suite
+
+Each server runs on a background thread on 127.0.0.1 and counts the requests
+it answers, so benchmarks can report API calls alongside wall time:
+
+1. FakeAnthropic - POST /v1/messages with configurable latency (fixed + per
+   output token) and usage including prompt-cache reads/writes
+2. FakeReplicate - asynchronous predictions (starting → processing →
+   succeeded after `duration`), optional completion webhooks, image files
+3. WebhookSink - accepts any POST (Make.com and similar webhooks)
+
+Airtable is served by execution/local_airtable_webhooks.py (LocalAirtable),
+which pages lists, caps writes at 10 records and can enforce 5 req/s.
+
+Point the code under test at them with the usual overrides:
+ANTHROPIC_BASE_URL, REPLICATE_API_URL and AIRTABLE_API_URL.
+
+Example:
+    anthropic_server = FakeAnthropic(latency=0.2).start()
+    os.environ["ANTHROPIC_BASE_URL"] = anthropic_server.url
+    ...
+    print(anthropic_server.request_count)
+    anthropic_server.stop()
+"""
+
+import hashlib
+import json
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+# Smallest valid PNG (1x1, transparent) served as every generated image
+TINY_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class FakeService:
+    """ThreadingHTTPServer wrapper; subclasses implement handle()"""
+
+    def __init__(self, port: int = 0):
+        self.request_count = 0
+        self.lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handle(self, method: str, path: str, query: Dict, body: Dict) -> Tuple[int, object, Dict]:
+        """Return (status, JSON-able data or bytes, extra headers)."""
+        raise NotImplementedError
+
+    def _handler_class(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _handle(self, method: str):
+                parsed = urlparse(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    body = {}
+
+                with service.lock:
+                    service.request_count += 1
+                status, data, headers = service.handle(method, parsed.path, parse_qs(parsed.query), body)
+
+                if isinstance(data, bytes):
+                    encoded = data
+                    headers = {'Content-Type': 'application/octet-stream', **headers}
+                else:
+                    encoded = json.dumps(data).encode()
+                    headers = {'Content-Type': 'application/json', **headers}
+
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+# ============== Anthropic ==============
+
+def default_responder(body: Dict) -> str:
+    """Generic assistant text sized to a fraction of max_tokens."""
+    words = max(20, int(body.get('max_tokens', 400) * 0.5))
+    return ' '.join(['lorem'] * words)
+
+
+class FakeAnthropic(FakeService):
+    """Messages API stand-in with a latency model and prompt-cache accounting"""
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency: float = 0.2,
+        tokens_per_second: float = 2000.0,
+        responder: Callable[[Dict], str] = default_responder,
+    ):
+        """
+        Args:
+            port: Port to bind (0 picks a free one)
+            latency: Seconds before the first token (time to first byte)
+            tokens_per_second: Output speed; each response also takes output_tokens / this
+            responder: Builds the reply text from the request body
+        """
+        super().__init__(port)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.responder = responder
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._cached_prefixes = set()
+
+    def _usage(self, body: Dict, text: str) -> Dict:
+        system = body.get('system') or ''
+        system_text = json.dumps(system) if not isinstance(system, str) else system
+        messages_text = json.dumps(body.get('messages', []))
+
+        cache_write = cache_read = 0
+        system_tokens = estimate_tokens(system_text)
+        if isinstance(system, list) and any(block.get('cache_control') for block in system):
+            prefix = hashlib.sha256(system_text.encode()).hexdigest()
+            with self.lock:
+                seen = prefix in self._cached_prefixes
+                self._cached_prefixes.add(prefix)
+            if seen:
+                cache_read = system_tokens
+            else:
+                cache_write = system_tokens
+            system_tokens = 0
+
+        return {
+            'input_tokens': system_tokens + estimate_tokens(messages_text),
+            'output_tokens': estimate_tokens(text),
+            'cache_creation_input_tokens': cache_write,
+            'cache_read_input_tokens': cache_read,
+        }
+
+    def handle(self, method, path, query, body):
+        if method != 'POST' or not path.endswith('/v1/messages'):
+            return 404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': path}}, {}
+        if body.get('stream'):
+            return 400, {'type': 'error', 'error': {'type': 'invalid_request_error', 'message': 'streaming not supported'}}, {}
+
+        text = self.responder(body)
+        usage = self._usage(body, text)
+        time.sleep(self.latency + usage['output_tokens'] / self.tokens_per_second)
+
+        with self.lock:
+            self.input_tokens += usage['input_tokens']
+            self.output_tokens += usage['output_tokens']
+
+        return 200, {
+            'id': f"msg_{secrets.token_hex(12)}",
+            'type': 'message',
+            'role': 'assistant',
+            'model': body.get('model', 'claude-fake'),
+            'content': [{'type': 'text', 'text': text}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': usage,
+        }, {}
+
+
+# ============== Replicate ==============
+
+class FakeReplicate(FakeService):
+    """Predictions API stand-in: each prediction succeeds `duration` seconds after creation"""
+
+    def __init__(self, port: int = 0, duration: float = 3.0):
+        """
+        Args:
+            port: Port to bind (0 picks a free one)
+            duration: Seconds from creation until a prediction succeeds
+        """
+        super().__init__(port)
+        self.duration = duration
+        self.predictions: Dict[str, Dict] = {}
+        self.created_count = 0
+
+    def _state(self, prediction: Dict) -> Dict:
+        elapsed = time.monotonic() - prediction['_started']
+        if elapsed >= self.duration:
+            status, output = 'succeeded', [f"{self.url}/files/{prediction['id']}.png"]
+        else:
+            status, output = ('starting' if elapsed < self.duration * 0.1 else 'processing'), None
+        return {
+            'id': prediction['id'],
+            'version': prediction['version'],
+            'input': prediction['input'],
+            'status': status,
+            'output': output,
+            'error': None,
+            'urls': {'get': f"{self.url}/v1/predictions/{prediction['id']}"},
+        }
+
+    def _send_webhook(self, prediction_id: str) -> None:
+        prediction = self.predictions[prediction_id]
+        try:
+            requests.post(prediction['_webhook'], json=self._state(prediction), timeout=10)
+        except requests.exceptions.RequestException:
+            pass
+
+    def handle(self, method, path, query, body):
+        parts = [p for p in path.split('/') if p]
+
+        if method == 'GET' and parts[:1] == ['files']:
+            return 200, TINY_PNG, {'Content-Type': 'image/png'}
+
+        if method == 'POST' and parts[:1] == ['v1'] and parts[-1] == 'predictions':
+            prediction_id = secrets.token_hex(10)
+            version = body.get('version') or '/'.join(parts[2:4])
+            prediction = {'id': prediction_id, 'version': version, 'input': body.get('input', {}),
+                          '_started': time.monotonic(), '_webhook': body.get('webhook')}
+            with self.lock:
+                self.predictions[prediction_id] = prediction
+                self.created_count += 1
+            if prediction['_webhook']:
+                timer = threading.Timer(self.duration, self._send_webhook, args=(prediction_id,))
+                timer.daemon = True
+                timer.start()
+            return 201, self._state(prediction), {}
+
+        if method == 'GET' and parts[:2] == ['v1', 'predictions'] and len(parts) == 3:
+            prediction = self.predictions.get(parts[2])
+            if prediction is None:
+                return 404, {'detail': 'Not found.'}, {}
+            return 200, self._state(prediction), {}
+
+        return 404, {'detail': 'Not found.'}, {}
+
+
+# ============== Webhooks ==============
+
+class WebhookSink(FakeService):
+    """Accepts every POST with 200 and keeps the payloads"""
+
+    def __init__(self, port: int = 0, on_payload: Optional[Callable[[Dict], None]] = None):
+        """
+        Args:
+            port: Port to bind (0 picks a free one)
+            on_payload: Called with each payload (e.g. to mark a post as Posted)
+        """
+        super().__init__(port)
+        self.payloads: List[Dict] = []
+        self.on_payload = on_payload
+
+    def handle(self, method, path, query, body):
+        if method != 'POST':
+            return 405, {'error': 'method not allowed'}, {}
+        with self.lock:
+            self.payloads.append(body)
+        if self.on_payload:
+            self.on_payload(body)
+        return 200, {'accepted': True}, {}
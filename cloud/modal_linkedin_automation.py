@@ -14,6 +14,8 @@ Test locally:
 Endpoints:
 - POST /webhook/status-change - Handle Airtable status changes (Draft→Pending, Pending→Approved, Rejected)
 - POST /webhook/schedule-check - Check for posts ready to schedule and post
+- POST airtable_change_ping - Airtable webhook notification → drain the change feed
+- POST replicate_image_callback - Replicate prediction finished → attach image to the post
 - GET  /health - Health check
 
 Scheduled Tasks (Cron):
@@ -32,12 +34,30 @@ Workflow:
 import modal
 from modal import fastapi_endpoint, Period
 import os
+import sys
 import json
-import requests
+import secrets
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Optional, Dict, List
 import logging
 
+# Shared helpers live in execution/utils (mounted into the image as /root/utils)
+UTILS_DIR = Path(__file__).resolve().parent.parent / "execution" / "utils"
+sys.path.insert(0, str(UTILS_DIR.parent))
+from utils.airtable_client import AirtableClient, formula_and, formula_eq, formula_in, formula_not_blank, formula_or
+from utils.change_feed import CHANGE_FEED_DICT_NAME, ChangeFeed
+from utils.cost_optimizer import CostTracker, PromptCache
+from utils.delta_poller import DeltaPoller
+from utils.due_queue import DUE_QUEUE_DICT_NAME, push_scheduled_post
+from utils.idempotency import IDEMPOTENCY_DICT_NAME, IdempotencyStore, content_version
+from utils.image_cache import ImageCache, attach_image, image_cache_key
+from utils.llm_cache import CachedAnthropic, DictResponseCache, llm_cache_enabled
+from utils.replicate_predictions import ReplicateClient, output_url
+from utils.shared_limiter import SharedConcurrencyLimiter
+from utils.slot_calendar import SlotCalendar, centered_windows, parse_time
+from utils.slot_leases import SLOT_LEASES_DICT_NAME, SlotLeases
+
 # ============== Modal App Setup ==============
 
 app = modal.App("linkedin-automation")
@@ -54,6 +74,7 @@ image = (
         "pytz>=2024.1",
         "fastapi>=0.104",
     )
+    .add_local_dir(str(UTILS_DIR), remote_path="/root/utils")
 )
 
 
@@ -67,106 +88,155 @@ def get_airtable_headers():
     }
 
 
+def get_airtable_client(base_id: str, table_id: str) -> AirtableClient:
+    """Get a pooled Airtable client for a table (shares one keep-alive session per container)"""
+    return AirtableClient(base_id, table_id)
+
+
 def get_airtable_record(base_id: str, table_id: str, record_id: str) -> dict:
     """Fetch a single Airtable record"""
-    url = f"https://api.airtable.com/v0/{base_id}/{table_id}/{record_id}"
-    response = requests.get(url, headers=get_airtable_headers(), timeout=30)
-
-    if response.status_code == 200:
-        return response.json()
-    else:
-        logging.error(f"Failed to fetch record: {response.status_code} - {response.text}")
-        return None
+    return get_airtable_client(base_id, table_id).get_record(record_id)
 
 
 def update_airtable_record(base_id: str, table_id: str, record_id: str, fields: dict) -> bool:
-    """Update an Airtable record with retry logic for reliability"""
-    import time
-    url = f"https://api.airtable.com/v0/{base_id}/{table_id}/{record_id}"
-    payload = {"fields": fields}
+    """Update an Airtable record (429/5xx/timeouts retried by the shared client)"""
+    if get_airtable_client(base_id, table_id).update_record(record_id, fields) is None:
+        logging.error(f"Failed to update record {record_id}")
+        return False
 
-    max_retries = 3
-    retry_delay = 1  # seconds
+    logging.info(f"Updated record {record_id}")
+    return True
 
-    for attempt in range(max_retries):
-        try:
-            response = requests.patch(url, json=payload, headers=get_airtable_headers(), timeout=30)
 
-            if response.status_code == 200:
-                logging.info(f"Updated record {record_id} (attempt {attempt + 1}/{max_retries})")
-                return True
-            elif response.status_code == 429:  # Rate limit
-                logging.warning(f"Rate limited. Retrying in {retry_delay}s... (attempt {attempt + 1}/{max_retries})")
-                time.sleep(retry_delay)
-                retry_delay *= 2  # Exponential backoff
-                continue
-            else:
-                logging.error(f"Failed to update record: {response.status_code} - {response.text}")
-                if attempt < max_retries - 1:
-                    logging.info(f"Retrying... (attempt {attempt + 2}/{max_retries})")
-                    time.sleep(retry_delay)
-                continue
-        except requests.exceptions.Timeout:
-            logging.warning(f"Timeout updating record. Retrying... (attempt {attempt + 1}/{max_retries})")
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
-            continue
-        except Exception as e:
-            logging.error(f"Error updating record: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
-            continue
+def add_airtable_record(base_id: str, table_id: str, fields: dict) -> Optional[str]:
+    """Add a new Airtable record and return the record ID"""
+    record = get_airtable_client(base_id, table_id).create_record(fields)
+    return record['id'] if record else None
 
-    logging.error(f"Failed to update record {record_id} after {max_retries} attempts")
+
+def delete_airtable_record(base_id: str, table_id: str, record_id: str) -> bool:
+    """Delete an Airtable record"""
+    if get_airtable_client(base_id, table_id).delete_record(record_id):
+        logging.info(f"Deleted record {record_id}")
+        return True
     return False
 
 
-def add_airtable_record(base_id: str, table_id: str, fields: dict) -> Optional[str]:
-    """Add a new Airtable record and return the record ID"""
-    url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-    payload = {"records": [{"fields": fields}]}
+# ============== Core Automation Functions ==============
 
-    response = requests.post(url, json=payload, headers=get_airtable_headers(), timeout=30)
+# Posting windows: 9 AM, 2 PM, 8 PM ET. A post within 30 min of the hour holds
+# the window; new posts land within ±15 min of it
+POSTING_TIMEZONE = 'America/New_York'
+POSTING_WINDOWS = centered_windows([9, 14, 20], buffer_minutes=30, jitter_minutes=15)
 
-    if response.status_code == 201:
-        records = response.json().get('records', [])
-        if records:
-            return records[0]['id']
-    else:
-        logging.error(f"Failed to add record: {response.status_code} - {response.text}")
+IMAGE_MODEL = "google/nano-banana-pro"  # High-quality model
 
-    return None
+# Predictions waiting for replicate_image_callback: prediction id -> post + prompt
+pending_images = modal.Dict.from_name("pending-image-predictions", create_if_missing=True)
 
+# Claim-once keys for expensive actions, shared by every trigger path (see utils/idempotency.py)
+idempotency = IdempotencyStore(modal.Dict.from_name(IDEMPOTENCY_DICT_NAME, create_if_missing=True))
+IMAGE_TRANSITION = 'generate_image'
 
-def delete_airtable_record(base_id: str, table_id: str, record_id: str) -> bool:
-    """Delete an Airtable record"""
-    url = f"https://api.airtable.com/v0/{base_id}/{table_id}/{record_id}"
 
-    response = requests.delete(url, headers=get_airtable_headers(), timeout=30)
+def finish_image_claim(claim_key: str, ok: bool, prompt_key: Optional[str] = None) -> None:
+    """
+    Record an image run's outcome.
 
-    if response.status_code == 200:
-        logging.info(f"Deleted record {record_id}")
-        return True
-    else:
-        logging.error(f"Failed to delete record: {response.status_code} - {response.text}")
+    The claim is versioned on the post content plus its "Image Prompt" at
+    trigger time. A run that generated the prompt writes it back, so on
+    success the (content, prompt used) version is marked done too - that is
+    the version every later trigger computes.
+    """
+    idempotency.finish(claim_key, ok)
+    if ok and prompt_key and prompt_key != claim_key:
+        idempotency.finish(prompt_key, True)
+
+# Generated images keyed by model + prompt + size (see utils/image_cache.py)
+IMAGE_CACHE_DIR = "/image_cache"
+IMAGE_SIZE = 1200
+image_cache_volume = modal.Volume.from_name("linkedin-image-cache", create_if_missing=True)
+
+
+def cache_generated_image(cache_key: str, image_url: str, record_id: str) -> None:
+    """Keep the finished image so the same prompt never needs another prediction"""
+    try:
+        if ImageCache(IMAGE_CACHE_DIR).put_from_url(cache_key, image_url, meta={"record_id": record_id}):
+            image_cache_volume.commit()
+    except Exception as e:
+        logging.warning(f"Could not cache image: {e}")
+
+
+def build_image_input(image_prompt: str) -> dict:
+    """Replicate input for a post image"""
+    return {
+        "prompt": image_prompt + ", professional photography, photorealistic, candid moment, natural lighting, 4K, sharp focus, documentary style, editorial photography, authentic business scenario, high detail",
+        "width": IMAGE_SIZE,
+        "height": IMAGE_SIZE,
+        "num_inference_steps": 50,  # Higher steps for better quality
+        "guidance_scale": 8.5,  # Slightly higher guidance for consistency with prompt
+        "negative_prompt": "cartoon, illustration, abstract, stock photo, generic, blurry, distorted, ugly, text, watermark, AI art, synthetic, unrealistic, painting, drawing, anime"
+    }
+
+
+def image_callback_url() -> Optional[str]:
+    """URL of replicate_image_callback (REPLICATE_WEBHOOK_URL overrides the deployed URL)"""
+    url = os.environ.get("REPLICATE_WEBHOOK_URL")
+    if url:
+        return url
+    try:
+        return replicate_image_callback.get_web_url()
+    except Exception as e:
+        logging.warning(f"No web URL for replicate_image_callback ({e}) - will poll instead")
+        return None
+
+
+def attach_generated_image(prediction: Optional[dict], record_id: str, base_id: str, table_id: str, image_prompt: str) -> bool:
+    """Write a finished prediction's image URL to the post (Airtable fetches the file itself)"""
+    image_url = output_url(prediction)
+    if not image_url:
+        status = prediction.get('status') if prediction else 'unknown'
+        logging.error(f"Image generation for {record_id} did not succeed ({status}): {(prediction or {}).get('error')}")
         return False
 
+    logging.info(f"Image generated: {image_url}")
+    update_fields = {
+        "Image": [
+            {
+                "url": image_url
+            }
+        ],
+        "Image Prompt": image_prompt
+    }
 
-# ============== Core Automation Functions ==============
+    if update_airtable_record(base_id, table_id, record_id, update_fields):
+        logging.info(f"Record updated with generated image")
+        return True
 
-@app.function(image=image, secrets=[modal.Secret.from_name("linkedin-secrets")], timeout=300)
+    logging.error("Failed to update record with image")
+    return False
+
+
+@app.function(
+    image=image,
+    secrets=[modal.Secret.from_name("linkedin-secrets")],
+    volumes={IMAGE_CACHE_DIR: image_cache_volume},
+    timeout=360,
+)
 def generate_images_for_post(record_id: str, base_id: str, table_id: str) -> bool:
     """
-    Generate AI images for a post that's in Pending Review status.
+    Start AI image generation for a post that's in Pending Review status.
 
-    This is triggered when a post status changes to "Pending Review".
+    This is triggered when a post status changes to "Pending Review". The
+    Replicate prediction reports back to replicate_image_callback, which
+    attaches the image, so this returns as soon as the prediction is queued.
+    A prompt that was generated before is served from the image cache, and a
+    repeated trigger for unchanged content is skipped.
     """
-    import time
-    from pathlib import Path
-
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
 
+    idempotency_key = None
     try:
         logger.info(f"Starting image generation for record {record_id}")
 
@@ -184,10 +254,16 @@ def generate_images_for_post(record_id: str, base_id: str, table_id: str) -> boo
             logger.error("No content or image prompt found")
             return False
 
+        # The Automation webhook, change feed, poller and handle_webhook can all
+        # report the same transition; only the first one pays for Claude + Replicate
+        idempotency_key = idempotency.claim(record_id, IMAGE_TRANSITION, content_version(post_content, image_prompt_base))
+        if idempotency_key is None:
+            return True
+
         # Generate image prompt if not exists
         if not image_prompt_base:
             from anthropic import Anthropic
-            client = Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+            client = cached_anthropic(Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY")))
 
             response = client.messages.create(
                 model="claude-opus-4-20250514",
@@ -206,124 +282,196 @@ Generate a prompt that would create a professional, visually engaging image that
         else:
             image_prompt = image_prompt_base
 
-        # Generate image using Replicate
-        import subprocess
+        # The prompt is written back to "Image Prompt", so later triggers see this version
+        prompt_key = idempotency.key(record_id, IMAGE_TRANSITION, content_version(post_content, image_prompt))
 
+        # Same prompt as before (e.g. status toggled back to Pending Review): no new prediction
+        cache_key = image_cache_key(IMAGE_MODEL, image_prompt, IMAGE_SIZE, IMAGE_SIZE)
+        try:
+            image_cache_volume.reload()
+        except Exception as e:
+            logger.warning(f"Image cache reload failed: {e}")
+        cached = ImageCache(IMAGE_CACHE_DIR).get(cache_key)
+        if cached:
+            logger.info(f"♻️ Image cache hit for {record_id} - skipping Replicate")
+            attached = attach_image(get_airtable_client(base_id, table_id), record_id, cached,
+                                    extra_fields={"Image Prompt": image_prompt}, url_field="Image URL")
+            finish_image_claim(idempotency_key, attached, prompt_key)
+            return attached
+
+        # Generate image using Replicate (returns as soon as the prediction is queued)
         logger.info(f"Generating image with prompt: {image_prompt[:100]}...")
 
-        # Call Replicate API
-        replicate_token = os.environ.get("REPLICATE_API_TOKEN")
-        headers = {
-            "Authorization": f"Token {replicate_token}",
-            "Content-Type": "application/json"
-        }
+        replicate = ReplicateClient()
+        webhook_url = image_callback_url()
+        prediction = replicate.create_prediction(IMAGE_MODEL, build_image_input(image_prompt), webhook=webhook_url)
+        if not prediction:
+            idempotency.finish(idempotency_key, False)
+            return False
 
-        payload = {
-            "version": "google/nano-banana-pro",  # High-quality model
-            "input": {
-                "prompt": image_prompt + ", professional photography, photorealistic, candid moment, natural lighting, 4K, sharp focus, documentary style, editorial photography, authentic business scenario, high detail",
-                "width": 1200,
-                "height": 1200,
-                "num_inference_steps": 50,  # Higher steps for better quality
-                "guidance_scale": 8.5,  # Slightly higher guidance for consistency with prompt
-                "negative_prompt": "cartoon, illustration, abstract, stock photo, generic, blurry, distorted, ugly, text, watermark, AI art, synthetic, unrealistic, painting, drawing, anime"
+        prediction_id = prediction['id']
+        if webhook_url:
+            pending_images[prediction_id] = {
+                "record_id": record_id,
+                "base_id": base_id,
+                "table_id": table_id,
+                "image_prompt": image_prompt,
+                "cache_key": cache_key,
+                "idempotency_key": idempotency_key,
+                "prompt_idempotency_key": prompt_key,
+                "created_at": datetime.now().isoformat(),
             }
-        }
-
-        # Create prediction
-        response = requests.post(
-            "https://api.replicate.com/v1/predictions",
-            json=payload,
-            headers=headers,
-            timeout=30
-        )
+            # The key stays claimed until the callback reports the outcome
+            logger.info(f"Prediction created: {prediction_id}, image will be attached on completion")
+            return True
 
-        if response.status_code != 201:
-            logger.error(f"Failed to create prediction: {response.status_code} - {response.text}")
+        # No callback endpoint (e.g. running outside a deployment): wait here
+        logger.info(f"Prediction created: {prediction_id}, waiting for completion...")
+        final = replicate.wait(prediction_id, timeout=300)
+        if not attach_generated_image(final, record_id, base_id, table_id, image_prompt):
+            idempotency.finish(idempotency_key, False)
             return False
+        cache_generated_image(cache_key, output_url(final), record_id)
+        finish_image_claim(idempotency_key, True, prompt_key)
+        return True
 
-        prediction = response.json()
-        prediction_id = prediction.get('id')
+    except Exception as e:
+        logging.error(f"Error in image generation: {str(e)}")
+        import traceback
+        logging.error(traceback.format_exc())
+        if idempotency_key:
+            idempotency.finish(idempotency_key, False)
+        return False
 
-        logger.info(f"Prediction created: {prediction_id}, waiting for completion...")
 
-        # Poll for completion (max 5 minutes)
-        max_wait = 300
-        start_time = datetime.now()
-        image_url = None
+@app.function(image=image, secrets=[modal.Secret.from_name("linkedin-secrets")], volumes={IMAGE_CACHE_DIR: image_cache_volume})
+@fastapi_endpoint(method="POST")
+def replicate_image_callback(prediction: dict):
+    """
+    Replicate webhook for finished image predictions.
 
-        while (datetime.now() - start_time).total_seconds() < max_wait:
-            response = requests.get(
-                f"https://api.replicate.com/v1/predictions/{prediction_id}",
-                headers=headers,
-                timeout=10
-            )
+    The body is only used to find the pending post; the prediction is
+    re-read from the Replicate API so a forged callback can't attach an
+    arbitrary URL.
+    """
+    logging.basicConfig(level=logging.INFO)
 
-            if response.status_code == 200:
-                result = response.json()
-                status = result.get('status')
+    prediction_id = prediction.get('id')
+    pending = pending_images.pop(prediction_id, None) if prediction_id else None
+    if not pending:
+        logging.warning(f"Ignoring callback for unknown prediction {prediction_id}")
+        return {"success": False, "error": "unknown prediction"}
 
-                if status == 'succeeded':
-                    output = result.get('output')
-                    if output:
-                        image_url = output[0] if isinstance(output, list) else output
-                        break
-                elif status == 'failed':
-                    logger.error(f"Prediction failed: {result.get('error')}")
-                    return False
+    final = ReplicateClient().get_prediction(prediction_id)
+    if final is None or final.get('status') not in ('succeeded', 'failed', 'canceled'):
+        # Not finished (or Replicate unreachable): keep it so a redelivered callback can finish it
+        pending_images[prediction_id] = pending
+        return {"success": False, "error": "prediction not finished"}
 
-                time.sleep(2)
-            else:
-                logger.error(f"Error polling prediction: {response.status_code}")
-                return False
+    success = attach_generated_image(
+        final, pending['record_id'], pending['base_id'], pending['table_id'], pending['image_prompt']
+    )
+    if success and pending.get('cache_key'):
+        cache_generated_image(pending['cache_key'], output_url(final), pending['record_id'])
+    if pending.get('idempotency_key'):
+        # A failed prediction frees the key so the next trigger can try again
+        finish_image_claim(pending['idempotency_key'], success, pending.get('prompt_idempotency_key'))
+    return {"success": success}
 
-        if not image_url:
-            logger.error("Image generation timed out")
-            return False
 
-        logger.info(f"Image generated: {image_url}")
+APPROVED_STATUS = 'Approved - Ready to Schedule'
 
-        # Download the image
-        try:
-            logger.info("Downloading generated image...")
-            img_response = requests.get(image_url, timeout=30)
-            if img_response.status_code != 200:
-                logger.error(f"Failed to download image: {img_response.status_code}")
-                return False
-        except Exception as e:
-            logger.error(f"Error downloading image: {e}")
-            return False
 
-        # Upload to Airtable as attachment
-        try:
-            logger.info("Uploading image to Airtable...")
-            # Airtable attachment format
-            update_fields = {
-                "Image": [
-                    {
-                        "url": image_url
-                    }
-                ],
-                "Image Prompt": image_prompt
-            }
+def schedule_approved_records(record_ids: List[str], base_id: str, table_id: str) -> Dict[str, bool]:
+    """
+    Schedule approved posts: one Airtable read, a leased window per post, one batched write.
 
-            success = update_airtable_record(base_id, table_id, record_id, update_fields)
+    Windows are reserved through SlotLeases (compare-and-set in a modal.Dict)
+    before anything is written, so parallel calls for different posts always
+    land in different windows and no detect-and-fix pass is needed afterwards.
 
-            if success:
-                logger.info(f"Record updated with generated image")
-                return True
-            else:
-                logger.error("Failed to update record with image")
-                return False
-        except Exception as e:
-            logger.error(f"Error uploading image to Airtable: {e}")
-            return False
+    Returns:
+        {record_id: True if scheduled (or already scheduled), False otherwise}
+    """
+    import pytz
 
-    except Exception as e:
-        logging.error(f"Error in image generation: {str(e)}")
-        import traceback
-        logging.error(traceback.format_exc())
-        return False
+    logger = logging.getLogger(__name__)
+    tz = pytz.timezone(POSTING_TIMEZONE)
+    now = datetime.now(tz)
+    run_id = secrets.token_hex(8)
+    results = {record_id: False for record_id in record_ids}
+
+    # One filtered fetch: the posts to schedule and every window already taken
+    client = get_airtable_client(base_id, table_id)
+    records = client.list_records(
+        formula=formula_or(formula_in('Status', [APPROVED_STATUS, 'Scheduled']), formula_not_blank('Scheduled Time')),
+        fields=['Title', 'Status', 'Scheduled Time'],
+    )
+    by_id = {record['id']: record for record in records}
+    calendar = SlotCalendar.from_records(records, POSTING_WINDOWS, tz=tz)
+    leases = SlotLeases(slot_leases_store)
+    logger.info(f"Used posting windows today: {[POSTING_WINDOWS[i].label for i in calendar.used_windows(now.date())]}")
+
+    planned = []  # (record_id, day, window index, scheduled time)
+    for record_id in record_ids:
+        fields = by_id.get(record_id, {}).get('fields', {})
+        status = fields.get('Status', '')
+
+        # If already scheduled and has a Scheduled Time, it was already processed
+        if status == 'Scheduled' and fields.get('Scheduled Time'):
+            logger.info(f"Post {record_id} already scheduled (race condition detected). Skipping.")
+            results[record_id] = True
+            continue
+        if status not in (APPROVED_STATUS, 'Scheduled'):
+            logger.warning(f"Post {record_id} status is {status or 'unknown'}, not '{APPROVED_STATUS}'")
+            continue
+        if not leases.claim_record(record_id, run_id):
+            logger.info(f"Post {record_id} is being scheduled by another call. Skipping.")
+            results[record_id] = True
+            continue
+
+        slot = leases.claim_next(calendar, now, owner=record_id)
+        if slot is None:
+            logger.error(f"No free posting window in the scheduling horizon for {record_id}")
+            leases.release_record(record_id)
+            continue
+
+        day, window_index, scheduled_time = slot
+        when = "today" if day == now.date() else day.isoformat()
+        logger.info(f"Found available window {when} at {POSTING_WINDOWS[window_index].label} for {record_id} "
+                    f"(scheduled for {scheduled_time.strftime('%I:%M %p %Z')})")
+        planned.append((record_id, day, window_index, scheduled_time))
+
+    # Update records with scheduled time and status
+    scheduled_at = datetime.now().isoformat()
+    try:
+        batch = client.batch_update([
+            {"id": record_id, "fields": {
+                "Status": "Scheduled",
+                "Scheduled Time": scheduled_time.isoformat(),
+                "Scheduled At": scheduled_at,
+            }}
+            for record_id, _, _, scheduled_time in planned
+        ])
+
+        for (record_id, day, window_index, scheduled_time), updated in zip(planned, batch.records):
+            if updated is None:
+                logger.error(f"Failed to update {record_id} with scheduled time")
+                leases.release(day, window_index, record_id)
+                continue
+
+            results[record_id] = True
+            logger.info(f"Post {record_id} scheduled for {scheduled_time}")
+            # Let the minute scheduler see it without waiting for its next refresh
+            push_scheduled_post(due_queue_store, record_id, scheduled_time.isoformat())
+    finally:
+        # Once written, redeliveries see Status=Scheduled; holding the record lease
+        # any longer would swallow a re-approval until it expired
+        for record_id, _, _, _ in planned:
+            leases.release_record(record_id)
+
+    leases.prune()
+    return results
 
 
 @app.function(image=image, secrets=[modal.Secret.from_name("linkedin-secrets")], timeout=300)
@@ -333,188 +481,50 @@ def schedule_approved_post(record_id: str, base_id: str, table_id: str) -> bool:
 
     This is triggered when status changes to "Approved - Ready to Schedule".
 
-    Distributes posts across all 3 daily posting windows:
+    Distributes posts across all 3 daily posting windows, earliest free first
+    (see utils/slot_calendar.py):
     - 9 AM (±15 min)
     - 2 PM (±15 min)
     - 8 PM (±15 min)
 
-    Includes retry logic and race condition detection.
+    Safe to run in parallel: each call leases its window (utils/slot_leases.py).
     """
-    import pytz
-    from datetime import datetime, timedelta
-    import random
-    import time
-
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
 
     try:
         logger.info(f"Scheduling approved post {record_id}")
+        return schedule_approved_records([record_id], base_id, table_id)[record_id]
 
-        # Fetch the record
-        record = get_airtable_record(base_id, table_id, record_id)
-        if not record:
-            logger.error(f"Could not fetch record {record_id}")
-            return False
-
-        fields = record.get('fields', {})
-
-        # Check if post is approved (or already scheduled - race condition protection)
-        status = fields.get('Status', '')
-        if status not in ['Approved - Ready to Schedule', 'Scheduled']:
-            logger.warning(f"Post status is {status}, not 'Approved - Ready to Schedule'")
-            return False
-
-        # If already scheduled and has a Scheduled Time, it was already processed
-        if status == 'Scheduled' and fields.get('Scheduled Time'):
-            logger.info(f"Post already scheduled (race condition detected). Skipping.")
-            return True
-
-        logger.info(f"Post status: {status}")
-
-        # Get next available posting time
-        tz = pytz.timezone('America/New_York')
-        now = datetime.now(tz)
-
-        # Posting times: 9 AM, 2 PM, 8 PM with random offset (±15 min)
-        posting_times = [9, 14, 20]
-
-        # Get all records to see which posting windows are already used today
-        # Track which posting window (9 AM, 2 PM, 8 PM) is used, not just the hour
-        try:
-            headers = {
-                'Authorization': f'Bearer {os.environ.get("AIRTABLE_API_KEY")}',
-                'Content-Type': 'application/json'
-            }
-            url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-            response = requests.get(url, headers=headers)
-
-            used_posting_windows = set()  # Will contain 9, 14, or 20
-            if response.status_code == 200:
-                records = response.json().get('records', [])
-                for record in records:
-                    scheduled_time_str = record.get('fields', {}).get('Scheduled Time')
-                    if scheduled_time_str:
-                        try:
-                            scheduled = datetime.fromisoformat(scheduled_time_str).astimezone(tz)
-                            # Check if scheduled for today
-                            if scheduled.date() == now.date():
-                                # Determine which posting window this is closest to
-                                for window_hour in posting_times:
-                                    # Window is used if scheduled time is within 30 min of that window
-                                    window_time = scheduled.replace(hour=window_hour, minute=0, second=0, microsecond=0)
-                                    time_diff = abs((scheduled - window_time).total_seconds() / 60)
-                                    if time_diff <= 30:  # Within 30 minutes of the window
-                                        used_posting_windows.add(window_hour)
-                                        logger.info(f"Posting window {window_hour}:00 already has a post scheduled today")
-                                        break
-                        except:
-                            pass
-            logger.info(f"Used posting windows today: {sorted(used_posting_windows)}")
-        except Exception as e:
-            logger.warning(f"Could not check used posting times: {e}")
-            used_posting_windows = set()
-
-        # Find next available slot today (excluding already-used windows)
-        scheduled_time = None
-        for hour in posting_times:
-            # Skip if this posting window is already used today
-            if hour in used_posting_windows:
-                logger.info(f"Posting window {hour}:00 already used, skipping to next window")
-                continue
-
-            test_time = now.replace(hour=hour, minute=0, second=0, microsecond=0)
-
-            # Add random offset (±15 min)
-            offset_minutes = random.randint(-15, 15)
-            test_time = test_time + timedelta(minutes=offset_minutes)
-
-            # Only schedule if the time is in the future
-            if test_time > now:
-                scheduled_time = test_time
-                logger.info(f"Found available window at {hour}:00 (scheduled for {test_time.strftime('%I:%M %p %Z')} with {offset_minutes:+d} min offset)")
-                break
+    except Exception as e:
+        logging.error(f"Error scheduling post: {str(e)}")
+        import traceback
+        logging.error(traceback.format_exc())
+        return False
 
-        # If no time today, check tomorrow's windows
-        if not scheduled_time:
-            tomorrow = now + timedelta(days=1)
 
-            # Check which windows are already used TOMORROW
-            used_windows_tomorrow = set()
-            try:
-                headers = {
-                    'Authorization': f'Bearer {os.environ.get("AIRTABLE_API_KEY")}',
-                    'Content-Type': 'application/json'
-                }
-                url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-                response = requests.get(url, headers=headers)
-
-                if response.status_code == 200:
-                    all_records = response.json().get('records', [])
-                    for record in all_records:
-                        scheduled_time_str = record.get('fields', {}).get('Scheduled Time')
-                        if scheduled_time_str:
-                            try:
-                                scheduled = datetime.fromisoformat(scheduled_time_str).astimezone(tz)
-                                # Check if scheduled for tomorrow
-                                if scheduled.date() == tomorrow.date():
-                                    # Determine which posting window this is closest to
-                                    for window_hour in posting_times:
-                                        window_time = scheduled.replace(hour=window_hour, minute=0, second=0, microsecond=0)
-                                        time_diff = abs((scheduled - window_time).total_seconds() / 60)
-                                        if time_diff <= 30:
-                                            used_windows_tomorrow.add(window_hour)
-                                            logger.info(f"Tomorrow's posting window {window_hour}:00 already has a post scheduled")
-                                            break
-                            except:
-                                pass
-            except Exception as e:
-                logger.warning(f"Could not check tomorrow's used windows: {e}")
-
-            logger.info(f"Tomorrow's used windows: {sorted(used_windows_tomorrow)}")
-
-            # Find first available window tomorrow
-            scheduled_time = None
-            for hour in posting_times:
-                if hour not in used_windows_tomorrow:
-                    test_time = tomorrow.replace(hour=hour, minute=0, second=0, microsecond=0)
-                    offset_minutes = random.randint(-15, 15)
-                    test_time = test_time + timedelta(minutes=offset_minutes)
-                    scheduled_time = test_time
-                    logger.info(f"No slots available today. Scheduled for tomorrow at {hour}:00 (offset: {offset_minutes} min)")
-                    break
-
-            # If all tomorrow windows are full, use 9 AM day after tomorrow
-            if not scheduled_time:
-                day_after = now + timedelta(days=2)
-                scheduled_time = day_after.replace(hour=9, minute=0, second=0, microsecond=0)
-                offset_minutes = random.randint(-15, 15)
-                scheduled_time = scheduled_time + timedelta(minutes=offset_minutes)
-                logger.info(f"All windows full for next 2 days. Scheduled for {day_after.date()} at 9:00 AM (offset: {offset_minutes} min)")
-
-        logger.info(f"Scheduled post for: {scheduled_time} ({scheduled_time.strftime('%I:%M %p %Z')})")
-
-        # Update record with scheduled time and status
-        update_fields = {
-            "Status": "Scheduled",
-            "Scheduled Time": scheduled_time.isoformat(),
-            "Scheduled At": datetime.now().isoformat()
-        }
+@app.function(image=image, secrets=[modal.Secret.from_name("linkedin-secrets")], timeout=300)
+def schedule_approved_posts(record_ids: List[str], base_id: str, table_id: str) -> Dict[str, bool]:
+    """
+    Schedule a batch of approved posts (bulk approvals) in one pass.
 
-        success = update_airtable_record(base_id, table_id, record_id, update_fields)
+    One Airtable read and one batched write for the whole batch, instead of a
+    call per post followed by check_and_fix_scheduling_issues.
+    """
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
 
-        if success:
-            logger.info(f"Post scheduled for {scheduled_time}")
-            return True
-        else:
-            logger.error("Failed to update record with scheduled time")
-            return False
+    try:
+        logger.info(f"Scheduling {len(record_ids)} approved posts")
+        results = schedule_approved_records(record_ids, base_id, table_id)
+        logger.info(f"Scheduled {sum(results.values())}/{len(record_ids)} posts")
+        return results
 
     except Exception as e:
-        logging.error(f"Error scheduling post: {str(e)}")
+        logging.error(f"Error scheduling posts: {str(e)}")
         import traceback
         logging.error(traceback.format_exc())
-        return False
+        return {record_id: False for record_id in record_ids}
 
 
 @app.function(image=image, secrets=[modal.Secret.from_name("linkedin-secrets"), modal.Secret.from_name("linkedin-makecom-webhook")], timeout=180)
@@ -668,191 +678,29 @@ def handle_rejected_post(record_id: str, base_id: str, table_id: str) -> bool:
 
 # ============== Cron Jobs ==============
 
-def proofread_post(post_text: str, client) -> str:
-    """
-    Proofread and fix grammar/spelling errors in LinkedIn post.
-    Returns corrected post text.
-    """
-    try:
-        response = client.messages.create(
-            model="claude-opus-4-5-20251101",
-            max_tokens=1000,
-            messages=[{
-                "role": "user",
-                "content": f"""Proofread this LinkedIn post for grammar, spelling, and punctuation errors.
-Fix any issues while maintaining the authentic voice and tone.
-If there are no errors, return the post exactly as-is.
+# ============== Content Prompts ==============
 
-IMPORTANT: Return ONLY the corrected post text. No explanations or comments.
+CONTENT_MODEL = "claude-opus-4-5-20251101"
 
-Post:
-{post_text}"""
-            }]
-        )
-
-        corrected_text = response.content[0].text.strip()
-        return corrected_text
-    except Exception as e:
-        logging.warning(f"Error during proofreading: {e}")
-        # Return original if proofreading fails
-        return post_text
-
-
-@app.function(image=image, secrets=[modal.Secret.from_name("linkedin-secrets")], timeout=3600)
-def generate_daily_content():
-    """
-    Generate new content posts daily.
-    Creates 21 posts (7 days × 3 posts/day) with Draft status.
-    """
-    from anthropic import Anthropic
-    import json
-    import random
-    import pytz
-
-    logging.basicConfig(level=logging.INFO)
-    logger = logging.getLogger(__name__)
-
-    try:
-        logger.info("Running daily content generation")
-
-        base_id = os.environ.get('AIRTABLE_BASE_ID')
-        table_id = os.environ.get('AIRTABLE_LINKEDIN_TABLE_ID')
-        anthropic_key = os.environ.get('ANTHROPIC_API_KEY')
-
-        if not all([base_id, table_id, anthropic_key]):
-            logger.error("Missing required environment variables")
-            return False
-
-        client = Anthropic(api_key=anthropic_key)
-
-        # Configuration - Diverse topics across personal experience, industry trends, and tactics
-        # See MUSA_VOICE_PROFILE.md for complete context on tone and approach
-        # Mix of: personal stories, automation insights, AI trends, niche-specific strategies
-        topics = [
-            # Personal Experience (Musa's Journey)
-            'Why my first business (MC Marketing) failed and what I learned',
-            'The real cost of manual processes your business ignores',
-            'How 5 people can scale like 50 with the right automation',
-            'Small businesses winning against enterprises through automation',
-            'Why marketing services failed before I tried automation',
-
-            # AI & Automation Trends & Benefits
-            'How AI is reshaping business operations in 2025',
-            'The difference between AI hype and AI reality for small teams',
-            'Why most businesses are underutilizing their AI investments',
-            'How automation platforms free up time for what actually matters',
-            'How AI chatbots are transforming customer service workflows',
-            'The 3 AI breakthroughs that will define 2025 for your business',
-            'Why AI adoption is accelerating faster than you think',
-            'The automation ROI that nobody talks about',
-            'How businesses are quietly doubling productivity with AI',
-            'The hidden cost of staying manual in an AI-powered world',
-
-            # Practical Examples: Automation Helping Businesses Thrive
-            'How a plumbing company cut scheduling time by 90%',
-            'The e-commerce team that reduced customer service response time from 6 hours to 2 minutes',
-            'How a 2-person consulting firm handles 50+ client workflows automatically',
-            'The fitness studio that grew 200% without hiring more staff (automation did the work)',
-            'How a digital marketing agency cut project delivery time in half',
-            'The accounting firm that eliminated data entry errors entirely with automation',
-            'How a SaaS company reduced onboarding time from weeks to hours',
-            'The real estate team that closes 40% more deals with AI lead qualification',
-            'How a course creator automates everything except teaching',
-            'The recruitment agency that screens candidates 10x faster',
-
-            # Real Estate Agent Niche
-            'How real estate agents are using AI to close 30% more deals',
-            'The automation strategy real estate agents need right now',
-            'AI lead scoring: How agents qualify 10x faster',
-            'Real estate follow-up automation that converts',
-
-            # Social Media Marketing Agency Niche
-            'How social media agencies are scaling without hiring',
-            'AI content calendars: The competitive advantage agencies are using',
-            'How agencies are automating client reporting and saving 10+ hours/week',
-
-            # Prompting & AI Tactics (20 Topics - Practical, Action-Oriented)
-            'The one-line prompt that unlocked 60% better AI outputs',
-            'How to talk to AI like you talk to a contractor (and get 10x better results)',
-            'The prompt template I use for every business automation',
-            'Why your AI outputs are mediocre (and how to fix it in 30 seconds)',
-            'The 5-part prompt framework that transforms generic to genius',
-            'How context beats complexity in AI prompts',
-            'The constraint that made my AI outputs 100x more useful',
-            'Why you should never ask AI yes-or-no questions (and what to ask instead)',
-            'The prompt pattern that keeps AI focused on what actually matters',
-            'How to debug a broken prompt (before you blame the AI)',
-            'The system prompt hack that changed my AI game',
-            'Why "be more detailed" is the worst prompt advice (and what actually works)',
-            'The role-play prompt that makes AI think like your ideal employee',
-            'How to use examples in prompts to get exactly what you want',
-            'The iterative prompt technique that fixes 80% of bad outputs',
-            'Why specificity matters more than length in prompts',
-            'The output format trick that eliminates AI hallucinations',
-            'How to chain prompts to solve problems AI cannot solve alone',
-            'The prompt that turned my AI from assistant to strategist',
-            'Why you should debate with your AI (and how to do it right)'
-        ]
-
-        posts_per_day = 3
-        days_ahead = 7
-        total_posts = posts_per_day * days_ahead  # 21 posts
-        max_posts_threshold = 21  # Stop generation when this many posts exist
-
-        logger.info(f"Generating {total_posts} posts for {days_ahead} days")
-
-        # Check current post count - suspend if we're at threshold
-        try:
-            headers = {
-                'Authorization': f'Bearer {os.environ.get("AIRTABLE_API_KEY")}',
-                'Content-Type': 'application/json'
-            }
-            url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-            response = requests.get(url, headers=headers)
-
-            if response.status_code == 200:
-                records = response.json().get('records', [])
-                current_post_count = len(records)
-                logger.info(f"Current post count: {current_post_count}")
-
-                if current_post_count >= max_posts_threshold:
-                    logger.info(f"Post threshold reached ({current_post_count}/{max_posts_threshold}). Suspending generation.")
-                    return True  # Return success without generating - suspension is normal
-            else:
-                logger.warning(f"Could not check post count: {response.status_code}")
-        except Exception as e:
-            logger.warning(f"Error checking post count: {e}")
-            # Continue with generation if check fails
-
-        # Research topics and generate ideas
-        logger.info("Researching topics and generating ideas...")
-
-        # Randomize topic selection to avoid monotone content
-        import random
-        topics_shuffled = random.sample(topics, min(len(topics), max(3, len(topics)//2)))
-        logger.info(f"Selected {len(topics_shuffled)} randomized topics for generation")
-
-        all_ideas = []
-
-        for topic in topics_shuffled:
-            logger.info(f"Researching topic: {topic}")
-
-            try:
-                message = client.messages.create(
-                    model="claude-opus-4-5-20251101",
-                    max_tokens=4000,
-                    messages=[{
-                        "role": "user",
-                        "content": f"""Generate 3 LinkedIn post ideas from Musa Comma's perspective about: {topic}
-
-Context from MUSA_VOICE_PROFILE.md:
+# Static per-task system prompts; each call sends only its own task's
+# instructions plus a short message with the per-item data.
+VOICE_PROFILE = """VOICE PROFILE (from MUSA_VOICE_PROFILE.md):
 - 23-year-old self-taught founder of ScaleAxis
 - Previously ran MC Marketing Solutions (learned it failed due to wrong market segment)
 - Believes real software beats platform constraints
-- Decision framework: opportunity cost + speed-to-payback + potential
-- Communication style: direct, blunt, no corporate speak, authentic
-- Avoids: fake credentials, false accomplishments, hype without substance
-- Values: truth, authenticity, real client transformation over valuations
+- Philosophy: Analyze → Leap of Faith → Learn from outcome
+- No fear approach: "Can I survive worst case? Will I learn? Yes to both → fear eliminated"
+- Decision framework / three-angle thinking: opportunity cost + speed-to-payback + potential
+- Communication style: direct, blunt, conversational, no corporate speak, calls out BS, authentic
+- Avoids: hype, fake credentials, false accomplishments, hype without substance
+- Values: truth over polish, authentic over generic, real client transformation over valuations
+- Actual WHY: client transformation (not billion-dollar valuation)"""
+
+IDEAS_SYSTEM_PROMPT = f"""You write LinkedIn content from Musa Comma's perspective.
+
+{VOICE_PROFILE}
+
+Generate 3 LinkedIn post ideas about the given topic.
 
 For each idea, provide:
 1. Content Type (Personal Story, Founder Insight, Real Case Study, Lesson Learned, ROI Breakdown)
@@ -870,71 +718,12 @@ Requirements:
 
 IMPORTANT: Respond ONLY with valid JSON array.
 [{{"type": "Personal Story", "title": "Title", "description": "Desc", "key_points": ["P1", "P2", "P3"], "image_concept": "Concept"}}]"""
-                    }]
-                )
-
-                response_text = message.content[0].text.strip()
-
-                # Clean up markdown if present
-                if response_text.startswith('```'):
-                    response_text = response_text.split('```')[1]
-                    if response_text.startswith('json'):
-                        response_text = response_text[4:]
-
-                ideas = json.loads(response_text.strip())
-                for idea in ideas:
-                    idea['topic'] = topic
-                all_ideas.extend(ideas)
-
-                logger.info(f"Generated {len(ideas)} ideas for {topic}")
-
-            except Exception as e:
-                logger.warning(f"Error researching topic {topic}: {e}")
-                continue
-
-        if not all_ideas:
-            logger.error("No ideas generated")
-            return False
-
-        logger.info(f"Total ideas generated: {len(all_ideas)}")
-
-        # Generate full posts from ideas
-        logger.info("Generating full post content...")
-
-        tz = pytz.timezone('America/New_York')
-        posts_created = 0
-
-        for i in range(total_posts):
-            try:
-                # Select idea (cycle through available ideas)
-                idea = all_ideas[i % len(all_ideas)]
-
-                # Determine what day this post is for
-                day_num = i // posts_per_day
-                post_date = datetime.now(tz) + timedelta(days=day_num)
-
-                # Add day context
-                day_name = post_date.strftime('%A')
-                idea_with_context = {**idea, 'day_context': day_name}
 
-                # Generate post content
-                prompt = f"""Create an authentic LinkedIn post written from Musa Comma's perspective.
+POST_SYSTEM_PROMPT = f"""You write LinkedIn content from Musa Comma's perspective.
 
-VOICE PROFILE REFERENCE: See MUSA_VOICE_PROFILE.md
-- 23-year-old founder of ScaleAxis, self-taught
-- MC Marketing Solutions background (learned lesson about wrong market)
-- Philosophy: Analyze → Leap of Faith → Learn from outcome
-- No fear approach: "Can I survive worst case? Will I learn? Yes to both → fear eliminated"
-- Three-angle thinking: opportunity cost + speed-to-payback + potential
-- Communication: direct, blunt, conversational, calls out BS
-- Avoids: hype, fake credentials, false accomplishments
-- Values: truth over polish, authentic over generic
-- Actual WHY: client transformation (not billion-dollar valuation)
+{VOICE_PROFILE}
 
-Post Topic: {idea.get('title', '')}
-Type: {idea.get('type', '')}
-Context: {idea.get('description', '')}
-Key Points: {', '.join(idea.get('key_points', []))}
+Create an authentic LinkedIn post from the given topic, type, context and key points.
 
 Requirements:
 1. First-person, sound like Musa wrote it naturally
@@ -950,29 +739,13 @@ Requirements:
 
 Generate ONLY the post text itself."""
 
-                message = client.messages.create(
-                    model="claude-opus-4-5-20251101",
-                    max_tokens=800,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-
-                post_text = message.content[0].text.strip()
-
-                # Proofread post for grammar and spelling errors
-                post_text = proofread_post(post_text, client)
-                logger.info(f"Proofread post completed")
+PROOFREAD_SYSTEM_PROMPT = """Proofread the given LinkedIn post for grammar, spelling, and punctuation errors.
+Fix any issues while maintaining the authentic voice and tone.
+If there are no errors, return the post exactly as-is.
 
-                # Generate image prompt - RELEVANCE-FOCUSED FOR LINKEDIN ENGAGEMENT
-                image_prompt_msg = client.messages.create(
-                    model="claude-opus-4-5-20251101",
-                    max_tokens=400,
-                    messages=[{
-                        "role": "user",
-                        "content": f"""Generate a precise, LinkedIn-optimized image prompt (1200x1200px square).
+IMPORTANT: Return ONLY the corrected post text. No explanations or comments."""
 
-Post Topic: {idea.get('title', '')}
-Post Type: {idea.get('type', '')}
-Post Content (first 200 chars): {post_text[:200]}
+IMAGE_PROMPT_SYSTEM_PROMPT = """Generate a precise, LinkedIn-optimized image prompt (1200x1200px square) for the given post.
 
 CRITICAL: Image must directly relate to and reinforce the post topic. NO generic business photos.
 
@@ -1031,33 +804,381 @@ Absolute Requirements:
 - NO cartoon, illustration, or overly stylized content
 
 Generate ONLY the detailed image prompt (500-800 characters) that will produce this exact image in image generation. Make it specific and actionable."""
-                    }]
-                )
-
-                image_prompt = image_prompt_msg.content[0].text.strip()
-
-                # Create Airtable record
-                fields = {
-                    "Title": idea.get('title', 'Untitled'),
-                    "Content": post_text,
-                    "Status": "Draft",
-                    "Image Prompt": image_prompt,
-                    "Image Concept": idea.get('image_concept', ''),
-                    "Content Type": idea.get('type', 'General'),
-                    "Created Date": datetime.now().isoformat(),
-                }
 
-                record_id = add_airtable_record(base_id, table_id, fields)
+# All four are below the Opus 4.5 cache minimum, so system_block() sends them
+# without cache_control; it turns caching on if a prompt grows past it
+IDEAS_SYSTEM = [PromptCache.system_block(IDEAS_SYSTEM_PROMPT, CONTENT_MODEL)]
+POST_SYSTEM = [PromptCache.system_block(POST_SYSTEM_PROMPT, CONTENT_MODEL)]
+PROOFREAD_SYSTEM = [PromptCache.system_block(PROOFREAD_SYSTEM_PROMPT, CONTENT_MODEL)]
+IMAGE_PROMPT_SYSTEM = [PromptCache.system_block(IMAGE_PROMPT_SYSTEM_PROMPT, CONTENT_MODEL)]
+
+# Container-local cost log; totals (including cache-read tokens) also go to the Modal logs
+content_cost_tracker = CostTracker(log_file="/tmp/api_costs.jsonl")
+
+
+def log_content_cost(message, endpoint: str, latency_ms: Optional[float] = None) -> None:
+    """Record one content call's cost (including prompt-cache reads/writes) and latency"""
+    usage = message.usage
+    cost = content_cost_tracker.log_message(message, model=CONTENT_MODEL, endpoint=endpoint, latency_ms=latency_ms)
+    logging.info(
+        f"💰 {endpoint}: ${cost:.4f} in {latency_ms or 0:.0f}ms ({usage.input_tokens} uncached in, "
+        f"{getattr(usage, 'cache_read_input_tokens', 0) or 0} cache read, "
+        f"{getattr(usage, 'cache_creation_input_tokens', 0) or 0} cache write, {usage.output_tokens} out)"
+    )
+
+
+def proofread_post(post_text: str, client) -> str:
+    """
+    Proofread and fix grammar/spelling errors in LinkedIn post.
+    Returns corrected post text.
+    """
+    try:
+        with content_cost_tracker.timer() as timing:
+            response = client.messages.create(
+                model=CONTENT_MODEL,
+                max_tokens=1000,
+                system=PROOFREAD_SYSTEM,
+                messages=[{
+                    "role": "user",
+                    "content": f"Post:\n{post_text}"
+                }],
+                cache_bypass=True  # Input is a fresh draft - a cached answer would never be read
+            )
+        log_content_cost(response, "proofread_post", timing.latency_ms)
+
+        corrected_text = response.content[0].text.strip()
+        return corrected_text
+    except Exception as e:
+        logging.warning(f"Error during proofreading: {e}")
+        # Return original if proofreading fails
+        return post_text
+
+
+# ============== Daily Content Generation ==============
+
+# Configuration - Diverse topics across personal experience, industry trends, and tactics
+# See MUSA_VOICE_PROFILE.md for complete context on tone and approach
+# Mix of: personal stories, automation insights, AI trends, niche-specific strategies
+DAILY_CONTENT_TOPICS = [
+    # Personal Experience (Musa's Journey)
+    'Why my first business (MC Marketing) failed and what I learned',
+    'The real cost of manual processes your business ignores',
+    'How 5 people can scale like 50 with the right automation',
+    'Small businesses winning against enterprises through automation',
+    'Why marketing services failed before I tried automation',
+
+    # AI & Automation Trends & Benefits
+    'How AI is reshaping business operations in 2025',
+    'The difference between AI hype and AI reality for small teams',
+    'Why most businesses are underutilizing their AI investments',
+    'How automation platforms free up time for what actually matters',
+    'How AI chatbots are transforming customer service workflows',
+    'The 3 AI breakthroughs that will define 2025 for your business',
+    'Why AI adoption is accelerating faster than you think',
+    'The automation ROI that nobody talks about',
+    'How businesses are quietly doubling productivity with AI',
+    'The hidden cost of staying manual in an AI-powered world',
+
+    # Practical Examples: Automation Helping Businesses Thrive
+    'How a plumbing company cut scheduling time by 90%',
+    'The e-commerce team that reduced customer service response time from 6 hours to 2 minutes',
+    'How a 2-person consulting firm handles 50+ client workflows automatically',
+    'The fitness studio that grew 200% without hiring more staff (automation did the work)',
+    'How a digital marketing agency cut project delivery time in half',
+    'The accounting firm that eliminated data entry errors entirely with automation',
+    'How a SaaS company reduced onboarding time from weeks to hours',
+    'The real estate team that closes 40% more deals with AI lead qualification',
+    'How a course creator automates everything except teaching',
+    'The recruitment agency that screens candidates 10x faster',
+
+    # Real Estate Agent Niche
+    'How real estate agents are using AI to close 30% more deals',
+    'The automation strategy real estate agents need right now',
+    'AI lead scoring: How agents qualify 10x faster',
+    'Real estate follow-up automation that converts',
+
+    # Social Media Marketing Agency Niche
+    'How social media agencies are scaling without hiring',
+    'AI content calendars: The competitive advantage agencies are using',
+    'How agencies are automating client reporting and saving 10+ hours/week',
+
+    # Prompting & AI Tactics (20 Topics - Practical, Action-Oriented)
+    'The one-line prompt that unlocked 60% better AI outputs',
+    'How to talk to AI like you talk to a contractor (and get 10x better results)',
+    'The prompt template I use for every business automation',
+    'Why your AI outputs are mediocre (and how to fix it in 30 seconds)',
+    'The 5-part prompt framework that transforms generic to genius',
+    'How context beats complexity in AI prompts',
+    'The constraint that made my AI outputs 100x more useful',
+    'Why you should never ask AI yes-or-no questions (and what to ask instead)',
+    'The prompt pattern that keeps AI focused on what actually matters',
+    'How to debug a broken prompt (before you blame the AI)',
+    'The system prompt hack that changed my AI game',
+    'Why "be more detailed" is the worst prompt advice (and what actually works)',
+    'The role-play prompt that makes AI think like your ideal employee',
+    'How to use examples in prompts to get exactly what you want',
+    'The iterative prompt technique that fixes 80% of bad outputs',
+    'Why specificity matters more than length in prompts',
+    'The output format trick that eliminates AI hallucinations',
+    'How to chain prompts to solve problems AI cannot solve alone',
+    'The prompt that turned my AI from assistant to strategist',
+    'Why you should debate with your AI (and how to do it right)'
+]
+
+# Max Anthropic calls in flight across all content workers (research + posts)
+CONTENT_GEN_CONCURRENCY = int(os.environ.get('CONTENT_GEN_CONCURRENCY', '6'))
+
+# Permits for the shared limiter; reset by generate_daily_content on each run
+anthropic_permits = modal.Queue.from_name("anthropic-permits", create_if_missing=True)
+anthropic_limiter = SharedConcurrencyLimiter(anthropic_permits)
+
+
+# Responses for generate_images_for_post's image-prompt step (same post -> same prompt);
+# opt-in with LLM_CACHE=1. The idea -> post chain bypasses it: every draft is fresh
+llm_response_cache = DictResponseCache(modal.Dict.from_name("llm-response-cache", create_if_missing=True))
+
+
+def cached_anthropic(client) -> CachedAnthropic:
+    """Wrap an Anthropic client with the shared response cache (pass-through unless LLM_CACHE=1)."""
+    return CachedAnthropic(client, llm_response_cache if llm_cache_enabled() else None)
+
+
+def limited_create(client, endpoint: str, **kwargs):
+    """client.messages.create() under the shared Anthropic concurrency cap, logged as `endpoint`."""
+    with anthropic_limiter:
+        # Timed inside the limiter so waiting for a permit doesn't count as latency
+        with content_cost_tracker.timer() as timing:
+            message = client.messages.create(**kwargs)
+    log_content_cost(message, endpoint, timing.latency_ms)
+    return message
+
+
+@app.function(image=image, secrets=[modal.Secret.from_name("linkedin-secrets")], timeout=600, max_containers=CONTENT_GEN_CONCURRENCY)
+def research_topic_ideas(topic: str) -> list:
+    """
+    Generate 3 post ideas for one topic (one Opus call).
+    Returns an empty list on failure so one bad topic doesn't sink the run.
+    """
+    from anthropic import Anthropic
+
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+    logger.info(f"Researching topic: {topic}")
+
+    try:
+        client = Anthropic(api_key=os.environ.get('ANTHROPIC_API_KEY'))
+
+        message = limited_create(
+            client,
+            "research_topic_ideas",
+            model=CONTENT_MODEL,
+            max_tokens=4000,
+            system=IDEAS_SYSTEM,
+            messages=[{
+                "role": "user",
+                "content": f"Topic: {topic}"
+            }]
+        )
+
+        response_text = message.content[0].text.strip()
+
+        # Clean up markdown if present
+        if response_text.startswith('```'):
+            response_text = response_text.split('```')[1]
+            if response_text.startswith('json'):
+                response_text = response_text[4:]
+
+        ideas = json.loads(response_text.strip())
+        for idea in ideas:
+            idea['topic'] = topic
+
+        logger.info(f"Generated {len(ideas)} ideas for {topic}")
+        return ideas
+
+    except Exception as e:
+        logger.warning(f"Error researching topic {topic}: {e}")
+        return []
+
+
+@app.function(image=image, secrets=[modal.Secret.from_name("linkedin-secrets")], timeout=900, max_containers=CONTENT_GEN_CONCURRENCY)
+def generate_post_from_idea(idea: dict, day_name: str) -> Optional[dict]:
+    """
+    Turn one idea into Airtable fields: post, proofread, image prompt (three Opus calls).
+    Returns None on failure.
+    """
+    from anthropic import Anthropic
+
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+    try:
+        client = cached_anthropic(Anthropic(api_key=os.environ.get('ANTHROPIC_API_KEY')))
+
+        # Add day context
+        idea_with_context = {**idea, 'day_context': day_name}
+
+        # Generate post content (voice profile and rules come from the system prompt)
+        prompt = f"""Post Topic: {idea.get('title', '')}
+Type: {idea.get('type', '')}
+Context: {idea.get('description', '')}
+Key Points: {', '.join(idea.get('key_points', []))}"""
+
+        message = limited_create(
+            client,
+            "generate_post_from_idea",
+            model=CONTENT_MODEL,
+            max_tokens=800,
+            system=POST_SYSTEM,
+            messages=[{"role": "user", "content": prompt}],
+            cache_bypass=True  # Post drafts are creative - always write fresh
+        )
+
+        post_text = message.content[0].text.strip()
+
+        # Proofread post for grammar and spelling errors
+        with anthropic_limiter:
+            post_text = proofread_post(post_text, client)
+        logger.info(f"Proofread post completed")
+
+        # Generate image prompt - RELEVANCE-FOCUSED FOR LINKEDIN ENGAGEMENT
+        image_prompt_msg = limited_create(
+            client,
+            "generate_image_prompt",
+            model=CONTENT_MODEL,
+            max_tokens=400,
+            system=IMAGE_PROMPT_SYSTEM,
+            messages=[{
+                "role": "user",
+                "content": f"""Post Topic: {idea.get('title', '')}
+Post Type: {idea.get('type', '')}
+Post Content (first 200 chars): {post_text[:200]}"""
+            }],
+            cache_bypass=True  # Built from the fresh draft - never a repeat request
+        )
+
+        image_prompt = image_prompt_msg.content[0].text.strip()
+
+        fields = {
+            "Title": idea.get('title', 'Untitled'),
+            "Content": post_text,
+            "Status": "Draft",
+            "Image Prompt": image_prompt,
+            "Image Concept": idea.get('image_concept', ''),
+            "Content Type": idea.get('type', 'General'),
+            "Created Date": datetime.now().isoformat(),
+        }
+
+        return fields
+
+    except Exception as e:
+        logger.warning(f"Error generating post for idea {idea.get('title')}: {e}")
+        return None
+
+
+@app.function(image=image, secrets=[modal.Secret.from_name("linkedin-secrets")], timeout=3600)
+def generate_daily_content():
+    """
+    Generate new content posts daily.
+    Creates 21 posts (7 days × 3 posts/day) with Draft status.
+
+    Topic research and post generation fan out across containers with
+    .map()/.starmap(); CONTENT_GEN_CONCURRENCY caps Anthropic calls in flight.
+    """
+    import random
+    import pytz
+
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+    try:
+        logger.info("Running daily content generation")
+
+        base_id = os.environ.get('AIRTABLE_BASE_ID')
+        table_id = os.environ.get('AIRTABLE_LINKEDIN_TABLE_ID')
+        anthropic_key = os.environ.get('ANTHROPIC_API_KEY')
+
+        if not all([base_id, table_id, anthropic_key]):
+            logger.error("Missing required environment variables")
+            return False
+
+        posts_per_day = 3
+        days_ahead = 7
+        total_posts = posts_per_day * days_ahead  # 21 posts
+        max_posts_threshold = 21  # Stop generation when this many posts exist
+
+        logger.info(f"Generating {total_posts} posts for {days_ahead} days")
+
+        # Check current post count - suspend if we're at threshold
+        try:
+            # Only the Status field is needed to count - keeps the payload tiny
+            records = list(get_airtable_client(base_id, table_id).iter_records(fields=['Status']))
+            current_post_count = len(records)
+            logger.info(f"Current post count: {current_post_count}")
+
+            if current_post_count >= max_posts_threshold:
+                logger.info(f"Post threshold reached ({current_post_count}/{max_posts_threshold}). Suspending generation.")
+                return True  # Return success without generating - suspension is normal
+        except Exception as e:
+            logger.warning(f"Error checking post count: {e}")
+            # Continue with generation if check fails
+
+        # Fresh permit pool for this run (also reclaims permits from crashed workers)
+        anthropic_limiter.reset(CONTENT_GEN_CONCURRENCY)
+
+        if llm_cache_enabled():
+            evicted = llm_response_cache.evict()
+            if evicted:
+                logger.info(f"LLM cache: evicted {evicted} expired/old response(s)")
+
+        # Research topics and generate ideas
+        logger.info("Researching topics and generating ideas...")
+
+        # Randomize topic selection to avoid monotone content
+        topics_shuffled = random.sample(DAILY_CONTENT_TOPICS, min(len(DAILY_CONTENT_TOPICS), max(3, len(DAILY_CONTENT_TOPICS)//2)))
+        logger.info(f"Selected {len(topics_shuffled)} randomized topics for generation (concurrency {CONTENT_GEN_CONCURRENCY})")
+
+        all_ideas = []
+        for topic, ideas in zip(topics_shuffled, research_topic_ideas.map(topics_shuffled, return_exceptions=True)):
+            if isinstance(ideas, Exception):
+                logger.warning(f"Error researching topic {topic}: {ideas}")
+                continue
+            all_ideas.extend(ideas)
+
+        if not all_ideas:
+            logger.error("No ideas generated")
+            return False
+
+        logger.info(f"Total ideas generated: {len(all_ideas)}")
+
+        # Generate full posts from ideas
+        logger.info("Generating full post content...")
 
-                if record_id:
-                    posts_created += 1
-                    logger.info(f"Created post {posts_created}/{total_posts}: {idea.get('title')}")
-                else:
-                    logger.warning(f"Failed to create post for idea: {idea.get('title')}")
+        tz = pytz.timezone('America/New_York')
+        post_args = []
 
-            except Exception as e:
-                logger.warning(f"Error generating post {i}: {e}")
+        for i in range(total_posts):
+            # Select idea (cycle through available ideas)
+            idea = all_ideas[i % len(all_ideas)]
+
+            # Determine what day this post is for
+            day_num = i // posts_per_day
+            post_date = datetime.now(tz) + timedelta(days=day_num)
+            post_args.append((idea, post_date.strftime('%A')))
+
+        # Results come back in input order
+        all_fields = []
+        for i, fields in enumerate(generate_post_from_idea.starmap(post_args, return_exceptions=True)):
+            if isinstance(fields, Exception) or not fields:
+                logger.warning(f"Error generating post {i}: {fields}")
                 continue
+            all_fields.append(fields)
+
+        # Create Airtable records 10 per request
+        result = get_airtable_client(base_id, table_id).batch_create(all_fields)
+        posts_created = result.succeeded_count
+
+        for failure in result.failures:
+            logger.warning(f"Failed to create post for idea: {failure.item.get('Title')} ({failure.error[:200]})")
 
         logger.info(f"Daily content generation complete: {posts_created}/{total_posts} posts created")
         return posts_created > 0
@@ -1095,16 +1216,15 @@ def cleanup_scheduled_deletions():
         # Use Airtable filter formula to find records due for deletion
         formula = f"IS_BEFORE({{Scheduled Deletion Date}}, '{formatted_now}')"
 
-        url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-        params = {"filterByFormula": formula}
-
-        response = requests.get(url, headers=get_airtable_headers(), params=params, timeout=30)
-
-        if response.status_code != 200:
-            logger.error(f"Failed to query records: {response.status_code} - {response.text}")
+        try:
+            records = list(get_airtable_client(base_id, table_id).iter_records(
+                formula=formula,
+                fields=['Status', 'Scheduled Deletion Date'],
+            ))
+        except Exception as e:
+            logger.error(f"Failed to query records: {e}")
             return False
 
-        records = response.json().get('records', [])
         logger.info(f"Found {len(records)} records due for deletion")
 
         deleted_count = 0
@@ -1139,92 +1259,15 @@ def cleanup_scheduled_deletions():
 
 # ============== Cloud-Native Polling (replaces Mac LaunchAgent) ==============
 
-def fetch_all_airtable_records(base_id: str, table_id: str) -> List[dict]:
-    """Fetch all records from Airtable with pagination"""
-    try:
-        all_records = []
-        offset = None
-        url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-
-        while True:
-            params = {}
-            if offset:
-                params['offset'] = offset
-
-            response = requests.get(url, headers=get_airtable_headers(), timeout=10, params=params)
-
-            if response.status_code == 200:
-                data = response.json()
-                all_records.extend(data.get('records', []))
-
-                # Check if there are more records
-                offset = data.get('offset')
-                if not offset:
-                    break
-            else:
-                logging.error(f"Airtable API error: {response.status_code} - {response.text}")
-                break
-
-        return all_records
-    except Exception as e:
-        logging.error(f"Error fetching records: {e}")
-        return []
-
-
-def build_polling_state(records: List[dict]) -> dict:
-    """Build state dict from current Airtable records"""
-    state = {}
-    for record in records:
-        record_id = record['id']
-        fields = record.get('fields', {})
-        state[record_id] = {
-            'title': fields.get('Title', 'Untitled'),
-            'status': fields.get('Status', 'Draft'),
-            'last_seen': datetime.now().isoformat()
-        }
-    return state
-
-
-def detect_status_changes(old_state: dict, new_state: dict) -> List[dict]:
-    """Compare old and new states, return list of changes"""
-    trigger_statuses = {
-        'Pending Review': 'image_generation',
-        'Approved - Ready to Schedule': 'scheduling',
-        'Rejected': 'rejection_handling'
-    }
-
-    changes = []
-
-    for record_id, new_data in new_state.items():
-        if record_id not in old_state:
-            # New record
-            if new_data['status'] in trigger_statuses:
-                changes.append({
-                    'record_id': record_id,
-                    'title': new_data['title'],
-                    'old_status': None,
-                    'new_status': new_data['status'],
-                    'reason': 'new_record'
-                })
-        else:
-            old_data = old_state[record_id]
-            # Status changed
-            if old_data['status'] != new_data['status']:
-                if new_data['status'] in trigger_statuses:
-                    changes.append({
-                        'record_id': record_id,
-                        'title': new_data['title'],
-                        'old_status': old_data['status'],
-                        'new_status': new_data['status'],
-                        'reason': 'status_change'
-                    })
-
-    return changes
-
-
 # Use Modal's KV store for polling state persistence
 polling_state_kv = modal.Dict.from_name("polling-state", create_if_missing=True)
 
+# Fire-time index read by the minute scheduler in execution/modal_maintain_inventory.py
+due_queue_store = modal.Dict.from_name(DUE_QUEUE_DICT_NAME, create_if_missing=True)
+
+# Compare-and-set leases on posting windows, shared by every scheduling call
+slot_leases_store = modal.Dict.from_name(SLOT_LEASES_DICT_NAME, create_if_missing=True)
+
 
 @app.function(
     image=image,
@@ -1240,6 +1283,9 @@ def poll_airtable_for_changes():
     which runs once per minute (1,440 checks/day) for 92% cost savings vs 5-second polling.
 
     This consolidation allows us to stay within Modal's 5 cron job limit.
+
+    Prefer drain_change_feed(), which reads only changed records from the
+    Airtable webhook cursor; this watermark poll remains as a fallback.
     """
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
@@ -1254,20 +1300,12 @@ def poll_airtable_for_changes():
 
         logger.info("Cloud polling: Checking Airtable for status changes...")
 
-        # Fetch current records from Airtable
-        records = fetch_all_airtable_records(base_id, table_id)
-        if not records:
-            logger.warning("No records found or API error")
-            return {"success": False, "error": "No records found"}
-
-        # Build new state
-        new_state = build_polling_state(records)
-
-        # Load old state from Modal KV store
-        old_state = dict(polling_state_kv) if polling_state_kv else {}
-
-        # Detect changes
-        changes = detect_status_changes(old_state, new_state)
+        # Only rows whose Status/Title changed since the last poll; changed
+        # keys are written back to the KV store in one batched update
+        poller = DeltaPoller(get_airtable_client(base_id, table_id), polling_state_kv, default_status='Draft')
+        changes = poller.poll()
+        if changes is None:
+            return {"success": False, "error": "Airtable request failed"}
 
         if changes:
             logger.info(f"Detected {len(changes)} status change(s)")
@@ -1288,15 +1326,10 @@ def poll_airtable_for_changes():
                     logger.error(f"  ❌ Failed to trigger handler: {e}")
 
         else:
-            logger.debug(f"No changes detected. Tracking {len(new_state)} records.")
-
-        # Update state in Modal KV store
-        for record_id, data in new_state.items():
-            polling_state_kv[record_id] = data
+            logger.debug("No changes detected.")
 
         return {
             "success": True,
-            "records_checked": len(new_state),
             "changes_detected": len(changes)
         }
 
@@ -1307,11 +1340,69 @@ def poll_airtable_for_changes():
         return {"success": False, "error": str(e)}
 
 
+# ============== Change Feed (Airtable webhook payloads) ==============
+
+# Webhook ID + payload cursor + delivery bookkeeping (see utils/change_feed.py)
+change_feed_store = modal.Dict.from_name(CHANGE_FEED_DICT_NAME, create_if_missing=True)
+
+
+@app.function(
+    image=image,
+    secrets=[modal.Secret.from_name("linkedin-secrets")],
+    timeout=300,
+    max_containers=1,  # one drain at a time, so the cursor has a single writer
+)
+def drain_change_feed():
+    """
+    Dispatch status changes from the Airtable webhook payload cursor to handle_webhook.
+
+    Replaces poll_airtable_for_changes: one small payloads request instead of
+    re-reading every record. Triggered by airtable_change_ping; calling it
+    also creates or refreshes the webhook (Airtable expires them after 7 days),
+    so any cron that runs at least weekly can keep it alive.
+    """
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+    base_id = os.environ.get('AIRTABLE_BASE_ID')
+    table_id = os.environ.get('AIRTABLE_LINKEDIN_TABLE_ID')
+    if not base_id or not table_id:
+        logger.error("Missing Airtable configuration")
+        return {"success": False, "error": "Missing Airtable config"}
+
+    feed = ChangeFeed(get_airtable_client(base_id, table_id), change_feed_store).load()
+    if not feed.ensure_webhook(os.environ.get('CHANGE_FEED_NOTIFICATION_URL')):
+        return {"success": False, "error": "Could not create Airtable webhook"}
+
+    def dispatch(event):
+        logger.info(f"  📝 {event.record_id}: {event.old_status or 'N/A'} → {event.new_status}")
+        logger.info(f"     {event.title}")
+        return handle_webhook.remote(event.record_id, event.new_status, base_id, table_id)
+
+    summary = feed.drain(dispatch)
+    logger.info(f"Change feed: {summary['dispatched']} dispatched, {summary['failed']} failed, cursor {summary['cursor']}")
+    return summary
+
+
+@app.function(image=image)
+@fastapi_endpoint(method="POST")
+def airtable_change_ping(ping: dict):
+    """
+    Notification URL for the Airtable webhook (set CHANGE_FEED_NOTIFICATION_URL to this).
+
+    Airtable pings ~1s after a watched change; the ping has no change data,
+    so it only queues a drain and answers immediately.
+    """
+    drain_change_feed.spawn()
+    return {"success": True}
+
+
 @app.function(image=image, secrets=[modal.Secret.from_name("linkedin-secrets")], timeout=300)
 def check_and_fix_scheduling_issues(base_id: str, table_id: str):
     """
     Detect and automatically correct scheduling issues in Airtable.
-    Called after posts are scheduled to catch conflicts.
+    Safety net for manual edits; scheduling itself leases windows
+    (utils/slot_leases.py), so it no longer runs after every approval.
 
     Issues detected:
     1. Multiple posts in same posting window on same day
@@ -1321,8 +1412,6 @@ def check_and_fix_scheduling_issues(base_id: str, table_id: str):
     Auto-corrects by redistributing posts to available windows.
     """
     import pytz
-    from datetime import datetime, timedelta
-    import random
 
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
@@ -1330,100 +1419,71 @@ def check_and_fix_scheduling_issues(base_id: str, table_id: str):
     try:
         logger.info("Checking for scheduling issues...")
 
-        tz = pytz.timezone('America/New_York')
-        now = datetime.now(tz)
-        posting_times = [9, 14, 20]
-        window_buffer = 30  # minutes
-
-        # Fetch all records
-        headers = {
-            'Authorization': f'Bearer {os.environ.get("AIRTABLE_API_KEY")}',
-            'Content-Type': 'application/json'
-        }
-        url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-        response = requests.get(url, headers=headers, timeout=30)
+        tz = pytz.timezone(POSTING_TIMEZONE)
 
-        if response.status_code != 200:
-            logger.warning(f"Could not fetch records: {response.status_code}")
+        # Fetch scheduled records only
+        client = get_airtable_client(base_id, table_id)
+        try:
+            records = list(client.iter_records(
+                formula=formula_and(formula_eq('Status', 'Scheduled'), formula_not_blank('Scheduled Time')),
+                fields=['Title', 'Status', 'Scheduled Time'],
+            ))
+        except Exception as e:
+            logger.warning(f"Could not fetch records: {e}")
             return {"success": False, "error": "API fetch failed"}
 
-        records = response.json().get('records', [])
-        window_occupancy = {}  # Key: (date, window_hour), Value: [record_ids]
+        calendar = SlotCalendar(POSTING_WINDOWS, tz=tz)
+        window_occupancy = {}  # Key: (date, window index), Value: posts
 
         # Build window occupancy map for scheduled posts
         for record in records:
             record_id = record.get('id')
             fields = record.get('fields', {})
-            status = fields.get('Status', '')
-            scheduled_time_str = fields.get('Scheduled Time')
-
-            if status != 'Scheduled' or not scheduled_time_str:
+            if fields.get('Status', '') != 'Scheduled':
                 continue
 
-            try:
-                # Parse scheduled time - handle both ISO and UTC Z formats
-                if scheduled_time_str.endswith('Z'):
-                    scheduled_time_str = scheduled_time_str.replace('Z', '+00:00')
-
-                scheduled = datetime.fromisoformat(scheduled_time_str).astimezone(tz)
-
-                # Determine which window this post belongs to
-                for window_hour in posting_times:
-                    window_time = scheduled.replace(hour=window_hour, minute=0, second=0, microsecond=0)
-                    time_diff = abs((scheduled - window_time).total_seconds() / 60)
-
-                    if time_diff <= window_buffer:
-                        date_key = scheduled.strftime('%Y-%m-%d')
-                        window_key = (date_key, window_hour)
-
-                        if window_key not in window_occupancy:
-                            window_occupancy[window_key] = []
-
-                        window_occupancy[window_key].append({
-                            'record_id': record_id,
-                            'title': fields.get('Title', 'Untitled'),
-                            'scheduled_time': scheduled.isoformat()
-                        })
-                        break
-            except Exception as e:
-                logger.warning(f"Could not parse scheduled time for {record_id}: {e}")
+            scheduled = parse_time(fields.get('Scheduled Time'), tz)
+            if scheduled is None:
+                logger.warning(f"Could not parse scheduled time for {record_id}: {fields.get('Scheduled Time')}")
                 continue
 
-        # Find and fix window conflicts
+            slot = calendar.add(scheduled)
+            if slot is not None:
+                window_occupancy.setdefault(slot, []).append({
+                    'record_id': record_id,
+                    'title': fields.get('Title', 'Untitled'),
+                    'scheduled_time': scheduled.isoformat()
+                })
+
+        # Find window conflicts; keep the first post, move the others to free windows that day
         issues_found = 0
         issues_fixed = 0
+        moves = []
 
-        for (date_key, window_hour), posts in window_occupancy.items():
+        for (day, window_index), posts in window_occupancy.items():
             if len(posts) > 1:
                 issues_found += 1
-                logger.warning(f"⚠ Window conflict on {date_key} at {window_hour}:00 - {len(posts)} posts")
+                logger.warning(f"⚠ Window conflict on {day} at {POSTING_WINDOWS[window_index].label} - {len(posts)} posts")
 
-                # Keep first post, redistribute others
-                kept_post = posts[0]
-                posts_to_move = posts[1:]
-
-                # Get available windows on this date
-                available_windows = [w for w in posting_times if (date_key, w) not in window_occupancy or (date_key, w) == (date_key, window_hour)]
-
-                for post in posts_to_move:
-                    if available_windows and available_windows[0] != window_hour:
-                        new_window = available_windows.pop(0)
-                        target_date = datetime.strptime(date_key, '%Y-%m-%d').replace(tzinfo=tz)
-                        new_time = target_date.replace(hour=new_window, minute=0, second=0, microsecond=0)
-                        offset_minutes = random.randint(-15, 15)
-                        new_time = new_time + timedelta(minutes=offset_minutes)
-
-                        # Update record
-                        update_url = f"https://api.airtable.com/v0/{base_id}/{table_id}/{post['record_id']}"
-                        update_payload = {"fields": {"Scheduled Time": new_time.isoformat()}}
-
-                        update_response = requests.patch(update_url, json=update_payload, headers=headers, timeout=30)
-
-                        if update_response.status_code == 200:
-                            issues_fixed += 1
-                            logger.info(f"✓ Moved {post['record_id']} to {new_window}:00 window")
-                        else:
-                            logger.error(f"✗ Failed to update {post['record_id']}")
+                for post in posts[1:]:
+                    free = calendar.free_windows(day)
+                    if not free:
+                        break
+                    calendar.occupy(day, free[0])
+                    moves.append((post, calendar.place(day, free[0]), free[0]))
+
+        result = client.batch_update([
+            {"id": post['record_id'], "fields": {"Scheduled Time": new_time.isoformat()}}
+            for post, new_time, _ in moves
+        ])
+
+        for (post, new_time, window_index), updated in zip(moves, result.records):
+            if updated:
+                issues_fixed += 1
+                push_scheduled_post(due_queue_store, post['record_id'], new_time.isoformat())
+                logger.info(f"✓ Moved {post['record_id']} to {POSTING_WINDOWS[window_index].label} window")
+            else:
+                logger.error(f"✗ Failed to update {post['record_id']}")
 
         if issues_found > 0:
             logger.info(f"Scheduling issue detection complete: {issues_found} conflicts, {issues_fixed} fixed")
@@ -1463,13 +1523,10 @@ def handle_webhook(record_id: str, status: str, base_id: str = None, table_id: s
 
     elif status == "Approved - Ready to Schedule":
         logger.info("Spawning post scheduling...")
+        # Windows are leased, so parallel spawns can't double-book and no
+        # check_and_fix_scheduling_issues pass is needed afterwards
         schedule_approved_post.spawn(record_id, base_id, table_id)
 
-        # After scheduling, check for any scheduling issues and auto-correct them
-        # This catches cases where multiple posts end up in the same window
-        logger.info("Running scheduling issue detection...")
-        check_and_fix_scheduling_issues.spawn(base_id, table_id)
-
         return {"success": True, "action": "scheduling_triggered"}
 
     elif status == "Rejected":
@@ -1795,6 +1852,7 @@ def airtable_webhook_listener():
             table_id = os.environ.get('AIRTABLE_LINKEDIN_TABLE_ID')
 
             processed_count = 0
+            approved_ids = []
 
             for tbl_id, table_data in changed_tables.items():
                 # Only process our LinkedIn posts table
@@ -1811,19 +1869,10 @@ def airtable_webhook_listener():
 
                         logger.info(f"Processing record {record_id}: status={status}")
 
-                        # Trigger scheduling if status is "Approved - Ready to Schedule"
+                        # Collect "Approved - Ready to Schedule" posts; bulk approvals are scheduled in one pass below
                         if status == 'Approved - Ready to Schedule':
-                            logger.info(f"Triggering schedule for approved post: {record_id}")
-
-                            # Call the scheduling function
-                            result = schedule_approved_post.remote(
-                                record_id,
-                                base_id,
-                                table_id
-                            )
-
-                            logger.info(f"Schedule result: {result}")
-                            processed_count += 1
+                            logger.info(f"Queueing approved post for scheduling: {record_id}")
+                            approved_ids.append(record_id)
 
                         # Trigger image generation if status is "Pending Review"
                         elif status == 'Pending Review':
@@ -1843,6 +1892,12 @@ def airtable_webhook_listener():
                         import traceback
                         logger.error(traceback.format_exc())
 
+            if approved_ids:
+                # One read and one batched write for the whole batch
+                result = schedule_approved_posts.remote(approved_ids, base_id, table_id)
+                logger.info(f"Schedule result: {result}")
+                processed_count += len(approved_ids)
+
             return {
                 "success": True,
                 "message": f"Processed {processed_count} records",
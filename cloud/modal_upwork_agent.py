@@ -19,14 +19,25 @@ Cron Jobs:
 
 import modal
 import os
+import sys
 import json
 from datetime import datetime
+from pathlib import Path
 from typing import Optional
 
+# Shared helpers live in execution/utils (mounted into the images as /root/utils)
+UTILS_DIR = Path(__file__).resolve().parent.parent / "execution" / "utils"
+sys.path.insert(0, str(UTILS_DIR.parent))
+from utils.airtable_client import AirtableClient
+from utils.seen_jobs import SEEN_JOBS_DICT_NAME, WATERMARK_SIZE, SeenJobIndex
+
 # ============== Modal App Setup ==============
 
 app = modal.App("upwork-automation")
 
+# Job IDs already in Airtable + per-term high-water marks (see utils/seen_jobs.py)
+seen_jobs_store = modal.Dict.from_name(SEEN_JOBS_DICT_NAME, create_if_missing=True)
+
 # Image with all dependencies (base for API calls)
 image = (
     modal.Image.debian_slim(python_version="3.11")
@@ -37,6 +48,7 @@ image = (
         "aiohttp",
         "fastapi[standard]",
     )
+    .add_local_dir(str(UTILS_DIR), remote_path="/root/utils")
 )
 
 # Image with Selenium for scraping
@@ -60,6 +72,7 @@ scraper_image = (
         "CHROME_BIN": "/usr/bin/chromium",
         "CHROMEDRIVER_PATH": "/usr/bin/chromedriver",
     })
+    .add_local_dir(str(UTILS_DIR), remote_path="/root/utils")
 )
 
 
@@ -167,48 +180,44 @@ Generate ONLY the proposal text, ready to submit."""
 )
 def sync_to_airtable(jobs: list) -> dict:
     """
-    Sync jobs to Airtable.
+    Sync jobs to Airtable (10 records per request).
     """
-    import requests
-    
     api_key = os.environ.get("AIRTABLE_API_KEY")
     base_id = os.environ.get("AIRTABLE_UPWORK_BASE_ID")
     table_name = "Upwork Jobs"
     
     log_to_slack(f"📤 Syncing {len(jobs)} jobs to Airtable...")
     
-    url = f"https://api.airtable.com/v0/{base_id}/{table_name}"
-    headers = get_airtable_headers()
-    
-    synced = 0
-    failed = 0
+    client = AirtableClient(base_id, table_name, api_key=api_key)
     
     try:
-        for job in jobs:
-            record = {
-                "fields": {
-                    "Job Title": job.get("title", ""),
-                    "Description": job.get("description", "")[:10000],
-                    "Budget": str(job.get("budget", "")),
-                    "Skills": job.get("skills", ""),
-                    "Job URL": job.get("url", ""),
-                    "Status": "New",
-                    "Scraped At": datetime.now().isoformat()
-                }
+        records = [
+            {
+                "Job Title": job.get("title", ""),
+                "Description": job.get("description", "")[:10000],
+                "Budget": str(job.get("budget", "")),
+                "Skills": job.get("skills", ""),
+                "Job URL": job.get("url", ""),
+                "Status": "New",
+                "Scraped At": datetime.now().isoformat()
             }
-            
-            response = requests.post(url, headers=headers, json=record, timeout=30)
-            if response.status_code in [200, 201]:
-                synced += 1
-            else:
-                failed += 1
+            for job in jobs
+        ]
         
-        log_to_slack(f"✅ Sync complete: {synced} synced, {failed} failed")
+        result = client.batch_create(records)
+        synced = result.succeeded_count
+        failed = result.failed_count
+        
+        log_to_slack(f"✅ Sync complete: {synced} synced, {failed} failed ({result.requests} requests)")
         
         return {
             "status": "success",
             "synced": synced,
             "failed": failed,
+            "errors": [
+                {"url": jobs[f.index].get("url", ""), "error": f.error[:200]}
+                for f in result.failures
+            ],
             "airtable_url": f"https://airtable.com/{base_id}",
             "timestamp": datetime.now().isoformat()
         }
@@ -363,65 +372,58 @@ def daily_status_check():
 # ============================================================================
 
 
-# ============== Scraper Functions ==============
+# ============== Scraper Helpers ==============
 
-@app.function(
-    image=scraper_image,
-    secrets=[modal.Secret.from_name("upwork-secrets"), modal.Secret.from_name("upwork-cookies")],
-    timeout=900,  # 15 minutes for scraping
-    memory=2048,  # More memory for Chrome
-)
-def scrape_upwork_jobs(
-    search_terms: list = None,
-    max_jobs_per_term: int = 15,
-    max_pages_per_term: int = 2
-) -> dict:
+# Default search terms for AI/automation jobs
+DEFAULT_SEARCH_TERMS = [
+    "AI automation",
+    "Make.com",
+    "Zapier integration",
+    "n8n workflow",
+    "no code automation",
+    "workflow automation",
+    "AI agent",
+    "ChatGPT integration",
+]
+
+# Browsers scraping in parallel (one Modal container each)
+SCRAPE_WORKERS = int(os.environ.get("SCRAPE_WORKERS", "4"))
+
+# Job tile selectors, most specific first
+JOB_TILE_SELECTORS = [
+    "article[data-test='JobTile']",
+    "section.job-tile",
+    "[data-test='job-tile-list'] > div",
+]
+
+PAGE_LOAD_TIMEOUT = 20  # seconds to wait for a page / job tiles
+
+
+def _wait_for_page_load(driver, timeout: int = PAGE_LOAD_TIMEOUT):
+    """Wait until the document has finished loading."""
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException
+    
+    try:
+        WebDriverWait(driver, timeout).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+    except TimeoutException:
+        pass
+
+
+def _start_upwork_driver(cookies: list, worker_label: str = ""):
     """
-    Scrape Upwork jobs using Selenium with cookie authentication.
+    Start headless Chromium and log in with the exported Upwork cookies.
+    
+    Returns:
+        (driver, None) on success, (None, error message) otherwise
     """
-    import json
-    import time
-    import re
-    from urllib.parse import quote_plus
     from selenium import webdriver
     from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    
-    # Default search terms for AI/automation jobs
-    DEFAULT_TERMS = [
-        "AI automation",
-        "Make.com",
-        "Zapier integration",
-        "n8n workflow",
-        "no code automation",
-        "workflow automation",
-        "AI agent",
-        "ChatGPT integration",
-    ]
-    
-    if search_terms is None:
-        search_terms = DEFAULT_TERMS
-    
-    log_to_slack(f"🔍 Starting Upwork scrape for {len(search_terms)} search terms...")
-    
-    # Load cookies from environment
-    cookies_json = os.environ.get("UPWORK_COOKIES", "[]")
-    log_to_slack(f"📦 Cookies JSON length: {len(cookies_json)}")
-    
-    try:
-        cookies = json.loads(cookies_json)
-        log_to_slack(f"🍪 Parsed {len(cookies)} cookies")
-    except Exception as e:
-        log_to_slack(f"❌ Failed to parse UPWORK_COOKIES: {str(e)}")
-        return {"status": "error", "message": "Invalid cookies"}
+    from selenium.common.exceptions import TimeoutException
     
-    if not cookies:
-        log_to_slack("❌ No Upwork cookies configured")
-        return {"status": "error", "message": "No cookies"}
-    
-    # Setup Chrome
     chrome_options = Options()
     chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--no-sandbox")
@@ -432,18 +434,13 @@ def scrape_upwork_jobs(
     chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
     chrome_options.binary_location = "/usr/bin/chromium"
     
-    driver = None
-    all_jobs = []
-    seen_ids = set()
+    log_to_slack(f"🚀 Starting Chrome{worker_label}...")
+    driver = webdriver.Chrome(options=chrome_options)
     
     try:
-        log_to_slack("🚀 Starting Chrome...")
-        driver = webdriver.Chrome(options=chrome_options)
-        
         # Load cookies
-        log_to_slack("🌐 Loading upwork.com...")
         driver.get("https://www.upwork.com")
-        time.sleep(2)
+        _wait_for_page_load(driver)
         driver.delete_all_cookies()
         
         added_cookies = 0
@@ -462,150 +459,337 @@ def scrape_upwork_jobs(
             except:
                 pass
         
-        log_to_slack(f"🍪 Added {added_cookies} cookies")
-        driver.refresh()
-        time.sleep(3)
+        log_to_slack(f"🍪 Added {added_cookies} cookies{worker_label}")
         
-        # Check login
-        log_to_slack("🔐 Checking login status...")
+        # Check login: find-work either settles on the feed or redirects to login
         driver.get("https://www.upwork.com/nx/find-work/")
-        time.sleep(5)
+        _wait_for_page_load(driver)
+        try:
+            WebDriverWait(driver, PAGE_LOAD_TIMEOUT).until(
+                lambda d: "login" in d.current_url.lower() or "find-work" in d.current_url.lower()
+            )
+        except TimeoutException:
+            pass
         
         current_url = driver.current_url
-        log_to_slack(f"📍 Current URL: {current_url[:80]}...")
+        log_to_slack(f"📍 Current URL{worker_label}: {current_url[:80]}...")
         
         if "login" in current_url.lower():
-            log_to_slack("❌ Not logged in - cookies expired. Please re-export cookies.")
-            return {"status": "error", "message": "Cookies expired - please update"}
+            driver.quit()
+            return None, "Cookies expired - please update"
         
-        log_to_slack("✅ Logged into Upwork successfully!")
+        return driver, None
+    
+    except Exception:
+        driver.quit()
+        raise
+
+
+def _scrape_search_term(driver, term: str, max_jobs: int, max_pages: int, seen_ids: set, known: SeenJobIndex = None) -> tuple:
+    """
+    Scrape up to `max_jobs` new jobs for one search term.
+    
+    Skips IDs in `seen_ids` (this run) and `known` (already in Airtable); stops
+    paginating at the first known job once the term has a watermark.
+    
+    Returns:
+        (new jobs, newest job IDs on page 1 for the term's watermark)
+    """
+    import re
+    from urllib.parse import quote_plus
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+    
+    term_jobs = []
+    top_ids = []
+    reached_known = False
+    log_to_slack(f"🔎 Searching: {term}")
+    
+    for page in range(1, max_pages + 1):
+        if len(term_jobs) >= max_jobs or reached_known:
+            break
         
-        # Scrape each search term
-        for term in search_terms:
-            term_jobs = []
-            log_to_slack(f"🔎 Searching: {term}")
+        encoded_term = quote_plus(term)
+        url = f"https://www.upwork.com/nx/search/jobs/?q={encoded_term}&sort=recency&payment_verified=1"
+        if page > 1:
+            url += f"&page={page}"
+        
+        try:
+            driver.get(url)
+            
+            # Wait for the first job tile instead of sleeping a fixed time
+            try:
+                WebDriverWait(driver, PAGE_LOAD_TIMEOUT).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, ", ".join(JOB_TILE_SELECTORS)))
+                )
+            except TimeoutException:
+                pass
             
-            for page in range(1, max_pages_per_term + 1):
-                if len(term_jobs) >= max_jobs_per_term:
+            # Try multiple selectors for job tiles
+            job_tiles = []
+            for selector in JOB_TILE_SELECTORS:
+                job_tiles = driver.find_elements(By.CSS_SELECTOR, selector)
+                if job_tiles:
                     break
-                
-                encoded_term = quote_plus(term)
-                url = f"https://www.upwork.com/nx/search/jobs/?q={encoded_term}&sort=recency&payment_verified=1"
-                if page > 1:
-                    url += f"&page={page}"
-                
+            
+            log_to_slack(f"   Found {len(job_tiles)} job tiles on page {page} ({term})")
+            
+            if not job_tiles:
+                # Debug: log page source snippet
+                page_text = driver.page_source[:500]
+                log_to_slack(f"   Page snippet: {page_text[:200]}...")
+                break
+            
+            for tile in job_tiles:
                 try:
-                    driver.get(url)
-                    time.sleep(4)
+                    # Title and URL - try multiple selectors
+                    title_elem = None
+                    for selector in ["a[data-test='job-tile-title-link']", "h2 a", "a.job-title", ".job-tile-title a"]:
+                        try:
+                            title_elem = tile.find_element(By.CSS_SELECTOR, selector)
+                            if title_elem:
+                                break
+                        except:
+                            continue
                     
-                    # Try multiple selectors for job tiles
-                    job_tiles = driver.find_elements(By.CSS_SELECTOR, "article[data-test='JobTile']")
-                    if not job_tiles:
-                        job_tiles = driver.find_elements(By.CSS_SELECTOR, "section.job-tile")
-                    if not job_tiles:
-                        job_tiles = driver.find_elements(By.CSS_SELECTOR, "[data-test='job-tile-list'] > div")
+                    if not title_elem:
+                        continue
+                        
+                    title = title_elem.text.strip()
+                    job_url = title_elem.get_attribute("href")
                     
-                    log_to_slack(f"   Found {len(job_tiles)} job tiles on page {page}")
+                    # Job ID
+                    job_id = None
+                    if job_url:
+                        match = re.search(r'/jobs/~(\w+)', job_url)
+                        if match:
+                            job_id = match.group(1)
                     
-                    if not job_tiles:
-                        # Debug: log page source snippet
-                        page_text = driver.page_source[:500]
-                        log_to_slack(f"   Page snippet: {page_text[:200]}...")
+                    if job_id and page == 1 and len(top_ids) < WATERMARK_SIZE:
+                        top_ids.append(job_id)
                     
-                    for tile in job_tiles:
-                        try:
-                            # Title and URL - try multiple selectors
-                            title_elem = None
-                            for selector in ["a[data-test='job-tile-title-link']", "h2 a", "a.job-title", ".job-tile-title a"]:
-                                try:
-                                    title_elem = tile.find_element(By.CSS_SELECTOR, selector)
-                                    if title_elem:
-                                        break
-                                except:
-                                    continue
-                            
-                            if not title_elem:
-                                continue
-                                
-                            title = title_elem.text.strip()
-                            job_url = title_elem.get_attribute("href")
-                            
-                            # Job ID
-                            job_id = None
-                            if job_url:
-                                match = re.search(r'/jobs/~(\w+)', job_url)
-                                if match:
-                                    job_id = match.group(1)
-                            
-                            if job_id and job_id in seen_ids:
-                                continue
-                            
-                            # Description
-                            description = ""
-                            try:
-                                desc_elem = tile.find_element(By.CSS_SELECTOR, "[data-test='job-description-text'], [data-test='UpCLineClamp JobDescription']")
-                                description = desc_elem.text.strip()
-                            except:
-                                pass
-                            
-                            # Budget
-                            budget = ""
-                            try:
-                                budget_elem = tile.find_element(By.CSS_SELECTOR, "[data-test='is-fixed-price'], [data-test='job-type-label']")
-                                budget = budget_elem.text.strip()
-                            except:
-                                pass
-                            
-                            # Skills
-                            skills = []
-                            try:
-                                skill_elems = tile.find_elements(By.CSS_SELECTOR, "[data-test='token']")
-                                skills = [s.text.strip() for s in skill_elems if s.text.strip()]
-                            except:
-                                pass
-                            
-                            if job_id:
-                                seen_ids.add(job_id)
-                                term_jobs.append({
-                                    "id": job_id,
-                                    "title": title,
-                                    "description": description,
-                                    "budget": budget,
-                                    "skills": skills,
-                                    "url": job_url,
-                                    "search_term": term,
-                                    "scraped_at": datetime.now().isoformat()
-                                })
-                        except:
-                            continue
+                    if job_id and known is not None and job_id in known:
+                        if known.should_stop(term, job_id):
+                            # Recency-sorted: everything below is already synced
+                            reached_known = True
+                            break
+                        continue
                     
-                except Exception as e:
-                    print(f"Error on page {page}: {e}")
-                    break
-                
-                time.sleep(2)
+                    if job_id and job_id in seen_ids:
+                        continue
+                    
+                    # Description
+                    description = ""
+                    try:
+                        desc_elem = tile.find_element(By.CSS_SELECTOR, "[data-test='job-description-text'], [data-test='UpCLineClamp JobDescription']")
+                        description = desc_elem.text.strip()
+                    except:
+                        pass
+                    
+                    # Budget
+                    budget = ""
+                    try:
+                        budget_elem = tile.find_element(By.CSS_SELECTOR, "[data-test='is-fixed-price'], [data-test='job-type-label']")
+                        budget = budget_elem.text.strip()
+                    except:
+                        pass
+                    
+                    # Skills
+                    skills = []
+                    try:
+                        skill_elems = tile.find_elements(By.CSS_SELECTOR, "[data-test='token']")
+                        skills = [s.text.strip() for s in skill_elems if s.text.strip()]
+                    except:
+                        pass
+                    
+                    if job_id:
+                        seen_ids.add(job_id)
+                        term_jobs.append({
+                            "id": job_id,
+                            "title": title,
+                            "description": description,
+                            "budget": budget,
+                            "skills": skills,
+                            "url": job_url,
+                            "search_term": term,
+                            "scraped_at": datetime.now().isoformat()
+                        })
+                except:
+                    continue
             
-            all_jobs.extend(term_jobs[:max_jobs_per_term])
-            time.sleep(2)
+        except Exception as e:
+            print(f"Error on page {page}: {e}")
+            break
+    
+    if reached_known:
+        log_to_slack(f"   ⏹ Reached already-synced jobs for '{term}' - {len(term_jobs)} new")
+    
+    return term_jobs[:max_jobs], top_ids
+
+
+def _load_upwork_cookies():
+    """
+    Parse UPWORK_COOKIES from the environment.
+    
+    Returns:
+        (cookies, None) on success, (None, error message) otherwise
+    """
+    cookies_json = os.environ.get("UPWORK_COOKIES", "[]")
+    
+    try:
+        cookies = json.loads(cookies_json)
+    except Exception as e:
+        log_to_slack(f"❌ Failed to parse UPWORK_COOKIES: {str(e)}")
+        return None, "Invalid cookies"
+    
+    if not cookies:
+        log_to_slack("❌ No Upwork cookies configured")
+        return None, "No cookies"
+    
+    return cookies, None
+
+
+def _shard_terms(search_terms: list, workers: int) -> list:
+    """Split terms round-robin into at most `workers` non-empty shards."""
+    workers = max(1, min(workers, len(search_terms)))
+    return [search_terms[i::workers] for i in range(workers)]
+
+
+# ============== Scraper Functions ==============
+
+@app.function(
+    image=scraper_image,
+    secrets=[modal.Secret.from_name("upwork-secrets"), modal.Secret.from_name("upwork-cookies")],
+    timeout=600,
+    memory=2048,  # More memory for Chrome
+)
+def scrape_search_terms(
+    search_terms: list,
+    max_jobs_per_term: int = 15,
+    max_pages_per_term: int = 2,
+    worker_index: int = 0
+) -> dict:
+    """
+    Scrape a shard of search terms in one browser.
+    
+    Returns:
+        {"status", "terms": {term: [jobs]}, "watermarks": {term: [ids]}} -
+        per-term lists so the caller can merge shards in the original term order
+    """
+    cookies, error = _load_upwork_cookies()
+    if error:
+        return {"status": "error", "message": error}
+    
+    worker_label = f" [worker {worker_index}]"
+    driver = None
+    seen_ids = set()
+    terms = {}
+    watermarks = {}
+    
+    # Read-only here; daily_scrape_and_sync records jobs once they're synced
+    known = SeenJobIndex(seen_jobs_store).load()
+    
+    try:
+        driver, error = _start_upwork_driver(cookies, worker_label)
+        if error:
+            log_to_slack(f"❌ Not logged in{worker_label} - cookies expired. Please re-export cookies.")
+            return {"status": "error", "message": error}
         
-        log_to_slack(f"✅ Scraped {len(all_jobs)} jobs from Upwork")
+        log_to_slack(f"✅ Logged into Upwork successfully{worker_label}!")
         
-        return {
-            "status": "success",
-            "jobs": all_jobs,
-            "count": len(all_jobs),
-            "timestamp": datetime.now().isoformat()
-        }
+        for term in search_terms:
+            terms[term], watermarks[term] = _scrape_search_term(
+                driver, term, max_jobs_per_term, max_pages_per_term, seen_ids, known
+            )
         
+        return {"status": "success", "terms": terms, "watermarks": watermarks}
+    
     except Exception as e:
-        log_to_slack(f"❌ Scraping error: {str(e)}")
-        return {"status": "error", "message": str(e)}
-        
+        log_to_slack(f"❌ Scraping error{worker_label}: {str(e)}")
+        return {"status": "error", "message": str(e), "terms": terms, "watermarks": watermarks}
+    
     finally:
         if driver:
             driver.quit()
 
 
+@app.function(
+    image=scraper_image,
+    secrets=[modal.Secret.from_name("upwork-secrets"), modal.Secret.from_name("upwork-cookies")],
+    timeout=900,  # 15 minutes for scraping
+    memory=2048,  # More memory for Chrome
+)
+def scrape_upwork_jobs(
+    search_terms: list = None,
+    max_jobs_per_term: int = 15,
+    max_pages_per_term: int = 2,
+    workers: int = None
+) -> dict:
+    """
+    Scrape Upwork jobs using Selenium with cookie authentication.
+    
+    Search terms are sharded across `workers` browsers (SCRAPE_WORKERS by
+    default), each in its own container; workers=1 scrapes serially here.
+    Only jobs missing from the seen job index are returned.
+    """
+    if search_terms is None:
+        search_terms = DEFAULT_SEARCH_TERMS
+    if workers is None:
+        workers = SCRAPE_WORKERS
+    
+    shards = _shard_terms(search_terms, workers)
+    log_to_slack(f"🔍 Starting Upwork scrape for {len(search_terms)} search terms ({len(shards)} browsers)...")
+    
+    if len(shards) == 1:
+        results = [scrape_search_terms.local(search_terms, max_jobs_per_term, max_pages_per_term)]
+    else:
+        results = list(scrape_search_terms.starmap(
+            [(shard, max_jobs_per_term, max_pages_per_term, i) for i, shard in enumerate(shards)],
+            return_exceptions=True
+        ))
+    
+    term_jobs = {}
+    watermarks = {}
+    errors = []
+    for result in results:
+        if isinstance(result, Exception):
+            errors.append(str(result))
+            continue
+        if result.get("status") != "success":
+            errors.append(result.get("message", "unknown error"))
+        term_jobs.update(result.get("terms", {}))
+        watermarks.update(result.get("watermarks", {}))
+    
+    if errors and not term_jobs:
+        return {"status": "error", "message": errors[0]}
+    
+    if errors:
+        log_to_slack(f"⚠️ {len(errors)} scrape worker(s) failed: {errors[0][:200]}")
+    
+    # Merge in term order; a job found by several terms keeps the first one
+    all_jobs = []
+    seen_ids = set()
+    for term in search_terms:
+        for job in term_jobs.get(term, []):
+            if job["id"] in seen_ids:
+                continue
+            seen_ids.add(job["id"])
+            all_jobs.append(job)
+    
+    log_to_slack(f"✅ Scraped {len(all_jobs)} jobs from Upwork")
+    
+    return {
+        "status": "success",
+        "jobs": all_jobs,
+        "count": len(all_jobs),
+        "watermarks": watermarks,
+        "failed_workers": len(errors),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 @app.function(
     image=scraper_image,
     secrets=[modal.Secret.from_name("upwork-secrets"), modal.Secret.from_name("upwork-cookies")],
@@ -615,18 +799,16 @@ def scrape_upwork_jobs(
 )
 def daily_scrape_and_sync():
     """Daily job scraping and sync to Airtable."""
-    import requests
-    
     log_to_slack("🚀 Starting daily Upwork job scrape...")
     
     # Scrape jobs
-    result = scrape_upwork_jobs.remote()
+    scrape_result = scrape_upwork_jobs.remote()
     
-    if result.get("status") != "success":
-        log_to_slack(f"❌ Scrape failed: {result.get('message')}")
-        return result
+    if scrape_result.get("status") != "success":
+        log_to_slack(f"❌ Scrape failed: {scrape_result.get('message')}")
+        return scrape_result
     
-    jobs = result.get("jobs", [])
+    jobs = scrape_result.get("jobs", [])
     
     if not jobs:
         log_to_slack("⚠️ No jobs found")
@@ -637,56 +819,53 @@ def daily_scrape_and_sync():
     base_id = os.environ.get("AIRTABLE_UPWORK_BASE_ID")
     table_name = "Upwork Jobs"
     
-    url = f"https://api.airtable.com/v0/{base_id}/{table_name}"
-    headers = {
-        'Authorization': f'Bearer {api_key}',
-        'Content-Type': 'application/json'
-    }
+    client = AirtableClient(base_id, table_name, api_key=api_key)
     
-    # Get existing job URLs to avoid duplicates
-    existing_urls = set()
-    try:
-        params = {'fields[]': 'Job URL', 'maxRecords': 500}
-        response = requests.get(url, headers=headers, params=params, timeout=30)
-        if response.status_code == 200:
-            for record in response.json().get('records', []):
-                job_url = record.get('fields', {}).get('Job URL', '')
-                if job_url:
-                    existing_urls.add(job_url)
-    except:
-        pass
+    # Dedupe against the seen job index (picks up rows other paths added since
+    # the last run) instead of re-reading Job URLs from Airtable
+    index = SeenJobIndex(seen_jobs_store).load()
+    index.reconcile(client)
     
-    # Sync new jobs only
-    synced = 0
     skipped = 0
-    
+    new_jobs = []
     for job in jobs:
-        if job.get('url') in existing_urls:
+        if job.get('id') in index:
             skipped += 1
             continue
-        
+        new_jobs.append(job)
+    
+    records = []
+    for job in new_jobs:
         # Format skills as comma-separated string
         skills_str = ", ".join(job.get('skills', [])) if isinstance(job.get('skills'), list) else job.get('skills', '')
         
-        record = {
-            "fields": {
-                "Job Title": job.get("title", "")[:255],
-                "Description": job.get("description", "")[:10000],
-                "Budget": str(job.get("budget", "")),
-                "Skills": skills_str,
-                "Job URL": job.get("url", ""),
-                "Status": "New",
-                "Scraped At": job.get("scraped_at", datetime.now().isoformat())
-            }
-        }
-        
-        try:
-            response = requests.post(url, headers=headers, json=record, timeout=30)
-            if response.status_code in [200, 201]:
-                synced += 1
-            time.sleep(0.2)  # Rate limiting
-        except:
-            pass
+        records.append({
+            "Job Title": job.get("title", "")[:255],
+            "Description": job.get("description", "")[:10000],
+            "Budget": str(job.get("budget", "")),
+            "Skills": skills_str,
+            "Job URL": job.get("url", ""),
+            "Status": "New",
+            "Scraped At": job.get("scraped_at", datetime.now().isoformat())
+        })
+    
+    # 10 records per request, paced by the client's token bucket
+    result = client.batch_create(records)
+    synced = result.succeeded_count
+    
+    if result.failures:
+        log_to_slack(f"⚠️ {result.failed_count} jobs failed to sync: {result.failures[0].error[:200]}")
+    
+    # Only synced jobs become "seen"; terms with failed jobs lose their
+    # watermark so the next run walks them fully and retries those jobs
+    index.add(job['id'] for job, record in zip(new_jobs, result.records) if record)
+    failed_terms = {new_jobs[failure.index].get('search_term') for failure in result.failures}
+    for term, top_ids in scrape_result.get("watermarks", {}).items():
+        if term in failed_terms:
+            index.drop_watermark(term)
+        else:
+            index.set_watermark(term, top_ids)
+    index.save()
     
     log_to_slack(f"✅ Daily sync complete: {synced} new jobs added, {skipped} duplicates skipped")
     
@@ -694,6 +873,7 @@ def daily_scrape_and_sync():
         "status": "success",
         "synced": synced,
         "skipped": skipped,
+        "failed": result.failed_count,
         "total_scraped": len(jobs),
         "timestamp": datetime.now().isoformat()
     }
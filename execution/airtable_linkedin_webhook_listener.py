@@ -5,7 +5,9 @@ Airtable LinkedIn Webhook Listener
 Polls Airtable for LinkedIn post status changes and triggers Modal functions.
 
 This replaces the polling-based approach by:
-1. Checking Airtable every 30-60 seconds for status changes
+1. Reading status changes from an Airtable webhook's payload cursor every
+   few seconds (utils/change_feed.py), falling back to a full-table poll
+   every 30-60 seconds if the webhook can't be created
 2. Calling Modal functions directly when status changes
 3. Tracking processed records to avoid duplicate execution
 
@@ -37,6 +39,11 @@ from pathlib import Path
 import requests
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent))
+from utils.airtable_client import AirtableClient
+from utils.change_feed import ChangeFeed
+from utils.json_store import JsonFileStore
+
 # Load env
 env_file = "/Users/musacomma/Agentic Workflow/.env"
 if os.path.exists(env_file):
@@ -65,6 +72,10 @@ MODAL_TOKEN = os.getenv('MODAL_TOKEN_ID')  # For Modal API calls
 # Polling interval (seconds)
 POLL_INTERVAL = 30
 
+# Change feed interval (seconds) - one small payloads request per check
+CHANGE_FEED_INTERVAL = 2
+CHANGE_FEED_STATE_FILE = Path(__file__).parent.parent / '.tmp' / 'linkedin_change_feed.json'
+
 # Track processed records to avoid duplicate handling
 # Format: {record_id: {status: str, timestamp: datetime}}
 processed_records: Dict[str, Dict] = {}
@@ -254,6 +265,33 @@ def poll_airtable():
     logger.info(f"Poll complete. Tracking {len(processed_records)} records.\n")
 
 
+def get_change_feed() -> Optional[ChangeFeed]:
+    """Load the change feed and make sure its Airtable webhook exists (None on failure)."""
+    client = AirtableClient(AIRTABLE_BASE_ID, AIRTABLE_TABLE_ID, api_key=AIRTABLE_API_KEY)
+    feed = ChangeFeed(client, JsonFileStore(str(CHANGE_FEED_STATE_FILE))).load()
+    if not feed.ensure_webhook(os.getenv('CHANGE_FEED_NOTIFICATION_URL')):
+        return None
+    return feed
+
+
+def drain_change_feed(feed: ChangeFeed) -> Dict:
+    """
+    Call Modal for every status change since the feed's cursor.
+
+    The feed's cursor and delivered-event bookkeeping replace the snapshot
+    diff and cooldown used by poll_airtable().
+    """
+    def dispatch(event):
+        logger.info(f"📌 Status change: {event.record_id} → {event.new_status}" +
+                    (f" (was: {event.old_status})" if event.old_status else ""))
+        return call_modal_function(event.record_id, event.new_status)
+
+    summary = feed.drain(dispatch)
+    if summary['dispatched'] or summary['failed']:
+        logger.info(f"Change feed: {summary['dispatched']} processed, {summary['failed']} failed")
+    return summary
+
+
 def polling_loop():
     """
     Continuous polling loop.
@@ -269,16 +307,26 @@ def polling_loop():
     logger.info(f"Table ID: {AIRTABLE_TABLE_ID}")
     logger.info(f"{'='*80}\n")
 
+    feed = get_change_feed()
+    if feed:
+        logger.info(f"Following Airtable webhook {feed.state['webhook_id']} every {CHANGE_FEED_INTERVAL}s")
+    else:
+        logger.warning("Airtable webhook unavailable - polling all records instead")
+
     try:
         while True:
             try:
-                poll_airtable()
+                if feed:
+                    feed.ensure_webhook(os.getenv('CHANGE_FEED_NOTIFICATION_URL'))
+                    drain_change_feed(feed)
+                else:
+                    poll_airtable()
             except Exception as e:
                 logger.error(f"Error in polling loop: {e}")
                 import traceback
                 logger.error(traceback.format_exc())
 
-            time.sleep(POLL_INTERVAL)
+            time.sleep(CHANGE_FEED_INTERVAL if feed else POLL_INTERVAL)
 
     except KeyboardInterrupt:
         logger.info("\n\n" + "="*80)
@@ -5,13 +5,17 @@ Stores and manages Upwork job listings in Airtable.
 """
 
 import os
+import sys
 import json
 import logging
+from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime
-import requests
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent))
+from utils.airtable_client import AirtableClient, AirtableError, formula_eq
+
 load_dotenv()
 
 # Configure logging
@@ -32,15 +36,11 @@ class AirtableUpworkIntegration:
         if not self.api_key:
             raise ValueError("AIRTABLE_API_KEY not found in .env")
         
-        self.headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
-        }
-        self.base_url = 'https://api.airtable.com/v0'
         self.logger = logger
         
         # Table name for Upwork jobs
         self.table_name = 'Upwork Jobs'
+        self.airtable = AirtableClient(self.base_id, self.table_name, api_key=self.api_key)
     
     def create_base(self, workspace_id: str = None) -> Optional[str]:
         """
@@ -100,25 +100,20 @@ class AirtableUpworkIntegration:
             }
         }
         
-        url = f"{self.base_url}/{self.base_id}/{self.table_name}"
-        
         try:
-            response = requests.post(url, headers=self.headers, json=sample_record)
+            response = self.airtable.request("POST", self.airtable.table_url, json=sample_record)
+            record_id = response.json().get('id')
+            self.logger.info("✓ Table fields created successfully")
             
-            if response.status_code == 200:
-                record_id = response.json().get('id')
-                self.logger.info("✓ Table fields created successfully")
-                
-                # Delete the sample record
-                delete_url = f"{url}/{record_id}"
-                requests.delete(delete_url, headers=self.headers)
-                self.logger.info("✓ Sample record cleaned up")
-                return True
-            else:
-                self.logger.error(f"Failed to set up fields: {response.status_code}")
-                self.logger.error(response.text)
-                return False
-                
+            # Delete the sample record
+            self.airtable.delete_record(record_id)
+            self.logger.info("✓ Sample record cleaned up")
+            return True
+        
+        except AirtableError as e:
+            self.logger.error(f"Failed to set up fields: {e.status_code}")
+            self.logger.error(e.body)
+            return False
         except Exception as e:
             self.logger.error(f"Error setting up fields: {e}")
             return False
@@ -131,14 +126,16 @@ class AirtableUpworkIntegration:
             jobs: List of job dictionaries from scraper
         
         Returns:
-            Summary dict with created, updated, skipped counts
+            Summary dict with created, updated, skipped counts and
+            per-job errors for any records Airtable rejected
         """
         summary = {
             'created': 0,
             'updated': 0,
             'skipped': 0,
             'failed': 0,
-            'jobs': []
+            'jobs': [],
+            'errors': []
         }
         
         self.logger.info(f"Syncing {len(jobs)} jobs to Airtable...")
@@ -146,6 +143,7 @@ class AirtableUpworkIntegration:
         # Get existing jobs to check for duplicates
         existing_jobs = self._get_existing_job_ids()
         
+        new_jobs = []
         for job in jobs:
             job_id = job.get('id', '')
             
@@ -159,18 +157,29 @@ class AirtableUpworkIntegration:
                 summary['skipped'] += 1
                 continue
             
-            # Create new job record
-            result = self._create_job_record(job)
-            
-            if result:
+            new_jobs.append(job)
+        
+        # Create new job records 10 per request
+        result = self.airtable.batch_create([self._job_fields(job) for job in new_jobs])
+        
+        for job, record in zip(new_jobs, result.records):
+            if record:
                 summary['created'] += 1
                 summary['jobs'].append({
-                    'id': job_id,
+                    'id': job.get('id', ''),
                     'title': job.get('title', 'Unknown'),
-                    'record_id': result
+                    'record_id': record.get('id')
                 })
-            else:
-                summary['failed'] += 1
+        
+        for failure in result.failures:
+            job = new_jobs[failure.index]
+            summary['failed'] += 1
+            summary['errors'].append({
+                'id': job.get('id', ''),
+                'title': job.get('title', 'Unknown'),
+                'error': failure.error
+            })
+            self.logger.error(f"Failed to create job {job.get('id', '')}: {failure.error[:200]}")
         
         self.logger.info(f"✓ Sync complete: {summary['created']} created, {summary['skipped']} skipped, {summary['failed']} failed")
         return summary
@@ -179,41 +188,21 @@ class AirtableUpworkIntegration:
         """Get set of existing job IDs in Airtable"""
         job_ids = set()
         
-        url = f"{self.base_url}/{self.base_id}/{self.table_name}"
-        params = {
-            'fields[]': 'Job ID',
-            'pageSize': 100
-        }
-        
         try:
-            offset = None
-            while True:
-                if offset:
-                    params['offset'] = offset
-                
-                response = requests.get(url, headers=self.headers, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    for record in data.get('records', []):
-                        job_id = record.get('fields', {}).get('Job ID')
-                        if job_id:
-                            job_ids.add(job_id)
-                    
-                    offset = data.get('offset')
-                    if not offset:
-                        break
-                else:
-                    self.logger.warning(f"Error fetching existing jobs: {response.status_code}")
-                    break
-                    
+            for record in self.airtable.iter_records(fields=['Job ID']):
+                job_id = record.get('fields', {}).get('Job ID')
+                if job_id:
+                    job_ids.add(job_id)
+        
+        except AirtableError as e:
+            self.logger.warning(f"Error fetching existing jobs: {e.status_code}")
         except Exception as e:
             self.logger.error(f"Error getting existing job IDs: {e}")
         
         return job_ids
     
-    def _create_job_record(self, job: Dict) -> Optional[str]:
-        """Create a single job record in Airtable"""
+    def _job_fields(self, job: Dict) -> Dict:
+        """Build the Airtable fields for a scraped job"""
         
         # Extract client info
         client = job.get('client', {})
@@ -221,43 +210,38 @@ class AirtableUpworkIntegration:
         # Calculate a simple score based on available data
         score = self._calculate_job_score(job)
         
-        record = {
-            "fields": {
-                "Job Title": job.get('title', 'Unknown')[:100],  # Airtable has field limits
-                "Job ID": job.get('id', ''),
-                "Job URL": job.get('url', ''),
-                "Description": job.get('description', '')[:5000],  # Long text limit
-                "Budget": job.get('budget', 0),
-                "Job Type": job.get('job_type', 'unknown'),
-                "Skills": ', '.join(job.get('skills', [])),
-                "Client Rating": client.get('rating', 0),
-                "Client Reviews": client.get('reviews', 0),
-                "Client Spent": client.get('spent', '$0'),
-                "Client Country": client.get('country', ''),
-                "Payment Verified": client.get('payment_verified', False),
-                "Posted": job.get('posted', ''),
-                "Proposals Count": job.get('proposals_count', 0),
-                "Status": "New",
-                "Score": score,
-                "Scraped At": job.get('scraped_at', datetime.now().isoformat()),
-                "Notes": "",
-                "Proposal": "",
-                "Applied": False
-            }
+        return {
+            "Job Title": job.get('title', 'Unknown')[:100],  # Airtable has field limits
+            "Job ID": job.get('id', ''),
+            "Job URL": job.get('url', ''),
+            "Description": job.get('description', '')[:5000],  # Long text limit
+            "Budget": job.get('budget', 0),
+            "Job Type": job.get('job_type', 'unknown'),
+            "Skills": ', '.join(job.get('skills', [])),
+            "Client Rating": client.get('rating', 0),
+            "Client Reviews": client.get('reviews', 0),
+            "Client Spent": client.get('spent', '$0'),
+            "Client Country": client.get('country', ''),
+            "Payment Verified": client.get('payment_verified', False),
+            "Posted": job.get('posted', ''),
+            "Proposals Count": job.get('proposals_count', 0),
+            "Status": "New",
+            "Score": score,
+            "Scraped At": job.get('scraped_at', datetime.now().isoformat()),
+            "Notes": "",
+            "Proposal": "",
+            "Applied": False
         }
-        
-        url = f"{self.base_url}/{self.base_id}/{self.table_name}"
-        
+    
+    def _create_job_record(self, job: Dict) -> Optional[str]:
+        """Create a single job record in Airtable"""
         try:
-            response = requests.post(url, headers=self.headers, json=record)
+            created = self.airtable.create_record(self._job_fields(job))
             
-            if response.status_code == 200:
-                record_id = response.json().get('id')
+            if created:
                 self.logger.debug(f"Created job: {job.get('title', 'Unknown')[:40]}...")
-                return record_id
-            else:
-                self.logger.error(f"Failed to create job: {response.status_code} - {response.text}")
-                return None
+                return created.get('id')
+            return None
                 
         except Exception as e:
             self.logger.error(f"Error creating job record: {e}")
@@ -318,23 +302,13 @@ class AirtableUpworkIntegration:
     
     def get_jobs_by_status(self, status: str) -> List[Dict]:
         """Get jobs filtered by status"""
-        url = f"{self.base_url}/{self.base_id}/{self.table_name}"
-        params = {
-            'filterByFormula': f"{{Status}} = '{status}'",
-            'pageSize': 100
-        }
-        
         jobs = []
         
         try:
-            response = requests.get(url, headers=self.headers, params=params)
-            
-            if response.status_code == 200:
-                data = response.json()
-                for record in data.get('records', []):
-                    job = record.get('fields', {})
-                    job['record_id'] = record.get('id')
-                    jobs.append(job)
+            for record in self.airtable.iter_records(formula=formula_eq('Status', status)):
+                job = record.get('fields', {})
+                job['record_id'] = record.get('id')
+                jobs.append(job)
                     
         except Exception as e:
             self.logger.error(f"Error getting jobs by status: {e}")
@@ -343,47 +317,34 @@ class AirtableUpworkIntegration:
     
     def update_job_status(self, record_id: str, status: str, notes: str = None) -> bool:
         """Update job status and optionally add notes"""
-        url = f"{self.base_url}/{self.base_id}/{self.table_name}/{record_id}"
-        
         fields = {"Status": status}
         if notes:
             fields["Notes"] = notes
         
         try:
-            response = requests.patch(url, headers=self.headers, json={"fields": fields})
-            return response.status_code == 200
+            return self.airtable.update_record(record_id, fields) is not None
         except Exception as e:
             self.logger.error(f"Error updating job status: {e}")
             return False
     
     def save_proposal(self, record_id: str, proposal: str) -> bool:
         """Save generated proposal to job record"""
-        url = f"{self.base_url}/{self.base_id}/{self.table_name}/{record_id}"
-        
         try:
-            response = requests.patch(url, headers=self.headers, json={
-                "fields": {
-                    "Proposal": proposal,
-                    "Status": "Proposal Ready"
-                }
-            })
-            return response.status_code == 200
+            return self.airtable.update_record(record_id, {
+                "Proposal": proposal,
+                "Status": "Proposal Ready"
+            }) is not None
         except Exception as e:
             self.logger.error(f"Error saving proposal: {e}")
             return False
     
     def mark_as_applied(self, record_id: str) -> bool:
         """Mark job as applied"""
-        url = f"{self.base_url}/{self.base_id}/{self.table_name}/{record_id}"
-        
         try:
-            response = requests.patch(url, headers=self.headers, json={
-                "fields": {
-                    "Applied": True,
-                    "Status": "Applied"
-                }
-            })
-            return response.status_code == 200
+            return self.airtable.update_record(record_id, {
+                "Applied": True,
+                "Status": "Applied"
+            }) is not None
         except Exception as e:
             self.logger.error(f"Error marking as applied: {e}")
             return False
@@ -16,15 +16,19 @@ Can be integrated into Modal as a periodic task.
 """
 
 import os
-import requests
+import sys
 import json
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Dict, List, Tuple, Set
 import logging
 import pytz
-import random
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent))
+from utils.airtable_client import AirtableClient, formula_not_blank
+from utils.slot_calendar import SlotCalendar, centered_windows
+
 # ============== Setup ==============
 
 # Load environment variables from .env file
@@ -47,50 +51,42 @@ if not all([AIRTABLE_API_KEY, AIRTABLE_BASE_ID, AIRTABLE_LINKEDIN_TABLE_ID]):
 POSTING_WINDOWS = [9, 14, 20]  # 9 AM, 2 PM, 8 PM ET
 WINDOW_BUFFER_MINUTES = 30  # Posts within 30 min of window belong to that window
 TZ = pytz.timezone('America/New_York')
+WINDOWS = centered_windows(POSTING_WINDOWS, buffer_minutes=WINDOW_BUFFER_MINUTES, jitter_minutes=15)
 
 # ============== Airtable API Helpers ==============
 
-def get_headers():
-    """Get Airtable API headers"""
-    return {
-        'Authorization': f'Bearer {AIRTABLE_API_KEY}',
-        'Content-Type': 'application/json'
-    }
+def get_client() -> AirtableClient:
+    """Get the pooled Airtable client for the LinkedIn table"""
+    return AirtableClient(AIRTABLE_BASE_ID, AIRTABLE_LINKEDIN_TABLE_ID, api_key=AIRTABLE_API_KEY)
 
 
 def fetch_all_records() -> List[Dict]:
-    """Fetch all records from the LinkedIn table"""
-    try:
-        url = f"https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_LINKEDIN_TABLE_ID}"
-        response = requests.get(url, headers=get_headers(), timeout=30)
-
-        if response.status_code == 200:
-            return response.json().get('records', [])
-        else:
-            logger.error(f"Failed to fetch records: {response.status_code} - {response.text}")
-            return []
-    except Exception as e:
-        logger.error(f"Error fetching records: {e}")
-        return []
+    """Fetch every LinkedIn record that has a Scheduled Time (all pages, scheduling fields only)"""
+    return get_client().list_records(
+        formula=formula_not_blank('Scheduled Time'),
+        fields=['Title', 'Status', 'Scheduled Time'],
+    )
 
 
 def update_record(record_id: str, fields: Dict) -> bool:
     """Update a single Airtable record"""
-    try:
-        url = f"https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_LINKEDIN_TABLE_ID}/{record_id}"
-        payload = {"fields": fields}
+    if get_client().update_record(record_id, fields) is None:
+        return False
 
-        response = requests.patch(url, json=payload, headers=get_headers(), timeout=30)
+    logger.info(f"✓ Updated record {record_id}: {json.dumps(fields)}")
+    return True
 
-        if response.status_code == 200:
-            logger.info(f"✓ Updated record {record_id}: {json.dumps(fields)}")
-            return True
-        else:
-            logger.error(f"Failed to update {record_id}: {response.status_code} - {response.text}")
-            return False
-    except Exception as e:
-        logger.error(f"Error updating record {record_id}: {e}")
-        return False
+
+def update_records(updates: List[Dict]) -> List[bool]:
+    """Update records in batches of 10 ([{"id", "fields"}, ...]); returns success per update"""
+    if not updates:
+        return []
+
+    result = get_client().batch_update(updates)
+    for update, record in zip(updates, result.records):
+        if record is not None:
+            logger.info(f"✓ Updated record {update['id']}: {json.dumps(update['fields'])}")
+    return [record is not None for record in result.records]
 
 
 # ============== Detection Logic ==============
@@ -130,11 +126,8 @@ def determine_posting_window(scheduled_dt: datetime) -> int:
     Determine which posting window a scheduled time belongs to.
     Returns the window hour (9, 14, or 20) or None if not in any window.
     """
-    for window_hour in POSTING_WINDOWS:
-        window_time = scheduled_dt.replace(hour=window_hour, minute=0, second=0, microsecond=0)
-        time_diff = abs((scheduled_dt - window_time).total_seconds() / 60)
-
-        if time_diff <= WINDOW_BUFFER_MINUTES:
+    for window_hour, window in zip(POSTING_WINDOWS, WINDOWS):
+        if window.contains(scheduled_dt):
             return window_hour
 
     return None
@@ -160,7 +153,9 @@ def detect_issues() -> Dict:
         'multiple_in_window': [],      # Multiple posts in same window/day
         'scheduled_in_past': [],        # Posts scheduled in the past
         'invalid_times': [],            # Posts with invalid scheduled times
-        'all_records': records          # For reference
+        'all_records': records,         # For reference
+        # Windows held by Scheduled posts; corrections claim windows from it
+        'calendar': SlotCalendar.from_records(records, WINDOWS, tz=TZ, statuses=['Scheduled'])
     }
 
     now = datetime.now(TZ)
@@ -257,17 +252,16 @@ def correct_window_conflicts(issues: Dict) -> List[Dict]:
 
     Returns list of corrections applied.
     """
-    corrections = []
-
     if not issues['multiple_in_window']:
         logger.info("\nNo window conflicts to correct.")
-        return corrections
+        return []
 
     logger.info(f"\n{'='*70}")
     logger.info("CORRECTING WINDOW CONFLICTS")
     logger.info(f"{'='*70}\n")
 
-    now = datetime.now(TZ)
+    calendar = issues['calendar']
+    planned = []  # (post, new datetime, reason)
 
     for conflict in issues['multiple_in_window']:
         date_key = conflict['date']
@@ -276,80 +270,32 @@ def correct_window_conflicts(issues: Dict) -> List[Dict]:
 
         logger.info(f"\nConflict: {date_key} at {window_hour}:00 - {len(posts)} posts")
 
-        # Parse the date
-        conflict_date = datetime.strptime(date_key, '%Y-%m-%d').replace(tzinfo=TZ)
-
-        # Get all posts on that date to see what windows are used
-        day_windows_used = set()
+        conflict_day = datetime.strptime(date_key, '%Y-%m-%d').date()
+        logger.info(f"  Windows already used on {date_key}: {[POSTING_WINDOWS[i] for i in calendar.used_windows(conflict_day)]}")
+        logger.info(f"  Available windows on {date_key}: {[POSTING_WINDOWS[i] for i in calendar.free_windows(conflict_day)]}")
 
-        for record in issues['all_records']:
-            fields = record.get('fields', {})
-            if fields.get('Status') == 'Scheduled':
-                scheduled_str = fields.get('Scheduled Time')
-                if scheduled_str:
-                    scheduled_dt, is_valid = parse_scheduled_time(scheduled_str)
-                    if is_valid and scheduled_dt.strftime('%Y-%m-%d') == date_key:
-                        w = determine_posting_window(scheduled_dt)
-                        if w:
-                            day_windows_used.add(w)
+        # Keep first post in original window, reassign the rest
+        logger.info(f"  ✓ Keeping {posts[0]['record_id']} in {window_hour}:00 window")
 
-        logger.info(f"  Windows already used on {date_key}: {sorted(day_windows_used)}")
-
-        # Find available windows on the same day
-        available_windows = [w for w in POSTING_WINDOWS if w not in day_windows_used]
-
-        logger.info(f"  Available windows on {date_key}: {available_windows}")
-
-        # Reassign posts
-        kept_in_original = posts[0]  # Keep first post in original window
-        posts_to_reassign = posts[1:]  # Reassign the rest
-
-        logger.info(f"  ✓ Keeping {kept_in_original['record_id']} in {window_hour}:00 window")
-
-        for post_idx, post in enumerate(posts_to_reassign):
-            if available_windows:
-                # Assign to next available window on same day
-                new_window = available_windows.pop(0)
-                new_scheduled_dt = conflict_date.replace(hour=new_window, minute=0, second=0, microsecond=0)
-                offset_minutes = random.randint(-15, 15)
-                new_scheduled_dt = new_scheduled_dt + timedelta(minutes=offset_minutes)
-
-                update_result = update_record(post['record_id'], {
-                    'Scheduled Time': new_scheduled_dt.isoformat()
-                })
-
-                if update_result:
-                    corrections.append({
-                        'record_id': post['record_id'],
-                        'title': post['title'],
-                        'old_time': post['scheduled_time'],
-                        'new_time': new_scheduled_dt.isoformat(),
-                        'reason': f'Redistributed from {window_hour}:00 to {new_window}:00 window on {date_key}'
-                    })
-                    logger.info(f"  ✓ Reassigned {post['record_id']} to {new_window}:00 window ({offset_minutes:+d} min offset)")
+        for post in posts[1:]:
+            free = calendar.free_windows(conflict_day)
+            if free:
+                # Next available window on same day
+                calendar.occupy(conflict_day, free[0])
+                new_scheduled_dt = calendar.place(conflict_day, free[0])
+                reason = f'Redistributed from {window_hour}:00 to {POSTING_WINDOWS[free[0]]}:00 window on {date_key}'
             else:
-                # No available windows on same day - move to next day
-                next_day = conflict_date + timedelta(days=1)
-                new_window = 9  # Start with 9 AM on next day
-                new_scheduled_dt = next_day.replace(hour=new_window, minute=0, second=0, microsecond=0)
-                offset_minutes = random.randint(-15, 15)
-                new_scheduled_dt = new_scheduled_dt + timedelta(minutes=offset_minutes)
-
-                update_result = update_record(post['record_id'], {
-                    'Scheduled Time': new_scheduled_dt.isoformat()
-                })
+                # No available windows on same day - first free window on a later day
+                next_day = TZ.localize(datetime.combine(conflict_day + timedelta(days=1), datetime.min.time()))
+                new_scheduled_dt = calendar.take(next_day)
+                if new_scheduled_dt is None:
+                    logger.warning(f"  ⚠ No free window found for {post['record_id']}")
+                    continue
+                reason = f'Moved to {new_scheduled_dt.strftime("%Y-%m-%d")} at {new_scheduled_dt.strftime("%I:%M %p")} - no available windows on {date_key}'
 
-                if update_result:
-                    corrections.append({
-                        'record_id': post['record_id'],
-                        'title': post['title'],
-                        'old_time': post['scheduled_time'],
-                        'new_time': new_scheduled_dt.isoformat(),
-                        'reason': f'Moved to next day ({next_day.strftime("%Y-%m-%d")}) at {new_window}:00 - no available windows on {date_key}'
-                    })
-                    logger.info(f"  ✓ Moved {post['record_id']} to {next_day.strftime('%Y-%m-%d')} at {new_window}:00 (no available slots on {date_key})")
+            planned.append((post, new_scheduled_dt, reason))
 
-    return corrections
+    return _apply_reschedules(planned)
 
 
 def correct_past_scheduled(issues: Dict) -> List[Dict]:
@@ -357,66 +303,56 @@ def correct_past_scheduled(issues: Dict) -> List[Dict]:
     Correct posts scheduled in the past.
     Reschedules them to the nearest future available window.
     """
-    corrections = []
-
     if not issues['scheduled_in_past']:
         logger.info("\nNo past-scheduled posts to correct.")
-        return corrections
+        return []
 
     logger.info(f"\n{'='*70}")
     logger.info("CORRECTING PAST-SCHEDULED POSTS")
     logger.info(f"{'='*70}\n")
 
+    calendar = issues['calendar']
     now = datetime.now(TZ)
+    planned = []
 
     for past_post in issues['scheduled_in_past']:
-        record_id = past_post['record_id']
-        title = past_post['title']
-        hours_past = past_post['hours_past']
-
-        logger.info(f"\nPost {record_id}: Scheduled {hours_past:.1f} hours in past")
-
-        # Find next available window
-        for days_ahead in range(0, 7):  # Check next 7 days
-            check_date = (now + timedelta(days=days_ahead)).replace(hour=0, minute=0, second=0, microsecond=0)
-            date_key = check_date.strftime('%Y-%m-%d')
-
-            # Get windows used on this date
-            used_windows = set()
-            for record in issues['all_records']:
-                fields = record.get('fields', {})
-                if fields.get('Status') == 'Scheduled' and record.get('id') != record_id:
-                    scheduled_str = fields.get('Scheduled Time')
-                    if scheduled_str:
-                        scheduled_dt, is_valid = parse_scheduled_time(scheduled_str)
-                        if is_valid and scheduled_dt.strftime('%Y-%m-%d') == date_key:
-                            w = determine_posting_window(scheduled_dt)
-                            if w:
-                                used_windows.add(w)
-
-            available = [w for w in POSTING_WINDOWS if w not in used_windows]
-
-            if available:
-                new_window = available[0]
-                new_scheduled_dt = check_date.replace(hour=new_window, minute=0, second=0, microsecond=0)
-                offset_minutes = random.randint(-15, 15)
-                new_scheduled_dt = new_scheduled_dt + timedelta(minutes=offset_minutes)
+        logger.info(f"\nPost {past_post['record_id']}: Scheduled {past_post['hours_past']:.1f} hours in past")
 
-                update_result = update_record(record_id, {
-                    'Scheduled Time': new_scheduled_dt.isoformat()
-                })
+        # Next available window within 7 days
+        new_scheduled_dt = calendar.take(now, horizon_days=7)
+        if new_scheduled_dt is None:
+            logger.warning(f"  ⚠ No free window in the next 7 days")
+            continue
 
-                if update_result:
-                    corrections.append({
-                        'record_id': record_id,
-                        'title': title,
-                        'old_time': past_post['scheduled_time'],
-                        'new_time': new_scheduled_dt.isoformat(),
-                        'reason': f'Rescheduled from past to {new_scheduled_dt.strftime("%Y-%m-%d at %I:%M %p %Z")}'
-                    })
-                    logger.info(f"  ✓ Rescheduled to {date_key} at {new_window}:00 ({offset_minutes:+d} min offset)")
+        planned.append((
+            past_post,
+            new_scheduled_dt,
+            f'Rescheduled from past to {new_scheduled_dt.strftime("%Y-%m-%d at %I:%M %p %Z")}'
+        ))
 
-                break
+    return _apply_reschedules(planned)
+
+
+def _apply_reschedules(planned: List[Tuple[Dict, datetime, str]]) -> List[Dict]:
+    """Write planned (post, new time, reason) moves in one batched update; returns corrections applied."""
+    results = update_records([
+        {'id': post['record_id'], 'fields': {'Scheduled Time': new_dt.isoformat()}}
+        for post, new_dt, _ in planned
+    ])
+
+    corrections = []
+    for (post, new_dt, reason), ok in zip(planned, results):
+        if not ok:
+            logger.error(f"  ✗ Failed to reschedule {post['record_id']}")
+            continue
+        corrections.append({
+            'record_id': post['record_id'],
+            'title': post['title'],
+            'old_time': post['scheduled_time'],
+            'new_time': new_dt.isoformat(),
+            'reason': reason
+        })
+        logger.info(f"  ✓ {post['record_id']}: {reason}")
 
     return corrections
 
@@ -10,12 +10,14 @@ import json
 import random
 from pathlib import Path
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 import requests
 
 sys.path.insert(0, str(Path(__file__).parent))
 from optimized_post_generator import OptimizedPostGenerator
 from post_quality_checker import PostQualityChecker
+from utils.airtable_client import MAX_BATCH_SIZE, AirtableClient, BatchResult
+from utils.cost_optimizer import batch_enabled
 
 class DraftPostGenerator:
     """Generates draft posts and maintains inventory."""
@@ -40,6 +42,9 @@ class DraftPostGenerator:
             "Authorization": f"Bearer {self.airtable_api_key}",
             "Content-Type": "application/json"
         }
+        self.airtable = AirtableClient(
+            self.airtable_base_id, self.airtable_table_id, api_key=self.airtable_api_key
+        )
 
         self.topics = [
             # Successful Prompting Techniques
@@ -139,7 +144,7 @@ class DraftPostGenerator:
         draft_count = sum(1 for p in posts if p.get('fields', {}).get('Status') == 'Draft')
         return draft_count
 
-    def generate_draft_post(self, topic: str = None, educational_mode: bool = False, automation_showcase_mode: bool = False, automation_name: str = None) -> dict:
+    def generate_draft_post(self, topic: str = None, educational_mode: bool = False, automation_showcase_mode: bool = False, automation_name: str = None, framework: str = None) -> dict:
         """Generate a single draft post (content only, no images/scheduling).
 
         Args:
@@ -147,6 +152,7 @@ class DraftPostGenerator:
             educational_mode: If True, generate instructional content with examples/steps
             automation_showcase_mode: If True, generate automation showcase content
             automation_name: Name of the automation to showcase (used in automation_showcase_mode)
+            framework: Writing framework to use. If None, random selection.
         """
         if topic is None:
             topic = random.choice(self.topics)
@@ -155,7 +161,8 @@ class DraftPostGenerator:
             topic,
             educational_mode=educational_mode,
             automation_showcase_mode=automation_showcase_mode,
-            automation_name=automation_name
+            automation_name=automation_name,
+            framework=framework
         )
 
         # Remove scheduling-related fields
@@ -191,21 +198,8 @@ class DraftPostGenerator:
         }
         return framework_mapping.get(framework, framework)
 
-    def add_post_to_airtable(self, post: dict) -> tuple:
-        """Add draft post to Airtable with QC validation.
-
-        Returns: (success: bool, qc_result: dict or None)
-        """
-        # Step 1: Run quality checks
-        qc_result = self.quality_checker.validate_post(post, check_duplicates=True)
-
-        if not qc_result['passes_qc']:
-            # QC failed - return failure with issues
-            return False, qc_result
-
-        # Step 2: If QC passes, upload to Airtable
-        url = f"https://api.airtable.com/v0/{self.airtable_base_id}/{self.airtable_table_id}"
-
+    def build_airtable_fields(self, post: dict) -> dict:
+        """Build the Airtable fields for a QC-passed draft post."""
         metadata = f"""Writing Framework: {post['framework']}
 Hook Type: {post['hook_type']}
 CTA Type: {post['cta_type']}
@@ -214,7 +208,7 @@ Visual Type: {post['visual_type']}
 Visual Spec: {json.dumps(post['visual_spec'])}
 QC Status: PASSED"""
 
-        fields = {
+        return {
             "Title": post['title'],
             "Post Content": post['full_content'],
             "Status": post['status'],
@@ -224,24 +218,83 @@ QC Status: PASSED"""
             "Notes": metadata
         }
 
-        payload = {
-            "records": [
-                {
-                    "fields": fields
-                }
-            ]
-        }
+    def add_post_to_airtable(self, post: dict) -> tuple:
+        """Add draft post to Airtable with QC validation.
 
-        response = requests.post(url, headers=self.headers, json=payload)
-        success = response.status_code == 200
+        Returns: (success: bool, qc_result: dict or None)
+        """
+        # Step 1: Run quality checks
+        qc_result = self.quality_checker.validate_post(post, check_duplicates=True)
+
+        if not qc_result['passes_qc']:
+            # QC failed - return failure with issues
+            return False, qc_result
 
-        if success:
+        # Step 2: If QC passes, upload to Airtable
+        result = self.add_posts_to_airtable([post])
+
+        if result.ok:
             return True, qc_result
         else:
             # Upload failed
-            return False, {'error': f'Airtable upload failed: {response.status_code}'}
+            failure = result.failures[0]
+            return False, {'error': f'Airtable upload failed: {failure.status_code}', 'issues': [failure.error]}
+
+    def add_posts_to_airtable(self, posts: List[dict]) -> BatchResult:
+        """Upload already QC-passed draft posts, 10 per request.
+
+        Returns: BatchResult aligned with `posts` (per-post record or failure)
+        """
+        result = self.airtable.batch_create([self.build_airtable_fields(post) for post in posts])
+
+        # Keep the duplicate index current without waiting for the next fetch
+        self.quality_checker.index_uploaded_posts([record for record in result.records if record])
+        return result
+
+    def flush_ready_posts(self, ready_posts: List[dict], failed_posts: List[dict]) -> int:
+        """Upload and index the buffered QC-passed posts, then empty the buffer.
+
+        Upload failures are appended to failed_posts.
+
+        Returns: number of posts created
+        """
+        if not ready_posts:
+            return 0
+
+        result = self.add_posts_to_airtable(ready_posts)
+        for failure in result.failures:
+            failed_posts.append({
+                'title': ready_posts[failure.index]['title'],
+                'issues': [f"Airtable upload failed ({failure.status_code}): {failure.error}"]
+            })
+
+        print(f"  ⬆️  Uploaded {result.succeeded_count}/{len(ready_posts)} posts to Airtable")
+        ready_posts.clear()
+        return result.succeeded_count
 
-    def maintain_inventory(self, target: int = 21, max_retries: int = 5):
+    def prefetch_enrichments(self, plan: List[tuple], educational_mode: bool = True) -> int:
+        """Answer the enricher calls for planned posts in one Message Batch.
+
+        Runs each post body in recording mode to capture the exact prompts it
+        will send, then fetches all answers at batch pricing. Generating the
+        posts afterwards with the same (topic, framework) uses those answers.
+
+        Args:
+            plan: [(topic, framework), ...] for the posts about to be generated
+            educational_mode: Mode the posts will be generated in
+
+        Returns:
+            Number of answers prefetched
+        """
+        enricher = self.generator.enricher
+
+        with enricher.recording() as requests:
+            for topic, framework in plan:
+                self.generator.generate_body(framework, topic, educational_mode=educational_mode)
+
+        return enricher.prefetch_batch(requests, batch_name="draft_inventory")
+
+    def maintain_inventory(self, target: int = 21, max_retries: int = 5, educational_mode: bool = False, use_batch: Optional[bool] = None):
         """Generate posts to maintain minimum inventory with quality control.
 
         Uses diverse topic selection to ensure variety across posts.
@@ -249,7 +302,13 @@ QC Status: PASSED"""
         Args:
             target: Target number of Draft posts
             max_retries: Max attempts to generate a valid post before giving up
+            educational_mode: Generate instructional posts (uses the Claude enricher)
+            use_batch: Fetch first-attempt enrichments through the Message Batches
+                API (half price, minutes-to-hours latency); retries still call live.
+                Defaults to on - refills aren't urgent - unless INVENTORY_USE_BATCH=0
         """
+        if use_batch is None:
+            use_batch = batch_enabled('INVENTORY_USE_BATCH')
         current = self.count_draft_posts()
         needed = max(0, target - current)
 
@@ -267,47 +326,66 @@ QC Status: PASSED"""
             print(f"   {i}. {topic}")
         print()
 
-        added_count = 0
+        # Pin a framework per post so the batched enrichments match the real run
+        frameworks = [self.generator.select_framework() for _ in diverse_topics]
+        if use_batch and educational_mode:
+            try:
+                self.prefetch_enrichments(list(zip(diverse_topics, frameworks)), educational_mode=True)
+            except Exception as e:
+                print(f"⚠️  Batch prefetch failed, generating live instead: {e}")
+
         failed_posts = []
-        topic_index = 0  # Track which topic in the diverse set we're using
-
-        for i in range(needed):
-            attempts = 0
-            success = False
-            current_topic = diverse_topics[i]  # Use the pre-selected diverse topic
-
-            while attempts < max_retries and not success:
-                attempts += 1
-                # Try with the assigned topic, or a fallback if retrying
-                topic_to_use = current_topic if attempts == 1 else random.choice(diverse_topics)
-                post = self.generate_draft_post(topic=topic_to_use)
-
-                upload_success, qc_result = self.add_post_to_airtable(post)
-
-                if upload_success:
-                    added_count += 1
-                    print(f"  {i+1}/{needed} ✓ {post['title'][:60]}... (attempt {attempts})")
-                    print(f"            Topic: {post['post_topic']}")
-                    success = True
-                else:
-                    if attempts < max_retries:
-                        print(f"  {i+1}/{needed} ⚠️  Attempt {attempts}/{max_retries} failed - retrying with different topic...")
-                        if qc_result and qc_result.get('issues'):
-                            for issue in qc_result['issues'][:1]:
-                                print(f"             Issue: {issue[:70]}...")
+        ready_posts = []  # QC-passed posts not uploaded yet (flushed every MAX_BATCH_SIZE)
+        added_count = 0
+
+        try:
+            for i in range(needed):
+                attempts = 0
+                success = False
+                current_topic = diverse_topics[i]  # Use the pre-selected diverse topic
+
+                while attempts < max_retries and not success:
+                    attempts += 1
+                    # Try with the assigned topic, or a fallback if retrying
+                    topic_to_use = current_topic if attempts == 1 else random.choice(diverse_topics)
+                    framework = frameworks[i] if attempts == 1 else None
+                    post = self.generate_draft_post(topic=topic_to_use, educational_mode=educational_mode, framework=framework)
+
+                    # Posts accepted earlier in this run count as existing for duplicate checks
+                    pending = [{'fields': {'Title': p['title'], 'Post Content': p['full_content']}} for p in ready_posts]
+                    qc_result = self.quality_checker.validate_post(post, check_duplicates=True, pending_posts=pending)
+
+                    if qc_result['passes_qc']:
+                        ready_posts.append(post)
+                        print(f"  {i+1}/{needed} ✓ {post['title'][:60]}... (attempt {attempts})")
+                        print(f"            Topic: {post['post_topic']}")
+                        success = True
                     else:
-                        print(f"  {i+1}/{needed} ❌ Failed after {max_retries} attempts")
-                        failed_posts.append({
-                            'title': post['title'],
-                            'issues': qc_result.get('issues', []) if qc_result else ['Unknown error']
-                        })
+                        if attempts < max_retries:
+                            print(f"  {i+1}/{needed} ⚠️  Attempt {attempts}/{max_retries} failed - retrying with different topic...")
+                            if qc_result and qc_result.get('issues'):
+                                for issue in qc_result['issues'][:1]:
+                                    print(f"             Issue: {issue[:70]}...")
+                        else:
+                            print(f"  {i+1}/{needed} ❌ Failed after {max_retries} attempts")
+                            failed_posts.append({
+                                'title': post['title'],
+                                'issues': qc_result.get('issues', []) if qc_result else ['Unknown error']
+                            })
+
+                # Upload each full chunk as it fills, so a crash loses at most one chunk
+                if len(ready_posts) >= MAX_BATCH_SIZE:
+                    added_count += self.flush_ready_posts(ready_posts, failed_posts)
+        finally:
+            # Upload whatever is left (including posts accepted before an error)
+            added_count += self.flush_ready_posts(ready_posts, failed_posts)
 
         print(f"\n{'='*80}")
         print(f"✅ Added {added_count} Draft posts to inventory (target: {needed})")
         print(f"📊 Topic Variety: {added_count}/{needed} posts use unique topics")
 
         if failed_posts:
-            print(f"\n⚠️  {len(failed_posts)} posts failed QC after {max_retries} attempts:")
+            print(f"\n⚠️  {len(failed_posts)} posts failed QC or upload:")
             for failed in failed_posts:
                 print(f"\n  Title: {failed['title'][:70]}...")
                 print(f"  Issues:")
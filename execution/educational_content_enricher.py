@@ -12,12 +12,15 @@ Uses Haiku 4.5 for cost efficiency (80% cheaper than Sonnet) with quality valida
 
 import os
 import sys
+from contextlib import contextmanager
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Optional, List, Dict
 import anthropic
 
 sys.path.insert(0, str(Path(__file__).parent))
-from utils.cost_optimizer import ModelSelector, CostTracker, PromptCache
+from utils.cost_optimizer import ModelSelector, CostTracker, PromptCache, BatchProcessor, BatchMessage
+from utils.llm_cache import cached_client
 
 
 class EducationalContentEnricher:
@@ -35,7 +38,8 @@ class EducationalContentEnricher:
                         key, value = line.split('=', 1)
                         os.environ[key.strip()] = value.strip().strip('\"\'')
 
-        self.client = anthropic.Anthropic(api_key=os.environ.get('ANTHROPIC_API_KEY'))
+        # Identical enrichment prompts are answered from the LLM cache when LLM_CACHE=1
+        self.client = cached_client(anthropic.Anthropic(api_key=os.environ.get('ANTHROPIC_API_KEY')))
         self.cost_tracker = CostTracker()
 
         # Use Haiku 4.5 for educational content (simple extraction/formatting)
@@ -52,6 +56,87 @@ Your content must be:
 
 Generate exactly what is requested. No explanations or meta-commentary."""
 
+        # Batch support: prompts captured by recording() and answers fetched by prefetch_batch()
+        self._recorded: Optional[List[dict]] = None
+        self._prefetched: Dict[str, BatchMessage] = {}
+
+    def _request_key(self, prompt: str, max_tokens: int) -> str:
+        """custom_id for a request - identical prompts map to the same answer."""
+        return BatchProcessor.make_custom_id("enrich", self.model, max_tokens, prompt)
+
+    def _create(self, prompt: str, max_tokens: int):
+        """
+        Send one enrichment prompt.
+
+        Returns a prefetched batch answer when one exists, records the request
+        (and returns an empty answer) while inside recording(), and otherwise
+        calls the API live.
+        """
+        key = self._request_key(prompt, max_tokens)
+
+        if self._recorded is not None:
+            self._recorded.append(BatchProcessor.build_request(
+                key, self.model, prompt, system_prompt=self.system_prompt, max_tokens=max_tokens
+            ))
+            return BatchMessage({"custom_id": key})
+
+        if key in self._prefetched:
+            return self._prefetched.pop(key)
+
+        return self.client.messages.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            system=[PromptCache.add_cache_control(self.system_prompt)],
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        )
+
+    @contextmanager
+    def recording(self):
+        """
+        Capture the requests generate_* would send, without calling the API.
+
+        Example:
+            with enricher.recording() as requests:
+                enricher.generate_examples(topic, count=2)
+            enricher.prefetch_batch(requests)
+        """
+        self._recorded = []
+        # Recorded calls cost nothing - keep them out of the cost log
+        cost_tracker, self.cost_tracker = self.cost_tracker, SimpleNamespace(log_call=lambda **kwargs: 0.0)
+        try:
+            yield self._recorded
+        finally:
+            self._recorded = None
+            self.cost_tracker = cost_tracker
+
+    def prefetch_batch(self, requests: List[dict], batch_name: str = "enrichment", timeout: Optional[float] = None) -> int:
+        """
+        Answer recorded requests through the Message Batches API (50% cheaper).
+
+        Later generate_* calls with the same prompt use these answers instead
+        of calling the API; anything that failed in the batch falls back to a
+        live call.
+
+        Returns:
+            Number of answers prefetched
+        """
+        unique = list({r["custom_id"]: r for r in requests}.values())
+        if not unique:
+            return 0
+
+        processor = BatchProcessor(self.client)
+        batch_id, results = processor.run(unique, batch_name=batch_name, timeout=timeout)
+
+        for custom_id, result in results.items():
+            if result.get("type") == "succeeded":
+                self._prefetched[custom_id] = BatchMessage(result)
+
+        processor.mark_consumed(batch_id)
+        print(f"📦 Prefetched {len(self._prefetched)}/{len(unique)} enrichment answers via batch {batch_id}")
+        return len(self._prefetched)
+
     def generate_examples(
         self,
         topic: str,
@@ -87,14 +172,7 @@ Requirements:
 - IMPORTANT: Keep examples SHORT and punchy (not long-winded)"""
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1500,
-                system=[PromptCache.add_cache_control(self.system_prompt)],
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            response = self._create(prompt, max_tokens=1500)
 
             # Track cost
             self.cost_tracker.log_call(
@@ -102,7 +180,8 @@ Requirements:
                 input_tokens=response.usage.input_tokens,
                 output_tokens=response.usage.output_tokens,
                 endpoint="generate_examples",
-                cached_tokens=getattr(response.usage, 'cache_read_input_tokens', 0)
+                cached_tokens=getattr(response.usage, 'cache_read_input_tokens', 0),
+                batch=getattr(response, 'is_batch', False)
             )
 
             # Parse response - split by **Example [number]** markers
@@ -161,14 +240,7 @@ Requirements:
 - IMPORTANT: Keep the entire response under 400 characters total"""
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1500,
-                system=[PromptCache.add_cache_control(self.system_prompt)],
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            response = self._create(prompt, max_tokens=1500)
 
             # Track cost
             self.cost_tracker.log_call(
@@ -176,7 +248,8 @@ Requirements:
                 input_tokens=response.usage.input_tokens,
                 output_tokens=response.usage.output_tokens,
                 endpoint="generate_steps",
-                cached_tokens=getattr(response.usage, 'cache_read_input_tokens', 0)
+                cached_tokens=getattr(response.usage, 'cache_read_input_tokens', 0),
+                batch=getattr(response, 'is_batch', False)
             )
 
             # Parse numbered steps
@@ -245,14 +318,7 @@ Requirements:
 - Both examples should be copy-paste ready"""
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1200,
-                system=[PromptCache.add_cache_control(self.system_prompt)],
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            response = self._create(prompt, max_tokens=1200)
 
             # Track cost
             self.cost_tracker.log_call(
@@ -260,7 +326,8 @@ Requirements:
                 input_tokens=response.usage.input_tokens,
                 output_tokens=response.usage.output_tokens,
                 endpoint="generate_before_after",
-                cached_tokens=getattr(response.usage, 'cache_read_input_tokens', 0)
+                cached_tokens=getattr(response.usage, 'cache_read_input_tokens', 0),
+                batch=getattr(response, 'is_batch', False)
             )
 
             content = response.content[0].text
@@ -354,14 +421,7 @@ Requirements:
 - No vague instructions"""
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1500,
-                system=[PromptCache.add_cache_control(self.system_prompt)],
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            response = self._create(prompt, max_tokens=1500)
 
             # Track cost
             self.cost_tracker.log_call(
@@ -369,7 +429,8 @@ Requirements:
                 input_tokens=response.usage.input_tokens,
                 output_tokens=response.usage.output_tokens,
                 endpoint="generate_template",
-                cached_tokens=getattr(response.usage, 'cache_read_input_tokens', 0)
+                cached_tokens=getattr(response.usage, 'cache_read_input_tokens', 0),
+                batch=getattr(response, 'is_batch', False)
             )
 
             content = response.content[0].text
@@ -471,14 +532,7 @@ Requirements:
 - Keep language clear and jargon-free"""
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1500,
-                system=[PromptCache.add_cache_control(self.system_prompt)],
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            response = self._create(prompt, max_tokens=1500)
 
             # Track cost
             self.cost_tracker.log_call(
@@ -486,7 +540,8 @@ Requirements:
                 input_tokens=response.usage.input_tokens,
                 output_tokens=response.usage.output_tokens,
                 endpoint="generate_automation_showcase",
-                cached_tokens=getattr(response.usage, 'cache_read_input_tokens', 0)
+                cached_tokens=getattr(response.usage, 'cache_read_input_tokens', 0),
+                batch=getattr(response, 'is_batch', False)
             )
 
             content = response.content[0].text
@@ -1,10 +1,21 @@
 import json
+import hashlib
 import logging
+import re
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 import os
 from dotenv import load_dotenv
 
+from utils.tracing import span
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -19,6 +30,94 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# No-code tool mentions that qualify a job on their own
+NOCODE_TOOLS = ['zapier', 'make.com', 'make', 'integromat', 'n8n', 'no-code', 'nocode', 'no code']
+
+PASSED_REASON = "Passed all filters"
+
+# filter_jobs switches to the NumPy columnar path at this many uncached jobs
+VECTORIZE_MIN_JOBS = 5000
+
+# Rejection reasons in check order (filter_job and the columnar path share these)
+CHECK_REASONS = [
+    "Budget out of range",
+    "Client rating too low",
+    "Client has insufficient reviews",
+    "Job category not allowed",
+    "Not a no-code automation job",
+    "Contains excluded keywords",
+    "Too many proposals already",
+    "Would cost too many connects (>20)",
+    "Job type not allowed",
+]
+
+
+def _without_notes(values) -> List:
+    """Drop 'note:' entries from a config list"""
+    if not isinstance(values, list):
+        return values
+    return [v for v in values if not (isinstance(v, str) and v.startswith('note:'))]
+
+
+def compile_keywords(keywords: List[str], word_boundaries: bool = False) -> Optional[re.Pattern]:
+    """
+    Compile lowercased keywords into one alternation (match against lowercased text).
+    
+    Longer keywords are tried first so 'make.com' wins over 'make'. Without
+    word boundaries this matches exactly what `keyword in text` did.
+    
+    Returns:
+        Compiled pattern, or None if there are no keywords
+    """
+    unique = sorted({k.lower() for k in keywords if k}, key=len, reverse=True)
+    if not unique:
+        return None
+    
+    alternation = '|'.join(re.escape(k) for k in unique)
+    if word_boundaries:
+        alternation = rf'(?<!\w)(?:{alternation})(?!\w)'
+    return re.compile(alternation)
+
+
+class CompiledFilterRules:
+    """filter_rules.json parsed once: notes stripped, keyword classes compiled"""
+    
+    def __init__(self, config: Dict):
+        """
+        Args:
+            config: Filter configuration (see config/filter_rules.json)
+        """
+        # Optional: match keywords as whole words instead of substrings
+        word_boundaries = bool(config.get('keyword_word_boundaries', False))
+        
+        self.min_budget = config.get('budget', {}).get('min', 0)
+        self.max_budget = config.get('budget', {}).get('max', float('inf'))
+        self.min_rating = config.get('client_rating', {}).get('min', 0)
+        self.min_reviews = config.get('client_reviews', {}).get('min', 0)
+        self.max_proposals = config.get('proposals_required', {}).get('max', float('inf'))
+        self.max_connects = config.get('max_connects', {}).get('limit', 50)
+        
+        self.allowed_categories = _without_notes(config.get('job_category', []))
+        self.allowed_types = _without_notes(config.get('job_type', []))
+        
+        self.required_skills = set(_without_notes(config.get('skills_required', [])))
+        self.required_skills_lower = {s.lower() for s in self.required_skills}
+        self.title_keywords = config.get('title_keywords', [])
+        self.excluded = _without_notes(config.get('exclude_keywords', []))
+        
+        # One pass over the job text per keyword class
+        self.include_pattern = compile_keywords(list(self.title_keywords) + NOCODE_TOOLS, word_boundaries)
+        self.exclude_pattern = compile_keywords(self.excluded, word_boundaries)
+        
+        # Scoring uses the raw config lists
+        self.score_min_budget = config.get('budget', {}).get('min', 0)
+        self.score_max_budget = config.get('budget', {}).get('max', 10000)
+        self.score_skills = set(config.get('skills_required', []))
+        
+        # Jobs carrying this fingerprint were filtered with these exact rules
+        self.fingerprint = hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
 class JobFilter:
     """Filter Upwork jobs based on criteria"""
     
@@ -30,6 +129,7 @@ class JobFilter:
             filter_config: Dictionary with filter criteria (budget, rating, skills, etc.)
         """
         self.config = filter_config
+        self.rules = CompiledFilterRules(filter_config)
         self.logger = logger
     
     def load_raw_jobs(self, filepath: str) -> List[Dict]:
@@ -43,35 +143,34 @@ class JobFilter:
             self.logger.error(f"Jobs file not found: {filepath}")
             return []
     
+    @staticmethod
+    def job_text(job: Dict) -> str:
+        """Lowercased title + description, the text keyword checks run against"""
+        return (job.get('title', '') + ' ' + job.get('description', '')).lower()
+    
     def check_budget(self, job: Dict) -> bool:
         """Check if job budget is within acceptable range"""
         budget = job.get('budget', 0)
-        min_budget = self.config.get('budget', {}).get('min', 0)
-        max_budget = self.config.get('budget', {}).get('max', float('inf'))
         
         # Handle both fixed and hourly rates
         if isinstance(budget, dict):
             budget = budget.get('amount', 0)
         
-        return min_budget <= budget <= max_budget
+        return self.rules.min_budget <= budget <= self.rules.max_budget
     
     def check_client_rating(self, job: Dict) -> bool:
         """Check if client rating is acceptable"""
         rating = job.get('client', {}).get('rating', 0)
-        min_rating = self.config.get('client_rating', {}).get('min', 0)
-        return rating >= min_rating
+        return rating >= self.rules.min_rating
     
     def check_client_reviews(self, job: Dict) -> bool:
         """Check if client has minimum number of reviews"""
         reviews = job.get('client', {}).get('reviews', 0)
-        min_reviews = self.config.get('client_reviews', {}).get('min', 0)
-        return reviews >= min_reviews
+        return reviews >= self.rules.min_reviews
     
     def check_job_category(self, job: Dict) -> bool:
         """Check if job category matches allowed categories"""
-        allowed_categories = self.config.get('job_category', [])
-        # Remove notes from allowed categories
-        allowed_categories = [c for c in allowed_categories if not c.startswith('note:')]
+        allowed_categories = self.rules.allowed_categories
         if not allowed_categories:
             return True  # No restriction if empty
         
@@ -81,62 +180,45 @@ class JobFilter:
             return True
         return job_category in allowed_categories
     
-    def check_required_skills(self, job: Dict) -> bool:
+    def check_required_skills(self, job: Dict, job_text: Optional[str] = None) -> bool:
         """Check if job requires minimum required skills OR title/description contains keywords"""
-        required_skills = self.config.get('skills_required', [])
-        required_skills = set(s for s in required_skills if not s.startswith('note:'))
-        
-        title_keywords = self.config.get('title_keywords', [])
-        
-        if not required_skills and not title_keywords:
+        if not self.rules.required_skills and not self.rules.title_keywords:
             return True  # No restriction if empty
         
         # Check skills
         job_skills = set(s.lower() for s in job.get('skills', []))
-        required_lower = set(s.lower() for s in required_skills)
-        skills_match = bool(required_lower & job_skills)
-        
-        # Also check title and description for keywords
-        job_text = (job.get('title', '') + ' ' + job.get('description', '')).lower()
-        
-        # Check title keywords
-        title_match = False
-        for kw in title_keywords:
-            if kw.lower() in job_text:
-                title_match = True
-                break
-        
-        # Check for no-code tool mentions in description
-        nocode_tools = ['zapier', 'make.com', 'make', 'integromat', 'n8n', 'no-code', 'nocode', 'no code']
-        tool_match = any(tool in job_text for tool in nocode_tools)
+        if self.rules.required_skills_lower & job_skills:
+            return True
         
-        # Pass if ANY match found
-        return skills_match or title_match or tool_match
+        # Title keywords and no-code tool mentions in one pass over title + description
+        if job_text is None:
+            job_text = self.job_text(job)
+        return self.rules.include_pattern.search(job_text) is not None
     
-    def check_exclude_keywords(self, job: Dict) -> bool:
+    def check_exclude_keywords(self, job: Dict, job_text: Optional[str] = None) -> bool:
         """Check if job contains excluded keywords"""
-        excluded = self.config.get('exclude_keywords', [])
-        # Remove notes from excluded keywords
-        excluded = [k for k in excluded if not k.startswith('note:')]
-        if not excluded:
+        if self.rules.exclude_pattern is None:
             return True
         
-        job_text = (job.get('title', '') + ' ' + job.get('description', '')).lower()
-        for keyword in excluded:
-            if keyword.lower() in job_text:
-                return False
-        return True
+        if job_text is None:
+            job_text = self.job_text(job)
+        return self.rules.exclude_pattern.search(job_text) is None
+    
+    def excluded_keywords_found(self, job: Dict) -> List[str]:
+        """All excluded keywords present in the job (for reporting)"""
+        if self.rules.exclude_pattern is None:
+            return []
+        return sorted({m.group(0).lower() for m in self.rules.exclude_pattern.finditer(self.job_text(job))})
     
     def check_proposals_required(self, job: Dict) -> bool:
         """Check if proposals count is within acceptable range"""
         # Check both field names (different scrapers use different names)
         proposals = job.get('proposals_required', job.get('proposals_count', 0))
-        max_proposals = self.config.get('proposals_required', {}).get('max', float('inf'))
-        return proposals <= max_proposals
+        return proposals <= self.rules.max_proposals
     
     def check_max_connects(self, job: Dict) -> bool:
         """Check if job requires too many connects to be competitive"""
-        max_connects = self.config.get('max_connects', {}).get('limit', 50)
+        max_connects = self.rules.max_connects
         
         # Estimate connects needed based on proposals count
         # Upwork typically charges 12-16 base + boost needed
@@ -161,9 +243,7 @@ class JobFilter:
     
     def check_job_type(self, job: Dict) -> bool:
         """Check if job type matches (fixed-price vs hourly)"""
-        allowed_types = self.config.get('job_type', [])
-        # Remove notes from allowed types
-        allowed_types = [t for t in allowed_types if not t.startswith('note:')]
+        allowed_types = self.rules.allowed_types
         if not allowed_types:
             return True
         
@@ -183,8 +263,8 @@ class JobFilter:
         if isinstance(budget, dict):
             budget = budget.get('amount', 0)
         
-        min_budget = self.config.get('budget', {}).get('min', 0)
-        max_budget = self.config.get('budget', {}).get('max', 10000)
+        min_budget = self.rules.score_min_budget
+        max_budget = self.rules.score_max_budget
         
         if budget >= min_budget and budget <= max_budget:
             # Scale: jobs at max_budget get +20, at min get 0
@@ -193,7 +273,7 @@ class JobFilter:
         
         # Client rating score (±15 points)
         rating = job.get('client', {}).get('rating', 0)
-        min_rating = self.config.get('client_rating', {}).get('min', 0)
+        min_rating = self.rules.min_rating
         if rating >= 4.5:
             score += 15
         elif rating >= 4.0:
@@ -218,7 +298,7 @@ class JobFilter:
             score += 5
         
         # Skills match score (±10 points)
-        required_skills = set(self.config.get('skills_required', []))
+        required_skills = self.rules.score_skills
         job_skills = set(job.get('skills', []))
         if required_skills:
             match_ratio = len(required_skills & job_skills) / len(required_skills)
@@ -233,52 +313,200 @@ class JobFilter:
         Returns:
             (passes_filter, reason, score)
         """
-        checks = [
-            (self.check_budget, "Budget out of range"),
-            (self.check_client_rating, "Client rating too low"),
-            (self.check_client_reviews, "Client has insufficient reviews"),
-            (self.check_job_category, "Job category not allowed"),
-            (self.check_required_skills, "Not a no-code automation job"),
-            (self.check_exclude_keywords, "Contains excluded keywords"),
-            (self.check_proposals_required, "Too many proposals already"),
-            (self.check_max_connects, "Would cost too many connects (>20)"),
-            (self.check_job_type, "Job type not allowed"),
-        ]
+        job_text = self.job_text(job)
+        checks = zip([
+            self.check_budget,
+            self.check_client_rating,
+            self.check_client_reviews,
+            self.check_job_category,
+            lambda j: self.check_required_skills(j, job_text),
+            lambda j: self.check_exclude_keywords(j, job_text),
+            self.check_proposals_required,
+            self.check_max_connects,
+            self.check_job_type,
+        ], CHECK_REASONS)
         
+        score = self.calculate_job_score(job)
         for check_func, failure_reason in checks:
             if not check_func(job):
-                score = self.calculate_job_score(job)
                 return False, failure_reason, score
         
-        score = self.calculate_job_score(job)
-        return True, "Passed all filters", score
+        return True, PASSED_REASON, score
     
-    def filter_jobs(self, jobs: List[Dict]) -> tuple[List[Dict], List[Dict]]:
+    def filter_jobs(self, jobs: List[Dict], vectorized: Optional[bool] = None) -> tuple[List[Dict], List[Dict]]:
         """
         Filter all jobs and return accepted and rejected lists
         
+        Jobs already filtered with the same rules (matching 'filter_rules'
+        fingerprint) keep their stored result instead of being re-checked.
+        
+        Args:
+            jobs: Job dicts (annotated in place with filter_* fields)
+            vectorized: Evaluate uncached jobs with the NumPy columnar path
+                (None = automatically for VECTORIZE_MIN_JOBS+ jobs when numpy is installed)
+        
         Returns:
             (accepted_jobs, rejected_jobs)
         """
+        with span("filter.filter_jobs", jobs=len(jobs)) as s:
+            accepted, rejected, reused = self._filter_jobs(jobs, vectorized)
+            s.set(accepted=len(accepted), rejected=len(rejected), reused=reused)
+        
+        if reused:
+            self.logger.info(f"Reused cached filter results for {reused} jobs")
+        self.logger.info(f"Filtering complete: {len(accepted)} accepted, {len(rejected)} rejected out of {len(jobs)} total")
+        return accepted, rejected
+    
+    def _filter_jobs(self, jobs: List[Dict], vectorized: Optional[bool]) -> tuple[List[Dict], List[Dict], int]:
         accepted = []
         rejected = []
         
-        for job in jobs:
-            passes, reason, score = self.filter_job(job)
-            
+        pending = [job for job in jobs
+                   if not (job.get('filter_rules') == self.rules.fingerprint and 'filter_reason' in job)]
+        reused = len(jobs) - len(pending)
+        
+        if vectorized is None:
+            vectorized = HAS_NUMPY and len(pending) >= VECTORIZE_MIN_JOBS
+        elif vectorized and not HAS_NUMPY:
+            self.logger.warning("numpy not installed, using scalar filtering. Install with: pip install numpy")
+            vectorized = False
+        
+        if vectorized and pending:
+            batch = self.filter_jobs_columnar(pending)
+            results = zip(batch.passed.tolist(), batch.reasons, batch.scores.tolist())
+        else:
+            results = (self.filter_job(job) for job in pending)
+        
+        filtered_at = datetime.now().isoformat()
+        for job, (passes, reason, score) in zip(pending, results):
             job['filter_score'] = score
             job['filter_reason'] = reason
-            job['filtered_at'] = datetime.now().isoformat()
+            job['filter_rules'] = self.rules.fingerprint
+            job['filtered_at'] = filtered_at
+        
+        for job in jobs:
+            reason = job['filter_reason']
+            score = job.get('filter_score', 0)
             
-            if passes:
+            if reason == PASSED_REASON:
                 accepted.append(job)
                 self.logger.info(f"✓ Job {job.get('id')} ACCEPTED (Score: {score:.1f}) - {job.get('title', 'N/A')[:50]}")
             else:
                 rejected.append(job)
                 self.logger.debug(f"✗ Job {job.get('id')} REJECTED ({reason}) - {job.get('title', 'N/A')[:50]}")
         
-        self.logger.info(f"Filtering complete: {len(accepted)} accepted, {len(rejected)} rejected out of {len(jobs)} total")
-        return accepted, rejected
+        return accepted, rejected, reused
+    
+    def filter_jobs_columnar(self, jobs: List[Dict]) -> "ColumnarFilterResult":
+        """
+        Evaluate all filters and scores for a batch of jobs as array expressions.
+        
+        Makes the same decisions as filter_job (see execution/test_filter_parity.py).
+        Jobs with values the arrays can't hold (e.g. a None budget) are
+        evaluated with filter_job instead.
+        
+        Only the range checks and the score are array expressions. Keyword hits
+        are still one regex search per job (see JobColumns.keyword_hits), and
+        together with building the columns that bounds the speedup: on 100k
+        jobs it takes ~0.6-0.7s against ~0.9s for the scalar path.
+        
+        Returns:
+            ColumnarFilterResult with accepted/rejected indices, reasons and scores
+        """
+        if not HAS_NUMPY:
+            raise ImportError("numpy not installed. Install with: pip install numpy")
+        
+        columns = JobColumns.from_jobs(jobs, self.rules)
+        rules = self.rules
+        
+        budget_ok = (rules.min_budget <= columns.budget) & (columns.budget <= rules.max_budget)
+        
+        proposals = columns.proposals
+        boost = np.select(
+            [proposals <= 5, proposals <= 15, proposals <= 30, proposals <= 50],
+            [0, 4, 8, 12],
+            default=20
+        )
+        
+        numeric_ok = (
+            budget_ok
+            & (columns.rating >= rules.min_rating)
+            & (columns.reviews >= rules.min_reviews)
+            & columns.category_ok
+        )
+        
+        # Keyword checks only scan text where the outcome can still matter
+        if not rules.required_skills and not rules.title_keywords:
+            include_ok = np.ones(len(jobs), dtype=bool)
+        else:
+            include_ok = columns.skill_hit | columns.keyword_hits(
+                rules.include_pattern, jobs, numeric_ok & ~columns.skill_hit
+            )
+        exclude_ok = ~columns.keyword_hits(rules.exclude_pattern, jobs, numeric_ok & include_ok)
+        
+        # One row per check, in CHECK_REASONS order (rows after a job's first
+        # failure are never read, so unscanned keyword rows are safe)
+        passed_checks = np.vstack([
+            budget_ok,
+            columns.rating >= rules.min_rating,
+            columns.reviews >= rules.min_reviews,
+            columns.category_ok,
+            include_ok,
+            exclude_ok,
+            proposals <= rules.max_proposals,
+            16 + boost <= rules.max_connects,
+            columns.type_ok,
+        ])
+        passed = passed_checks.all(axis=0)
+        first_failure = np.argmin(passed_checks, axis=0)
+        
+        scores = self._score_columns(columns)
+        
+        reason_table = np.array(CHECK_REASONS + [PASSED_REASON], dtype=object)
+        reasons = reason_table[np.where(passed, len(CHECK_REASONS), first_failure)].tolist()
+        
+        # Odd values: fall back to the scalar path for exact behaviour
+        for i in np.flatnonzero(columns.fallback).tolist():
+            job_passed, reasons[i], scores[i] = self.filter_job(jobs[i])
+            passed[i] = job_passed
+        
+        return ColumnarFilterResult(
+            accepted=np.flatnonzero(passed),
+            rejected=np.flatnonzero(~passed),
+            passed=passed,
+            reasons=reasons,
+            scores=scores,
+        )
+    
+    def _score_columns(self, columns: "JobColumns"):
+        """calculate_job_score over arrays (terms added in the same order for identical floats)"""
+        rules = self.rules
+        score = np.full(len(columns), 50.0)
+        
+        # Budget score (±20 points)
+        budget = columns.budget
+        in_range = (budget >= rules.score_min_budget) & (budget <= rules.score_max_budget)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            budget_score = ((budget - rules.score_min_budget) / (rules.score_max_budget - rules.score_min_budget)) * 20
+        score = np.where(in_range, score + np.minimum(budget_score, 20), score)
+        
+        # Client rating score (±15 points)
+        rating = columns.rating
+        score += np.select([rating >= 4.5, rating >= 4.0, rating >= rules.min_rating], [15, 10, 5], default=0)
+        
+        # Client reviews score (±10 points)
+        reviews = columns.reviews
+        score += np.select([reviews >= 100, reviews >= 50], [10, 5], default=0)
+        
+        # Proposals required score (±15 points)
+        proposals = columns.score_proposals
+        score += np.select([proposals <= 10, proposals <= 20, proposals <= 50], [15, 10, 5], default=0)
+        
+        # Skills match score (±10 points)
+        if rules.score_skills:
+            score += columns.score_skill_ratio * 10
+        
+        return np.clip(score, 0, 100)
     
     def save_filtered_jobs(self, accepted: List[Dict], rejected: List[Dict], output_prefix: str = '.tmp/'):
         """Save filtered jobs to JSON files"""
@@ -300,6 +528,133 @@ class JobFilter:
         return accepted_file, rejected_file
 
 
+_NUMERIC_TYPES = (int, float, bool)
+
+
+@dataclass
+class ColumnarFilterResult:
+    """Batch filter outcome, aligned with the input job list"""
+    accepted: Any       # indices of jobs that passed
+    rejected: Any       # indices of jobs that failed
+    passed: Any         # bool per job
+    reasons: List[str]  # rejection reason (or PASSED_REASON) per job
+    scores: Any         # 0-100 score per job
+
+
+class JobColumns:
+    """Job fields the filters need, as NumPy arrays"""
+    
+    def __init__(self, size: int):
+        self.size = size
+        self.fallback = np.zeros(size, dtype=bool)
+        self._texts: Dict[int, str] = {}  # job index -> lowercased text, built on first scan
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def _numeric(self, values: List) -> "np.ndarray":
+        """Float column; non-numeric entries become NaN and are flagged for the scalar path"""
+        try:
+            if all(type(v) in _NUMERIC_TYPES for v in values):
+                return np.fromiter(values, dtype=np.float64, count=len(values))
+        except OverflowError:
+            pass
+        
+        column = np.empty(len(values), dtype=np.float64)
+        for i, v in enumerate(values):
+            if type(v) in _NUMERIC_TYPES:
+                column[i] = v
+            else:
+                column[i] = np.nan
+                self.fallback[i] = True
+        return column
+    
+    def keyword_hits(self, pattern: Optional[re.Pattern], jobs: List[Dict], mask: "np.ndarray") -> "np.ndarray":
+        """
+        Per-job keyword hit mask, searching only jobs where `mask` is set.
+        
+        Jobs already rejected by an earlier check never need their text
+        scanned, and each search stops at the first hit.
+        
+        This is a Python loop on purpose. A whole-column scan measured slower on
+        100k jobs: one regex pass over the NUL-joined texts took 0.25s against
+        0.12s, and np.strings.find per keyword took 0.8-3s. Nearly every job
+        hits early, so the per-job search already does the least regex work.
+        """
+        hits = np.zeros(self.size, dtype=bool)
+        if pattern is None:
+            return hits
+        
+        search = pattern.search
+        texts = self._texts
+        indices = np.flatnonzero(mask)
+        found = []
+        for i in indices.tolist():
+            text = texts.get(i)
+            if text is None:
+                text = texts[i] = JobFilter.job_text(jobs[i])
+            found.append(search(text) is not None)
+        hits[indices] = np.array(found, dtype=bool)
+        return hits
+    
+    @classmethod
+    def from_jobs(cls, jobs: List[Dict], rules: CompiledFilterRules) -> "JobColumns":
+        columns = cls(len(jobs))
+        
+        budgets = []
+        for job in jobs:
+            budget = job.get('budget', 0)
+            if isinstance(budget, dict):
+                budget = budget.get('amount', 0)
+            budgets.append(budget)
+        columns.budget = columns._numeric(budgets)
+        
+        clients = [job.get('client', {}) for job in jobs]
+        columns.rating = columns._numeric([client.get('rating', 0) for client in clients])
+        columns.reviews = columns._numeric([client.get('reviews', 0) for client in clients])
+        columns.proposals = columns._numeric(
+            [job.get('proposals_required', job.get('proposals_count', 0)) for job in jobs]
+        )
+        columns.score_proposals = columns._numeric([job.get('proposals_required', 50) for job in jobs])
+        
+        # Category and type: membership decided once per distinct value
+        allowed_categories = rules.allowed_categories
+        if allowed_categories:
+            columns.category_ok = np.fromiter(
+                (not job.get('category', '') or job.get('category', '') in allowed_categories for job in jobs),
+                dtype=bool, count=len(jobs)
+            )
+        else:
+            columns.category_ok = np.ones(len(jobs), dtype=bool)
+        
+        allowed_types = rules.allowed_types
+        if allowed_types:
+            type_values = [job.get('type', '') or job.get('job_type', '') for job in jobs]
+            if isinstance(allowed_types, list):
+                allowed = {v: v in allowed_types for v in set(type_values)}
+            else:
+                allowed = {v: v == allowed_types for v in set(type_values)}
+            columns.type_ok = np.fromiter((allowed[v] for v in type_values), dtype=bool, count=len(jobs))
+        else:
+            columns.type_ok = np.ones(len(jobs), dtype=bool)
+        
+        # Skills: exact (lowercased) match for the check, case-sensitive ratio for the score
+        required_lower = rules.required_skills_lower
+        score_skills = rules.score_skills
+        skill_lists = [job.get('skills', []) for job in jobs]
+        columns.skill_hit = np.fromiter(
+            (any(s.lower() in required_lower for s in skills) for skills in skill_lists),
+            dtype=bool, count=len(jobs)
+        )
+        if score_skills:
+            columns.score_skill_ratio = np.fromiter(
+                (len(score_skills.intersection(skills)) / len(score_skills) for skills in skill_lists),
+                dtype=np.float64, count=len(jobs)
+            )
+        
+        return columns
+
+
 def load_filter_config(config_path: str = 'config/filter_rules.json') -> Dict:
     """Load filter configuration from JSON file"""
     try:
@@ -9,7 +9,9 @@ import sys
 
 # Add execution/utils to path for cost_optimizer import
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-from utils.cost_optimizer import CostTracker, PromptCache, PromptCompressor
+from utils.cost_optimizer import BatchMessage, BatchProcessor, CostTracker, PromptCache, PromptCompressor, batch_enabled
+from utils.llm_cache import cached_client
+from utils.tracing import current_span, traced
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +27,10 @@ logger = logging.getLogger(__name__)
 # Initialize cost tracker
 cost_tracker = CostTracker()
 
+# Models per stage (Haiku for extraction, Sonnet for writing)
+INSIGHTS_MODEL = "claude-haiku-4-5"
+PROPOSAL_MODEL = "claude-sonnet-4-5"
+
 # Load environment variables
 load_dotenv()
 
@@ -41,7 +47,8 @@ class ProposalGenerator:
             template_path: Path to proposal template
         """
         self.api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        # Insight extraction is answered from the LLM cache when LLM_CACHE=1
+        self.client = cached_client(anthropic.Anthropic(api_key=self.api_key))
         self.template_path = template_path
         self.template = self._load_template()
         self.logger = logger
@@ -86,6 +93,61 @@ For a project like this, I typically deliver within {timeline}.
 Let's hop on a quick call to discuss the specifics. I'm available to start immediately.
 """.strip()
     
+    def _insights_params(self, job: Dict) -> Dict:
+        """messages.create() params for the insight-extraction call"""
+        # Compress job data to JSON (instead of natural language)
+        job_data = {
+            "title": job.get('title', 'N/A'),
+            "desc": PromptCompressor.truncate_description(job.get('description', 'N/A'), max_chars=300),
+            "budget": job.get('budget', 'N/A'),
+            "skills": job.get('skills', [])
+        }
+        job_json = PromptCompressor.to_json(job_data, indent=None)
+
+        # Compress the prompt instructions
+        system_instruction = """Extract from job posting: pain points, tech requirements, opportunities, positioning.
+Respond in JSON with keys: pain_points, technical_requirements, opportunities, positioning."""
+
+        return {
+            "model": INSIGHTS_MODEL,  # CHANGED: Opus → Haiku (80% savings)
+            "max_tokens": 400,  # CHANGED: Reduced from 500
+            "system": [
+                PromptCache.add_cache_control(system_instruction, ttl="ephemeral")  # ADDED: Caching
+            ],
+            "messages": [
+                {
+                    "role": "user",
+                    "content": f"Analyze: {job_json}"
+                }
+            ]
+        }
+
+    def _parse_insights(self, response_text: str, job: Dict) -> Dict:
+        """Parse insight JSON, falling back to job fields if the reply isn't pure JSON"""
+        try:
+            return json.loads(response_text)
+        except json.JSONDecodeError:
+            # Fallback if response isn't pure JSON
+            return {
+                "pain_points": [job.get('description', '')[:100]],
+                "technical_requirements": job.get('skills', []),
+                "opportunities": ["Potential for ongoing maintenance/support"],
+                "positioning": "Position as a reliable expert in automation"
+            }
+
+    def _empty_insights(self, job: Dict) -> Dict:
+        """Insights used when the extraction call fails"""
+        return {
+            "pain_points": [],
+            "technical_requirements": job.get('skills', []),
+            "opportunities": [],
+            "positioning": "Professional approach to solving your automation needs"
+        }
+
+    def _log_cost(self, message, model: str, endpoint: str, batch: bool = False, latency_ms: float = None):
+        """Log cost for one API call (live Message or BatchMessage)"""
+        cost_tracker.log_message(message, model=model, endpoint=endpoint, batch=batch, latency_ms=latency_ms)
+
     def extract_job_insights(self, job: Dict) -> Dict:
         """
         Use Claude to extract key insights from job description (OPTIMIZED)
@@ -100,68 +162,59 @@ Let's hop on a quick call to discuss the specifics. I'm available to start immed
             Dict with extracted pain points, requirements, opportunities
         """
         try:
-            # Compress job data to JSON (instead of natural language)
-            job_data = {
-                "title": job.get('title', 'N/A'),
-                "desc": PromptCompressor.truncate_description(job.get('description', 'N/A'), max_chars=300),
-                "budget": job.get('budget', 'N/A'),
-                "skills": job.get('skills', [])
-            }
-            job_json = PromptCompressor.to_json(job_data, indent=None)
-
-            # Compress the prompt instructions
-            system_instruction = """Extract from job posting: pain points, tech requirements, opportunities, positioning.
-Respond in JSON with keys: pain_points, technical_requirements, opportunities, positioning."""
-
-            message = self.client.messages.create(
-                model="claude-haiku-4-5",  # CHANGED: Opus → Haiku (80% savings)
-                max_tokens=400,  # CHANGED: Reduced from 500
-                system=[
-                    PromptCache.add_cache_control(system_instruction, ttl="ephemeral")  # ADDED: Caching
-                ],
-                messages=[
-                    {
-                        "role": "user",
-                        "content": f"Analyze: {job_json}"
-                    }
-                ]
-            )
-
-            response_text = message.content[0].text
+            with cost_tracker.timer() as timing:
+                message = self.client.messages.create(**self._insights_params(job))
 
             # Log cost for this API call
-            cost_tracker.log_call(
-                model="claude-haiku-4-5",
-                input_tokens=message.usage.input_tokens,
-                output_tokens=message.usage.output_tokens,
-                endpoint="extract_job_insights",
-                cached_tokens=message.usage.cache_read_input_tokens if hasattr(message.usage, 'cache_read_input_tokens') else 0
-            )
-
-            # Try to parse JSON from response
-            try:
-                insights = json.loads(response_text)
-            except json.JSONDecodeError:
-                # Fallback if response isn't pure JSON
-                insights = {
-                    "pain_points": [job.get('description', '')[:100]],
-                    "technical_requirements": job.get('skills', []),
-                    "opportunities": ["Potential for ongoing maintenance/support"],
-                    "positioning": "Position as a reliable expert in automation"
-                }
+            self._log_cost(message, INSIGHTS_MODEL, "extract_job_insights", latency_ms=timing.latency_ms)
+
+            insights = self._parse_insights(message.content[0].text, job)
 
             self.logger.info(f"Extracted insights for job {job.get('id')} (Haiku, cached)")
             return insights
 
         except Exception as e:
             self.logger.error(f"Error extracting job insights: {e}")
-            return {
-                "pain_points": [],
-                "technical_requirements": job.get('skills', []),
-                "opportunities": [],
-                "positioning": "Professional approach to solving your automation needs"
-            }
-    
+            return self._empty_insights(job)
+
+    def _proposal_params(self, job: Dict, insights: Dict) -> Dict:
+        """messages.create() params for the proposal-writing call"""
+        # Prepare context for Claude
+        pain_points = ', '.join(insights.get('pain_points', ['automation challenges']))
+        required_skills = ', '.join(job.get('skills', ['automation']))
+        budget_range = f"${job.get('budget', 'negotiable')}"
+        description_short = PromptCompressor.truncate_description(
+            job.get('description', 'N/A'),
+            max_chars=300
+        )
+
+        # Cached system instruction (same for all proposals)
+        system_instruction = """You are an expert no-code automation specialist. Primary tool: Make.com (visual workflow builder, cost-effective).
+Use Zapier/n8n if client requests. Generate compelling, conversational proposals under 250 words.
+RULES: Hook with SPECIFIC problem understanding. No generic phrases. No fake stats. Focus on clarity, specificity, timeline.
+Output ONLY proposal text, ready to submit."""
+
+        return {
+            "model": PROPOSAL_MODEL,  # CHANGED: Opus → Sonnet (40% savings)
+            "max_tokens": 350,  # CHANGED: Reduced from 1000
+            "system": [
+                PromptCache.add_cache_control(system_instruction, ttl="ephemeral")  # ADDED: Caching
+            ],
+            "messages": [
+                {
+                    "role": "user",
+                    "content": f"""Job: {job.get('title', 'N/A')}
+Desc: {description_short}
+Budget: {budget_range}
+Skills: {required_skills}
+Pain Points: {pain_points}
+
+Generate under 250 words."""
+                }
+            ]
+        }
+
+    @traced("proposal.generate")
     def generate_proposal(self, job: Dict) -> str:
         """
         Generate a personalized proposal for a job (OPTIMIZED)
@@ -179,56 +232,20 @@ Respond in JSON with keys: pain_points, technical_requirements, opportunities, p
         Returns:
             Generated proposal text
         """
+        current_span().set(job_id=job.get('id'))
         try:
             # Extract insights
             insights = self.extract_job_insights(job)
 
-            # Prepare context for Claude
-            pain_points = ', '.join(insights.get('pain_points', ['automation challenges']))
-            required_skills = ', '.join(job.get('skills', ['automation']))
-            budget_range = f"${job.get('budget', 'negotiable')}"
-            description_short = PromptCompressor.truncate_description(
-                job.get('description', 'N/A'),
-                max_chars=300
-            )
-
-            # Cached system instruction (same for all proposals)
-            system_instruction = """You are an expert no-code automation specialist. Primary tool: Make.com (visual workflow builder, cost-effective).
-Use Zapier/n8n if client requests. Generate compelling, conversational proposals under 250 words.
-RULES: Hook with SPECIFIC problem understanding. No generic phrases. No fake stats. Focus on clarity, specificity, timeline.
-Output ONLY proposal text, ready to submit."""
-
             # Ask Claude to generate proposal
-            message = self.client.messages.create(
-                model="claude-sonnet-4-5",  # CHANGED: Opus → Sonnet (40% savings)
-                max_tokens=350,  # CHANGED: Reduced from 1000
-                system=[
-                    PromptCache.add_cache_control(system_instruction, ttl="ephemeral")  # ADDED: Caching
-                ],
-                messages=[
-                    {
-                        "role": "user",
-                        "content": f"""Job: {job.get('title', 'N/A')}
-Desc: {description_short}
-Budget: {budget_range}
-Skills: {required_skills}
-Pain Points: {pain_points}
-
-Generate under 250 words."""
-                    }
-                ]
-            )
+            # Proposals are written fresh on every call
+            with cost_tracker.timer() as timing:
+                message = self.client.messages.create(**self._proposal_params(job, insights), cache_bypass=True)
 
             proposal = message.content[0].text
 
             # Log cost for this API call
-            cost_tracker.log_call(
-                model="claude-sonnet-4-5",
-                input_tokens=message.usage.input_tokens,
-                output_tokens=message.usage.output_tokens,
-                endpoint="generate_proposal",
-                cached_tokens=message.usage.cache_read_input_tokens if hasattr(message.usage, 'cache_read_input_tokens') else 0
-            )
+            self._log_cost(message, PROPOSAL_MODEL, "generate_proposal", latency_ms=timing.latency_ms)
 
             self.logger.info(f"Generated proposal for job {job.get('id')} (Sonnet, cached)")
             return proposal
@@ -294,20 +311,31 @@ NOTES:
         self.logger.info(f"Saved proposal to {filename}")
         return filename
     
-    def generate_proposals_batch(self, jobs: List[Dict], output_dir: str = '.tmp/proposals/') -> Dict:
+    def generate_proposals_batch(self, jobs: List[Dict], output_dir: str = '.tmp/proposals/', use_batch: bool = False) -> Dict:
         """
         Generate proposals for multiple jobs
         
+        Args:
+            jobs: Job dicts
+            output_dir: Where proposal files are written
+            use_batch: Run both stages through the Message Batches API
+                (half price, not interactive - meant for overnight runs)
+        
         Returns:
             Summary dict with generated/failed counts
         """
+        if use_batch:
+            proposal_texts = self._generate_proposals_via_batches(jobs)
+        else:
+            proposal_texts = None
+        
         generated = 0
         failed = 0
         proposals = []
         
-        for job in jobs:
+        for index, job in enumerate(jobs):
             try:
-                proposal = self.generate_proposal(job)
+                proposal = proposal_texts[index] if proposal_texts is not None else self.generate_proposal(job)
                 proposal_file = self.save_proposal(job, proposal, output_dir)
                 generated += 1
                 proposals.append({
@@ -324,12 +352,65 @@ NOTES:
             "generated": generated,
             "failed": failed,
             "proposals": proposals,
+            "batch": use_batch,
             "generated_at": datetime.now().isoformat()
         }
         
         self.logger.info(f"Batch proposal generation complete: {generated} generated, {failed} failed")
         return summary
     
+    def _generate_proposals_via_batches(self, jobs: List[Dict]) -> List[str]:
+        """
+        Two Message Batches: insights for every job, then proposals.
+        
+        Batches are resumed if the process restarts mid-run. Jobs whose batch
+        request errored get the same fallbacks as the live path.
+        
+        Returns:
+            Proposal text per job, in input order
+        """
+        processor = BatchProcessor(self.client)
+        
+        # Stage 1: insights
+        insight_ids = [BatchProcessor.make_custom_id("insights", index, job.get('id')) for index, job in enumerate(jobs)]
+        insight_batch, insight_results = processor.run(
+            [{"custom_id": cid, "params": self._insights_params(job)} for cid, job in zip(insight_ids, jobs)],
+            batch_name="proposal_insights"
+        )
+        
+        all_insights = []
+        for cid, job in zip(insight_ids, jobs):
+            result = insight_results.get(cid, {})
+            if result.get("type") == "succeeded":
+                message = BatchMessage(result)
+                self._log_cost(message, INSIGHTS_MODEL, "extract_job_insights", batch=True)
+                all_insights.append(self._parse_insights(result["text"], job))
+            else:
+                self.logger.error(f"Insight extraction failed for job {job.get('id')}: {result.get('error', result.get('type'))}")
+                all_insights.append(self._empty_insights(job))
+        
+        # Stage 2: proposals
+        proposal_ids = [BatchProcessor.make_custom_id("proposal", index, job.get('id')) for index, job in enumerate(jobs)]
+        proposal_batch, proposal_results = processor.run(
+            [{"custom_id": cid, "params": self._proposal_params(job, insights)}
+             for cid, job, insights in zip(proposal_ids, jobs, all_insights)],
+            batch_name="proposals"
+        )
+        
+        texts = []
+        for cid, job in zip(proposal_ids, jobs):
+            result = proposal_results.get(cid, {})
+            if result.get("type") == "succeeded":
+                self._log_cost(BatchMessage(result), PROPOSAL_MODEL, "generate_proposal", batch=True)
+                texts.append(result["text"])
+            else:
+                self.logger.error(f"Proposal generation failed for job {job.get('id')}: {result.get('error', result.get('type'))}")
+                texts.append(self._generate_fallback_proposal(job))
+        
+        processor.mark_consumed(insight_batch)
+        processor.mark_consumed(proposal_batch)
+        return texts
+    
     def generate_proposal_from_clickup_task(self, task: Dict) -> str:
         """Generate proposal directly from a ClickUp task (for webhook integration)"""
         # Extract job details from ClickUp task custom fields
@@ -391,8 +472,8 @@ if __name__ == "__main__":
     jobs = load_approved_jobs()
     
     if jobs:
-        # Generate proposals
-        summary = generator.generate_proposals_batch(jobs)
+        # Overnight run: Message Batches (half price) unless PROPOSALS_USE_BATCH=0
+        summary = generator.generate_proposals_batch(jobs, use_batch=batch_enabled('PROPOSALS_USE_BATCH'))
         
         # Save summary
         save_proposals_summary(summary)
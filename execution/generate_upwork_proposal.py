@@ -18,7 +18,7 @@ import time
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 import subprocess
 
 # Third-party imports
@@ -240,6 +240,21 @@ class ProposalGenerator:
     def __init__(self):
         self.client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
 
+    def _request_params(self, job_data: Dict) -> Dict:
+        """messages.create()/stream() params for one proposal"""
+        return {
+            "model": "claude-opus-4-5-20251101",  # Using the most capable model for best quality
+            "max_tokens": 1024,
+            "temperature": 0.7,  # Slight variation to sound natural, not robotic
+            "system": self.VOICE_PROFILE,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": self._build_prompt(job_data)
+                }
+            ]
+        }
+
     def generate_proposal(self, job_data: Dict) -> tuple:
         """
         Generate a personalized proposal using Claude API
@@ -251,23 +266,9 @@ class ProposalGenerator:
             Tuple of (proposal text, score dict) or (None, None) if generation fails
         """
         try:
-            # Build the prompt
-            prompt = self._build_prompt(job_data)
-
             logger.info("→ Generating proposal with Claude API...")
 
-            message = self.client.messages.create(
-                model="claude-opus-4-5-20251101",  # Using the most capable model for best quality
-                max_tokens=1024,
-                temperature=0.7,  # Slight variation to sound natural, not robotic
-                system=self.VOICE_PROFILE,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+            message = self.client.messages.create(**self._request_params(job_data))
 
             # Debug: Log the response structure
             logger.info(f"API Response: {message}")
@@ -277,29 +278,50 @@ class ProposalGenerator:
                 logger.error("✗ API returned empty content array")
                 return None, None
 
-            proposal = message.content[0].text.strip()
+            return self.finish_proposal(message.content[0].text, job_data)
 
-            if not proposal:
-                logger.error("✗ API returned empty text")
-                logger.info(f"Full message: {message}")
-                return None, None
+        except Exception as e:
+            logger.error(f"✗ Proposal generation failed: {e}")
+            import traceback
+            logger.error(traceback.format_exc())
+            return None, None
 
-            # Remove em-dashes and replace with hyphens or remove entirely
-            proposal = self._clean_em_dashes(proposal)
+    def stream_proposal(self, job_data: Dict) -> Iterator[str]:
+        """
+        Stream the raw proposal text as Claude writes it.
 
-            logger.info("✓ Proposal generated successfully")
+        Yields text chunks as they arrive (for st.write_stream); pass the
+        joined text to finish_proposal() for cleanup and scoring. API errors
+        propagate to the caller.
+        """
+        logger.info("→ Streaming proposal from Claude API...")
+        with self.client.messages.stream(**self._request_params(job_data)) as stream:
+            for text in stream.text_stream:
+                yield text
 
-            # Score the proposal
-            score = self._score_proposal(proposal, job_data)
+    def finish_proposal(self, raw_text: str, job_data: Dict) -> tuple:
+        """
+        Clean and score a completed proposal.
 
-            return proposal, score
+        Returns:
+            Tuple of (proposal text, score dict) or (None, None) if the text is empty
+        """
+        proposal = (raw_text or '').strip()
 
-        except Exception as e:
-            logger.error(f"✗ Proposal generation failed: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+        if not proposal:
+            logger.error("✗ API returned empty text")
             return None, None
 
+        # Remove em-dashes and replace with hyphens or remove entirely
+        proposal = self._clean_em_dashes(proposal)
+
+        logger.info("✓ Proposal generated successfully")
+
+        # Score the proposal
+        score = self._score_proposal(proposal, job_data)
+
+        return proposal, score
+
     def _build_prompt(self, job_data: Dict) -> str:
         """Build the prompt for Claude to generate a proposal"""
 
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Local Airtable stand-in for the webhook change feed.
+
+Serves the parts of the Airtable API that utils/change_feed.py and the
+record helpers use, and emits webhook payloads in Airtable's shape whenever
+a watched field changes:
+
+- GET/POST/PATCH /v0/{base}/{table}[/{record}]       records (lists are paged
+  with pageSize/offset and honour fields[] and simple filterByFormula
+  expressions; creates are capped at 10 records per request)
+- GET  /v0/meta/bases/{base}/tables                  schema (table + field IDs)
+- POST /v0/bases/{base}/webhooks                     create webhook
+- POST /v0/bases/{base}/webhooks/{id}/refresh        refresh webhook
+- GET  /v0/bases/{base}/webhooks/{id}/payloads       payload list from a cursor
+
+If a webhook has a notificationUrl, each payload is followed by a ping with an
+X-Airtable-Content-MAC header, like the real service.
+
+For load tests the server can also add per-request latency, enforce the
+5 requests/second per-base limit with 429s and inject random 429s
+(see benchmarks/run_benchmarks.py).
+
+Usage:
+    python execution/local_airtable_webhooks.py --port 8765
+    AIRTABLE_API_URL=http://127.0.0.1:8765/v0 python polling_trigger.py --change-feed
+
+In tests:
+    server = LocalAirtable().start()
+    client = AirtableClient(server.base_id, server.table_id, api_key="test", api_url=server.api_url)
+    record_id = server.create_record({"Title": "Post", "Status": "Draft"})
+    server.set_status(record_id, "Pending Review")
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import random
+import re
+import secrets
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+import requests
+
+PAYLOADS_PER_PAGE = 50
+
+RECORDS_PER_PAGE = 100
+
+RECORDS_PER_WRITE = 10
+
+# {Field}='value' / {Field}!=value comparisons inside filterByFormula
+_COMPARISON_RE = re.compile(r"^\{([^}]+)\}\s*(!=|=)\s*(.+)$")
+
+DEFAULT_FIELDS = {
+    'Title': 'singleLineText',
+    'Status': 'singleSelect',
+    'Post Content': 'multilineText',
+    'Scheduled Time': 'dateTime',
+}
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+def _split_args(text: str) -> List[str]:
+    """Split a formula argument list on top-level commas."""
+    args, depth, quote, current = [], 0, None, ''
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote and text[i - 1] != '\\':
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            args.append(current.strip())
+            current = ''
+            continue
+        current += char
+    if current.strip():
+        args.append(current.strip())
+    return args
+
+
+def _literal(text: str):
+    text = text.strip()
+    if text in ('TRUE()', 'FALSE()'):
+        return text == 'TRUE()'
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+        return text[1:-1].replace("\\'", "'").replace('\\\\', '\\')
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def formula_matches(formula: str, fields: Dict) -> bool:
+    """
+    Evaluate the filterByFormula subset the repo's formula_* helpers produce.
+
+    AND(), OR(), NOT() and {Field}=/!= literal comparisons are supported;
+    any other expression matches every record (a superset, like no filter).
+    """
+    formula = (formula or '').strip()
+    if not formula:
+        return True
+
+    for name in ('AND', 'OR', 'NOT'):
+        if formula.startswith(f"{name}(") and formula.endswith(')'):
+            results = [formula_matches(arg, fields) for arg in _split_args(formula[len(name) + 1:-1])]
+            if name == 'AND':
+                return all(results)
+            if name == 'OR':
+                return any(results)
+            return not results[0] if results else True
+
+    match = _COMPARISON_RE.match(formula)
+    if not match:
+        return True
+
+    name, operator, raw = match.groups()
+    value, expected = fields.get(name), _literal(raw)
+    if expected == '':
+        equal = value in (None, '', [])
+    elif isinstance(expected, float) and isinstance(value, (int, float)):
+        equal = float(value) == expected
+    else:
+        equal = value == expected
+    return equal if operator == '=' else not equal
+
+
+class LocalAirtable:
+    """In-memory base with one table, served over HTTP on a background thread"""
+
+    def __init__(
+        self,
+        port: int = 0,
+        base_id: str = 'appLOCALBASE00000',
+        table_id: str = 'tblLOCALPOSTS0000',
+        table_name: str = 'LinkedIn Posts',
+        fields: Optional[Dict[str, str]] = None,
+        latency: float = 0.0,
+        rate_limit: Optional[float] = None,
+        error_rate: float = 0.0,
+    ):
+        """
+        Args:
+            port: Port to bind (0 picks a free one)
+            base_id: Base ID the server answers for
+            table_id: ID of the single table
+            table_name: Name of the single table (also accepted in URLs)
+            fields: {field name: Airtable field type}
+            latency: Seconds added to every response
+            rate_limit: Requests per second before answering 429 (Airtable allows 5)
+            error_rate: Fraction of requests answered with an injected 429
+        """
+        self.base_id = base_id
+        self.table_id = table_id
+        self.table_name = table_name
+        self.field_ids = {name: f"fld{i:014d}" for i, name in enumerate(fields or DEFAULT_FIELDS)}
+        self.field_types = dict(fields or DEFAULT_FIELDS)
+        self.records: Dict[str, Dict] = {}
+        self.webhooks: Dict[str, Dict] = {}
+        self.transaction = 0
+        self.request_count = 0
+        self.throttled_count = 0
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self._recent = deque()
+        self.lock = threading.RLock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def api_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v0"
+
+    def start(self) -> "LocalAirtable":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ---------- Records (also callable directly from tests) ----------
+
+    def _cell(self, name: str, value):
+        if self.field_types.get(name) == 'singleSelect' and isinstance(value, str):
+            return {'id': f"sel{hashlib.md5(value.encode()).hexdigest()[:14]}", 'name': value, 'color': 'blueLight2'}
+        return value
+
+    def create_record(self, fields: Dict) -> str:
+        with self.lock:
+            record_id = f"rec{secrets.token_hex(7)}"
+            self.records[record_id] = {'id': record_id, 'createdTime': _now_iso(), 'fields': dict(fields)}
+            self._emit(created={record_id: fields})
+            return record_id
+
+    def update_record(self, record_id: str, fields: Dict) -> Dict:
+        return self.update_records([{'id': record_id, 'fields': fields}])[0]
+
+    def update_records(self, updates: List[Dict]) -> List[Dict]:
+        """Apply several updates as one transaction (one webhook payload)."""
+        with self.lock:
+            changed = {}
+            for update in updates:
+                record = self.records[update['id']]
+                previous = {name: record['fields'].get(name) for name in update['fields']}
+                record['fields'].update(update['fields'])
+                changed[update['id']] = (previous, update['fields'])
+            self._emit(changed=changed)
+            return [self.records[update['id']] for update in updates]
+
+    def set_status(self, record_id: str, status: str) -> Dict:
+        return self.update_record(record_id, {'Status': status})
+
+    # ---------- Webhooks ----------
+
+    def _emit(self, created: Optional[Dict] = None, changed: Optional[Dict] = None) -> None:
+        """Append a payload to every webhook whose filters match the change."""
+        self.transaction += 1
+        for webhook in self.webhooks.values():
+            options = webhook['specification'].get('options', {})
+            watched = set(options.get('filters', {}).get('watchDataInFieldIds') or self.field_ids.values())
+            include_ids = set(options.get('includes', {}).get('includeCellValuesInFieldIds') or [])
+            include_previous = options.get('includes', {}).get('includePreviousCellValues', False)
+
+            table = {}
+            for record_id, fields in (created or {}).items():
+                cells = {self.field_ids[n]: self._cell(n, v) for n, v in fields.items() if n in self.field_ids}
+                table.setdefault('createdRecordsById', {})[record_id] = {
+                    'createdTime': self.records[record_id]['createdTime'],
+                    'cellValuesByFieldId': cells,
+                }
+
+            for record_id, (previous, fields) in (changed or {}).items():
+                current = {self.field_ids[n]: self._cell(n, v) for n, v in fields.items()
+                           if n in self.field_ids and self.field_ids[n] in watched and previous.get(n) != v}
+                if not current:
+                    continue
+                entry = {'current': {'cellValuesByFieldId': current}}
+                if include_previous:
+                    entry['previous'] = {'cellValuesByFieldId': {
+                        self.field_ids[n]: self._cell(n, previous.get(n)) for n in fields
+                        if self.field_ids.get(n) in current
+                    }}
+                unchanged = {self.field_ids[n]: self._cell(n, v)
+                             for n, v in self.records[record_id]['fields'].items()
+                             if self.field_ids.get(n) in include_ids and self.field_ids[n] not in current}
+                if unchanged:
+                    entry['unchanged'] = {'cellValuesByFieldId': unchanged}
+                table.setdefault('changedRecordsById', {})[record_id] = entry
+
+            if not table:
+                continue
+
+            webhook['payloads'].append({
+                'timestamp': _now_iso(),
+                'baseTransactionNumber': self.transaction,
+                'actionMetadata': {'source': 'client', 'sourceMetadata': {'user': {'id': 'usrLOCAL'}}},
+                'payloadFormat': 'v0',
+                'changedTablesById': {self.table_id: table},
+            })
+            if webhook.get('notificationUrl'):
+                threading.Thread(target=self._ping, args=(webhook,), daemon=True).start()
+
+    def _ping(self, webhook: Dict) -> None:
+        body = json.dumps({'base': {'id': self.base_id}, 'webhook': {'id': webhook['id']}, 'timestamp': _now_iso()}).encode()
+        mac = hmac.new(base64.b64decode(webhook['macSecretBase64']), body, hashlib.sha256).hexdigest()
+        try:
+            requests.post(webhook['notificationUrl'], data=body, timeout=5, headers={
+                'Content-Type': 'application/json',
+                'X-Airtable-Content-MAC': f"hmac-sha256={mac}",
+            })
+        except requests.exceptions.RequestException:
+            pass
+
+    def _create_webhook(self, body: Dict) -> Dict:
+        webhook_id = f"ach{secrets.token_hex(7)}"
+        webhook = {
+            'id': webhook_id,
+            'macSecretBase64': base64.b64encode(secrets.token_bytes(32)).decode(),
+            'expirationTime': (datetime.now(timezone.utc) + timedelta(days=7)).strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'notificationUrl': body.get('notificationUrl'),
+            'specification': body.get('specification', {}),
+            'payloads': [],
+        }
+        self.webhooks[webhook_id] = webhook
+        return {k: webhook[k] for k in ('id', 'macSecretBase64', 'expirationTime')}
+
+    def _list_payloads(self, webhook: Dict, cursor: int) -> Dict:
+        start = max(cursor, 1) - 1
+        page = webhook['payloads'][start:start + PAYLOADS_PER_PAGE]
+        next_cursor = start + len(page) + 1
+        return {
+            'payloads': page,
+            'cursor': next_cursor,
+            'mightHaveMore': next_cursor <= len(webhook['payloads']),
+            'payloadFormat': 'v0',
+        }
+
+    # ---------- HTTP ----------
+
+    def _throttle(self) -> bool:
+        """True if this request should get a 429 (rate limit exceeded or injected)."""
+        with self.lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= 1.0:
+                self._recent.popleft()
+            limited = self.rate_limit is not None and len(self._recent) >= self.rate_limit
+            if not limited:
+                self._recent.append(now)
+            limited = limited or (self.error_rate > 0 and random.random() < self.error_rate)
+            if limited:
+                self.throttled_count += 1
+            return limited
+
+    def _list_records(self, query: Dict) -> Dict:
+        formula = query.get('filterByFormula', [''])[0]
+        fields = query.get('fields[]')
+        page_size = min(int(query.get('pageSize', [RECORDS_PER_PAGE])[0]), RECORDS_PER_PAGE)
+        start = int(query.get('offset', ['0'])[0])
+
+        matching = [r for r in self.records.values() if formula_matches(formula, r['fields'])]
+        page = matching[start:start + page_size]
+        if fields:
+            page = [{**r, 'fields': {k: v for k, v in r['fields'].items() if k in fields}} for r in page]
+
+        data = {'records': page}
+        if start + page_size < len(matching):
+            data['offset'] = str(start + page_size)
+        return data
+
+    def _route(self, method: str, path: str, query: Dict, body: Dict):
+        parts = [p for p in path.split('/') if p][1:]  # drop 'v0'
+
+        if parts[:3] == ['meta', 'bases', self.base_id] and parts[3:] == ['tables']:
+            return 200, {'tables': [{
+                'id': self.table_id,
+                'name': self.table_name,
+                'fields': [{'id': fid, 'name': name, 'type': self.field_types[name]} for name, fid in self.field_ids.items()],
+            }]}
+
+        if parts[:3] == ['bases', self.base_id, 'webhooks']:
+            if len(parts) == 3 and method == 'POST':
+                return 200, self._create_webhook(body)
+            webhook = self.webhooks.get(parts[3]) if len(parts) > 3 else None
+            if webhook is None:
+                return 404, {'error': 'NOT_FOUND'}
+            if parts[4:] == ['refresh'] and method == 'POST':
+                webhook['expirationTime'] = (datetime.now(timezone.utc) + timedelta(days=7)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+                return 200, {'expirationTime': webhook['expirationTime']}
+            if parts[4:] == ['payloads'] and method == 'GET':
+                return 200, self._list_payloads(webhook, int(query.get('cursor', ['1'])[0]))
+            return 404, {'error': 'NOT_FOUND'}
+
+        if parts[:1] == [self.base_id] and len(parts) >= 2 and parts[1] in (self.table_id, self.table_name):
+            if len(parts) == 2 and method == 'GET':
+                return 200, self._list_records(query)
+            if len(parts) == 2 and method in ('POST', 'PATCH') and len(body.get('records', [])) > RECORDS_PER_WRITE:
+                return 422, {'error': {'type': 'INVALID_RECORDS', 'message': f"At most {RECORDS_PER_WRITE} records per request"}}
+            if len(parts) == 2 and method == 'POST' and 'records' not in body:
+                return 200, self.records[self.create_record(body.get('fields', {}))]
+            if len(parts) == 2 and method == 'POST':
+                created = [self.records[self.create_record(r.get('fields', {}))] for r in body.get('records', [])]
+                return 200, {'records': created}
+            if len(parts) == 2 and method == 'PATCH':
+                return 200, {'records': self.update_records(body.get('records', []))}
+            record = self.records.get(parts[2]) if len(parts) == 3 else None
+            if record is None:
+                return 404, {'error': 'NOT_FOUND'}
+            if method == 'GET':
+                return 200, record
+            if method == 'PATCH':
+                return 200, self.update_record(record['id'], body.get('fields', {}))
+
+        return 404, {'error': 'NOT_FOUND'}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self, method: str):
+                parsed = urlparse(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+                if server.latency:
+                    time.sleep(server.latency)
+                if server._throttle():
+                    status, data = 429, {'errors': [{'error': 'RATE_LIMIT_REACHED'}]}
+                else:
+                    with server.lock:
+                        server.request_count += 1
+                        status, data = server._route(method, unquote(parsed.path), parse_qs(parsed.query), body)
+                encoded = json.dumps(data).encode()
+                self.send_response(status)
+                if status == 429:
+                    self.send_header('Retry-After', '1')
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def do_PATCH(self):
+                self._handle('PATCH')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Airtable stand-in that emits webhook payloads')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    args = parser.parse_args()
+
+    server = LocalAirtable(port=args.port)
+    print(f"🧪 Local Airtable at {server.api_url}")
+    print(f"   Base: {server.base_id}  Table: {server.table_id}")
+    print(f"   export AIRTABLE_API_URL={server.api_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -23,6 +23,8 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from draft_post_generator import DraftPostGenerator
 from post_quality_checker import PostQualityChecker
+from utils.airtable_client import AirtableClient, formula_and, formula_eq, formula_not_blank
+from utils.due_queue import DUE_QUEUE_DICT_NAME, DueQueue, parse_scheduled_time
 
 # Modal imports
 try:
@@ -37,6 +39,9 @@ except ImportError:
 # Initialize Modal app
 app = modal.App(name="linkedin-post-inventory")
 
+# Persisted fire-time index for post_scheduler_exact_minute (see utils/due_queue.py)
+due_queue_store = modal.Dict.from_name(DUE_QUEUE_DICT_NAME, create_if_missing=True)
+
 # Environment variables for Modal
 AIRTABLE_API_KEY = os.environ.get('AIRTABLE_API_KEY')
 AIRTABLE_BASE_ID = os.environ.get('AIRTABLE_BASE_ID')
@@ -52,6 +57,16 @@ ELIGIBLE_STATUSES = ['Draft', 'Pending Review', 'Approved - Ready to Schedule',
 # Time to keep posted posts before deletion (days)
 DAYS_TO_KEEP_POSTED = 7
 
+# Due queue refresh cadence; posts found late by a delta refresh still fire
+# within DUE_QUEUE_LATE_GRACE of their slot
+DUE_QUEUE_REFRESH_INTERVAL = timedelta(minutes=5)
+DUE_QUEUE_FULL_REBUILD_INTERVAL = timedelta(hours=1)
+DUE_QUEUE_LATE_GRACE = timedelta(minutes=10)
+
+# Failed Make.com sends stay queued and are retried after 1, 2, 4, 8 minutes
+DUE_QUEUE_MAX_ATTEMPTS = 5
+DUE_QUEUE_RETRY_DELAY = timedelta(minutes=1)
+
 
 def get_airtable_headers():
     """Get headers for Airtable API requests."""
@@ -96,10 +111,8 @@ def delete_old_posted_posts(all_records):
     Args:
         all_records: List of all Airtable records
     """
-    url = f"https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE_ID}"
-    headers = get_airtable_headers()
-
-    deleted_count = 0
+    now = datetime.now(timezone.utc)
+    to_delete = []
 
     for record in all_records:
         fields = record.get('fields', {})
@@ -115,38 +128,34 @@ def delete_old_posted_posts(all_records):
                     # Parse the posted date
                     posted_time = datetime.fromisoformat(posted_at.replace('Z', '+00:00'))
 
-                    # Calculate days since posting
-                    now = datetime.now(timezone.utc)
-                    days_since_posted = (now - posted_time).days
-
                     # Delete if 7+ days have passed
-                    if days_since_posted >= DAYS_TO_KEEP_POSTED:
-                        record_id = record['id']
-                        delete_url = f"{url}/{record_id}"
-
-                        try:
-                            del_response = requests.delete(
-                                delete_url,
-                                headers=headers,
-                                timeout=10
-                            )
-                            if del_response.status_code == 200:
-                                deleted_count += 1
-                                print(f"✓ Deleted old posted post: {record_id}")
-                            else:
-                                print(f"✗ Failed to delete {record_id}: {del_response.status_code}")
-                        except Exception as e:
-                            print(f"✗ Error deleting record: {e}")
+                    if (now - posted_time).days >= DAYS_TO_KEEP_POSTED:
+                        to_delete.append(record['id'])
 
                 except Exception as e:
                     print(f"Error parsing posted date: {e}")
 
-    return deleted_count
+    if not to_delete:
+        return 0
+
+    # Delete 10 records per request
+    client = AirtableClient(AIRTABLE_BASE_ID, AIRTABLE_TABLE_ID, api_key=AIRTABLE_API_KEY, timeout=10)
+    result = client.batch_delete(to_delete)
+
+    for record in result.records:
+        if record:
+            print(f"✓ Deleted old posted post: {record.get('id')}")
+    for failure in result.failures:
+        print(f"✗ Failed to delete {failure.item}: {failure.status_code} {failure.error[:200]}")
+
+    return result.succeeded_count
 
 
 def generate_and_upload_posts(count):
     """Generate and upload specified number of posts.
 
+    Posts are generated first, then uploaded 10 per request.
+
     Args:
         count: Number of posts to generate
 
@@ -156,10 +165,7 @@ def generate_and_upload_posts(count):
     gen = DraftPostGenerator()
     checker = PostQualityChecker()
 
-    url = f"https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE_ID}"
-    headers = get_airtable_headers()
-
-    uploaded = 0
+    records = []
 
     for i in range(count):
         try:
@@ -172,28 +178,28 @@ def generate_and_upload_posts(count):
             # Get framework mapping
             framework_airtable = gen.map_framework_to_airtable(post['framework'])
 
-            # Upload to Airtable
-            fields = {
+            records.append({
                 "Title": post['title'],
                 "Post Content": post['full_content'],
                 "Status": "Draft",
                 "Writing Framework": framework_airtable,
                 "Image Prompt": f"Visual: {post['visual_type']}",
                 "Notes": f"Framework: {post['framework']}\nHook: {post['hook_type']}\nTopic: {post['post_topic']}"
-            }
-
-            payload = {"records": [{"fields": fields}]}
-
-            response = requests.post(url, headers=headers, json=payload, timeout=10)
-            if response.status_code == 200:
-                uploaded += 1
-            else:
-                print(f"Upload failed for post {i+1}: {response.status_code}")
+            })
 
         except Exception as e:
             print(f"Error generating post {i+1}: {e}")
 
-    return uploaded
+    if not records:
+        return 0
+
+    client = AirtableClient(AIRTABLE_BASE_ID, AIRTABLE_TABLE_ID, api_key=AIRTABLE_API_KEY, timeout=10)
+    result = client.batch_create(records)
+
+    for failure in result.failures:
+        print(f"Upload failed for post '{failure.item['Title'][:50]}': {failure.status_code} {failure.error[:200]}")
+
+    return result.succeeded_count
 
 
 def maintain_inventory_daily():
@@ -251,8 +257,160 @@ def maintain_inventory_daily():
     }
 
 
+def build_makecom_payload(record, base_id, table_id):
+    """Build the Make.com webhook payload for a post record (None if it has no content)."""
+    fields = record.get('fields', {})
+
+    content = fields.get('Post Content', '') or fields.get('Content', '')
+    if not content:
+        return None
+
+    image_field = fields.get('Image', [])
+    if isinstance(image_field, list) and len(image_field) > 0:
+        image_url = image_field[0].get('url', '')
+    else:
+        image_url = fields.get('Image URL', '')
+
+    payload = {
+        "record_id": record.get('id'),
+        "content": content,
+        "base_id": base_id,
+        "table_id": table_id,
+        "scheduled_deletion_date": (datetime.now(timezone.utc) + timedelta(days=7)).isoformat()
+    }
+
+    # Only include image_url if it's not empty (Make.com LinkedIn module may fail with empty string)
+    if image_url:
+        payload["image_url"] = image_url
+
+    return payload
+
+
+def send_to_makecom(record, base_id, table_id, make_webhook_url, logger):
+    """Send one post to the Make.com LinkedIn webhook. Returns True on success."""
+    record_id = record.get('id')
+    payload = build_makecom_payload(record, base_id, table_id)
+
+    if payload is None:
+        logger.warning(f"No content for post {record_id}")
+        return False
+
+    try:
+        webhook_response = requests.post(make_webhook_url, json=payload, timeout=120)
+
+        if webhook_response.status_code == 200:
+            logger.info(f"✓ Posted {record_id} to LinkedIn via Make.com")
+            return True
+
+        logger.error(f"Make.com webhook failed for {record_id}: {webhook_response.status_code}")
+    except Exception as e:
+        logger.error(f"Error calling Make.com webhook for {record_id}: {e}")
+
+    return False
+
+
+def retry_due_post(queue, record_id, attempts, minute_start, logger):
+    """Keep a post that couldn't be sent queued for a later tick, up to DUE_QUEUE_MAX_ATTEMPTS tries."""
+    if attempts + 1 >= DUE_QUEUE_MAX_ATTEMPTS:
+        logger.error(f"Giving up on {record_id} after {attempts + 1} failed attempts")
+        queue.remove(record_id)
+        return
+
+    retry_at = minute_start + DUE_QUEUE_RETRY_DELAY * (2 ** attempts)
+    queue.retry(record_id, retry_at.timestamp())
+    logger.warning(f"Will retry {record_id} at {retry_at.isoformat()} (attempt {attempts + 2})")
+
+
+def run_due_queue_tick(client, minute_start, minute_end, make_webhook_url, logger):
+    """
+    Post everything the due queue says fires before minute_end.
+
+    Most ticks only read the last few minute buckets from the modal.Dict;
+    Airtable is hit for the periodic delta/full refresh and to re-read each
+    due record. A post leaves the queue only once Make.com accepted it.
+    """
+    queue = DueQueue(
+        due_queue_store,
+        client,
+        refresh_interval=DUE_QUEUE_REFRESH_INTERVAL,
+        full_rebuild_interval=DUE_QUEUE_FULL_REBUILD_INTERVAL,
+        lookback=DUE_QUEUE_LATE_GRACE,
+    ).load()
+
+    refresh_mode = queue.refresh(minute_start)
+    if refresh_mode != "skipped":
+        logger.info(f"Due queue {refresh_mode} refresh: {len(queue)} posts queued")
+
+    posted_count = 0
+    late_cutoff = (minute_start - DUE_QUEUE_LATE_GRACE).timestamp()
+
+    for record_id, entry in queue.due(minute_end.timestamp()):
+        fire_ts = entry['fire_ts']
+        if not entry['attempts'] and fire_ts < late_cutoff:
+            logger.warning(f"Skipping {record_id}: missed its slot ({datetime.fromtimestamp(fire_ts, timezone.utc).isoformat()})")
+            queue.remove(record_id)
+            continue
+
+        # Re-read the record so a stale index entry can never post the wrong thing
+        record = client.get_record(record_id)
+        if not record:
+            retry_due_post(queue, record_id, entry['attempts'], minute_start, logger)
+            continue
+
+        fields = record.get('fields', {})
+        current_ts = parse_scheduled_time(fields.get('Scheduled Time'))
+
+        if fields.get('Status') != 'Scheduled' or current_ts is None:
+            logger.info(f"Skipping {record_id}: no longer scheduled")
+            queue.remove(record_id)
+            continue
+
+        if current_ts != fire_ts:
+            logger.info(f"Rescheduling {record_id} in due queue: time changed")
+            queue.upsert(record_id, current_ts)
+            if current_ts >= minute_end.timestamp():
+                continue
+
+        logger.info(f"🎯 Posting {record_id} (scheduled for {fields.get('Scheduled Time')})")
+        if send_to_makecom(record, client.base_id, client.table, make_webhook_url, logger):
+            queue.mark_fired(record_id, current_ts)
+            posted_count += 1
+        else:
+            retry_due_post(queue, record_id, (queue.get(record_id) or entry)['attempts'], minute_start, logger)
+
+    queue.save()
+    return posted_count
+
+
+def run_scan_tick(client, minute_start, minute_end, make_webhook_url, logger):
+    """Legacy mode: scan every Scheduled post (all pages) for this minute's matches."""
+    records = client.iter_records(
+        formula=formula_and(formula_eq('Status', 'Scheduled'), formula_not_blank('Scheduled Time'))
+    )
+
+    posted_count = 0
+    for record in records:
+        scheduled_time_str = record.get('fields', {}).get('Scheduled Time')
+        scheduled_ts = parse_scheduled_time(scheduled_time_str)
+
+        if scheduled_ts is None:
+            logger.warning(f"Could not parse time for {record.get('id')}: {scheduled_time_str}")
+            continue
+
+        # Check if scheduled time falls within current minute
+        if minute_start.timestamp() <= scheduled_ts < minute_end.timestamp():
+            logger.info(f"🎯 Posting {record.get('id')} (scheduled for {scheduled_time_str})")
+            if send_to_makecom(record, client.base_id, client.table, make_webhook_url, logger):
+                posted_count += 1
+
+    return posted_count
+
+
 @app.function(
-    secrets=[modal.Secret.from_name("linkedin-makecom-webhook")]
+    secrets=[
+        modal.Secret.from_name("linkedin-makecom-webhook"),
+        modal.Secret.from_name("airtable-credentials")
+    ]
 )
 def post_scheduler_exact_minute():
     """
@@ -261,11 +419,15 @@ def post_scheduler_exact_minute():
 
     Cost: 1,440 checks/day (once per minute) vs 17,280 with 5-second polling = 92% savings.
 
+    Modes (POST_SCHEDULER_MODE):
+    - "due_queue" (default): read the head of the persisted due queue; Airtable
+      is only called for the periodic index refresh and for posts that are due
+    - "scan": page through every "Scheduled" post each tick
+
     Flow:
-    1. Fetch all "Scheduled" posts with Scheduled Time populated
-    2. Check if Scheduled Time falls within current minute (±0-60 seconds)
-    3. For each match, call Make.com webhook with post content
-    4. Make.com posts to LinkedIn and updates Airtable status to "Posted"
+    1. Find posts whose Scheduled Time falls within the current minute
+    2. For each match, call Make.com webhook with post content
+    3. Make.com posts to LinkedIn and updates Airtable status to "Posted"
     """
     import logging
 
@@ -273,9 +435,9 @@ def post_scheduler_exact_minute():
     logger = logging.getLogger(__name__)
 
     try:
-        base_id = AIRTABLE_BASE_ID
-        table_id = AIRTABLE_TABLE_ID
-        api_key = AIRTABLE_API_KEY
+        base_id = os.environ.get('AIRTABLE_BASE_ID') or AIRTABLE_BASE_ID
+        table_id = os.environ.get('AIRTABLE_LINKEDIN_TABLE_ID') or AIRTABLE_TABLE_ID
+        api_key = os.environ.get('AIRTABLE_API_KEY') or AIRTABLE_API_KEY
         make_webhook_url = os.environ.get('MAKE_LINKEDIN_WEBHOOK_URL')
 
         if not all([base_id, table_id, api_key, make_webhook_url]):
@@ -289,76 +451,15 @@ def post_scheduler_exact_minute():
 
         logger.info(f"Post scheduler check: {minute_start.isoformat()} to {minute_end.isoformat()}")
 
-        # Fetch all records
-        headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-        url = f"https://api.airtable.com/v0/{base_id}/{table_id}"
-        response = requests.get(url, headers=headers, timeout=30)
-
-        if response.status_code != 200:
-            logger.error(f"Failed to fetch Airtable records: {response.status_code}")
-            return {"success": False, "posted": 0}
-
-        records = response.json().get('records', [])
-        posted_count = 0
+        client = AirtableClient(base_id, table_id, api_key=api_key)
+        mode = os.environ.get('POST_SCHEDULER_MODE', 'due_queue')
 
-        # Find posts scheduled for this minute
-        for record in records:
-            fields = record.get('fields', {})
-            status = fields.get('Status', '')
-            record_id = record.get('id')
-            scheduled_time_str = fields.get('Scheduled Time')
+        if mode == 'scan':
+            posted_count = run_scan_tick(client, minute_start, minute_end, make_webhook_url, logger)
+        else:
+            posted_count = run_due_queue_tick(client, minute_start, minute_end, make_webhook_url, logger)
 
-            if status == "Scheduled" and scheduled_time_str:
-                try:
-                    # Parse scheduled time
-                    scheduled_time = datetime.fromisoformat(scheduled_time_str.replace('Z', '+00:00'))
-
-                    # Check if scheduled time falls within current minute
-                    if minute_start <= scheduled_time < minute_end:
-                        logger.info(f"🎯 Posting {record_id} (scheduled for {scheduled_time_str})")
-
-                        # Extract post content for Make.com
-                        content = fields.get('Post Content', '') or fields.get('Content', '')
-                        image_field = fields.get('Image', [])
-                        image_url = ''
-
-                        if isinstance(image_field, list) and len(image_field) > 0:
-                            image_url = image_field[0].get('url', '')
-                        else:
-                            image_url = fields.get('Image URL', '')
-
-                        if not content:
-                            logger.warning(f"No content for post {record_id}")
-                            continue
-
-                        # Call Make.com webhook
-                        payload = {
-                            "record_id": record_id,
-                            "content": content,
-                            "base_id": base_id,
-                            "table_id": table_id,
-                            "scheduled_deletion_date": (datetime.now(timezone.utc) + timedelta(days=7)).isoformat()
-                        }
-
-                        # Only include image_url if it's not empty (Make.com LinkedIn module may fail with empty string)
-                        if image_url:
-                            payload["image_url"] = image_url
-
-                        try:
-                            webhook_response = requests.post(make_webhook_url, json=payload, timeout=120)
-
-                            if webhook_response.status_code == 200:
-                                posted_count += 1
-                                logger.info(f"✓ Posted {record_id} to LinkedIn via Make.com")
-                            else:
-                                logger.error(f"Make.com webhook failed for {record_id}: {webhook_response.status_code}")
-                        except Exception as e:
-                            logger.error(f"Error calling Make.com webhook for {record_id}: {e}")
-
-                except ValueError as e:
-                    logger.warning(f"Could not parse time for {record_id}: {scheduled_time_str}")
-
-        logger.info(f"Post scheduler check complete. Posted {posted_count} posts.")
+        logger.info(f"Post scheduler check complete ({mode}). Posted {posted_count} posts.")
         return {"success": True, "posted": posted_count}
 
     except Exception as e:
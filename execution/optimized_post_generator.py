@@ -705,7 +705,7 @@ class OptimizedPostGenerator:
         selected = selected_broad + selected_niche
         return ' '.join(selected)
 
-    def generate_complete_post(self, topic: str, educational_mode: bool = False, automation_showcase_mode: bool = False, automation_name: str = None) -> Dict:
+    def generate_complete_post(self, topic: str, educational_mode: bool = False, automation_showcase_mode: bool = False, automation_name: str = None, framework: str = None) -> Dict:
         """Generate a complete optimized post.
 
         Args:
@@ -713,6 +713,7 @@ class OptimizedPostGenerator:
             educational_mode: If True, generate instructional content with examples/steps
             automation_showcase_mode: If True, generate automation showcase content
             automation_name: Name of the automation (used in automation_showcase_mode)
+            framework: Writing framework to use (random selection if None)
         """
         # Determine post type (40% expertise, 40% engagement, 20% promotional)
         rand = random.random()
@@ -724,7 +725,7 @@ class OptimizedPostGenerator:
             post_type = 'promotional_posts'
 
         # Select components
-        framework = self.select_framework()
+        framework = framework or self.select_framework()
         hook_type = self.select_hook_type()
         hook = self.generate_hook(hook_type, topic)
         body = self.generate_body(framework, topic, educational_mode=educational_mode, automation_showcase_mode=automation_showcase_mode, automation_name=automation_name)
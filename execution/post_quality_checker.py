@@ -12,11 +12,13 @@ import os
 import sys
 import difflib
 import re
-import requests
+import time
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
 sys.path.insert(0, str(Path(__file__).parent))
+from utils.airtable_client import AirtableClient, AirtableError
+from utils.near_duplicate_index import DEFAULT_INDEX_PATH, NearDuplicateIndex, record_key
 
 
 class PostQualityChecker:
@@ -36,10 +38,9 @@ class PostQualityChecker:
         self.airtable_api_key = os.environ.get('AIRTABLE_API_KEY')
         self.airtable_base_id = os.environ.get('AIRTABLE_BASE_ID')
         self.airtable_table_id = os.environ.get('AIRTABLE_LINKEDIN_TABLE_ID')
-        self.headers = {
-            "Authorization": f"Bearer {self.airtable_api_key}",
-            "Content-Type": "application/json"
-        }
+        self.airtable = AirtableClient(
+            self.airtable_base_id, self.airtable_table_id, api_key=self.airtable_api_key, timeout=10
+        )
 
         # Thresholds
         self.SIMILARITY_THRESHOLD = 0.85  # 85%+ similarity = likely duplicate
@@ -49,18 +50,53 @@ class PostQualityChecker:
         # Topic relevance thresholds
         self.MIN_TOPIC_KEYWORD_COVERAGE = 0.3  # At least 30% of topic keywords should appear
 
-    def fetch_existing_posts(self) -> List[Dict]:
-        """Get all existing posts from Airtable."""
-        try:
-            url = f"https://api.airtable.com/v0/{self.airtable_base_id}/{self.airtable_table_id}"
-            response = requests.get(url, headers=self.headers, timeout=10)
+        # MinHash/LSH index over existing posts (difflib only verifies top candidates)
+        self.dup_index = NearDuplicateIndex(os.environ.get('NEAR_DUP_INDEX_PATH', DEFAULT_INDEX_PATH)).load()
+        # Full Airtable re-listing at most this often; uploads are indexed as they happen
+        self.DUP_INDEX_REFRESH_SECONDS = int(os.environ.get('NEAR_DUP_REFRESH_SECONDS', 3600))
 
-            if response.status_code == 200:
-                return response.json().get('records', [])
-            return []
-        except Exception as e:
+    def fetch_existing_posts(self) -> Optional[List[Dict]]:
+        """Get all existing posts from Airtable (only the fields comparisons use); None if the fetch failed."""
+        try:
+            return list(self.airtable.iter_records(fields=['Title', 'Post Content']))
+        except AirtableError as e:
             print(f"⚠️  Warning: Couldn't fetch existing posts for comparison: {str(e)}")
-            return []
+            return None
+
+    def refresh_duplicate_index(self, force: bool = False) -> None:
+        """Re-list Airtable into the index when the last full sync is stale; a failed fetch keeps the index as is."""
+        if not force and time.time() - self.dup_index.synced_at < self.DUP_INDEX_REFRESH_SECONDS:
+            return
+
+        existing_posts = self.fetch_existing_posts()
+        if existing_posts is None:
+            return
+
+        if self.dup_index.sync(existing_posts, complete=True):
+            self._save_duplicate_index()
+
+    def sync_duplicate_index(self, existing_posts: List[Dict]) -> None:
+        """Add or refresh posts in the near-duplicate index (re-hashes only new/edited posts)."""
+        if self.dup_index.sync(existing_posts):
+            self._save_duplicate_index()
+
+    def index_uploaded_posts(self, records: List[Dict]) -> None:
+        """Add freshly uploaded Airtable records to the near-duplicate index."""
+        changed = False
+        for record in records:
+            fields = record.get('fields', {})
+            if record.get('id') and fields.get('Post Content'):
+                changed |= self.dup_index.add(record['id'], fields.get('Title', 'Unknown'), fields['Post Content'])
+                # Drop the entry the post had while it was pending in its batch
+                changed |= self.dup_index.remove(record_key({'fields': fields}))
+        if changed:
+            self._save_duplicate_index()
+
+    def _save_duplicate_index(self) -> None:
+        try:
+            self.dup_index.save()
+        except OSError as e:
+            print(f"⚠️  Warning: Couldn't save near-duplicate index: {str(e)}")
 
     def calculate_similarity(self, text1: str, text2: str) -> float:
         """Calculate similarity between two texts (0.0 to 1.0)."""
@@ -459,38 +495,29 @@ class PostQualityChecker:
 
         return True, "No AI generation markers detected"
 
-    def check_hook_repetition(self, hook_text: str, existing_posts: List[Dict]) -> Tuple[bool, str]:
+    def check_hook_repetition(self, hook_text: str, existing_posts: Optional[List[Dict]] = None) -> Tuple[bool, str]:
         """Check if hook is too similar to hooks in existing posts.
 
-        Prevents repeated hooks from different posts.
+        Prevents repeated hooks from different posts. Uses the index's
+        inverted word index, so only posts sharing a hook word are visited.
+        existing_posts, if given, are added to the index first.
         """
-        if not existing_posts:
+        if existing_posts:
+            self.sync_duplicate_index(existing_posts)
+
+        if not len(self.dup_index):
             return True, "No existing posts to compare"
 
         hook_words = set(hook_text.lower().split())
         if len(hook_words) < 5:
             return True, "Hook too short to compare"
 
-        for existing in existing_posts:
-            existing_content = existing.get('fields', {}).get('Post Content', '')
-            if not existing_content:
-                continue
-
-            # Extract first paragraph as potential hook
-            existing_lines = existing_content.split('\n')
-            existing_hook = existing_lines[0].strip() if existing_lines else ""
-
-            if not existing_hook:
-                continue
-
-            existing_words = set(existing_hook.lower().split())
-
-            # Check word overlap
-            common_words = hook_words & existing_words
-            overlap_ratio = len(common_words) / max(len(hook_words), len(existing_words)) if max(len(hook_words), len(existing_words)) > 0 else 0
+        for _, common_count, overlap_ratio in self.dup_index.hook_overlaps(hook_text):
+            if overlap_ratio <= 0.5:
+                break
 
             # If >50% of words overlap in hook, it's probably the same hook template
-            if overlap_ratio > 0.5 and len(common_words) > 3:
+            if common_count > 3:
                 return False, f"Hook too similar to existing post (>50% word overlap detected). This suggests hook repetition across posts"
 
         return True, "Hook is unique"
@@ -592,34 +619,33 @@ class PostQualityChecker:
 
         return True, f"Authenticity signals present: {total_signals} detected (numbers:{signals['specific_numbers']}, personal:{signals['personal_language']}, examples:{signals['concrete_examples']}, vulnerability:{signals['vulnerability']})"
 
-    def check_for_duplicates(self, post_content: str, existing_posts: List[Dict]) -> Tuple[bool, str, float]:
-        """Check if post is too similar to existing posts."""
-        if not existing_posts:
-            return True, "No existing posts to compare against", 0.0
+    def check_for_duplicates(self, post_content: str, existing_posts: Optional[List[Dict]] = None) -> Tuple[bool, str, float]:
+        """Check if post is too similar to existing posts.
 
-        max_similarity = 0.0
-        most_similar_title = ""
-
-        for existing in existing_posts:
-            existing_content = existing.get('fields', {}).get('Post Content', '')
-            if not existing_content:
-                continue
+        LSH narrows the archive to a few candidates; difflib verifies those.
+        existing_posts, if given, are added to the index first.
+        """
+        if existing_posts:
+            self.sync_duplicate_index(existing_posts)
 
-            similarity = self.calculate_similarity(post_content, existing_content)
+        if not len(self.dup_index):
+            return True, "No existing posts to compare against", 0.0
 
-            if similarity > max_similarity:
-                max_similarity = similarity
-                most_similar_title = existing.get('fields', {}).get('Title', 'Unknown')
+        max_similarity, most_similar_title = self.dup_index.max_similarity(post_content, verify=self.calculate_similarity)
 
-            # If too similar to any post, flag it
-            if similarity > self.MAX_SIMILARITY_TO_EXISTING:
-                return False, f"Too similar to: '{most_similar_title}' ({similarity:.1%} match)", similarity
+        # If too similar to any post, flag it
+        if max_similarity > self.MAX_SIMILARITY_TO_EXISTING:
+            return False, f"Too similar to: '{most_similar_title}' ({max_similarity:.1%} match)", max_similarity
 
         return True, f"Unique content (max similarity: {max_similarity:.1%})", max_similarity
 
-    def validate_post(self, post: Dict, check_duplicates: bool = True) -> Dict:
+    def validate_post(self, post: Dict, check_duplicates: bool = True, pending_posts: Optional[List[Dict]] = None) -> Dict:
         """
         Comprehensive quality check on a post.
+
+        pending_posts: records (same shape as Airtable records) accepted earlier
+        in the same batch but not uploaded yet; they count as existing posts.
+
         Returns: {
             'passes_qc': bool,
             'issues': List[str],
@@ -717,17 +743,20 @@ class PostQualityChecker:
 
         # Check 12: Hook repetition (NEW - prevent same hooks across posts)
         if check_duplicates:
-            existing_posts = self.fetch_existing_posts()
+            # Query the persisted index; Airtable is only re-listed when it's stale
+            self.refresh_duplicate_index()
+            if pending_posts:
+                self.dup_index.sync(pending_posts)
 
             # Check for hook repetition
             hook_text = content.split('\n')[0] if content else ""
-            hook_rep_ok, hook_rep_msg = self.check_hook_repetition(hook_text, existing_posts)
+            hook_rep_ok, hook_rep_msg = self.check_hook_repetition(hook_text)
             details['hook_repetition'] = {'passed': hook_rep_ok, 'message': hook_rep_msg}
             if not hook_rep_ok:
                 issues.append(f"Hook Repetition: {hook_rep_msg}")
 
             # Check for duplicates
-            dup_ok, dup_msg, similarity = self.check_for_duplicates(content, existing_posts)
+            dup_ok, dup_msg, similarity = self.check_for_duplicates(content)
             details['duplicate_check'] = {'passed': dup_ok, 'message': dup_msg, 'max_similarity': similarity}
             if not dup_ok:
                 issues.append(f"Duplicate Detection: {dup_msg}")
@@ -2,42 +2,33 @@
 Smart Queue-Based Scheduler
 Detects posts with "Approved - Ready to Schedule" status, queues them,
 and assigns to available time slots (8-10am, 12-2pm, 5-7pm).
+
+The whole queue is placed from one fetch (queue + occupied slots, via
+utils/slot_calendar.py) and written back with one batched update.
 """
 
 import os
-import requests
-from datetime import datetime, timedelta
-import random
+import sys
+from datetime import datetime
 import json
 from pathlib import Path
 
-class TimeSlot:
-    """Represents a time slot."""
-    def __init__(self, date: datetime, slot_number: int):
-        self.date = date
-        self.slot = slot_number  # 1, 2, or 3
-
-    @property
-    def start_hour(self) -> int:
-        """Start hour for this slot."""
-        return {1: 8, 2: 12, 3: 17}[self.slot]
-
-    @property
-    def end_hour(self) -> int:
-        """End hour for this slot."""
-        return {1: 10, 2: 14, 3: 19}[self.slot]
+sys.path.insert(0, str(Path(__file__).parent))
+from utils.airtable_client import AirtableClient, formula_eq, formula_not_blank, formula_or
+from utils.slot_calendar import SlotCalendar, Window
 
-    @property
-    def slot_name(self) -> str:
-        """Human-readable slot name."""
-        return {1: "8-10 AM", 2: "12-2 PM", 3: "5-7 PM"}[self.slot]
+APPROVED_STATUS = 'Approved - Ready to Schedule'
 
-    def get_scheduled_time(self) -> str:
-        """Get random time within this slot in ISO format."""
-        minute = random.randint(0, 59)
-        scheduled = self.date.replace(hour=self.start_hour, minute=minute, second=0)
-        return scheduled.isoformat()
+# Statuses that hold a slot
+OCCUPYING_STATUSES = ['Pending Review', 'Posted']
 
+# Slots 1-3: a post anywhere in the two hours occupies the slot; new posts
+# get a random minute in the first hour
+SLOTS = [
+    Window(start=8 * 60, end=10 * 60, earliest=8 * 60, latest=8 * 60 + 59, label="8-10 AM"),
+    Window(start=12 * 60, end=14 * 60, earliest=12 * 60, latest=12 * 60 + 59, label="12-2 PM"),
+    Window(start=17 * 60, end=19 * 60, earliest=17 * 60, latest=17 * 60 + 59, label="5-7 PM"),
+]
 
 class SmartScheduler:
     """Intelligent scheduler for LinkedIn posts."""
@@ -56,108 +47,43 @@ class SmartScheduler:
         self.airtable_api_key = os.environ.get('AIRTABLE_API_KEY')
         self.airtable_base_id = os.environ.get('AIRTABLE_BASE_ID')
         self.airtable_table_id = os.environ.get('AIRTABLE_LINKEDIN_TABLE_ID')
-        self.headers = {
-            "Authorization": f"Bearer {self.airtable_api_key}",
-            "Content-Type": "application/json"
-        }
-
-    def fetch_all_posts(self) -> list:
-        """Fetch all posts from Airtable."""
-        url = f"https://api.airtable.com/v0/{self.airtable_base_id}/{self.airtable_table_id}"
-        response = requests.get(url, headers=self.headers)
-
-        if response.status_code != 200:
-            return []
-
-        return response.json().get('records', [])
-
-    def get_posts_to_schedule(self) -> list:
-        """Get posts with 'Approved - Ready to Schedule' status, sorted by created date."""
-        posts = self.fetch_all_posts()
-
-        approved = [p for p in posts if p.get('fields', {}).get('Status') == 'Approved - Ready to Schedule']
-
+        self.airtable = AirtableClient(
+            self.airtable_base_id, self.airtable_table_id, api_key=self.airtable_api_key
+        )
+
+    def fetch_all_posts(self, formula: str = None) -> list:
+        """Fetch posts from Airtable (all pages, scheduling fields only)."""
+        return self.airtable.list_records(
+            formula=formula,
+            fields=['Title', 'Status', 'Scheduled Time'],
+        )
+
+    def fetch_queue_and_calendar(self) -> tuple:
+        """
+        One fetch for both the approval queue and slot occupancy.
+
+        Returns:
+            (posts to schedule sorted by created date, SlotCalendar of occupied slots)
+        """
+        posts = self.fetch_all_posts(formula_or(
+            formula_eq('Status', APPROVED_STATUS),
+            formula_not_blank('Scheduled Time'),
+        ))
+
+        approved = [p for p in posts if p.get('fields', {}).get('Status') == APPROVED_STATUS]
         # Sort by created date (oldest first)
         approved.sort(key=lambda x: x.get('createdTime', ''))
 
-        return approved
-
-    def get_occupied_slots(self) -> dict:
-        """Get occupied time slots. Returns: {date_str: {slot_num: True/False}}"""
-        posts = self.fetch_all_posts()
-        occupied = {}
-
-        for post in posts:
-            fields = post.get('fields', {})
-            status = fields.get('Status', '')
-            scheduled_time = fields.get('Scheduled Time')
-
-            # Only count scheduled posts (Pending Review, Posted)
-            if scheduled_time and status in ['Pending Review', 'Posted']:
-                try:
-                    dt = datetime.fromisoformat(scheduled_time)
-                    date_key = dt.date().isoformat()
-
-                    if date_key not in occupied:
-                        occupied[date_key] = {1: False, 2: False, 3: False}
-
-                    # Determine which slot this post occupies
-                    hour = dt.hour
-                    if 8 <= hour < 10:
-                        slot = 1
-                    elif 12 <= hour < 14:
-                        slot = 2
-                    elif 17 <= hour < 19:
-                        slot = 3
-                    else:
-                        continue
-
-                    occupied[date_key][slot] = True
+        calendar = SlotCalendar.from_records(posts, SLOTS, statuses=OCCUPYING_STATUSES)
+        return approved, calendar
 
-                except ValueError:
-                    continue
-
-        return occupied
-
-    def find_available_slot(self, start_date: datetime = None) -> TimeSlot:
-        """Find next available time slot starting from start_date."""
-        if start_date is None:
-            start_date = datetime.now()
-
-        occupied = self.get_occupied_slots()
-
-        # Search forward up to 60 days
-        for days_offset in range(60):
-            check_date = start_date + timedelta(days=days_offset)
-            date_key = check_date.date().isoformat()
-
-            occupied_today = occupied.get(date_key, {1: False, 2: False, 3: False})
-
-            # Try slots in order
-            for slot_num in [1, 2, 3]:
-                if not occupied_today[slot_num]:
-                    return TimeSlot(check_date, slot_num)
-
-        # Fallback (should never reach here)
-        return TimeSlot(start_date, 1)
-
-    def update_post_scheduled_time(self, record_id: str, scheduled_time: str) -> bool:
-        """Update a post's scheduled time in Airtable."""
-        url = f"https://api.airtable.com/v0/{self.airtable_base_id}/{self.airtable_table_id}/{record_id}"
-
-        payload = {
-            "fields": {
-                "Scheduled Time": scheduled_time,
-                "Status": "Pending Review"  # Change status to Pending Review when scheduled
-            }
-        }
-
-        response = requests.patch(url, headers=self.headers, json=payload)
-        return response.status_code == 200
+    def get_posts_to_schedule(self) -> list:
+        """Get posts with 'Approved - Ready to Schedule' status, sorted by created date."""
+        return self.fetch_queue_and_calendar()[0]
 
     def process_queue(self):
-        """Process queue of posts awaiting scheduling."""
-        posts_to_schedule = self.get_posts_to_schedule()
+        """Process queue of posts awaiting scheduling (one read, one batched write)."""
+        posts_to_schedule, calendar = self.fetch_queue_and_calendar()
 
         if not posts_to_schedule:
             print("✅ No posts in scheduling queue")
@@ -167,27 +93,30 @@ class SmartScheduler:
         print(f"📅 PROCESSING SCHEDULING QUEUE ({len(posts_to_schedule)} posts)")
         print("="*80 + "\n")
 
-        start_date = datetime.now()
-
-        for i, post in enumerate(posts_to_schedule, 1):
-            record_id = post['id']
-            fields = post.get('fields', {})
-            title = fields.get('Title', 'Unknown')
-
-            # Find next available slot
-            slot = self.find_available_slot(start_date)
-            scheduled_time = slot.get_scheduled_time()
-
-            # Update post
-            if self.update_post_scheduled_time(record_id, scheduled_time):
-                scheduled_dt = datetime.fromisoformat(scheduled_time)
-                print(f"  {i}/{len(posts_to_schedule)} ✅ Scheduled: {title[:50]}...")
-                print(f"     📍 {scheduled_dt.strftime('%a, %b %d')} @ {slot.slot_name}\n")
+        assignments = calendar.assign_all(posts_to_schedule, after=datetime.now())
+
+        # Status changes to Pending Review when scheduled
+        result = self.airtable.batch_update([
+            {"id": post['id'], "fields": {"Scheduled Time": when.isoformat(), "Status": "Pending Review"}}
+            for post, when in assignments
+        ])
+
+        total = len(posts_to_schedule)
+        for i, ((post, when), updated) in enumerate(zip(assignments, result.records), 1):
+            title = post.get('fields', {}).get('Title', 'Unknown')
+            if updated is not None:
+                slot_name = SLOTS[calendar.window_of(when)].label
+                print(f"  {i}/{total} ✅ Scheduled: {title[:50]}...")
+                print(f"     📍 {when.strftime('%a, %b %d')} @ {slot_name}\n")
             else:
-                print(f"  {i}/{len(posts_to_schedule)} ❌ Failed: {title[:50]}...\n")
+                print(f"  {i}/{total} ❌ Failed: {title[:50]}...\n")
+
+        for post in posts_to_schedule[len(assignments):]:
+            title = post.get('fields', {}).get('Title', 'Unknown')
+            print(f"  ❌ No free slot in the next 60 days: {title[:50]}...\n")
 
         print("="*80)
-        print(f"✅ SCHEDULING COMPLETE - {len(posts_to_schedule)} posts queued")
+        print(f"✅ SCHEDULING COMPLETE - {result.succeeded_count}/{total} posts queued")
         print("="*80 + "\n")
 
 def main():
@@ -28,6 +28,31 @@ from generate_upwork_proposal import (
     ClipboardManager,
 )
 
+
+@st.cache_resource
+def get_generator(api_key: str) -> ProposalGenerator:
+    """One generator (and Anthropic connection pool) per API key, kept across reruns"""
+    return ProposalGenerator()
+
+
+def run_generation(generator: ProposalGenerator, job_data: dict, stream: bool) -> tuple:
+    """
+    Generate a proposal, rendering tokens as they arrive when streaming.
+
+    Returns (proposal, score) like ProposalGenerator.generate_proposal; the
+    score is computed once the full text is in.
+    """
+    if not stream:
+        return generator.generate_proposal(job_data)
+
+    live = st.empty()
+    with live.container():
+        raw_text = st.write_stream(generator.stream_proposal(job_data))
+    # The cleaned proposal is shown below; drop the raw streamed copy
+    live.empty()
+    return generator.finish_proposal(raw_text, job_data)
+
+
 # Page config
 st.set_page_config(
     page_title="Upwork Proposal Generator",
@@ -78,6 +103,9 @@ with st.sidebar:
     - ✓ Authentic
     """)
 
+    st.markdown("---")
+    stream_output = st.toggle("⚡ Show proposal as it's written", value=True)
+
 # Main interface
 st.markdown("### Paste Job Description")
 st.markdown("*Copy the full job description from Upwork and paste it below*")
@@ -127,10 +155,8 @@ if generate_btn:
 
                 st.info(f"✓ API key found ({len(api_key)} chars)")
 
-                # Initialize generator
-                st.write("Initializing proposal generator...")
-                generator = ProposalGenerator()
-                st.write("✓ Generator initialized")
+                # Reused across reruns (template + connection pool stay warm)
+                generator = get_generator(api_key)
 
                 # Prepare job data
                 job_data = {
@@ -142,9 +168,8 @@ if generate_btn:
                     'level': 'Not specified',
                 }
 
-                st.write("Calling Claude API...")
                 # Generate proposal (returns tuple of proposal text and score dict)
-                result = generator.generate_proposal(job_data)
+                result = run_generation(generator, job_data, stream_output)
 
                 if isinstance(result, tuple):
                     proposal, score = result
@@ -306,14 +331,14 @@ if st.session_state.proposal:
                             st.error("❌ API key not found. Please add ANTHROPIC_API_KEY to Streamlit Secrets.")
                             st.stop()
 
-                        generator = ProposalGenerator()
+                        generator = get_generator(api_key)
 
                         # Get job data and add regeneration instructions if provided
                         job_data = st.session_state.job_data.copy()
                         if regen_prompt.strip():
                             job_data['regen_instructions'] = regen_prompt.strip()
 
-                        result = generator.generate_proposal(job_data)
+                        result = run_generation(generator, job_data, stream_output)
 
                         if isinstance(result, tuple):
                             proposal, score = result
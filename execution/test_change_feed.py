@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Check the Airtable webhook change feed against the local stand-in server.
+
+Validates:
+1. Status flips into trigger statuses become events (new records included),
+   other edits and statuses don't
+2. Each drain costs one payloads request, however large the table is
+3. A failed dispatch is retried without re-dispatching events already delivered
+4. State persisted between runs resumes at the cursor (no replays)
+5. A deleted webhook is recreated
+
+Usage:
+    python execution/test_change_feed.py
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from local_airtable_webhooks import LocalAirtable
+from utils.airtable_client import AirtableClient, RetryPolicy, TokenBucket
+from utils.change_feed import MAX_DISPATCH_ATTEMPTS, ChangeFeed
+
+logging.basicConfig(level=logging.ERROR)
+
+
+def make_feed(server: LocalAirtable, store: dict) -> ChangeFeed:
+    client = AirtableClient(
+        server.base_id, server.table_id, api_key="test", api_url=server.api_url,
+        retry_policy=RetryPolicy(max_retries=0), rate_limiter=TokenBucket(rate=1000),
+    )
+    return ChangeFeed(client, store).load()
+
+
+def check_events(server: LocalAirtable) -> bool:
+    print("✅ Test 1: Status transitions become events")
+    store = {}
+    feed = make_feed(server, store)
+    assert feed.ensure_webhook()
+
+    for i in range(300):
+        server.create_record({"Title": f"Post {i}", "Status": "Draft"})
+    record_ids = list(server.records)
+
+    server.set_status(record_ids[0], "Pending Review")
+    server.update_record(record_ids[1], {"Title": "Renamed"})       # not watched
+    server.set_status(record_ids[2], "Scheduled")                  # no handler
+    server.set_status(record_ids[3], "Approved - Ready to Schedule")
+    new_id = server.create_record({"Title": "Born rejected", "Status": "Rejected"})
+
+    delivered = []
+    before = server.request_count
+    summary = make_feed(server, store).drain(lambda event: delivered.append(event) or True)
+    requests_used = server.request_count - before
+
+    got = [(e.record_id, e.old_status, e.new_status, e.title) for e in delivered]
+    expected = [
+        (record_ids[0], "Draft", "Pending Review", "Post 0"),
+        (record_ids[3], "Draft", "Approved - Ready to Schedule", "Post 3"),
+        (new_id, None, "Rejected", "Born rejected"),
+    ]
+    ok = got == expected
+    print(f"   {'✓' if ok else '✗'} {len(delivered)} events from {summary['payloads']} payloads: {got if not ok else 'as expected'}")
+
+    # 300 creates + 5 edits fit in 7 pages of 50; a quiet drain is a single request
+    before = server.request_count
+    make_feed(server, store).drain(lambda event: True)
+    quiet = server.request_count - before
+    ok = ok and quiet == 1
+    print(f"   {'✓' if quiet == 1 else '✗'} Initial drain: {requests_used} requests; quiet drain: {quiet} request")
+    return ok
+
+
+def check_retry_and_resume(server: LocalAirtable) -> bool:
+    print("\n✅ Test 2: Failed dispatches retry without duplicates")
+    store = {}
+    feed = make_feed(server, store)
+    feed.ensure_webhook()
+
+    first = server.create_record({"Title": "A", "Status": "Draft"})
+    second = server.create_record({"Title": "B", "Status": "Draft"})
+    # One transaction, so both events share a payload
+    server.update_records([
+        {"id": first, "fields": {"Status": "Pending Review"}},
+        {"id": second, "fields": {"Status": "Pending Review"}},
+    ])
+
+    calls = []
+    failures = {"count": 1}
+
+    def flaky(event):
+        calls.append(event.record_id)
+        if event.record_id == second and failures["count"]:
+            failures["count"] -= 1
+            raise RuntimeError("Modal unavailable")
+        return {"success": True}
+
+    first_run = make_feed(server, store).drain(flaky)
+    second_run = make_feed(server, store).drain(flaky)   # fresh process, same store
+    third_run = make_feed(server, store).drain(flaky)
+
+    ok = calls == [first, second, second] and third_run['dispatched'] == 0
+    print(f"   {'✓' if ok else '✗'} Calls: {['first' if c == first else 'second' for c in calls]}; "
+          f"runs dispatched {first_run['dispatched']}/{second_run['dispatched']}/{third_run['dispatched']}")
+
+    print(f"\n✅ Test 3: Poison events are dropped after {MAX_DISPATCH_ATTEMPTS} attempts")
+    server.update_record(first, {"Status": "Rejected"})
+    attempts = []
+    for _ in range(MAX_DISPATCH_ATTEMPTS + 1):
+        make_feed(server, store).drain(lambda event: attempts.append(event) and False)
+    dropped = len(attempts) == MAX_DISPATCH_ATTEMPTS
+    print(f"   {'✓' if dropped else '✗'} Dispatched {len(attempts)} times, then skipped")
+    return ok and dropped
+
+
+def check_recreate(server: LocalAirtable) -> bool:
+    print("\n✅ Test 4: Deleted webhook is recreated")
+    store = {}
+    feed = make_feed(server, store)
+    feed.ensure_webhook()
+    old_id = feed.state['webhook_id']
+    del server.webhooks[old_id]
+
+    summary = feed.drain(lambda event: True)
+    recreated = feed.ensure_webhook() and feed.state['webhook_id'] not in (None, old_id)
+    ok = not summary['success'] and recreated
+    print(f"   {'✓' if ok else '✗'} Drain failed cleanly, new webhook {feed.state['webhook_id']}")
+    return ok
+
+
+def main():
+    server = LocalAirtable().start()
+    try:
+        results = [check_events(server), check_retry_and_resume(server), check_recreate(server)]
+    finally:
+        server.stop()
+
+    passed = all(results)
+    print("\n" + ("✅ ALL CHANGE FEED CHECKS PASSED" if passed else "❌ CHANGE FEED CHECKS FAILED"))
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Parity and benchmark script for JobFilter's vectorized (columnar) mode.
+
+Validates:
+1. filter_jobs_columnar makes the same accept/reject decisions, reasons and
+   scores as the scalar filter_job path on randomized jobs
+2. Odd values (None budgets, string ratings) fall back to the scalar path
+3. Benchmarks scalar vs columnar filtering on 100k jobs
+
+Usage:
+    python execution/test_filter_parity.py [--jobs 100000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from filter_jobs import HAS_NUMPY, JobFilter, load_filter_config, get_default_filter_config
+
+WORDS = (
+    "we need a zapier expert to build make.com scenarios and automate our workflow "
+    "integration with the crm react dashboard blockchain nft crypto full-time role "
+    "maker of n8n no-code flask api mobile app reactive data labeling integrate"
+).split()
+FILLER = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do".split()
+SKILLS = ["Zapier", "Make.com", "Python", "API Integration", "Excel", "automation", "React"]
+TYPES = ["fixed-price", "hourly", "", "contract"]
+CATEGORIES = ["", "Web Development", "Automation", "Data Entry"]
+
+
+def random_job(rng: random.Random, index: int) -> dict:
+    budget = rng.choice([0, 50, 250, 800, 5000, 150000, {"amount": rng.randint(0, 3000)}])
+    job = {
+        "id": f"job_{index}",
+        "title": " ".join(rng.choices(WORDS + FILLER, k=6)),
+        "description": " ".join(rng.choices(WORDS + FILLER * 8, k=rng.randint(20, 200))),
+        "skills": rng.sample(SKILLS, k=rng.randint(0, 3)),
+        "budget": budget,
+        "client": {"rating": round(rng.random() * 5, 2), "reviews": rng.randint(0, 150)},
+        "category": rng.choice(CATEGORIES),
+        rng.choice(["type", "job_type"]): rng.choice(TYPES),
+    }
+    proposals_field = rng.choice(["proposals_required", "proposals_count", None])
+    if proposals_field:
+        job[proposals_field] = rng.randint(0, 80)
+    return job
+
+
+def check_parity(filter_engine: JobFilter, jobs: list) -> bool:
+    scalar = [filter_engine.filter_job(job) for job in jobs]
+    columnar = filter_engine.filter_jobs_columnar(jobs)
+
+    mismatches = 0
+    for i, (passes, reason, score) in enumerate(scalar):
+        if (passes != bool(columnar.passed[i]) or reason != columnar.reasons[i]
+                or abs(score - float(columnar.scores[i])) > 1e-9):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"   ✗ Job {i}: scalar={passes, reason, score} columnar="
+                      f"{bool(columnar.passed[i]), columnar.reasons[i], float(columnar.scores[i])}")
+
+    accepted = sum(1 for passes, _, _ in scalar if passes)
+    print(f"   {len(jobs)} jobs, {accepted} accepted, {mismatches} mismatches")
+    return mismatches == 0
+
+
+def check_random_jobs(config: dict, count: int = 20000) -> bool:
+    print("✅ Test 1: Scalar vs columnar parity")
+    rng = random.Random(42)
+    jobs = [random_job(rng, i) for i in range(count)]
+
+    ok = check_parity(JobFilter(config), jobs)
+
+    # Exercise every check with stricter rules than the shipped config
+    strict = dict(config, budget={"min": 100, "max": 4000}, client_rating={"min": 3.5},
+                  client_reviews={"min": 10}, job_category=["Automation", "note: test"],
+                  proposals_required={"max": 40}, max_connects={"limit": 24})
+    ok = check_parity(JobFilter(strict), jobs) and ok
+
+    ok = check_parity(JobFilter(dict(config, keyword_word_boundaries=True)), jobs) and ok
+    ok = check_parity(JobFilter(get_default_filter_config()), jobs) and ok
+    return ok
+
+
+def check_fallback(config: dict) -> bool:
+    print("\n✅ Test 2: Non-numeric values fall back to the scalar path")
+    rng = random.Random(7)
+    jobs = [random_job(rng, i) for i in range(200)]
+    jobs[3]["budget"] = None
+    jobs[10]["client"] = {"rating": "4.9", "reviews": 20}
+
+    filter_engine = JobFilter(config)
+    try:
+        filter_engine.filter_jobs_columnar(jobs)
+        print("   ✗ Expected the scalar path's TypeError for a None budget")
+        return False
+    except TypeError:
+        pass
+
+    jobs[3]["budget"] = 500
+    try:
+        filter_engine.filter_jobs_columnar(jobs)
+        print("   ✗ Expected the scalar path's TypeError for a string rating")
+        return False
+    except TypeError:
+        print("   ✓ Odd values raise exactly like filter_job")
+        return True
+
+
+def benchmark(config: dict, count: int) -> None:
+    print(f"\n⏱  Benchmark: {count:,} jobs (best of 3)")
+    rng = random.Random(1)
+    jobs = [random_job(rng, i) for i in range(count)]
+    filter_engine = JobFilter(config)
+
+    def best_of(runs, fn):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    scalar_time = best_of(3, lambda: [filter_engine.filter_job(job) for job in jobs])
+    columnar_time = best_of(3, lambda: filter_engine.filter_jobs_columnar(jobs))
+    result = filter_engine.filter_jobs_columnar(jobs)
+
+    print(f"   Scalar:   {scalar_time:.3f}s")
+    print(f"   Columnar: {columnar_time:.3f}s ({scalar_time / columnar_time:.1f}x, {len(result.accepted):,} accepted)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JobFilter columnar parity + benchmark")
+    parser.add_argument("--jobs", type=int, default=100000, help="Jobs to benchmark (default: 100000)")
+    args = parser.parse_args()
+
+    if not HAS_NUMPY:
+        print("❌ numpy not installed. Install with: pip install numpy")
+        sys.exit(1)
+
+    config = load_filter_config()
+    results = [check_random_jobs(config), check_fallback(config)]
+    benchmark(config, args.jobs)
+
+    passed = all(results)
+    print("\n" + ("✅ ALL PARITY CHECKS PASSED" if passed else "❌ PARITY CHECKS FAILED"))
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Check the shared idempotency store (utils/idempotency.py) on both backends.
+
+Validates:
+1. Concurrent claims of one key have exactly one winner
+2. A finished key suppresses duplicates; a new version doesn't
+3. Failures are forgotten or cooled down; dead claims expire after the lease
+4. Eviction drops expired keys and caps the store at max_entries
+
+Usage:
+    python execution/test_idempotency.py
+"""
+
+import logging
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from utils.idempotency import IdempotencyStore, SqliteIdempotencyStore
+
+logging.basicConfig(level=logging.ERROR)
+
+
+def check(name: str, backend) -> bool:
+    print(f"✅ Backend: {name}")
+    keys = IdempotencyStore(backend, ttl=60, lease=0.2, max_entries=5, sweep_every=1000)
+    results = []
+
+    # 1. One winner out of 20 concurrent triggers
+    winners = []
+    threads = [threading.Thread(target=lambda: winners.append(keys.claim("rec1", "generate", "v1"))) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    claimed = [key for key in winners if key]
+    results.append(len(claimed) == 1)
+    print(f"   {'✓' if results[-1] else '✗'} {len(claimed)} of 20 concurrent claims won")
+
+    # 2. Done keys suppress duplicates, new versions run
+    keys.finish(claimed[0], True)
+    results.append(keys.claim("rec1", "generate", "v1") is None and keys.claim("rec1", "generate", "v2") is not None)
+    print(f"   {'✓' if results[-1] else '✗'} Duplicate skipped, edited content claimed")
+
+    # 3. Failures: released keys retry now, cooled-down keys wait; dead claims expire
+    keys.finish(keys.claim("rec2", "submit"), False)
+    keys.finish(keys.claim("rec3", "submit"), False, cooldown=0.2)
+    keys.claim("rec4", "submit")  # never finished
+    immediate = keys.claim("rec2", "submit") is not None and keys.claim("rec3", "submit") is None
+    time.sleep(0.25)
+    later = keys.claim("rec3", "submit") is not None and keys.claim("rec4", "submit") is not None
+    results.append(immediate and later)
+    print(f"   {'✓' if results[-1] else '✗'} Released key retried, cooldown and lease expiry honoured")
+
+    # 4. Eviction caps the store
+    for n in range(10):
+        keys.finish(keys.claim(f"bulk{n}", "generate"), True)
+    keys.evict()
+    results.append(len(backend) <= 5)
+    print(f"   {'✓' if results[-1] else '✗'} {len(backend)} keys left after eviction (cap 5)")
+
+    return all(results)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [
+            check("dict", {}),
+            check("sqlite", SqliteIdempotencyStore(str(Path(tmp) / "idempotency.sqlite"))),
+        ]
+
+    passed = all(results)
+    print("\n" + ("✅ ALL IDEMPOTENCY CHECKS PASSED" if passed else "❌ IDEMPOTENCY CHECKS FAILED"))
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Check the webhook job queue (utils/job_queue.py).
+
+Validates:
+1. A burst never runs more than `concurrency` jobs at once
+2. enqueue() raises QueueFull at max_pending and ignores duplicate keys;
+   get() returns what the handler returned
+3. Handlers that return False or raise are retried, then marked failed
+4. Jobs left running by a dead process are picked up again on start()
+
+Usage:
+    python execution/test_job_queue.py
+"""
+
+import logging
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from utils.job_queue import RUNNING, ActionConfig, JobQueue, QueueFull
+
+logging.basicConfig(level=logging.CRITICAL)
+
+
+def check_burst(tmp: Path) -> bool:
+    print("✅ Test 1: Burst of 20 jobs with concurrency 3")
+    lock = threading.Lock()
+    active, peak = [0], [0]
+
+    def handler(payload):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return {"n": payload["n"]}
+
+    queue = JobQueue(str(tmp / "burst.sqlite"), {"work": ActionConfig(handler, concurrency=3, max_pending=20)},
+                     poll_interval=0.05)
+    job_ids = [queue.enqueue("work", {"n": n}, key=f"job{n}") for n in range(20)]
+
+    duplicate = queue.enqueue("work", {"n": 0}, key="job0")
+    try:
+        queue.enqueue("work", {"n": 20})
+        full = False
+    except QueueFull as e:
+        full = e.retry_after > 0
+
+    queue.start()
+    idle = queue.wait_idle(10)
+    queue.stop()
+    done = queue.status()["work"]["done"]
+    result = queue.get(job_ids[7])["result"]
+
+    ok = idle and peak[0] == 3 and duplicate is None and full and done == 20 and result == {"n": 7}
+    print(f"   {'✓' if ok else '✗'} peak {peak[0]} running, {done} done, duplicate ignored, QueueFull at capacity, result kept")
+    return ok
+
+
+def check_retries(tmp: Path) -> bool:
+    print("✅ Test 2: Retries with backoff")
+    calls = {"flaky": 0, "broken": 0}
+
+    def handler(payload):
+        calls[payload["kind"]] += 1
+        if payload["kind"] == "flaky":
+            return calls["flaky"] > 1
+        raise RuntimeError("boom")
+
+    queue = JobQueue(str(tmp / "retry.sqlite"), {
+        "work": ActionConfig(handler, max_attempts=3, backoff=0.05),
+    }, poll_interval=0.05)
+    queue.enqueue("work", {"kind": "flaky"})
+    queue.enqueue("work", {"kind": "broken"})
+    queue.start()
+    queue.wait_idle(10)
+    queue.stop()
+
+    status = queue.status()["work"]
+    failures = status["recent_failures"]
+    ok = (calls == {"flaky": 2, "broken": 3} and status["done"] == 1 and status["failed"] == 1
+          and "boom" in failures[0]["error"])
+    print(f"   {'✓' if ok else '✗'} flaky ran {calls['flaky']}x, broken ran {calls['broken']}x, "
+          f"{status['done']} done / {status['failed']} failed")
+    return ok
+
+
+def check_restart(tmp: Path) -> bool:
+    print("✅ Test 3: Restart recovery")
+    path = str(tmp / "restart.sqlite")
+    ran = []
+
+    first = JobQueue(path, {"work": ActionConfig(ran.append)})
+    first.enqueue("work", {"n": 1})
+    first.enqueue("work", {"n": 2})
+    # Simulate a crash mid-job: claimed but never finished
+    first._claim("work")
+    orphaned = first.status()["work"]["running"]
+
+    second = JobQueue(path, {"work": ActionConfig(ran.append)}, poll_interval=0.05).start()
+    idle = second.wait_idle(10)
+    second.stop()
+
+    ok = orphaned == 1 and idle and sorted(p["n"] for p in ran) == [1, 2]
+    print(f"   {'✓' if ok else '✗'} {orphaned} orphaned {RUNNING} job requeued, ran {len(ran)} job(s) after restart")
+    return ok
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        results = [check_burst(tmp), check_retries(tmp), check_restart(tmp)]
+
+    passed = all(results)
+    print("\n" + ("✅ ALL JOB QUEUE CHECKS PASSED" if passed else "❌ JOB QUEUE CHECKS FAILED"))
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Smoke-check gateway jobs (execution/webhook_gateway.py) against local stand-ins.
+
+Validates:
+1. A revise_posts job runs to "done" whatever the working directory (content
+   revision modules open their log files at import)
+2. The revised post content is written back to Airtable and the job result
+   reports it
+
+Usage:
+    python execution/test_webhook_gateway.py
+"""
+
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "execution"))
+sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+
+from fakes import FakeAnthropic
+from local_airtable_webhooks import LocalAirtable
+
+logging.basicConfig(level=logging.CRITICAL)
+
+LINKEDIN_TABLE_ID = "tbljg75KMQWDo2Hgu"
+REVISED_POST = "Revised post: shorter, sharper, same story. #automation #founders"
+
+
+def check_revision_job(tmp: Path) -> bool:
+    print("✅ Test 1: revise_posts job outside linkedin_automation/execution")
+    airtable = LocalAirtable(base_id="appGateway", table_name=LINKEDIN_TABLE_ID).start()
+    claude = FakeAnthropic(latency=0.0, responder=lambda body: REVISED_POST).start()
+    try:
+        os.environ.update({
+            "AIRTABLE_API_URL": airtable.api_url,
+            "AIRTABLE_API_KEY": "test",
+            "AIRTABLE_BASE_ID": airtable.base_id,
+            "ANTHROPIC_BASE_URL": claude.url,
+            "ANTHROPIC_API_KEY": "test",
+            "GATEWAY_JOB_QUEUE_PATH": str(tmp / "gateway_jobs.sqlite"),
+            "UPWORK_JOB_QUEUE_PATH": str(tmp / "upwork_jobs.sqlite"),
+            "UPWORK_IDEMPOTENCY_PATH": str(tmp / "upwork_idempotency.sqlite"),
+        })
+        record_id = airtable.create_record({
+            "Title": "Invoice automation",
+            "Status": "Pending Review",
+            "Post Content": "Original post about automating invoices for a client.",
+            "Revision Prompt": "rewrite it shorter",
+        })
+
+        # Like `python execution/webhook_gateway.py` from the repo root, the working
+        # directory isn't linkedin_automation/execution (tmp keeps logs/ out of the repo)
+        os.chdir(tmp)
+        import webhook_gateway as gateway
+
+        gateway.job_queue.poll_interval = 0.05
+        job_id = gateway.job_queue.enqueue("revise_posts", {"record_ids": [record_id]})
+        gateway.job_queue.start()
+        idle = gateway.job_queue.wait_idle(30)
+        gateway.job_queue.stop()
+
+        job = gateway.job_queue.get(job_id)
+        content = airtable.records[record_id]["fields"].get("Post Content")
+        ok = idle and job["status"] == "done" and job["result"] == {"revised": 1} and content == REVISED_POST
+        print(f"   {'✓' if ok else '✗'} job {job['status']} ({job['result'] or job['error']}), "
+              f"post {'updated' if content == REVISED_POST else 'unchanged'}")
+        return ok
+    finally:
+        os.chdir(REPO_ROOT)
+        claude.stop()
+        airtable.stop()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [check_revision_job(Path(tmp))]
+
+    passed = all(results)
+    print("\n" + ("✅ ALL GATEWAY CHECKS PASSED" if passed else "❌ GATEWAY CHECKS FAILED"))
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Per-stage latency breakdown for traced pipeline runs.
+
+Reads spans exported by utils/tracing.py and prints, per span name, the call
+count, total time, p50/p95/max and errors, slowest stages first.
+
+Usage:
+    python orchestrate.py --action full --trace        # writes .tmp/traces.jsonl
+    python execution/trace_report.py                   # latest run
+    python execution/trace_report.py --all             # every run in the file
+    python execution/trace_report.py --trace <id>      # one run
+    python execution/trace_report.py --otlp run.json   # also write OTLP/JSON
+    python execution/trace_report.py --otlp-endpoint http://localhost:4318/v1/traces
+"""
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+from utils.tracing import DEFAULT_TRACE_FILE, load_spans, to_otlp
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latest_trace_id(spans: List[Dict]) -> str:
+    """Trace of the most recently started root span."""
+    roots = [s for s in spans if not s.get("parent_id")] or spans
+    return max(roots, key=lambda s: s["start_ns"])["trace_id"]
+
+
+def breakdown(spans: List[Dict]) -> List[Dict]:
+    """Latency stats per span name, slowest total first."""
+    by_name: Dict[str, List[Dict]] = {}
+    for s in spans:
+        by_name.setdefault(s["name"], []).append(s)
+
+    rows = []
+    for name, group in by_name.items():
+        durations = [s["duration_ms"] for s in group]
+        rows.append({
+            "name": name,
+            "count": len(group),
+            "total_ms": sum(durations),
+            "p50_ms": percentile(durations, 50),
+            "p95_ms": percentile(durations, 95),
+            "max_ms": max(durations),
+            "errors": sum(1 for s in group if s.get("status") == "error"),
+        })
+    return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+
+def print_breakdown(spans: List[Dict], title: str) -> None:
+    roots = [s for s in spans if not s.get("parent_id")]
+    wall_ms = sum(s["duration_ms"] for s in roots) or None
+
+    print(f"\n{title}")
+    if wall_ms:
+        print(f"Wall time (root spans): {wall_ms / 1000:.2f}s")
+    print(f"{'stage':<40} {'n':>5} {'total':>10} {'p50':>9} {'p95':>9} {'max':>9} {'err':>4} {'%':>6}")
+    print("-" * 98)
+    for row in breakdown(spans):
+        share = f"{100 * row['total_ms'] / wall_ms:5.1f}%" if wall_ms else ""
+        print(
+            f"{row['name'][:40]:<40} {row['count']:>5} {row['total_ms'] / 1000:>9.2f}s "
+            f"{row['p50_ms']:>7.0f}ms {row['p95_ms']:>7.0f}ms {row['max_ms']:>7.0f}ms {row['errors']:>4} {share:>6}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-stage p50/p95 latency for traced runs')
+    parser.add_argument('--file', default=DEFAULT_TRACE_FILE, help=f'Span JSONL file (default: {DEFAULT_TRACE_FILE})')
+    parser.add_argument('--trace', help='Trace ID to report (default: latest run)')
+    parser.add_argument('--all', action='store_true', help='Aggregate every run in the file')
+    parser.add_argument('--otlp', help='Write the selected spans as OTLP/JSON to this file')
+    parser.add_argument('--otlp-endpoint', help='POST the selected spans to an OTLP/HTTP collector (…/v1/traces)')
+    args = parser.parse_args()
+
+    if not Path(args.file).exists():
+        print(f"❌ No spans at {args.file} - run with --trace (or TRACE_FILE set) first")
+        return 1
+
+    spans = [s for s in load_spans(args.file) if s.get("end_ns")]
+    if not spans:
+        print(f"❌ {args.file} has no finished spans")
+        return 1
+
+    if args.all:
+        selected, title = spans, f"All runs ({len({s['trace_id'] for s in spans})} traces, {len(spans)} spans)"
+    else:
+        trace_id = args.trace or latest_trace_id(spans)
+        selected = [s for s in spans if s["trace_id"] == trace_id]
+        title = f"Trace {trace_id} ({len(selected)} spans)"
+        if not selected:
+            print(f"❌ Trace {trace_id} not found")
+            return 1
+
+    print_breakdown(selected, title)
+
+    if args.otlp or args.otlp_endpoint:
+        payload = to_otlp(selected)
+        if args.otlp:
+            with open(args.otlp, 'w') as f:
+                json.dump(payload, f)
+            print(f"\n✓ OTLP/JSON written to {args.otlp}")
+        if args.otlp_endpoint:
+            try:
+                response = requests.post(args.otlp_endpoint, json=payload, timeout=30)
+                print(f"\n✓ Sent {len(selected)} spans to {args.otlp_endpoint} ({response.status_code})")
+            except requests.exceptions.RequestException as e:
+                print(f"\n❌ OTLP export failed: {e}")
+                return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
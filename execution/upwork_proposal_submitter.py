@@ -33,6 +33,8 @@ from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import load_dotenv
 import requests
 
+from utils.tracing import current_span, span, traced
+
 load_dotenv()
 
 # Configure logging
@@ -239,7 +241,8 @@ Generate ONLY the proposal text, ready to submit."""
     def _navigate_to_job(self, job_url: str) -> bool:
         """Navigate to the job page."""
         try:
-            self.driver.get(job_url)
+            with span("selenium.page_load", url=job_url):
+                self.driver.get(job_url)
             time.sleep(3)
             
             # Check if we're on the job page
@@ -480,6 +483,7 @@ Generate ONLY the proposal text, ready to submit."""
             self.logger.error(f"Error checking submission: {e}")
             return False
     
+    @traced("submit.proposal")
     def submit_proposal(self, job: Dict, proposal_text: str = None) -> Tuple[bool, str]:
         """
         Submit a proposal for a single job.
@@ -494,6 +498,7 @@ Generate ONLY the proposal text, ready to submit."""
         job_title = job.get('Job Title', 'Unknown')
         job_url = job.get('Job URL', '')
         record_id = job.get('_record_id')
+        current_span().set(record_id=record_id, job_url=job_url)
         
         self.logger.info(f"=" * 60)
         self.logger.info(f"Submitting proposal for: {job_title[:50]}...")
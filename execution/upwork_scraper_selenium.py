@@ -27,6 +27,8 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import load_dotenv
 
+from utils.tracing import span
+
 load_dotenv()
 
 # Configure logging
@@ -40,6 +42,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Job cards on the search results page
+JOB_CARD_SELECTOR = '[data-test="job-tile-list"] article, .job-tile'
+
 
 class UpworkScraperSelenium:
     """
@@ -109,6 +114,11 @@ class UpworkScraperSelenium:
         time.sleep(2)
         self.logger.info("✓ Chrome driver initialized")
     
+    def _load_page(self, url: str):
+        """driver.get() timed as a selenium.page_load span."""
+        with span("selenium.page_load", url=url):
+            self.driver.get(url)
+    
     def _manual_login(self):
         """Wait for user to log in manually."""
         self.logger.info("=" * 60)
@@ -121,7 +131,7 @@ class UpworkScraperSelenium:
         
         try:
             # Go directly to jobs page - Upwork will redirect to login if needed
-            self.driver.get('https://www.upwork.com/nx/find-work/best-matches')
+            self._load_page('https://www.upwork.com/nx/find-work/best-matches')
             time.sleep(5)
         except Exception as e:
             self.logger.error(f"Error loading page: {e}")
@@ -161,7 +171,7 @@ class UpworkScraperSelenium:
             
         self.logger.info("Logging into Upwork...")
         
-        self.driver.get('https://www.upwork.com/ab/account-security/login')
+        self._load_page('https://www.upwork.com/ab/account-security/login')
         time.sleep(5)
         
         try:
@@ -567,17 +577,18 @@ class UpworkScraperSelenium:
                 
                 # Navigate to search page
                 search_url = self._build_search_url(search_query, page=page)
-                self.driver.get(search_url)
-                time.sleep(5)  # Wait for jobs to load
+                self._load_page(search_url)
                 
-                # Scroll to load all jobs on page
-                self._scroll_page()
-                
-                # Find all job cards
+                # Find all job cards (explicit wait for the tiles, then scroll
+                # to load any lazily rendered ones)
                 try:
-                    job_cards = WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_all_elements_located((By.CSS_SELECTOR, '[data-test="job-tile-list"] article, .job-tile'))
+                    WebDriverWait(self.driver, 15).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, JOB_CARD_SELECTOR))
                     )
+                    self._scroll_page()
+                    job_cards = self.driver.find_elements(By.CSS_SELECTOR, JOB_CARD_SELECTOR)
+                    if not job_cards:
+                        raise TimeoutException("Job cards disappeared after scrolling")
                 except TimeoutException:
                     # Try alternative selector
                     try:
@@ -596,9 +607,6 @@ class UpworkScraperSelenium:
                     if job_data and job_data.get('title') and job_data.get('title') != 'Unknown':
                         jobs.append(job_data)
                         self.logger.debug(f"Scraped: {job_data.get('title', 'Unknown')[:50]}...")
-                
-                # Small delay between pages
-                time.sleep(2)
             
             self.logger.info(f"✓ Scraped {len(jobs)} jobs total")
             return jobs
@@ -608,22 +616,24 @@ class UpworkScraperSelenium:
             raise
     
     def _scroll_page(self):
-        """Scroll page to load all dynamic content."""
+        """Scroll page to load all dynamic content (waits for the page to grow, not a fixed time)."""
         try:
             last_height = self.driver.execute_script("return document.body.scrollHeight")
             
             for _ in range(3):  # Scroll 3 times
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
                 
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
+                try:
+                    WebDriverWait(self.driver, 2).until(
+                        lambda d: d.execute_script("return document.body.scrollHeight") != last_height
+                    )
+                except TimeoutException:
+                    break  # Nothing more loaded
+                
+                last_height = self.driver.execute_script("return document.body.scrollHeight")
                 
             # Scroll back to top
             self.driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(1)
             
         except Exception as e:
             self.logger.debug(f"Scroll error (non-critical): {e}")
@@ -639,7 +649,7 @@ class UpworkScraperSelenium:
             Dictionary with detailed job info
         """
         try:
-            self.driver.get(job_url)
+            self._load_page(job_url)
             time.sleep(3)
             
             details = {}
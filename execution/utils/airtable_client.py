@@ -0,0 +1,649 @@
+"""
+Airtable Client: Shared, pooled access to the Airtable REST API
+
+This module provides:
+1. One keep-alive requests.Session per process (connection pool, no TLS setup per call)
+2. filterByFormula / fields[] / sort parameter builders
+3. Transparent pagination over list endpoints
+4. A single retry policy for 429 rate limits, 5xx errors and timeouts (POST creates
+   only resend when Airtable can't have written anything)
+5. A per-base token bucket that paces requests under Airtable's 5 req/s limit
+6. Bulk create/update/delete in 10-record batches with per-record results
+
+Every module that talks to Airtable should go through AirtableClient instead of
+calling requests.get/patch directly. Server-side filtering and field selection
+keep payloads small; the shared session keeps connections warm.
+
+Example:
+    client = AirtableClient(base_id, table_id)
+    scheduled = client.list_records(
+        formula=formula_eq("Status", "Scheduled"),
+        fields=["Title", "Scheduled Time"],
+        sort=[("Scheduled Time", "asc")],
+    )
+"""
+
+import os
+import time
+import base64
+import random
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+
+from .tracing import Span, span
+
+logger = logging.getLogger(__name__)
+
+AIRTABLE_API_URL = "https://api.airtable.com/v0"
+
+# Direct attachment uploads (files up to 5 MB) use a separate host
+AIRTABLE_CONTENT_URL = "https://content.airtable.com/v0"
+
+# Airtable caps list pages at 100 records
+MAX_PAGE_SIZE = 100
+
+# Airtable caps create/update/delete at 10 records per request
+MAX_BATCH_SIZE = 10
+
+# Airtable allows 5 requests per second per base
+RATE_LIMIT_PER_SECOND = 5.0
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide pooled session.
+
+    The session is created lazily and shared by every AirtableClient, so all
+    Airtable calls in a process reuse the same keep-alive connections.
+    """
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+
+    return _session
+
+
+# ============== Formula Builders ==============
+
+def escape_formula_value(value) -> str:
+    """Render a Python value as an Airtable formula literal."""
+    if isinstance(value, bool):
+        return "TRUE()" if value else "FALSE()"
+    if isinstance(value, (int, float)):
+        return str(value)
+
+    text = str(value).replace("\\", "\\\\").replace("'", "\\'")
+    return f"'{text}'"
+
+
+def formula_field(name: str) -> str:
+    """Reference a field by name inside a formula."""
+    return "{" + name + "}"
+
+
+def formula_eq(field: str, value) -> str:
+    """{Field} = value"""
+    return f"{formula_field(field)}={escape_formula_value(value)}"
+
+
+def formula_ne(field: str, value) -> str:
+    """{Field} != value"""
+    return f"{formula_field(field)}!={escape_formula_value(value)}"
+
+
+def formula_not_blank(field: str) -> str:
+    """Field has a value."""
+    return f"NOT({formula_field(field)}='')"
+
+
+def formula_in(field: str, values: Sequence) -> str:
+    """{Field} equals any of the given values."""
+    return formula_or(*[formula_eq(field, v) for v in values])
+
+
+def formula_and(*parts: str) -> str:
+    """AND() of the non-empty parts."""
+    parts = [p for p in parts if p]
+    if not parts:
+        return ""
+    if len(parts) == 1:
+        return parts[0]
+    return f"AND({', '.join(parts)})"
+
+
+def formula_or(*parts: str) -> str:
+    """OR() of the non-empty parts."""
+    parts = [p for p in parts if p]
+    if not parts:
+        return ""
+    if len(parts) == 1:
+        return parts[0]
+    return f"OR({', '.join(parts)})"
+
+
+SortSpec = Sequence[Union[str, Tuple[str, str]]]
+
+
+def build_list_params(
+    formula: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    sort: Optional[SortSpec] = None,
+    page_size: int = MAX_PAGE_SIZE,
+    max_records: Optional[int] = None,
+    view: Optional[str] = None,
+) -> List[Tuple[str, str]]:
+    """
+    Build query parameters for a list request.
+
+    Returned as a list of pairs because fields[] and sort[n][...] repeat.
+
+    Args:
+        formula: filterByFormula expression
+        fields: Only return these fields
+        sort: Field names (ascending) or (field, "asc"|"desc") pairs
+        page_size: Records per page (max 100)
+        max_records: Stop after this many records in total
+        view: Restrict to a named view
+
+    Returns:
+        List of (key, value) pairs suitable for requests' params=
+    """
+    params: List[Tuple[str, str]] = [("pageSize", str(min(page_size, MAX_PAGE_SIZE)))]
+
+    if formula:
+        params.append(("filterByFormula", formula))
+
+    for name in fields or []:
+        params.append(("fields[]", name))
+
+    for index, spec in enumerate(sort or []):
+        if isinstance(spec, str):
+            name, direction = spec, "asc"
+        else:
+            name, direction = spec
+        params.append((f"sort[{index}][field]", name))
+        params.append((f"sort[{index}][direction]", direction))
+
+    if max_records:
+        params.append(("maxRecords", str(max_records)))
+
+    if view:
+        params.append(("view", view))
+
+    return params
+
+
+# ============== Retry Policy ==============
+
+class AirtableError(Exception):
+    """Raised when an Airtable request fails after all retries."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, body: str = ""):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+
+
+@dataclass
+class RetryPolicy:
+    """Backoff settings shared by every Airtable call"""
+    max_retries: int = 4
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0
+
+    # Airtable asks clients to wait 30s after a 429; we honour Retry-After
+    # when present and otherwise back off exponentially up to backoff_max.
+    retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504)
+
+    # A POST create that timed out or hit a 5xx may already have written its
+    # records, so other methods only retry a 429 or a request that never left
+    idempotent_methods: Tuple[str, ...] = ("GET", "PUT", "PATCH", "DELETE")
+    unsent_retry_statuses: Tuple[int, ...] = (429,)
+
+    def retries_status(self, method: str, status_code: int) -> bool:
+        """True if a response with this status may be retried for `method`."""
+        if method.upper() in self.idempotent_methods:
+            return status_code in self.retry_statuses
+        return status_code in self.unsent_retry_statuses
+
+    def retries_error(self, method: str, error: requests.exceptions.RequestException) -> bool:
+        """True if a network error may be retried for `method`."""
+        return method.upper() in self.idempotent_methods or _never_sent(error)
+
+    def delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Seconds to sleep before retry number `attempt` (0-based)."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.backoff_max)
+                except ValueError:
+                    pass
+
+        delay = self.backoff_base * (2 ** attempt)
+        # Jitter keeps parallel workers from retrying in lockstep
+        delay += random.uniform(0, self.backoff_base)
+        return min(delay, self.backoff_max)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+def _never_sent(error: requests.exceptions.RequestException) -> bool:
+    """True if the request failed while connecting (connect timeout or refusal)."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    # urllib3 wraps connection failures in MaxRetryError(reason=NewConnectionError),
+    # and NewConnectionError subclasses ConnectTimeoutError
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, ConnectTimeoutError)
+
+
+# ============== Rate Limiting ==============
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available"""
+
+    def __init__(self, rate: float = RATE_LIMIT_PER_SECOND, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Burst size (defaults to one second's worth of tokens)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take `tokens`, sleeping as needed. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+
+                wait = (tokens - self._tokens) / self.rate
+
+            time.sleep(wait)
+            waited += wait
+
+
+_rate_limiters: Dict[str, TokenBucket] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(base_id: str) -> TokenBucket:
+    """Return the process-wide token bucket for an Airtable base."""
+    with _rate_limiters_lock:
+        if base_id not in _rate_limiters:
+            _rate_limiters[base_id] = TokenBucket()
+        return _rate_limiters[base_id]
+
+
+# ============== Batch Results ==============
+
+@dataclass
+class BatchFailure:
+    """One input item that could not be written"""
+    index: int                  # position in the caller's input list
+    item: Any                   # fields dict, update dict or record ID
+    error: str
+    status_code: Optional[int] = None
+
+
+@dataclass
+class BatchResult:
+    """Outcome of a bulk write, aligned with the caller's input order"""
+    records: List[Optional[Dict]] = field(default_factory=list)   # None where the item failed
+    failures: List[BatchFailure] = field(default_factory=list)
+    requests: int = 0
+
+    @property
+    def succeeded_count(self) -> int:
+        return sum(1 for record in self.records if record is not None)
+
+    @property
+    def failed_count(self) -> int:
+        return len(self.failures)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+
+def chunked(items: Sequence, size: int = MAX_BATCH_SIZE) -> Iterator[Tuple[int, Sequence]]:
+    """Yield (start_index, chunk) pairs of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+
+# ============== Client ==============
+
+class AirtableClient:
+    """Pooled, retrying client bound to one Airtable table"""
+
+    def __init__(
+        self,
+        base_id: str,
+        table: str,
+        api_key: Optional[str] = None,
+        timeout: int = 30,
+        retry_policy: Optional[RetryPolicy] = None,
+        session: Optional[requests.Session] = None,
+        api_url: Optional[str] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+    ):
+        """
+        Args:
+            base_id: Airtable base ID (app...)
+            table: Table ID (tbl...) or table name
+            api_key: Personal access token (defaults to AIRTABLE_API_KEY env var)
+            timeout: Per-request timeout in seconds
+            retry_policy: Override the shared retry settings
+            session: Override the shared pooled session
+            api_url: Override the API root (AIRTABLE_API_URL env var, then the public API)
+            rate_limiter: Override the shared per-base token bucket
+        """
+        self.base_id = base_id
+        self.table = table
+        self.api_key = api_key or os.environ.get("AIRTABLE_API_KEY")
+        self.timeout = timeout
+        self.retry_policy = retry_policy or DEFAULT_RETRY_POLICY
+        self.session = session or get_session()
+        self.api_url = (api_url or os.environ.get("AIRTABLE_API_URL") or AIRTABLE_API_URL).rstrip("/")
+        self.rate_limiter = rate_limiter or get_rate_limiter(base_id)
+
+    @property
+    def table_url(self) -> str:
+        return f"{self.api_url}/{self.base_id}/{self.table}"
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the shared session with the retry policy applied.
+
+        Raises:
+            AirtableError: non-retryable error status, or retries exhausted
+        """
+        with span("airtable.request", method=method, table=self.table) as request_span:
+            return self._request(method, url, request_span, **kwargs)
+
+    def _request(self, method: str, url: str, request_span: Span, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        policy = self.retry_policy
+        last_error = ""
+        response = None
+
+        for attempt in range(policy.max_retries + 1):
+            self.rate_limiter.acquire()
+            request_span.set(attempts=attempt + 1)
+            try:
+                response = self.session.request(method, url, headers=self.headers, **kwargs)
+                request_span.set(**{"http.status": response.status_code})
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                last_error = str(e)
+                response = None
+                if attempt < policy.max_retries and policy.retries_error(method, e):
+                    delay = policy.delay(attempt)
+                    logger.warning(f"Airtable {method} network error ({e}); retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+                break
+
+            if response.status_code < 400:
+                return response
+
+            if policy.retries_status(method, response.status_code) and attempt < policy.max_retries:
+                delay = policy.delay(attempt, response)
+                logger.warning(
+                    f"Airtable {method} returned {response.status_code}; "
+                    f"retrying in {delay:.1f}s (attempt {attempt + 1}/{policy.max_retries})"
+                )
+                time.sleep(delay)
+                continue
+
+            raise AirtableError(
+                f"Airtable {method} {url} failed: {response.status_code}",
+                status_code=response.status_code,
+                body=response.text,
+            )
+
+        status = response.status_code if response is not None else None
+        raise AirtableError(
+            f"Airtable {method} {url} failed after {attempt + 1} attempt(s): {last_error or status}",
+            status_code=status,
+            body=response.text if response is not None else "",
+        )
+
+    # ---------- Reads ----------
+
+    def iter_records(
+        self,
+        formula: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        sort: Optional[SortSpec] = None,
+        max_records: Optional[int] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        view: Optional[str] = None,
+    ) -> Iterator[Dict]:
+        """
+        Yield records across all pages.
+
+        Raises:
+            AirtableError: if any page fails after retries
+        """
+        params = build_list_params(formula, fields, sort, page_size, max_records, view)
+        offset = None
+
+        while True:
+            page_params = params + ([("offset", offset)] if offset else [])
+            data = self.request("GET", self.table_url, params=page_params).json()
+
+            for record in data.get("records", []):
+                yield record
+
+            offset = data.get("offset")
+            if not offset:
+                break
+
+    def list_records(
+        self,
+        formula: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        sort: Optional[SortSpec] = None,
+        max_records: Optional[int] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        view: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Fetch all matching records (all pages).
+
+        Returns an empty list and logs on failure; use iter_records() when the
+        caller needs to tell "no records" apart from "request failed".
+        """
+        try:
+            return list(self.iter_records(formula, fields, sort, max_records, page_size, view))
+        except AirtableError as e:
+            logger.error(f"{e} - {e.body[:200]}")
+            return []
+
+    def get_record(self, record_id: str) -> Optional[Dict]:
+        """Fetch a single record, or None on failure."""
+        try:
+            return self.request("GET", f"{self.table_url}/{record_id}").json()
+        except AirtableError as e:
+            logger.error(f"Failed to fetch record {record_id}: {e.status_code} - {e.body[:200]}")
+            return None
+
+    # ---------- Writes ----------
+
+    def create_record(self, fields: Dict, typecast: bool = False) -> Optional[Dict]:
+        """Create one record and return it, or None on failure."""
+        payload = {"records": [{"fields": fields}]}
+        if typecast:
+            payload["typecast"] = True
+
+        try:
+            records = self.request("POST", self.table_url, json=payload).json().get("records", [])
+            return records[0] if records else None
+        except AirtableError as e:
+            logger.error(f"Failed to create record: {e.status_code} - {e.body[:200]}")
+            return None
+
+    def update_record(self, record_id: str, fields: Dict, typecast: bool = False) -> Optional[Dict]:
+        """PATCH one record and return it, or None on failure."""
+        payload = {"fields": fields}
+        if typecast:
+            payload["typecast"] = True
+
+        try:
+            return self.request("PATCH", f"{self.table_url}/{record_id}", json=payload).json()
+        except AirtableError as e:
+            logger.error(f"Failed to update record {record_id}: {e.status_code} - {e.body[:200]}")
+            return None
+
+    def upload_attachment(
+        self,
+        record_id: str,
+        field: str,
+        data: bytes,
+        filename: str,
+        content_type: str = "image/png",
+    ) -> Optional[Dict]:
+        """
+        Append a file to an attachment field from its bytes (no public URL needed).
+
+        Returns the updated record, or None on failure.
+        """
+        content_url = (os.environ.get("AIRTABLE_CONTENT_URL") or AIRTABLE_CONTENT_URL).rstrip("/")
+        url = f"{content_url}/{self.base_id}/{record_id}/{quote(field, safe='')}/uploadAttachment"
+        payload = {
+            "contentType": content_type,
+            "file": base64.b64encode(data).decode("ascii"),
+            "filename": filename,
+        }
+
+        try:
+            return self.request("POST", url, json=payload).json()
+        except AirtableError as e:
+            logger.error(f"Failed to upload attachment to {record_id}: {e.status_code} - {e.body[:200]}")
+            return None
+
+    def delete_record(self, record_id: str) -> bool:
+        """Delete one record."""
+        try:
+            self.request("DELETE", f"{self.table_url}/{record_id}")
+            return True
+        except AirtableError as e:
+            logger.error(f"Failed to delete record {record_id}: {e.status_code} - {e.body[:200]}")
+            return False
+
+    # ---------- Bulk writes ----------
+
+    def _write_batches(self, method: str, items: Sequence, build_request) -> BatchResult:
+        """
+        Send `items` in 10-record chunks. A rejected chunk (e.g. 422 on one bad
+        field) is retried record by record so only the offending items fail.
+        """
+        result = BatchResult(records=[None] * len(items))
+
+        def send(start: int, chunk: Sequence) -> Optional[AirtableError]:
+            result.requests += 1
+            try:
+                response = self.request(method, self.table_url, **build_request(chunk))
+            except AirtableError as e:
+                return e
+
+            for offset, record in enumerate(response.json().get("records", [])):
+                result.records[start + offset] = record
+            return None
+
+        for start, chunk in chunked(items):
+            error = send(start, chunk)
+            if error is None:
+                continue
+
+            if len(chunk) > 1 and error.status_code is not None and 400 <= error.status_code < 500 and error.status_code != 429:
+                logger.warning(f"Airtable {method} batch rejected ({error.status_code}); isolating bad records")
+                for offset, item in enumerate(chunk):
+                    single_error = send(start + offset, [item])
+                    if single_error is not None:
+                        result.failures.append(BatchFailure(
+                            start + offset, item, single_error.body[:500] or str(single_error), single_error.status_code
+                        ))
+                continue
+
+            for offset, item in enumerate(chunk):
+                result.failures.append(BatchFailure(start + offset, item, error.body[:500] or str(error), error.status_code))
+
+        if result.failures:
+            logger.error(f"Airtable {method}: {result.failed_count}/{len(items)} records failed")
+
+        return result
+
+    def batch_create(self, records: Sequence[Dict], typecast: bool = False) -> BatchResult:
+        """
+        Create records (each a fields dict) in batches of 10.
+
+        Returns:
+            BatchResult whose records[i] is the created record for records[i], or None
+        """
+        def build(chunk):
+            payload = {"records": [{"fields": fields} for fields in chunk]}
+            if typecast:
+                payload["typecast"] = True
+            return {"json": payload}
+
+        return self._write_batches("POST", records, build)
+
+    def batch_update(self, updates: Sequence[Dict], typecast: bool = False) -> BatchResult:
+        """
+        PATCH records in batches of 10.
+
+        Args:
+            updates: [{"id": record_id, "fields": {...}}, ...]
+        """
+        def build(chunk):
+            payload = {"records": [{"id": u["id"], "fields": u["fields"]} for u in chunk]}
+            if typecast:
+                payload["typecast"] = True
+            return {"json": payload}
+
+        return self._write_batches("PATCH", updates, build)
+
+    def batch_delete(self, record_ids: Sequence[str]) -> BatchResult:
+        """Delete records in batches of 10. records[i] is {"id", "deleted"} or None."""
+        def build(chunk):
+            return {"params": [("records[]", record_id) for record_id in chunk]}
+
+        return self._write_batches("DELETE", record_ids, build)
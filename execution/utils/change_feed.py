@@ -0,0 +1,387 @@
+"""
+Change Feed: Status transitions from Airtable's webhook payload cursor
+
+The polling paths re-download every record, rebuild a {record_id: status}
+snapshot and diff it to find status flips. ChangeFeed instead registers an
+Airtable webhook that watches only the Status field and reads the webhook's
+payload list from a persisted cursor, so each poll (or each notification
+ping, ~1s after the edit) costs one small request that returns only what
+changed.
+
+Payloads are turned into StatusChange events and handed to a dispatch
+callable (handle_webhook in production). Bookkeeping makes delivery
+effectively exactly-once:
+- the cursor only advances past a payload once all of its events are done
+- events delivered from a partly-processed payload are remembered, so a
+  crash or retry resumes at the payload without re-dispatching them
+- a failing event is retried on the next drain, up to MAX_DISPATCH_ATTEMPTS
+
+State lives in a key-value store (a modal.Dict in production, a dict or
+JsonFileStore locally). Notification pings carry no change data, so a
+receiver only needs to trigger a drain; the payloads themselves are read
+with the API token.
+
+Example:
+    feed = ChangeFeed(client, modal.Dict.from_name(CHANGE_FEED_DICT_NAME)).load()
+    feed.ensure_webhook(notification_url)
+    feed.drain(lambda event: handle_webhook.remote(event.record_id, event.new_status))
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, MutableMapping, Optional
+
+from .airtable_client import AirtableClient, AirtableError
+
+logger = logging.getLogger(__name__)
+
+CHANGE_FEED_DICT_NAME = "airtable-change-feed"
+
+STATE_KEY = "state"
+
+# Statuses that have a handler in handle_webhook
+TRIGGER_STATUSES = ('Pending Review', 'Approved - Ready to Schedule', 'Rejected')
+
+# Airtable webhooks expire after 7 days unless refreshed
+REFRESH_BEFORE_EXPIRY = timedelta(days=2)
+
+MAX_DISPATCH_ATTEMPTS = 3
+
+# Safety cap on payload pages read per drain (Airtable returns up to 50 per page)
+MAX_PAGES_PER_DRAIN = 20
+
+
+@dataclass
+class StatusChange:
+    """One status transition of one record, from one Airtable transaction"""
+    record_id: str
+    new_status: str
+    old_status: Optional[str]
+    title: str
+    reason: str          # 'new_record' or 'status_change'
+    transaction: int     # baseTransactionNumber of the payload
+    timestamp: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.record_id}:{self.transaction}"
+
+
+def _empty_state() -> Dict:
+    return {
+        'webhook_id': None,
+        'mac_secret': None,
+        'expires_at': None,
+        'cursor': 1,
+        'table_id': None,
+        'status_field_id': None,
+        'title_field_id': None,
+        'delivered': [],     # event keys already dispatched from the payload at `cursor`
+        'attempts': {},      # event key -> failed dispatch count
+    }
+
+
+def _cell_name(value: Any) -> Optional[str]:
+    """Single-select cells arrive as {'id', 'name', 'color'}; plain text as a string."""
+    if isinstance(value, dict):
+        return value.get('name')
+    return value
+
+
+def _dispatch_ok(result: Any) -> bool:
+    if isinstance(result, dict):
+        return bool(result.get('success'))
+    return bool(result)
+
+
+def events_from_payload(
+    payload: Dict,
+    table_id: str,
+    status_field_id: str,
+    title_field_id: Optional[str] = None,
+    trigger_statuses: Iterable[str] = TRIGGER_STATUSES,
+) -> List[StatusChange]:
+    """
+    Status transitions in one webhook payload (same rules as the snapshot pollers).
+
+    Created records trigger when they start in a trigger status; changed records
+    trigger when Status moves into one.
+    """
+    table = payload.get('changedTablesById', {}).get(table_id)
+    if not table:
+        return []
+
+    trigger_statuses = set(trigger_statuses)
+    transaction = payload.get('baseTransactionNumber', 0)
+    timestamp = payload.get('timestamp', '')
+    events = []
+
+    def title_of(*cell_maps) -> str:
+        for cells in cell_maps:
+            if title_field_id and title_field_id in (cells or {}):
+                return cells[title_field_id]
+        return 'Untitled'
+
+    for record_id, created in table.get('createdRecordsById', {}).items():
+        cells = created.get('cellValuesByFieldId', {})
+        status = _cell_name(cells.get(status_field_id))
+        if status in trigger_statuses:
+            events.append(StatusChange(record_id, status, None, title_of(cells), 'new_record', transaction, timestamp))
+
+    for record_id, changed in table.get('changedRecordsById', {}).items():
+        current = changed.get('current', {}).get('cellValuesByFieldId', {})
+        if status_field_id not in current:
+            continue
+
+        status = _cell_name(current.get(status_field_id))
+        previous = _cell_name(changed.get('previous', {}).get('cellValuesByFieldId', {}).get(status_field_id))
+        if status in trigger_statuses and status != previous:
+            title = title_of(current, changed.get('unchanged', {}).get('cellValuesByFieldId', {}))
+            events.append(StatusChange(record_id, status, previous, title, 'status_change', transaction, timestamp))
+
+    return events
+
+
+class ChangeFeed:
+    """Airtable webhook subscription plus a persisted payload cursor"""
+
+    def __init__(
+        self,
+        client: AirtableClient,
+        store: MutableMapping,
+        status_field: str = 'Status',
+        title_field: str = 'Title',
+        trigger_statuses: Iterable[str] = TRIGGER_STATUSES,
+    ):
+        """
+        Args:
+            client: AirtableClient bound to the watched table (table ID or name)
+            store: modal.Dict, dict or JsonFileStore holding the feed state
+            status_field: Field whose changes are watched
+            title_field: Field included in events for logging
+            trigger_statuses: Statuses that produce events
+        """
+        self.client = client
+        self.store = store
+        self.status_field = status_field
+        self.title_field = title_field
+        self.trigger_statuses = tuple(trigger_statuses)
+        self.table_id = client.table
+        self.state = _empty_state()
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.client.api_url}/bases/{self.client.base_id}/webhooks"
+
+    # ---------- Persistence ----------
+
+    def load(self) -> "ChangeFeed":
+        """Load feed state from the store."""
+        try:
+            stored = self.store.get(STATE_KEY)
+        except Exception as e:
+            logger.warning(f"Could not load change feed state: {e}")
+            stored = None
+
+        self.state = {**_empty_state(), **(stored or {})}
+        self.table_id = self.state['table_id'] or self.client.table
+        return self
+
+    def save(self) -> None:
+        self.store[STATE_KEY] = self.state
+
+    # ---------- Webhook lifecycle ----------
+
+    def _resolve_fields(self) -> bool:
+        """Look up the table and field IDs the webhook spec and payloads use."""
+        url = f"{self.client.api_url}/meta/bases/{self.client.base_id}/tables"
+        try:
+            tables = self.client.request("GET", url).json().get('tables', [])
+        except AirtableError as e:
+            logger.error(f"Could not read base schema: {e.status_code} - {e.body[:200]}")
+            return False
+
+        for table in tables:
+            if self.client.table not in (table.get('id'), table.get('name')):
+                continue
+            fields = {field['name']: field['id'] for field in table.get('fields', [])}
+            if self.status_field not in fields:
+                logger.error(f"Field '{self.status_field}' not found in table {table.get('name')}")
+                return False
+
+            self.table_id = table['id']
+            self.state['table_id'] = table['id']
+            self.state['status_field_id'] = fields[self.status_field]
+            self.state['title_field_id'] = fields.get(self.title_field)
+            return True
+
+        logger.error(f"Table {self.client.table} not found in base {self.client.base_id}")
+        return False
+
+    def _create_webhook(self, notification_url: Optional[str]) -> bool:
+        if not self._resolve_fields():
+            return False
+
+        includes = {'includePreviousCellValues': True}
+        if self.state['title_field_id']:
+            includes['includeCellValuesInFieldIds'] = [self.state['title_field_id']]
+
+        body = {
+            'notificationUrl': notification_url,
+            'specification': {
+                'options': {
+                    'filters': {
+                        'dataTypes': ['tableData'],
+                        'recordChangeScope': self.table_id,
+                        'watchDataInFieldIds': [self.state['status_field_id']],
+                    },
+                    'includes': includes,
+                }
+            },
+        }
+
+        try:
+            created = self.client.request("POST", self.base_url, json=body).json()
+        except AirtableError as e:
+            logger.error(f"Could not create Airtable webhook: {e.status_code} - {e.body[:200]}")
+            return False
+
+        self.state.update({
+            'webhook_id': created['id'],
+            'mac_secret': created.get('macSecretBase64'),
+            'expires_at': created.get('expirationTime'),
+            'cursor': 1,
+            'delivered': [],
+            'attempts': {},
+        })
+        self.save()
+        logger.info(f"Created Airtable webhook {created['id']} watching '{self.status_field}'")
+        return True
+
+    def _refresh_webhook(self) -> bool:
+        url = f"{self.base_url}/{self.state['webhook_id']}/refresh"
+        try:
+            refreshed = self.client.request("POST", url).json()
+        except AirtableError as e:
+            logger.warning(f"Could not refresh webhook {self.state['webhook_id']}: {e.status_code}")
+            return False
+
+        self.state['expires_at'] = refreshed.get('expirationTime')
+        self.save()
+        return True
+
+    def ensure_webhook(self, notification_url: Optional[str] = None, now: Optional[datetime] = None) -> bool:
+        """
+        Make sure a live webhook exists, creating or refreshing it as needed.
+
+        A newly created webhook starts with an empty payload list: changes made
+        while no webhook existed are not replayed.
+
+        Returns:
+            True if the feed is usable
+        """
+        now = now or datetime.now(timezone.utc)
+
+        if self.state['webhook_id']:
+            expires_at = self.state.get('expires_at')
+            if not expires_at:
+                return True
+            expiry = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
+            if expiry - now > REFRESH_BEFORE_EXPIRY or self._refresh_webhook():
+                return True
+            logger.warning("Webhook expired or missing - creating a new one")
+
+        return self._create_webhook(notification_url)
+
+    # ---------- Draining ----------
+
+    def drain(self, dispatch: Callable[[StatusChange], Any]) -> Dict:
+        """
+        Dispatch every event after the cursor, advancing the cursor as payloads complete.
+
+        Args:
+            dispatch: Called once per event; a falsy result or {'success': False}
+                counts as a failure and is retried on the next drain
+
+        Returns:
+            {'success', 'payloads', 'dispatched', 'failed', 'cursor'}
+        """
+        summary = {'success': True, 'payloads': 0, 'dispatched': 0, 'failed': 0, 'cursor': self.state['cursor']}
+        if not self.state['webhook_id']:
+            summary.update(success=False, error='No webhook - call ensure_webhook() first')
+            return summary
+
+        url = f"{self.base_url}/{self.state['webhook_id']}/payloads"
+
+        for _ in range(MAX_PAGES_PER_DRAIN):
+            try:
+                page = self.client.request("GET", url, params={'cursor': self.state['cursor']}).json()
+            except AirtableError as e:
+                logger.error(f"Could not read webhook payloads: {e.status_code} - {e.body[:200]}")
+                if e.status_code == 404:
+                    # Webhook was deleted or expired; ensure_webhook() recreates it
+                    self.state['webhook_id'] = None
+                    self.save()
+                summary.update(success=False, error=str(e))
+                break
+
+            for payload in page.get('payloads', []):
+                if not self._process_payload(payload, dispatch, summary):
+                    self.save()
+                    summary['cursor'] = self.state['cursor']
+                    return summary
+                summary['payloads'] += 1
+                self.state['cursor'] += 1
+                self.state['delivered'] = []
+                self.save()
+
+            # Trust the server's cursor (it skips payloads that have expired)
+            if page.get('cursor'):
+                self.state['cursor'] = max(self.state['cursor'], page['cursor'])
+                self.save()
+            if not page.get('mightHaveMore'):
+                break
+
+        summary['cursor'] = self.state['cursor']
+        return summary
+
+    def _process_payload(self, payload: Dict, dispatch: Callable, summary: Dict) -> bool:
+        """Dispatch a payload's events. Returns False to stop at this payload and retry later."""
+        events = events_from_payload(
+            payload,
+            self.table_id,
+            self.state['status_field_id'],
+            self.state['title_field_id'],
+            self.trigger_statuses,
+        )
+
+        for event in events:
+            if event.key in self.state['delivered']:
+                continue
+
+            try:
+                ok = _dispatch_ok(dispatch(event))
+            except Exception as e:
+                logger.error(f"Dispatch failed for {event.record_id} → {event.new_status}: {e}")
+                ok = False
+
+            if ok:
+                self.state['delivered'].append(event.key)
+                self.state['attempts'].pop(event.key, None)
+                self.save()
+                summary['dispatched'] += 1
+                continue
+
+            attempts = self.state['attempts'].get(event.key, 0) + 1
+            summary['failed'] += 1
+            if attempts < MAX_DISPATCH_ATTEMPTS:
+                self.state['attempts'][event.key] = attempts
+                logger.warning(f"Will retry {event.record_id} → {event.new_status} (attempt {attempts}/{MAX_DISPATCH_ATTEMPTS})")
+                return False
+
+            logger.error(f"Giving up on {event.record_id} → {event.new_status} after {attempts} attempts")
+            self.state['attempts'].pop(event.key, None)
+            self.state['delivered'].append(event.key)
+
+        return True
@@ -0,0 +1,220 @@
+"""
+Cost Ledger: Indexed SQLite store behind CostTracker
+
+CostTracker used to append each call to .tmp/api_costs.jsonl and answer
+get_summary() by re-reading and parsing the whole file, which grew to
+hundreds of thousands of lines. CostLedger keeps:
+
+1. calls - one row per API call (indexed on timestamp, model and endpoint),
+   including latency and cache read/write tokens
+2. daily - per (day, model, endpoint) running totals, updated in the same
+   transaction as the insert
+
+A window summary reads the day buckets fully inside the window plus the
+indexed rows of the one partial boundary day, so its cost depends on the
+number of days, not the number of calls.
+
+Writes are single SQLite transactions, safe across threads and processes.
+An existing JSONL log is imported once when the ledger is first created.
+
+Example:
+    ledger = CostLedger(".tmp/api_costs.sqlite")
+    ledger.record({"timestamp": ..., "model": ..., "endpoint": ..., "cost_usd": 0.01, ...})
+    ledger.summary(days=7)
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Numeric columns summed into the daily buckets
+TOTALS = ("cost_usd", "input_tokens", "output_tokens", "cached_tokens", "cache_write_tokens")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    model TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    cached_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_write_tokens INTEGER NOT NULL DEFAULT 0,
+    cost_usd REAL NOT NULL DEFAULT 0,
+    latency_ms REAL,
+    batch INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS calls_timestamp ON calls (timestamp);
+CREATE INDEX IF NOT EXISTS calls_model ON calls (model, timestamp);
+CREATE INDEX IF NOT EXISTS calls_endpoint ON calls (endpoint, timestamp);
+CREATE TABLE IF NOT EXISTS daily (
+    day TEXT NOT NULL,
+    model TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    calls INTEGER NOT NULL DEFAULT 0,
+    cost_usd REAL NOT NULL DEFAULT 0,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    cached_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_write_tokens INTEGER NOT NULL DEFAULT 0,
+    latency_ms_total REAL NOT NULL DEFAULT 0,
+    latency_calls INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, model, endpoint)
+);
+"""
+
+_INSERT_CALL = """
+INSERT INTO calls (timestamp, model, endpoint, input_tokens, output_tokens, cached_tokens,
+                   cache_write_tokens, cost_usd, latency_ms, batch)
+VALUES (:timestamp, :model, :endpoint, :input_tokens, :output_tokens, :cached_tokens,
+        :cache_write_tokens, :cost_usd, :latency_ms, :batch)
+"""
+
+_UPSERT_DAY = """
+INSERT INTO daily (day, model, endpoint, calls, cost_usd, input_tokens, output_tokens, cached_tokens,
+                   cache_write_tokens, latency_ms_total, latency_calls)
+VALUES (:day, :model, :endpoint, 1, :cost_usd, :input_tokens, :output_tokens, :cached_tokens,
+        :cache_write_tokens, COALESCE(:latency_ms, 0), :latency_calls)
+ON CONFLICT (day, model, endpoint) DO UPDATE SET
+    calls = calls + 1,
+    cost_usd = cost_usd + excluded.cost_usd,
+    input_tokens = input_tokens + excluded.input_tokens,
+    output_tokens = output_tokens + excluded.output_tokens,
+    cached_tokens = cached_tokens + excluded.cached_tokens,
+    cache_write_tokens = cache_write_tokens + excluded.cache_write_tokens,
+    latency_ms_total = latency_ms_total + excluded.latency_ms_total,
+    latency_calls = latency_calls + excluded.latency_calls
+"""
+
+
+def _row(entry: Dict) -> Dict:
+    """Normalize a JSONL-style entry into ledger columns."""
+    latency = entry.get("latency_ms")
+    return {
+        "timestamp": entry["timestamp"],
+        "day": entry["timestamp"][:10],
+        "model": entry.get("model", ""),
+        "endpoint": entry.get("endpoint", ""),
+        "input_tokens": entry.get("input_tokens", 0) or 0,
+        "output_tokens": entry.get("output_tokens", 0) or 0,
+        "cached_tokens": entry.get("cached_tokens", 0) or 0,
+        "cache_write_tokens": entry.get("cache_write_tokens", 0) or 0,
+        "cost_usd": entry.get("cost_usd", 0) or 0,
+        "latency_ms": latency,
+        "latency_calls": 0 if latency is None else 1,
+        "batch": 1 if entry.get("batch") else 0,
+    }
+
+
+class CostLedger:
+    """SQLite call ledger with per-day pre-aggregated buckets"""
+
+    def __init__(self, path: str, import_jsonl: Optional[str] = None):
+        """
+        Args:
+            path: SQLite file (created on first use)
+            import_jsonl: Legacy JSONL log to import if the ledger is new
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        is_new = not self.path.exists()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+
+        if is_new and import_jsonl and Path(import_jsonl).exists():
+            self._import(Path(import_jsonl))
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; SQLite serializes writers across threads and processes
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _write(self, rows: Iterable[Dict]) -> int:
+        rows = list(rows)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(_INSERT_CALL, rows)
+            conn.executemany(_UPSERT_DAY, rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def record(self, entry: Dict) -> None:
+        """Store one call (the same dict CostTracker writes to the JSONL log)."""
+        self._write([_row(entry)])
+
+    def _import(self, jsonl_path: Path) -> None:
+        def rows():
+            with open(jsonl_path) as f:
+                for line in f:
+                    try:
+                        yield _row(json.loads(line))
+                    except (ValueError, KeyError):
+                        continue
+
+        imported = self._write(rows())
+        logger.info(f"Cost ledger: imported {imported} call(s) from {jsonl_path}")
+
+    def summary(self, days: int = 7, now: Optional[datetime] = None) -> Dict:
+        """
+        Totals for calls after now - days.
+
+        Whole days inside the window come from the daily buckets; only the
+        boundary day is read row by row (through the timestamp index).
+        """
+        now = now or datetime.now()
+        cutoff = now - timedelta(days=days)
+        next_day = (cutoff + timedelta(days=1)).strftime("%Y-%m-%d")
+
+        columns = ", ".join(f"SUM({c})" for c in TOTALS)
+        conn = self._conn()
+        bucket_rows = conn.execute(
+            f"SELECT model, endpoint, SUM(calls), {columns}, SUM(latency_ms_total), SUM(latency_calls) "
+            "FROM daily WHERE day >= ? GROUP BY model, endpoint",
+            (next_day,),
+        ).fetchall()
+        boundary_rows = conn.execute(
+            f"SELECT model, endpoint, COUNT(*), {columns}, COALESCE(SUM(latency_ms), 0), COUNT(latency_ms) "
+            "FROM calls WHERE timestamp > ? AND timestamp < ? GROUP BY model, endpoint",
+            (cutoff.isoformat(), next_day),
+        ).fetchall()
+
+        totals = {"entries": 0, "latency_ms_total": 0.0, "latency_calls": 0, **{c: 0 for c in TOTALS}}
+        by_model: Dict[str, float] = {}
+        by_endpoint: Dict[str, float] = {}
+        for model, endpoint, calls, *sums in bucket_rows + boundary_rows:
+            values = dict(zip(TOTALS + ("latency_ms_total", "latency_calls"), sums))
+            totals["entries"] += calls
+            for key, value in values.items():
+                totals[key] += value or 0
+            by_model[model] = by_model.get(model, 0) + (values["cost_usd"] or 0)
+            by_endpoint[endpoint] = by_endpoint.get(endpoint, 0) + (values["cost_usd"] or 0)
+
+        avg_latency = totals["latency_ms_total"] / totals["latency_calls"] if totals["latency_calls"] else None
+        return {
+            "days": days,
+            "total_cost": round(totals["cost_usd"], 2),
+            "entries": totals["entries"],
+            "by_model": {k: round(v, 2) for k, v in by_model.items()},
+            "by_endpoint": {k: round(v, 4) for k, v in by_endpoint.items()},
+            "input_tokens": totals["input_tokens"],
+            "output_tokens": totals["output_tokens"],
+            "cached_tokens": totals["cached_tokens"],
+            "cache_write_tokens": totals["cache_write_tokens"],
+            "avg_latency_ms": round(avg_latency, 1) if avg_latency is not None else None,
+        }
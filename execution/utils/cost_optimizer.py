@@ -5,7 +5,7 @@ This module provides utilities for:
 1. Model selection based on task complexity
 2. Prompt compression (JSON formatting, truncation)
 3. Output control (length constraints, streaming)
-4. Batch processing
+4. Batch processing (Message Batches: submit, poll, resume, map back by custom_id)
 5. Prompt caching setup
 6. Cost tracking and monitoring
 
@@ -15,12 +15,23 @@ degradation of output quality.
 
 import json
 import hashlib
-from typing import Literal, Optional
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Iterator, Literal, Optional
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 import anthropic
 
+from .cost_ledger import CostLedger
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class CostEstimate:
@@ -227,7 +238,13 @@ class PromptCompressor:
 
 
 class CostTracker:
-    """Track API calls and costs for monitoring and optimization"""
+    """
+    Track API calls and costs for monitoring and optimization
+
+    Calls go to an indexed SQLite ledger (see cost_ledger.py) that answers
+    get_summary() without rescanning history; the JSONL log is still
+    appended for `tail`-style inspection.
+    """
 
     COSTS = {
         "claude-haiku-4-5": (1, 5),
@@ -235,9 +252,44 @@ class CostTracker:
         "claude-opus-4-5": (5, 25),
     }
 
-    def __init__(self, log_file: str = ".tmp/api_costs.jsonl"):
+    def __init__(self, log_file: str = ".tmp/api_costs.jsonl", ledger_file: Optional[str] = None):
+        """
+        Args:
+            log_file: Append-only JSONL log
+            ledger_file: SQLite ledger (defaults to log_file with a .sqlite suffix;
+                an existing JSONL log is imported into a new ledger once)
+        """
         self.log_file = Path(log_file)
         self.log_file.parent.mkdir(exist_ok=True)
+        self.ledger = CostLedger(ledger_file or str(self.log_file.with_suffix(".sqlite")), import_jsonl=str(self.log_file))
+        self._log_lock = threading.Lock()
+
+    @staticmethod
+    @contextmanager
+    def timer():
+        """
+        Measure a call's latency for log_call/log_message.
+
+        Example:
+            with cost_tracker.timer() as t:
+                message = client.messages.create(...)
+            cost_tracker.log_message(message, model, "endpoint", latency_ms=t.latency_ms)
+        """
+        timing = SimpleNamespace(latency_ms=None)
+        started = time.perf_counter()
+        try:
+            yield timing
+        finally:
+            timing.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def rates(self, model: str) -> tuple:
+        """(input, output) USD per million tokens; dated IDs match their family."""
+        if model in self.COSTS:
+            return self.COSTS[model]
+        for family, rates in self.COSTS.items():
+            if model.startswith(family):
+                return rates
+        return (0, 0)
 
     def log_call(
         self,
@@ -246,29 +298,38 @@ class CostTracker:
         output_tokens: int,
         endpoint: str,
         cached_tokens: int = 0,
+        batch: bool = False,
+        cache_write_tokens: int = 0,
+        latency_ms: Optional[float] = None,
     ) -> float:
         """
         Log an API call and return the cost.
 
         Args:
             model: Model used (e.g., "claude-sonnet-4-5")
-            input_tokens: Number of input tokens
+            input_tokens: Number of input tokens (including cached ones)
             output_tokens: Number of output tokens
             endpoint: Task/endpoint name (for analytics)
             cached_tokens: Number of tokens read from cache
+            batch: Call went through the Message Batches API (50% discount)
+            cache_write_tokens: Number of input tokens written to the cache
+            latency_ms: Wall-clock time of the call (see timer())
 
         Returns:
             Cost in USD
         """
-        input_rate, output_rate = self.COSTS.get(model, (0, 0))
+        input_rate, output_rate = self.rates(model)
 
-        # Calculate costs
+        # Calculate costs (cache reads 0.1x, cache writes 1.25x the input rate)
         cache_cost = (cached_tokens * input_rate * 0.1) / 1_000_000
+        cache_write_cost = (cache_write_tokens * input_rate * 1.25) / 1_000_000
         regular_input_cost = (
-            (input_tokens - cached_tokens) * input_rate
+            (input_tokens - cached_tokens - cache_write_tokens) * input_rate
         ) / 1_000_000
         output_cost = (output_tokens * output_rate) / 1_000_000
-        total_cost = cache_cost + regular_input_cost + output_cost
+        total_cost = cache_cost + cache_write_cost + regular_input_cost + output_cost
+        if batch:
+            total_cost *= 0.5
 
         # Log entry
         entry = {
@@ -280,45 +341,98 @@ class CostTracker:
             "cached_tokens": cached_tokens,
             "cost_usd": round(total_cost, 6),
         }
-
-        with open(self.log_file, "a") as f:
+        if cache_write_tokens:
+            entry["cache_write_tokens"] = cache_write_tokens
+        if latency_ms is not None:
+            entry["latency_ms"] = latency_ms
+        if batch:
+            entry["batch"] = True
+
+        try:
+            self.ledger.record(entry)
+        except sqlite3.Error as e:
+            logger.warning(f"Cost ledger write failed: {e}")
+
+        with self._log_lock, open(self.log_file, "a") as f:
             f.write(json.dumps(entry) + "\n")
 
         return total_cost
 
+    def log_message(
+        self,
+        message,
+        model: str,
+        endpoint: str,
+        batch: bool = False,
+        latency_ms: Optional[float] = None,
+    ) -> float:
+        """
+        Log a Message (or BatchMessage) from its usage block.
+
+        The API reports uncached input, cache reads and cache writes
+        separately; this folds them back into log_call's totals.
+        """
+        usage = message.usage
+        cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+        return self.log_call(
+            model=model,
+            input_tokens=usage.input_tokens + cache_read + cache_write,
+            output_tokens=usage.output_tokens,
+            endpoint=endpoint,
+            cached_tokens=cache_read,
+            batch=batch,
+            cache_write_tokens=cache_write,
+            latency_ms=latency_ms,
+        )
+
     def get_summary(self, days: int = 7) -> dict:
-        """Get cost summary for last N days"""
-        if not self.log_file.exists():
-            return {"total_cost": 0, "entries": 0, "by_model": {}}
+        """
+        Get cost summary for last N days
 
-        from datetime import timedelta
-        cutoff = datetime.now() - timedelta(days=days)
+        Answered from the ledger's daily buckets, so it stays fast however
+        long the log grows. Also reports tokens (incl. cache reads/writes),
+        average latency and cost by endpoint.
+        """
+        return self.ledger.summary(days=days)
 
-        total_cost = 0
-        entries = 0
-        by_model = {}
 
-        with open(self.log_file) as f:
-            for line in f:
-                entry = json.loads(line)
-                entry_time = datetime.fromisoformat(entry["timestamp"])
+class PromptCache:
+    """Implement prompt caching to reuse expensive system instructions"""
 
-                if entry_time > cutoff:
-                    total_cost += entry["cost_usd"]
-                    entries += 1
-                    model = entry["model"]
-                    by_model[model] = by_model.get(model, 0) + entry["cost_usd"]
+    # Shortest prefix each model will cache; cache_control on anything shorter
+    # is silently ignored (no cache reads, no savings)
+    MIN_CACHEABLE_TOKENS = {
+        "opus-4-5": 4096,
+        "haiku-4-5": 4096,
+        "haiku": 2048,
+    }
+    DEFAULT_MIN_CACHEABLE_TOKENS = 1024  # Sonnet, Opus 4/4.1
 
-        return {
-            "days": days,
-            "total_cost": round(total_cost, 2),
-            "entries": entries,
-            "by_model": {k: round(v, 2) for k, v in by_model.items()},
-        }
+    @classmethod
+    def min_cacheable_tokens(cls, model: str) -> int:
+        """Minimum prefix length (tokens) the API caches for `model`."""
+        for family, minimum in cls.MIN_CACHEABLE_TOKENS.items():
+            if family in model:
+                return minimum
+        return cls.DEFAULT_MIN_CACHEABLE_TOKENS
 
+    @classmethod
+    def system_block(
+        cls, text: str, model: str, ttl: Literal["ephemeral", "long"] = "ephemeral"
+    ) -> dict:
+        """
+        System block with cache control only if `text` can actually be cached.
 
-class PromptCache:
-    """Implement prompt caching to reuse expensive system instructions"""
+        Uses the ~4 characters/token estimate; below the model's minimum the
+        block is sent plain, since a cache write would never be read back.
+
+        Example:
+            system = [PromptCache.system_block(SYSTEM_INSTRUCTIONS, "claude-sonnet-4-5")]
+        """
+        if len(text) // 4 < cls.min_cacheable_tokens(model):
+            return {"type": "text", "text": text}
+        return cls.add_cache_control(text, ttl=ttl)
 
     @staticmethod
     def add_cache_control(
@@ -337,20 +451,112 @@ class PromptCache:
         Example:
             system = [PromptCache.add_cache_control(SYSTEM_INSTRUCTIONS)]
         """
+        # The API only knows the "ephemeral" type; the 1-hour lifetime is its "ttl" option
+        cache_control = {"type": "ephemeral"}
+        if ttl == "long":
+            cache_control["ttl"] = "1h"
         return {
             "type": "text",
             "text": text,
-            "cache_control": {"type": ttl}
+            "cache_control": cache_control
         }
 
 
+class BatchMessage:
+    """
+    Message-shaped view of one batch result.
+
+    Exposes .content[0].text and .usage like an SDK Message so callers can
+    reuse the parsing/cost-logging code they already have for live calls.
+    """
+
+    is_batch = True
+
+    def __init__(self, result: dict):
+        self.custom_id = result.get("custom_id")
+        self.model = result.get("model")
+        self.content = [SimpleNamespace(type="text", text=result.get("text", ""))]
+        usage = result.get("usage") or {}
+        self.usage = SimpleNamespace(
+            input_tokens=usage.get("input_tokens", 0),
+            output_tokens=usage.get("output_tokens", 0),
+            cache_read_input_tokens=usage.get("cache_read_input_tokens", 0),
+        )
+
+
+def batch_enabled(env_var: str) -> bool:
+    """True unless `env_var` is set to 0/false/no (batching is on by default for non-urgent runs)."""
+    return os.environ.get(env_var, "1").strip().lower() not in ("0", "false", "no")
+
+
 class BatchProcessor:
-    """Process multiple items efficiently using batch API"""
+    """
+    Message Batches pipeline: submit → poll → stream results → map back by custom_id.
+
+    Every batch gets a state file in batch_dir (and a results file once it
+    ends), so a crashed run resumes polling - or reuses downloaded results -
+    instead of paying for the same batch twice. Batches cost 50% of live
+    calls and don't consume the interactive rate limit, so use this for work
+    that can wait (inventory refills, overnight proposal runs).
+
+    Example:
+        processor = BatchProcessor(client)
+        batch_id, results = processor.run(requests, batch_name="proposals")
+        for custom_id, result in results.items():
+            if result["type"] == "succeeded":
+                text = result["text"]
+        processor.mark_consumed(batch_id)
+    """
+
+    # Batch state lifecycle: submitted -> ended (results on disk) -> consumed
+    STATUS_SUBMITTED = "submitted"
+    STATUS_ENDED = "ended"
+    STATUS_CONSUMED = "consumed"
 
-    def __init__(self, client: anthropic.Anthropic):
+    def __init__(
+        self,
+        client: anthropic.Anthropic,
+        batch_dir: str = ".tmp/batches",
+        poll_interval: int = 60,
+    ):
         self.client = client
-        self.batch_dir = Path(".tmp/batches")
-        self.batch_dir.mkdir(exist_ok=True)
+        self.batch_dir = Path(batch_dir)
+        self.batch_dir.mkdir(parents=True, exist_ok=True)
+        self.poll_interval = poll_interval
+
+    # ---------- Requests ----------
+
+    @staticmethod
+    def build_request(
+        custom_id: str,
+        model: str,
+        content: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 500,
+        **params,
+    ) -> dict:
+        """
+        Build one batch request entry.
+
+        custom_id must be 1-64 chars of [a-zA-Z0-9_-]; see make_custom_id().
+        """
+        request_params = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": content}],
+            **params,
+        }
+        if system_prompt:
+            request_params["system"] = [PromptCache.add_cache_control(system_prompt)]
+
+        return {"custom_id": custom_id, "params": request_params}
+
+    @staticmethod
+    def make_custom_id(prefix: str, *parts) -> str:
+        """Stable, API-safe custom_id derived from arbitrary parts."""
+        digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()[:24]
+        safe_prefix = "".join(c if c.isalnum() or c in "-_" else "-" for c in prefix)[:36]
+        return f"{safe_prefix}-{digest}"
 
     def create_batch(
         self,
@@ -378,36 +584,155 @@ class BatchProcessor:
             batch_id = processor.create_batch(jobs, "claude-sonnet-4-5", SYSTEM)
             results = processor.retrieve_batch(batch_id)
         """
-        requests = []
-
-        for item in items:
-            requests.append({
-                "custom_id": item.get("id", str(len(requests))),
-                "params": {
-                    "model": model,
-                    "max_tokens": max_tokens,
-                    "system": [PromptCache.add_cache_control(system_prompt)],
-                    "messages": [{
-                        "role": "user",
-                        "content": item.get("content", "")
-                    }]
-                }
-            })
-
-        batch = self.client.batches.create(requests=requests)
-
-        # Track batch
-        with open(self.batch_dir / f"{batch_name}_{batch.id}.json", "w") as f:
-            json.dump({
-                "batch_id": batch.id,
-                "batch_name": batch_name,
-                "item_count": len(items),
-                "created_at": datetime.now().isoformat(),
-                "status": "processing"
-            }, f)
-
+        requests = [
+            self.build_request(
+                item.get("id", str(index)), model, item.get("content", ""),
+                system_prompt=system_prompt, max_tokens=max_tokens,
+            )
+            for index, item in enumerate(items)
+        ]
+        return self.submit(requests, batch_name)
+
+    def submit(self, requests: list[dict], batch_name: str = "batch") -> str:
+        """Submit prepared requests as one batch and persist its state. Returns the batch ID."""
+        batch = self.client.messages.batches.create(requests=requests)
+
+        self._save_state({
+            "batch_id": batch.id,
+            "batch_name": batch_name,
+            "item_count": len(requests),
+            "custom_ids": [r["custom_id"] for r in requests],
+            "created_at": datetime.now().isoformat(),
+            "status": self.STATUS_SUBMITTED,
+        })
+
+        print(f"📦 Submitted batch {batch.id} ({batch_name}, {len(requests)} requests)")
         return batch.id
 
+    # ---------- State ----------
+
+    def _state_path(self, batch_name: str, batch_id: str) -> Path:
+        return self.batch_dir / f"{batch_name}_{batch_id}.json"
+
+    def _results_path(self, batch_name: str, batch_id: str) -> Path:
+        return self.batch_dir / f"{batch_name}_{batch_id}.results.jsonl"
+
+    def _save_state(self, state: dict) -> None:
+        path = self._state_path(state["batch_name"], state["batch_id"])
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        tmp_path.replace(path)
+
+    def _load_state(self, batch_id: str) -> Optional[dict]:
+        for path in self.batch_dir.glob(f"*_{batch_id}.json"):
+            with open(path) as f:
+                return json.load(f)
+        return None
+
+    def find_pending(self, batch_name: str, custom_ids: Optional[list[str]] = None) -> Optional[dict]:
+        """
+        Most recent unconsumed batch for batch_name.
+
+        If custom_ids is given, only a batch with exactly those IDs matches.
+        """
+        pending = [
+            state for state in self.list_batches()
+            if state.get("batch_name") == batch_name and state.get("status") != self.STATUS_CONSUMED
+        ]
+        if custom_ids is not None:
+            wanted = sorted(custom_ids)
+            pending = [state for state in pending if sorted(state.get("custom_ids", [])) == wanted]
+
+        pending.sort(key=lambda state: state.get("created_at", ""))
+        return pending[-1] if pending else None
+
+    def mark_consumed(self, batch_id: str) -> None:
+        """Record that the caller has finished with this batch's results."""
+        state = self._load_state(batch_id)
+        if state:
+            state["status"] = self.STATUS_CONSUMED
+            state["consumed_at"] = datetime.now().isoformat()
+            self._save_state(state)
+
+    # ---------- Polling & results ----------
+
+    def wait(self, batch_id: str, timeout: Optional[float] = None):
+        """Poll until the batch has ended. Raises TimeoutError after `timeout` seconds."""
+        import time
+
+        started = time.monotonic()
+        while True:
+            batch = self.client.messages.batches.retrieve(batch_id)
+
+            if batch.processing_status == "ended":
+                return batch
+
+            counts = batch.request_counts
+            print(f"Batch {batch_id} status: {batch.processing_status} "
+                  f"({counts.succeeded + counts.errored}/{counts.processing + counts.succeeded + counts.errored + counts.canceled + counts.expired} done)")
+
+            if timeout is not None and time.monotonic() - started >= timeout:
+                raise TimeoutError(f"Batch {batch_id} still {batch.processing_status} after {timeout}s")
+
+            time.sleep(self.poll_interval)
+
+    @staticmethod
+    def _normalize_result(entry) -> dict:
+        """Flatten one SDK result entry into a JSON-serializable dict."""
+        result = entry.result
+        normalized = {"custom_id": entry.custom_id, "type": result.type}
+
+        if result.type == "succeeded":
+            message = result.message
+            usage = message.usage
+            normalized["text"] = "".join(
+                block.text for block in message.content if getattr(block, "type", "") == "text"
+            )
+            normalized["model"] = message.model
+            normalized["stop_reason"] = message.stop_reason
+            normalized["usage"] = {
+                "input_tokens": usage.input_tokens,
+                "output_tokens": usage.output_tokens,
+                "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+            }
+        elif result.type == "errored":
+            normalized["error"] = str(getattr(result, "error", ""))
+
+        return normalized
+
+    def stream_results(self, batch_id: str) -> Iterator[dict]:
+        """
+        Yield normalized results of an ended batch (in arbitrary order).
+
+        Reads the local results file if this batch was already downloaded,
+        otherwise streams from the API and persists each line as it arrives.
+        """
+        state = self._load_state(batch_id) or {"batch_id": batch_id, "batch_name": "batch"}
+        results_path = self._results_path(state["batch_name"], batch_id)
+
+        if state.get("status") in (self.STATUS_ENDED, self.STATUS_CONSUMED) and results_path.exists():
+            with open(results_path) as f:
+                for line in f:
+                    yield json.loads(line)
+            return
+
+        tmp_path = results_path.with_suffix(".partial")
+        with open(tmp_path, "w") as f:
+            for entry in self.client.messages.batches.results(batch_id):
+                normalized = self._normalize_result(entry)
+                f.write(json.dumps(normalized) + "\n")
+                yield normalized
+        tmp_path.replace(results_path)
+
+        state["status"] = self.STATUS_ENDED
+        state["ended_at"] = datetime.now().isoformat()
+        self._save_state(state)
+
+    def collect(self, batch_id: str) -> dict[str, dict]:
+        """Results of an ended batch keyed by custom_id."""
+        return {result["custom_id"]: result for result in self.stream_results(batch_id)}
+
     def retrieve_batch(self, batch_id: str) -> list[dict]:
         """
         Retrieve batch results (polls until complete).
@@ -417,28 +742,54 @@ class BatchProcessor:
 
         Returns:
             List of results with format:
-            [{"custom_id": "...", "result": {"message": {...}, "usage": {...}}}, ...]
+            [{"custom_id": "...", "type": "succeeded", "text": "...", "usage": {...}}, ...]
         """
-        import time
+        self.wait(batch_id)
+        return list(self.stream_results(batch_id))
 
-        while True:
-            batch = self.client.batches.retrieve(batch_id)
+    def run(
+        self,
+        requests: list[dict],
+        batch_name: str = "batch",
+        resume: bool = True,
+        match_custom_ids: bool = True,
+        timeout: Optional[float] = None,
+    ) -> tuple[str, dict[str, dict]]:
+        """
+        Submit (or resume) a batch, wait for it and return results by custom_id.
 
-            if batch.processing_status == "ended":
-                # Collect all results
-                results = []
-                for event in batch.request_counts:
-                    # Get actual results from batch
-                    pass
-                return results
+        Args:
+            requests: Prepared requests (see build_request)
+            batch_name: Name for batch tracking and resume lookup
+            resume: Reuse an unconsumed batch with the same name if one exists
+            match_custom_ids: Only resume a batch with exactly these custom_ids
+            timeout: Give up polling after this many seconds (TimeoutError;
+                the batch stays pending and is resumed next run)
+
+        Returns:
+            (batch_id, {custom_id: result}); call mark_consumed(batch_id) once
+            the results have been stored so the next run starts fresh.
+        """
+        pending = None
+        if resume:
+            custom_ids = [r["custom_id"] for r in requests] if match_custom_ids else None
+            pending = self.find_pending(batch_name, custom_ids)
+
+        if pending:
+            batch_id = pending["batch_id"]
+            print(f"↻ Resuming batch {batch_id} ({batch_name}, status: {pending['status']})")
+        else:
+            batch_id = self.submit(requests, batch_name)
+
+        if not pending or pending["status"] == self.STATUS_SUBMITTED:
+            self.wait(batch_id, timeout=timeout)
 
-            print(f"Batch {batch_id} status: {batch.processing_status}")
-            time.sleep(60)  # Check every minute
+        return batch_id, self.collect(batch_id)
 
     def list_batches(self) -> list[dict]:
         """List tracked batches"""
         batches = []
-        for batch_file in self.batch_dir.glob("batch_*.json"):
+        for batch_file in self.batch_dir.glob("*.json"):
             with open(batch_file) as f:
                 batches.append(json.load(f))
         return batches
@@ -0,0 +1,196 @@
+"""
+Delta Poller: Incremental status polling with a modified-time watermark
+
+For tables without a webhook (see change_feed.py), the pollers used to fetch
+every record each interval, diff the whole snapshot, and write every record
+back to the state store. DeltaPoller asks Airtable only for rows whose
+Status/Title changed (or that were created) since a stored watermark, fetches
+just those two fields, and writes only the keys that changed in one batched
+store update (no write at all when nothing changed). Per-poll cost
+therefore scales with the number of changes.
+
+Deletions can't be seen in a delta query, so an hourly ID sweep (one field,
+all rows) tombstones records that disappeared; tombstones keep a restored
+record from re-triggering as "new", and are evicted after TOMBSTONE_TTL.
+
+The store keeps one key per record ({'title', 'status'}, the same shape the
+snapshot pollers used) plus META_KEY for the watermark, so existing state
+carries over. It can be a modal.Dict, dict or JsonFileStore.
+
+Example:
+    poller = DeltaPoller(client, modal.Dict.from_name("polling-state"))
+    changes = poller.poll()     # None on Airtable errors
+    for change in changes:
+        handle_webhook.remote(change['record_id'], change['new_status'])
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, MutableMapping, Optional
+
+from .airtable_client import AirtableClient, AirtableError, formula_field, formula_or
+from .change_feed import TRIGGER_STATUSES
+
+logger = logging.getLogger(__name__)
+
+META_KEY = "__delta_poller__"
+
+# Re-read a little before the watermark to absorb clock skew with Airtable
+WATERMARK_OVERLAP = timedelta(minutes=2)
+
+# How often to list every record ID to find deletions
+SWEEP_INTERVAL = timedelta(hours=1)
+
+# How long deleted records are remembered
+TOMBSTONE_TTL = timedelta(days=7)
+
+
+def _airtable_time(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+class DeltaPoller:
+    """Status-change poller that only reads rows modified since its watermark"""
+
+    def __init__(
+        self,
+        client: AirtableClient,
+        store: MutableMapping,
+        status_field: str = 'Status',
+        title_field: str = 'Title',
+        trigger_statuses: Iterable[str] = TRIGGER_STATUSES,
+        default_status: str = 'N/A',
+    ):
+        """
+        Args:
+            client: AirtableClient bound to the polled table
+            store: modal.Dict, dict or JsonFileStore holding per-record state
+            status_field: Field whose transitions are reported
+            title_field: Field carried along for logging
+            trigger_statuses: Statuses that produce changes
+            default_status: Status recorded for rows with an empty Status
+        """
+        self.client = client
+        self.store = store
+        self.status_field = status_field
+        self.title_field = title_field
+        self.trigger_statuses = set(trigger_statuses)
+        self.default_status = default_status
+
+    def delta_formula(self, since: datetime) -> str:
+        """Rows created, or whose status/title changed, after `since`."""
+        stamp = _airtable_time(since)
+        fields = f"{formula_field(self.status_field)}, {formula_field(self.title_field)}"
+        return formula_or(
+            f"IS_AFTER(LAST_MODIFIED_TIME({fields}), '{stamp}')",
+            f"IS_AFTER(CREATED_TIME(), '{stamp}')",
+        )
+
+    def _entry(self, record: Dict) -> Dict:
+        fields = record.get('fields', {})
+        return {
+            'title': fields.get(self.title_field, 'Untitled'),
+            'status': fields.get(self.status_field, self.default_status),
+        }
+
+    def poll(self, now: Optional[datetime] = None) -> Optional[List[Dict]]:
+        """
+        Read changed rows, persist their new state in one write, and return transitions.
+
+        The first poll (no watermark yet) reads every row once to build the
+        baseline.
+
+        Returns:
+            [{'record_id', 'title', 'old_status', 'new_status', 'reason'}]
+            (same shape the snapshot pollers produced), or None if Airtable failed
+        """
+        now = now or datetime.now(timezone.utc)
+        meta = dict(self.store.get(META_KEY) or {})
+        watermark = meta.get('watermark')
+        full_scan = watermark is None
+
+        formula = None
+        if not full_scan:
+            formula = self.delta_formula(datetime.fromisoformat(watermark) - WATERMARK_OVERLAP)
+
+        try:
+            records = list(self.client.iter_records(formula=formula, fields=[self.title_field, self.status_field]))
+        except AirtableError as e:
+            logger.error(f"Delta poll failed: {e.status_code} - {e.body[:200]}")
+            return None
+
+        # Known state: one streaming read on full scans, per-key reads for deltas
+        known = {k: v for k, v in self.store.items() if k != META_KEY} if full_scan else None
+
+        updates = {}
+        changes = []
+        for record in records:
+            record_id = record['id']
+            new = self._entry(record)
+            old = known.get(record_id) if known is not None else self.store.get(record_id)
+
+            if old is None or (old.get('deleted_at') and old.get('status') != new['status']):
+                if new['status'] in self.trigger_statuses:
+                    changes.append({**self._change(record_id, new, None), 'reason': 'new_record'})
+            elif old.get('status') != new['status'] and new['status'] in self.trigger_statuses:
+                changes.append({**self._change(record_id, new, old['status']), 'reason': 'status_change'})
+
+            if old is None or old.get('deleted_at') or old.get('status') != new['status'] or old.get('title') != new['title']:
+                updates[record_id] = new
+
+        evict = []
+        swept = False
+        last_sweep = meta.get('last_sweep')
+        if full_scan or not last_sweep or now - datetime.fromisoformat(last_sweep) >= SWEEP_INTERVAL:
+            live_ids = {record['id'] for record in records} if full_scan else self._list_ids()
+            if live_ids is not None:
+                tombstones, evict = self._sweep(live_ids, known, now)
+                updates.update(tombstones)
+                meta['last_sweep'] = now.isoformat()
+                swept = True
+
+        # Nothing changed: keep the old watermark (the next delta query still
+        # returns nothing new) and skip the write entirely
+        if not (updates or evict or swept):
+            return changes
+
+        state_changes = len(updates)
+        meta['watermark'] = now.isoformat()
+        updates[META_KEY] = meta
+        self.store.update(updates)
+        for record_id in evict:
+            self.store.pop(record_id, None)
+
+        if state_changes or evict:
+            logger.info(f"Delta poll: {len(records)} row(s) read, {state_changes} state change(s), {len(evict)} evicted")
+        return changes
+
+    def _change(self, record_id: str, new: Dict, old_status: Optional[str]) -> Dict:
+        return {'record_id': record_id, 'title': new['title'], 'old_status': old_status, 'new_status': new['status']}
+
+    def _list_ids(self) -> Optional[set]:
+        """All record IDs in the table (one field per row to keep pages small)."""
+        try:
+            return {record['id'] for record in self.client.iter_records(fields=[self.status_field])}
+        except AirtableError as e:
+            logger.warning(f"Deletion sweep skipped: {e.status_code}")
+            return None
+
+    def _sweep(self, live_ids: set, known: Optional[Dict], now: datetime):
+        """Tombstone records missing from the table; list tombstones past their TTL."""
+        if known is None:
+            known = {k: v for k, v in self.store.items() if k != META_KEY}
+
+        tombstones = {}
+        evict = []
+        cutoff = (now - TOMBSTONE_TTL).isoformat()
+        for record_id, entry in known.items():
+            if record_id in live_ids:
+                continue
+            deleted_at = entry.get('deleted_at')
+            if not deleted_at:
+                tombstones[record_id] = {**entry, 'deleted_at': now.isoformat()}
+            elif deleted_at < cutoff:
+                evict.append(record_id)
+
+        return tombstones, evict
@@ -0,0 +1,350 @@
+"""
+Due Queue: Time-ordered index of scheduled LinkedIn posts
+
+The minute scheduler used to download the whole LinkedIn table every tick to
+find the few posts due that minute. DueQueue keeps one key per scheduled post
+plus one key per minute listing the posts due in it, in a key-value store (a
+modal.Dict in production, a plain dict locally), so a tick only reads the
+buckets for the last few minutes instead of the whole index.
+
+The index is kept in sync with Airtable by:
+1. Full rebuilds from {Status}='Scheduled' (hourly, or when the index is empty)
+2. Delta refreshes using LAST_MODIFIED_TIME() > watermark (every few minutes)
+3. Direct upserts from the code that schedules posts (see push_scheduled_post)
+
+Most ticks therefore make zero Airtable calls. Before a post fires the caller
+re-reads that single record, so a stale index entry can delay a post but
+never publish one that was unscheduled or moved. A due entry stays in the
+queue until mark_fired(); a failed send is moved to a later minute with
+retry() and keeps its attempt count across refreshes.
+
+Example:
+    queue = DueQueue(modal.Dict.from_name(DUE_QUEUE_DICT_NAME), client)
+    queue.load()
+    queue.refresh(now)
+    for record_id, entry in queue.due(minute_end.timestamp()):
+        if send(record_id):
+            queue.mark_fired(record_id, entry['fire_ts'])
+        else:
+            queue.retry(record_id, retry_ts)
+    queue.save()
+"""
+
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, MutableMapping, Optional, Tuple
+
+from .airtable_client import AirtableClient, AirtableError, formula_and, formula_eq, formula_not_blank
+
+logger = logging.getLogger(__name__)
+
+# Shared by the scheduler (reader) and schedule_approved_post (writer)
+DUE_QUEUE_DICT_NAME = "linkedin-due-queue"
+
+# Refresh bookkeeping; posts live under POST_PREFIX + record ID and
+# MINUTE_PREFIX + epoch minute lists the record IDs due in that minute
+STATE_KEY = "state"
+POST_PREFIX = "post:"
+MINUTE_PREFIX = "minute:"
+
+# Bumped when the layout changes; an older state forces a full rebuild
+STATE_VERSION = 2
+
+# Fired entries are remembered this long so a delta refresh that runs before
+# Make.com flips the record to "Posted" can't queue it a second time
+FIRED_RETENTION = timedelta(days=2)
+
+# Delta refreshes re-read a little before the watermark to absorb clock skew
+WATERMARK_OVERLAP = timedelta(seconds=90)
+
+
+def parse_scheduled_time(value: Optional[str]) -> Optional[float]:
+    """Parse an Airtable 'Scheduled Time' value into a UTC epoch timestamp."""
+    if not value:
+        return None
+
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return None
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+
+    return dt.timestamp()
+
+
+def _minute(ts: float) -> int:
+    return int(ts // 60)
+
+
+def _empty_state() -> Dict:
+    return {
+        'version': STATE_VERSION,
+        'fired': {},          # record_id -> fire_ts already sent
+        'watermark': None,    # ISO time of the last successful refresh
+        'last_full': None,    # ISO time of the last full rebuild
+    }
+
+
+class DueQueue:
+    """Per-minute fire-time index over scheduled posts, persisted in a key-value store"""
+
+    def __init__(
+        self,
+        store: MutableMapping,
+        client: Optional[AirtableClient] = None,
+        refresh_interval: timedelta = timedelta(minutes=5),
+        full_rebuild_interval: timedelta = timedelta(hours=1),
+        lookback: timedelta = timedelta(minutes=10),
+    ):
+        """
+        Args:
+            store: modal.Dict or dict holding the persisted state
+            client: Airtable client for the LinkedIn table (needed for refresh)
+            refresh_interval: Minimum time between delta refreshes
+            full_rebuild_interval: Maximum time between full rebuilds
+            lookback: How far before the current minute due() still reads buckets
+        """
+        self.store = store
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.full_rebuild_interval = full_rebuild_interval
+        self.lookback = lookback
+        self.state = _empty_state()
+
+    # ---------- Persistence ----------
+
+    def load(self) -> "DueQueue":
+        """Load refresh bookkeeping from the store."""
+        try:
+            stored = self.store.get(STATE_KEY)
+        except Exception as e:
+            logger.warning(f"Could not load due queue state: {e}")
+            stored = None
+
+        if stored and stored.get('version') == STATE_VERSION:
+            self.state = {**_empty_state(), **stored}
+        else:
+            self.state = _empty_state()
+        return self
+
+    def save(self) -> None:
+        """Persist refresh bookkeeping (entries are written as they change)."""
+        self.store[STATE_KEY] = self.state
+
+    def __len__(self) -> int:
+        return sum(1 for key in self.store.keys() if key.startswith(POST_PREFIX))
+
+    # ---------- Index operations ----------
+
+    def get(self, record_id: str) -> Optional[Dict]:
+        """Queued entry for a record: {'fire_ts', 'due_ts', 'attempts'}."""
+        return self.store.get(POST_PREFIX + record_id)
+
+    def _bucket_add(self, minute: int, record_id: str) -> None:
+        key = f"{MINUTE_PREFIX}{minute}"
+        record_ids = self.store.get(key) or []
+        if record_id not in record_ids:
+            self.store[key] = record_ids + [record_id]
+
+    def _bucket_drop(self, minute: int, record_id: str) -> None:
+        key = f"{MINUTE_PREFIX}{minute}"
+        record_ids = self.store.get(key) or []
+        if record_id not in record_ids:
+            return
+        remaining = [other for other in record_ids if other != record_id]
+        if remaining:
+            self.store[key] = remaining
+        else:
+            self.store.pop(key, None)
+
+    def _put(self, record_id: str, entry: Dict, previous: Optional[Dict] = None) -> None:
+        if previous and _minute(previous['due_ts']) != _minute(entry['due_ts']):
+            self._bucket_drop(_minute(previous['due_ts']), record_id)
+        self.store[POST_PREFIX + record_id] = entry
+        self._bucket_add(_minute(entry['due_ts']), record_id)
+
+    def upsert(self, record_id: str, fire_ts: float) -> None:
+        """Insert or move a record to `fire_ts`; an unchanged time keeps its retry state."""
+        if self.state['fired'].get(record_id) == fire_ts:
+            return
+
+        previous = self.get(record_id)
+        if previous and previous['fire_ts'] == fire_ts:
+            return
+
+        self._put(record_id, {'fire_ts': fire_ts, 'due_ts': fire_ts, 'attempts': 0}, previous)
+
+    def remove(self, record_id: str) -> None:
+        """Drop a record from the index if present."""
+        entry = self.store.pop(POST_PREFIX + record_id, None)
+        if entry is not None:
+            self._bucket_drop(_minute(entry['due_ts']), record_id)
+
+    def due(self, until_ts: float) -> List[Tuple[str, Dict]]:
+        """
+        Entries with due_ts < until_ts, earliest first, without removing them.
+
+        Only the buckets from `lookback` before the current minute are read,
+        so the cost doesn't grow with the number of scheduled posts.
+        """
+        first = _minute(until_ts - 60 - self.lookback.total_seconds())
+        due = []
+        for minute in range(first, math.ceil(until_ts / 60)):
+            for record_id in self.store.get(f"{MINUTE_PREFIX}{minute}") or []:
+                entry = self.get(record_id)
+                if entry and _minute(entry['due_ts']) == minute and entry['due_ts'] < until_ts:
+                    due.append((record_id, entry))
+
+        due.sort(key=lambda item: item[1]['due_ts'])
+        return due
+
+    def retry(self, record_id: str, retry_ts: float) -> int:
+        """
+        Move a failed entry to `retry_ts`, keeping its original fire time.
+
+        Returns:
+            The number of failed attempts so far (0 if the record isn't queued)
+        """
+        entry = self.get(record_id)
+        if entry is None:
+            return 0
+
+        updated = {**entry, 'due_ts': retry_ts, 'attempts': entry['attempts'] + 1}
+        self._put(record_id, updated, entry)
+        return updated['attempts']
+
+    def mark_fired(self, record_id: str, fire_ts: float) -> None:
+        """Drop a sent record and remember it was sent for this fire time."""
+        self.remove(record_id)
+        self.state['fired'][record_id] = fire_ts
+
+    def _evict_fired(self, now: datetime) -> None:
+        cutoff = (now - FIRED_RETENTION).timestamp()
+        self.state['fired'] = {
+            record_id: fire_ts
+            for record_id, fire_ts in self.state['fired'].items()
+            if fire_ts >= cutoff
+        }
+
+    # ---------- Airtable sync ----------
+
+    def needs_full_rebuild(self, now: datetime) -> bool:
+        last_full = self.state['last_full']
+        if not last_full:
+            return True
+        return now - datetime.fromisoformat(last_full) >= self.full_rebuild_interval
+
+    def needs_refresh(self, now: datetime) -> bool:
+        watermark = self.state['watermark']
+        if not watermark:
+            return True
+        return now - datetime.fromisoformat(watermark) >= self.refresh_interval
+
+    def refresh(self, now: Optional[datetime] = None, force_full: bool = False) -> str:
+        """
+        Bring the index up to date if it is due for a refresh.
+
+        Returns:
+            "full", "delta" or "skipped"; on Airtable errors the index and
+            watermark are left untouched so the next tick retries.
+        """
+        now = now or datetime.now(timezone.utc)
+
+        if force_full or self.needs_full_rebuild(now):
+            mode = "full"
+        elif self.needs_refresh(now):
+            mode = "delta"
+        else:
+            return "skipped"
+
+        if self.client is None:
+            raise ValueError("DueQueue.refresh() needs an Airtable client")
+
+        try:
+            if mode == "full":
+                self._full_rebuild(now)
+                self.state['last_full'] = now.isoformat()
+            else:
+                self._apply_deltas(datetime.fromisoformat(self.state['watermark']))
+        except AirtableError as e:
+            logger.error(f"Due queue {mode} refresh failed: {e}")
+            return "skipped"
+
+        self.state['watermark'] = now.isoformat()
+        self._evict_fired(now)
+        return mode
+
+    def _full_rebuild(self, now: datetime) -> None:
+        records = self.client.iter_records(
+            formula=formula_and(formula_eq('Status', 'Scheduled'), formula_not_blank('Scheduled Time')),
+            fields=['Scheduled Time'],
+        )
+
+        fired = self.state['fired']
+        listed = {}
+        for record in records:
+            fire_ts = parse_scheduled_time(record.get('fields', {}).get('Scheduled Time'))
+            if fire_ts is not None and fired.get(record['id']) != fire_ts:
+                listed[record['id']] = fire_ts
+
+        for key in [key for key in self.store.keys() if key.startswith(POST_PREFIX)]:
+            if key[len(POST_PREFIX):] not in listed:
+                self.remove(key[len(POST_PREFIX):])
+
+        # Entries older than the lookback window would never be read again:
+        # pending retries move to now, never-tried ones have missed their slot
+        window_start = (now - self.lookback).timestamp()
+        for record_id, fire_ts in listed.items():
+            self.upsert(record_id, fire_ts)
+            entry = self.get(record_id)
+            if entry['due_ts'] >= window_start:
+                continue
+            if entry['attempts']:
+                self._put(record_id, {**entry, 'due_ts': now.timestamp()}, entry)
+            else:
+                self.remove(record_id)
+
+        logger.info(f"Due queue rebuilt: {len(listed)} scheduled posts")
+
+    def _apply_deltas(self, watermark: datetime) -> None:
+        since = (watermark - WATERMARK_OVERLAP).astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        records = self.client.iter_records(
+            formula=f"IS_AFTER(LAST_MODIFIED_TIME(), '{since}')",
+            fields=['Status', 'Scheduled Time'],
+        )
+
+        changed = 0
+        for record in records:
+            fields = record.get('fields', {})
+            fire_ts = parse_scheduled_time(fields.get('Scheduled Time'))
+
+            if fields.get('Status') == 'Scheduled' and fire_ts is not None:
+                self.upsert(record['id'], fire_ts)
+            else:
+                self.remove(record['id'])
+            changed += 1
+
+        if changed:
+            logger.info(f"Due queue applied {changed} changed record(s) since {since}")
+
+
+def push_scheduled_post(store: MutableMapping, record_id: str, scheduled_time: str) -> bool:
+    """
+    Upsert one freshly scheduled post into the persisted due queue.
+
+    Best-effort: only this post's keys are written; if the write fails the
+    next delta refresh picks the record up instead.
+    """
+    fire_ts = parse_scheduled_time(scheduled_time)
+    if fire_ts is None:
+        return False
+
+    try:
+        DueQueue(store).load().upsert(record_id, fire_ts)
+        return True
+    except Exception as e:
+        logger.warning(f"Could not push {record_id} to due queue: {e}")
+        return False
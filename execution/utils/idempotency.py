@@ -0,0 +1,269 @@
+"""
+Idempotency: Shared duplicate suppression for expensive per-record actions
+
+The same Airtable transition can arrive several times - the Automation
+webhook, the poller, the change feed and handle_webhook all fire for it, and
+Airtable retries deliveries. Each duplicate that gets through costs a full
+LLM call, Replicate prediction or browser submission. Every trigger path
+used its own process-local cooldown dict that grew forever. IdempotencyStore
+replaces them with one store, checked right before the expensive work:
+
+1. Keys are (record_id, transition, version) - version is a hash of the
+   inputs the action depends on (content_version), so an edited record is a
+   new key while a repeated delivery of the same change is not
+2. claim() is a compare-and-set; exactly one caller runs. The claim is a
+   "running" lease, so a caller that dies doesn't block the key forever
+3. finish() keeps a success for `ttl`, and a failure for an optional cooldown
+   (or forgets it, so the next trigger retries straight away)
+4. Expired keys are evicted every few claims and the store is capped at
+   max_entries (oldest expiry first)
+5. Backends: modal.Dict (cloud), SqliteIdempotencyStore (local servers,
+   shared across processes) or a plain dict (tests)
+
+Example:
+    keys = IdempotencyStore(SqliteIdempotencyStore(".tmp/idempotency.sqlite"))
+
+    key = keys.claim(record_id, "generate_proposal", content_version(title, description))
+    if key is None:
+        return  # already done (or in progress) for this version
+    ok = generate_proposal(...)
+    keys.finish(key, ok, cooldown=300)
+"""
+
+import hashlib
+import json
+import logging
+import secrets
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .slot_leases import put_if_absent
+
+logger = logging.getLogger(__name__)
+
+# Shared by every Modal function that guards an expensive action
+IDEMPOTENCY_DICT_NAME = "idempotency-keys"
+
+DEFAULT_TTL = 7 * 86400      # remember completed actions for a week
+DEFAULT_LEASE = 3600         # longest an action may run before others may take over
+DEFAULT_MAX_ENTRIES = 10000
+
+RUNNING, DONE, FAILED = "running", "done", "failed"
+
+
+def content_version(*values: Any) -> str:
+    """Short stable hash of the inputs an action depends on."""
+    raw = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+class SqliteIdempotencyStore:
+    """SQLite backend with an indexed expiry column (local servers)"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite file (created on first use)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS idempotency_keys "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idempotency_expires ON idempotency_keys (expires);"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        return conn
+
+    def acquire(self, key: str, value: Dict, now: float) -> bool:
+        """Store `value` if `key` is absent or expired; True if it was stored."""
+        cursor = self._conn().execute(
+            "INSERT INTO idempotency_keys (key, value, expires) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires = excluded.expires "
+            "WHERE idempotency_keys.expires <= ?",
+            (key, json.dumps(value), value["expires"], now),
+        )
+        return cursor.rowcount == 1
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self._conn().execute("SELECT value FROM idempotency_keys WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def __setitem__(self, key: str, value: Dict) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO idempotency_keys (key, value, expires) VALUES (?, ?, ?)",
+            (key, json.dumps(value), value["expires"]),
+        )
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        value = self.get(key, default)
+        self._conn().execute("DELETE FROM idempotency_keys WHERE key = ?", (key,))
+        return value
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM idempotency_keys").fetchone()[0]
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        for key, value in self._conn().execute("SELECT key, value FROM idempotency_keys").fetchall():
+            yield key, json.loads(value)
+
+    def evict(self, now: float, max_entries: int) -> int:
+        """Delete expired keys, then the soonest-expiring ones beyond max_entries."""
+        conn = self._conn()
+        removed = conn.execute("DELETE FROM idempotency_keys WHERE expires <= ?", (now,)).rowcount
+        removed += conn.execute(
+            "DELETE FROM idempotency_keys WHERE key IN ("
+            "SELECT key FROM idempotency_keys ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (max_entries,),
+        ).rowcount
+        return removed
+
+
+class IdempotencyStore:
+    """Claim-once keys per (record, transition, version) with TTL eviction"""
+
+    def __init__(
+        self,
+        store: Any,
+        ttl: float = DEFAULT_TTL,
+        lease: float = DEFAULT_LEASE,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        sweep_every: int = 100,
+    ):
+        """
+        Args:
+            store: modal.Dict, SqliteIdempotencyStore, or a dict (single process)
+            ttl: Seconds a completed action stays claimed
+            lease: Seconds a running claim blocks others
+            max_entries: Size cap enforced on each sweep
+            sweep_every: Claims between eviction sweeps
+        """
+        self.store = store
+        self.ttl = ttl
+        self.lease = lease
+        self.max_entries = max_entries
+        self.sweep_every = sweep_every
+        self.claimed = 0
+        self.duplicates = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(record_id: str, transition: str, version: str = "") -> str:
+        return f"{transition}/{record_id}/{version}"
+
+    def _acquire(self, key: str, value: Dict, now: float) -> bool:
+        if hasattr(self.store, "acquire"):
+            return self.store.acquire(key, value, now)
+
+        if put_if_absent(self.store, key, value):
+            return True
+        current = self.store.get(key)
+        if current is None:
+            # Released between our put and get
+            return put_if_absent(self.store, key, value)
+        if current.get("expires", 0) > now:
+            return False
+
+        # Expired claim: only the caller that wins the one-shot takeover key replaces it
+        if not put_if_absent(self.store, f"{key}@{current.get('nonce')}", {"expires": now + self.lease}):
+            return False
+        self.store[key] = value
+        return True
+
+    def claim(self, record_id: str, transition: str, version: str = "") -> Optional[str]:
+        """
+        Claim an action before doing it.
+
+        Returns:
+            The key to pass to finish(), or None if this (record, transition,
+            version) is done, cooling down after a failure, or running elsewhere
+        """
+        key = self.key(record_id, transition, version)
+        now = time.time()
+        value = {"state": RUNNING, "expires": now + self.lease, "nonce": secrets.token_hex(8)}
+
+        try:
+            acquired = self._acquire(key, value, now)
+        except Exception as e:
+            # A broken store must not stop the pipeline; worst case is a duplicate
+            logger.error(f"Idempotency store error for {key}: {e}")
+            return key
+
+        with self._lock:
+            if acquired:
+                self.claimed += 1
+                sweep = self.claimed % self.sweep_every == 0
+            else:
+                self.duplicates += 1
+                sweep = False
+
+        if not acquired:
+            current = self.store.get(key) or {}
+            logger.info(f"⏭️ Skipping duplicate {transition} for {record_id} ({current.get('state', 'claimed')})")
+            return None
+
+        if sweep:
+            self.evict()
+        return key
+
+    def finish(self, key: str, ok: bool, cooldown: float = 0) -> None:
+        """
+        Record the outcome of a claimed action.
+
+        Args:
+            key: Key returned by claim()
+            ok: Whether the action succeeded (kept for ttl)
+            cooldown: On failure, seconds to keep suppressing the key (0 = retry on the next trigger)
+        """
+        now = time.time()
+        try:
+            if ok:
+                self.store[key] = {"state": DONE, "expires": now + self.ttl, "nonce": secrets.token_hex(8)}
+            elif cooldown:
+                self.store[key] = {"state": FAILED, "expires": now + cooldown, "nonce": secrets.token_hex(8)}
+            else:
+                self.store.pop(key, None)
+        except Exception as e:
+            logger.error(f"Idempotency store error for {key}: {e}")
+
+    def evict(self) -> int:
+        """Drop expired keys and cap the store at max_entries; returns how many were removed."""
+        now = time.time()
+        try:
+            if hasattr(self.store, "evict"):
+                removed = self.store.evict(now, self.max_entries)
+            else:
+                entries = sorted(
+                    ((value or {}).get("expires", 0), key) for key, value in list(self.store.items())
+                )
+                expired = [key for expires, key in entries if expires <= now]
+                live = [key for expires, key in entries if expires > now]
+                overflow = live[:max(0, len(live) - self.max_entries)]
+                for key in expired + overflow:
+                    self.store.pop(key, None)
+                removed = len(expired) + len(overflow)
+        except Exception as e:
+            logger.error(f"Idempotency eviction failed: {e}")
+            return 0
+
+        if removed:
+            logger.info(f"Evicted {removed} idempotency key(s)")
+        return removed
+
+    def stats(self) -> Dict:
+        """Claims and skipped duplicates in this process, plus the store size."""
+        try:
+            entries = len(self.store)
+        except Exception:
+            entries = None
+        return {"claimed": self.claimed, "duplicates_skipped": self.duplicates, "entries": entries}
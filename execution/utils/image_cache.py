@@ -0,0 +1,217 @@
+"""
+Image Cache: Content-addressed store for generated post images
+
+Every "Pending Review" re-trigger and every image revision used to run a
+fresh 30-120s Replicate prediction, even when the Image Prompt hadn't
+changed. ImageCache keys images by a hash of model + normalized prompt +
+dimensions and keeps the image bytes plus the hosted URL they came from,
+so a repeat request is answered from disk.
+
+Replicate's output URLs expire about an hour after the prediction, so a
+cached URL is only reused while fresh; after that the bytes are attached to
+Airtable directly (see attach_image()).
+
+The cache is a plain directory (a Modal Volume in the cloud, .tmp/image_cache
+locally) with least-recently-used eviction once it grows past max_bytes.
+
+Example:
+    cache = ImageCache()
+    key = image_cache_key(model, prompt, 1200, 1200)
+    cached = cache.get(key)
+    if not cached:
+        ...  # run the prediction
+        cached = cache.put_from_url(key, image_url)
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = ".tmp/image_cache"
+
+DEFAULT_MAX_BYTES = int(os.environ.get("IMAGE_CACHE_MAX_MB", "1024")) * 1024 * 1024
+
+# Replicate delivery URLs expire after an hour; leave a margin for Airtable's fetch
+HOSTED_URL_TTL = timedelta(minutes=50)
+
+_EXTENSIONS = {"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp"}
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace and case so trivially different prompts share an entry."""
+    return ' '.join((prompt or '').split()).casefold()
+
+
+def image_cache_key(model: str, prompt: str, width: int, height: int, negative_prompt: Optional[str] = None) -> str:
+    """Content address for an image request."""
+    spec = json.dumps([model, normalize_prompt(prompt), int(width), int(height), normalize_prompt(negative_prompt)])
+    return hashlib.sha256(spec.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class CachedImage:
+    """One cached image: bytes on disk plus the URL it was generated at"""
+    key: str
+    path: Path
+    url: Optional[str]
+    content_type: str
+    size: int
+    created_at: str
+
+    def url_is_fresh(self, now: Optional[datetime] = None) -> bool:
+        if not self.url:
+            return False
+        now = now or datetime.now(timezone.utc)
+        return now - datetime.fromisoformat(self.created_at) < HOSTED_URL_TTL
+
+    @property
+    def filename(self) -> str:
+        return f"{self.key[:16]}{_EXTENSIONS.get(self.content_type, '.png')}"
+
+    def read_bytes(self) -> bytes:
+        return self.path.read_bytes()
+
+
+class ImageCache:
+    """Directory of images addressed by request hash, with LRU size eviction"""
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            root: Cache directory (created on first write)
+            max_bytes: Size the cache is trimmed back to after each write
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    def _paths(self, key: str):
+        folder = self.root / key[:2]
+        return folder / f"{key}.bin", folder / f"{key}.json"
+
+    def get(self, key: str) -> Optional[CachedImage]:
+        """Look up an image; a hit marks it most recently used."""
+        data_path, meta_path = self._paths(key)
+        if not data_path.exists() or not meta_path.exists():
+            return None
+
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            os.utime(data_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable image cache entry {key[:12]}: {e}")
+            return None
+
+        return CachedImage(key, data_path, meta.get('url'), meta.get('content_type', 'image/png'),
+                           data_path.stat().st_size, meta['created_at'])
+
+    def put(self, key: str, data: bytes, url: Optional[str] = None,
+            content_type: str = "image/png", meta: Optional[Dict] = None) -> CachedImage:
+        """Store image bytes (atomically) and evict old entries if over budget."""
+        data_path, meta_path = self._paths(key)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+
+        created_at = datetime.now(timezone.utc).isoformat()
+        record = {**(meta or {}), 'url': url, 'content_type': content_type, 'size': len(data), 'created_at': created_at}
+
+        tmp_data = data_path.with_suffix('.bin.tmp')
+        tmp_data.write_bytes(data)
+        tmp_data.replace(data_path)
+
+        tmp_meta = meta_path.with_suffix('.json.tmp')
+        with open(tmp_meta, 'w') as f:
+            json.dump(record, f)
+        tmp_meta.replace(meta_path)
+
+        self.evict()
+        return CachedImage(key, data_path, url, content_type, len(data), created_at)
+
+    def put_from_url(self, key: str, url: str, meta: Optional[Dict] = None, timeout: int = 60) -> Optional[CachedImage]:
+        """Download a generated image into the cache. Returns None on failure."""
+        try:
+            response = requests.get(url, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to download image for cache: {e}")
+            return None
+
+        if response.status_code != 200:
+            logger.error(f"Failed to download image for cache: {response.status_code}")
+            return None
+
+        content_type = response.headers.get('Content-Type', 'image/png').split(';')[0]
+        return self.put(key, response.content, url=url, content_type=content_type, meta=meta)
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits max_bytes. Returns entries removed."""
+        if not self.root.exists():
+            return 0
+
+        entries = []
+        total = 0
+        for data_path in self.root.glob('*/*.bin'):
+            try:
+                stat = data_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, data_path))
+            total += stat.st_size
+
+        removed = 0
+        for _, size, data_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            data_path.unlink(missing_ok=True)
+            data_path.with_suffix('.json').unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        if removed:
+            logger.info(f"Image cache: evicted {removed} least recently used image(s)")
+        return removed
+
+
+def attach_image(client, record_id: str, cached: CachedImage, field: str = "Image",
+                 extra_fields: Optional[Dict] = None, url_field: Optional[str] = None) -> bool:
+    """
+    Set a record's image attachment from a cached image.
+
+    Reuses the hosted URL while it's fresh; otherwise clears the field and
+    uploads the cached bytes (AirtableClient.upload_attachment). If url_field
+    is given (e.g. "Image URL"), it's kept in step with the attachment: the
+    fresh hosted URL, or the uploaded attachment's URL (cleared if Airtable
+    doesn't return one), never the previous image's URL.
+    """
+    fields = dict(extra_fields or {})
+
+    if cached.url_is_fresh():
+        fields[field] = [{"url": cached.url}]
+        if url_field:
+            fields[url_field] = cached.url
+        return client.update_record(record_id, fields) is not None
+
+    fields[field] = []
+    if url_field:
+        fields[url_field] = None
+    if client.update_record(record_id, fields) is None:
+        return False
+
+    uploaded = client.upload_attachment(record_id, field, cached.read_bytes(), cached.filename, cached.content_type)
+    if uploaded is None:
+        return False
+
+    if url_field:
+        # The upload response keys fields by ID; the attachment list is the one with URLs
+        for value in (uploaded.get("fields") or {}).values():
+            if isinstance(value, list) and value and isinstance(value[-1], dict) and value[-1].get("url"):
+                client.update_record(record_id, {url_field: value[-1]["url"]})
+                break
+    return True
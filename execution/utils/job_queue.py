@@ -0,0 +1,401 @@
+"""
+Job Queue: Durable SQLite work queue with bounded worker pools per action
+
+The Flask webhook servers started a raw thread for every event, so a burst
+of 50 Airtable events meant 50 threads, 50 Claude calls and 50 Chrome
+instances at once, and anything in flight was lost on restart. JobQueue
+replaces that with:
+
+1. A jobs table in SQLite - enqueued work survives restarts; jobs a dead
+   process left "running" go back to pending on start() (so each queue
+   file belongs to one server process)
+2. One worker pool per action with its own concurrency (e.g. 4 LLM
+   generations, 1 browser submission) and an optional minimum spacing
+   between job starts
+3. Backpressure - enqueue() raises QueueFull once an action has max_pending
+   jobs waiting or running (the servers answer 429)
+4. Retries with exponential backoff when a handler raises or returns False,
+   up to max_attempts (then on_failed, if set, gets the payload)
+5. Duplicate suppression - a key (e.g. "rec123:submit") can only be queued
+   once while pending or running
+6. status() - depth, in-flight jobs and recent failures per action;
+   get() - one job, including what its handler returned
+
+Example:
+    queue = JobQueue(".tmp/webhook_jobs.sqlite", {
+        "generate": ActionConfig(handle_generate, concurrency=4),
+        "submit": ActionConfig(handle_submit, concurrency=1, spacing=30),
+    }).start()
+
+    try:
+        queue.enqueue("submit", {"record_id": record_id}, key=f"{record_id}:submit")
+    except QueueFull as e:
+        return jsonify({"error": str(e)}), 429
+"""
+
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    action TEXT NOT NULL,
+    key TEXT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    last_error TEXT,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (action, status, available_at);
+CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, status);
+"""
+
+
+class QueueFull(Exception):
+    """Raised by enqueue() when an action is at capacity"""
+
+    def __init__(self, action: str, depth: int, retry_after: int = 30):
+        super().__init__(f"Queue for '{action}' is full ({depth} jobs pending or running)")
+        self.action = action
+        self.depth = depth
+        self.retry_after = retry_after
+
+
+@dataclass
+class ActionConfig:
+    """Worker pool settings for one kind of job"""
+    handler: Callable[[Dict], Any]  # returns False (or raises) to retry; other values are kept as the result
+    concurrency: int = 1            # workers running this action at once
+    max_pending: int = 100          # pending + running jobs before QueueFull
+    max_attempts: int = 3
+    backoff: float = 30.0           # first retry delay; doubles per attempt
+    backoff_max: float = 600.0
+    spacing: float = 0.0            # minimum seconds between job starts
+    on_failed: Optional[Callable[[Dict, str], Any]] = None  # called with (payload, error) after the last attempt
+
+
+class JobQueue:
+    """SQLite-backed queue drained by per-action worker threads"""
+
+    def __init__(
+        self,
+        path: str,
+        actions: Dict[str, ActionConfig],
+        poll_interval: float = 1.0,
+        keep_days: float = 7,
+    ):
+        """
+        Args:
+            path: SQLite file (created on first use)
+            actions: Action name -> handler and pool settings
+            poll_interval: Longest a worker sleeps before re-checking for due retries
+            keep_days: Finished jobs older than this are deleted on start()
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.actions = actions
+        self.poll_interval = poll_interval
+        self.keep_days = keep_days
+
+        self._local = threading.local()
+        self._wake = {action: threading.Event() for action in actions}
+        self._start_locks = {action: threading.Lock() for action in actions}
+        self._next_start = {action: 0.0 for action in actions}
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "result" not in columns:
+            # Queue files created before results were kept
+            conn.execute("ALTER TABLE jobs ADD COLUMN result TEXT")
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; SQLite serializes writers across threads and processes
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _transaction(self, work: Callable[[sqlite3.Connection], Any]) -> Any:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = work(conn)
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ============== Producers ==============
+
+    def enqueue(self, action: str, payload: Dict, key: Optional[str] = None, delay: float = 0) -> Optional[int]:
+        """
+        Add a job.
+
+        Returns:
+            Job ID, or None if a job with the same key is already pending or running
+
+        Raises:
+            QueueFull: the action already has max_pending jobs pending or running
+        """
+        config = self.actions[action]
+        now = time.time()
+
+        def insert(conn):
+            if key is not None:
+                duplicate = conn.execute(
+                    "SELECT id FROM jobs WHERE key = ? AND status IN (?, ?)", (key, PENDING, RUNNING)
+                ).fetchone()
+                if duplicate:
+                    return None
+
+            depth = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE action = ? AND status IN (?, ?)", (action, PENDING, RUNNING)
+            ).fetchone()[0]
+            if depth >= config.max_pending:
+                raise QueueFull(action, depth)
+
+            cursor = conn.execute(
+                "INSERT INTO jobs (action, key, payload, available_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (action, key, json.dumps(payload, default=str), now + delay, now),
+            )
+            return cursor.lastrowid
+
+        job_id = self._transaction(insert)
+        if job_id is not None:
+            self._wake[action].set()
+        return job_id
+
+    # ============== Workers ==============
+
+    def start(self) -> "JobQueue":
+        """Requeue jobs orphaned by a previous process and start the worker pools."""
+        cutoff = time.time() - self.keep_days * 86400
+
+        def recover(conn):
+            orphaned = conn.execute(
+                "UPDATE jobs SET status = ?, available_at = ? WHERE status = ?", (PENDING, time.time(), RUNNING)
+            ).rowcount
+            conn.execute("DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?", (DONE, FAILED, cutoff))
+            return orphaned
+
+        orphaned = self._transaction(recover)
+        if orphaned:
+            logger.warning(f"Requeued {orphaned} job(s) left running by a previous process")
+
+        self._stopping.clear()
+        for action, config in self.actions.items():
+            for n in range(config.concurrency):
+                thread = threading.Thread(target=self._worker, args=(action,), name=f"jobs-{action}-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+        pools = ", ".join(f"{action}×{config.concurrency}" for action, config in self.actions.items())
+        logger.info(f"Job queue started: {pools}")
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers after their current job."""
+        self._stopping.set()
+        for event in self._wake.values():
+            event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _claim(self, action: str) -> Optional[tuple]:
+        now = time.time()
+
+        def claim(conn):
+            row = conn.execute(
+                "SELECT id, key, payload, attempts FROM jobs "
+                "WHERE action = ? AND status = ? AND available_at <= ? ORDER BY available_at, id LIMIT 1",
+                (action, PENDING, now),
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ? WHERE id = ?",
+                    (RUNNING, now, row[0]),
+                )
+            return row
+
+        return self._transaction(claim)
+
+    def _next_job(self, action: str) -> Optional[tuple]:
+        """Claim the next due job, honouring the action's spacing."""
+        config = self.actions[action]
+        with self._start_locks[action]:
+            now = time.time()
+            if now < self._next_start[action]:
+                return None
+            job = self._claim(action)
+            if job and config.spacing:
+                self._next_start[action] = now + config.spacing
+            return job
+
+    def _worker(self, action: str) -> None:
+        config = self.actions[action]
+        wake = self._wake[action]
+
+        while not self._stopping.is_set():
+            try:
+                job = self._next_job(action)
+            except sqlite3.Error as e:
+                logger.error(f"Job queue error ({action}): {e}")
+                job = None
+
+            if job is None:
+                wake.wait(self.poll_interval)
+                wake.clear()
+                continue
+
+            job_id, key, payload, attempts = job
+            attempt = attempts + 1
+            error = result = None
+            try:
+                result = config.handler(json.loads(payload))
+                ok = result is not False
+                if not ok:
+                    error = "handler reported failure"
+            except Exception as e:
+                ok = False
+                error = f"{type(e).__name__}: {e}"
+                logger.error(f"Job {job_id} ({action} {key or ''}) raised {error}")
+
+            status = self._finish(job_id, action, attempt, ok, error, result if ok else None)
+            if status == FAILED and config.on_failed:
+                try:
+                    config.on_failed(json.loads(payload), error)
+                except Exception as e:
+                    logger.error(f"on_failed for job {job_id} ({action}) raised {type(e).__name__}: {e}")
+
+    def _finish(self, job_id: int, action: str, attempt: int, ok: bool, error: Optional[str], result: Any = None) -> str:
+        config = self.actions[action]
+        now = time.time()
+
+        if ok:
+            status, available_at = DONE, now
+        elif attempt < config.max_attempts:
+            delay = min(config.backoff * (2 ** (attempt - 1)), config.backoff_max)
+            # Jitter keeps a burst of failures from retrying in lockstep
+            delay += random.uniform(0, delay * 0.1)
+            status, available_at = PENDING, now + delay
+            logger.warning(f"Job {job_id} ({action}) attempt {attempt}/{config.max_attempts} failed - retrying in {delay:.0f}s")
+        else:
+            status, available_at = FAILED, now
+            logger.error(f"Job {job_id} ({action}) failed after {attempt} attempts: {error}")
+
+        stored = None
+        if result is not None and result is not True:
+            try:
+                stored = json.dumps(result, default=str)
+            except (TypeError, ValueError):
+                logger.warning(f"Job {job_id} ({action}) returned a result that can't be stored")
+
+        self._transaction(lambda conn: conn.execute(
+            "UPDATE jobs SET status = ?, available_at = ?, finished_at = ?, last_error = ?, result = ? WHERE id = ?",
+            (status, available_at, now if status in (DONE, FAILED) else None, error, stored, job_id),
+        ))
+        return status
+
+    # ============== Reporting ==============
+
+    def status(self, recent_failures: int = 5) -> Dict:
+        """Queue depth, in-flight jobs and recent failures per action."""
+        conn = self._conn()
+        now = time.time()
+        report = {}
+
+        for action, config in self.actions.items():
+            counts = dict(conn.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE action = ? GROUP BY status", (action,)
+            ).fetchall())
+            oldest = conn.execute(
+                "SELECT MIN(created_at) FROM jobs WHERE action = ? AND status = ?", (action, PENDING)
+            ).fetchone()[0]
+            running = conn.execute(
+                "SELECT id, key, attempts, started_at FROM jobs WHERE action = ? AND status = ? ORDER BY started_at",
+                (action, RUNNING),
+            ).fetchall()
+            failures = conn.execute(
+                "SELECT id, key, last_error, finished_at FROM jobs WHERE action = ? AND status = ? "
+                "ORDER BY finished_at DESC LIMIT ?",
+                (action, FAILED, recent_failures),
+            ).fetchall()
+
+            report[action] = {
+                "concurrency": config.concurrency,
+                "capacity": config.max_pending,
+                "pending": counts.get(PENDING, 0),
+                "running": counts.get(RUNNING, 0),
+                "done": counts.get(DONE, 0),
+                "failed": counts.get(FAILED, 0),
+                "oldest_pending_seconds": round(now - oldest, 1) if oldest else None,
+                "in_flight": [
+                    {"id": job_id, "key": key, "attempt": attempts, "running_seconds": round(now - started_at, 1)}
+                    for job_id, key, attempts, started_at in running
+                ],
+                "recent_failures": [
+                    {"id": job_id, "key": key, "error": error}
+                    for job_id, key, error, _ in failures
+                ],
+            }
+
+        return report
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        """One job's state and result, or None if it doesn't exist (or was pruned)."""
+        row = self._conn().execute(
+            "SELECT id, action, key, status, attempts, created_at, started_at, finished_at, last_error, result "
+            "FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        job_id, action, key, status, attempts, created_at, started_at, finished_at, error, result = row
+        return {
+            "id": job_id,
+            "action": action,
+            "key": key,
+            "status": status,
+            "attempts": attempts,
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "error": error,
+            "result": json.loads(result) if result else None,
+        }
+
+    def wait_idle(self, timeout: float = 60) -> bool:
+        """Block until nothing is pending or running (True) or the timeout passes (False)."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            busy = self._conn().execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (PENDING, RUNNING)
+            ).fetchone()[0]
+            if not busy:
+                return True
+            time.sleep(0.05)
+        return False
@@ -0,0 +1,48 @@
+"""
+JSON Store: dict-like key-value store persisted to a JSON file
+
+Local stand-in for modal.Dict in the state-keeping helpers (seen jobs,
+change feed, delta poller). Writes go to a temp file and are renamed into
+place, so a crash never leaves a half-written file. update() and pop()
+write once per call, so callers that batch their changes pay one write.
+"""
+
+import json
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class JsonFileStore(dict):
+    """Minimal dict-like store persisted to a JSON file (local runs)"""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = Path(path)
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    super().update(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read {self.path}: {e}")
+
+    def _write(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(dict(self), f)
+        tmp_path.replace(self.path)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._write()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._write()
+
+    def pop(self, key, *default):
+        value = super().pop(key, *default)
+        self._write()
+        return value
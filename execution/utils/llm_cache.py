@@ -0,0 +1,296 @@
+"""
+LLM Cache: Persistent response cache for deterministic Claude calls
+
+Proofreading, image-prompt generation, job-insight extraction and the
+educational enrichments are re-invoked with byte-identical requests on
+retries, re-runs after a timeout and QC loops, and each repeat used to be
+paid for again. CachedAnthropic wraps an Anthropic client so that
+messages.create() first looks the request up by a hash of its parameters
+(model, system, messages, max_tokens, temperature and anything else passed).
+
+Two backends with the same interface:
+1. LLMResponseCache - SQLite file (local runs), TTL + max-entries LRU eviction
+2. DictResponseCache - modal.Dict or dict (Modal containers share no disk)
+
+Caching is opt-in: cached_client() only enables it when LLM_CACHE=1, and any
+call can skip it with cache_bypass=True (creative steps that must vary).
+Cache hits report zero usage so cost logging stays truthful.
+
+Example:
+    client = cached_client(anthropic.Anthropic())
+    message = client.messages.create(model=..., max_tokens=400, messages=[...])
+    client.messages.create(..., cache_bypass=True)    # always live
+    print(client.cache.stats())
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, MutableMapping, Optional
+
+from .tracing import Span, span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = ".tmp/llm_cache.sqlite"
+
+DEFAULT_TTL = float(os.environ.get("LLM_CACHE_TTL_HOURS", "168")) * 3600
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+# Truncated or refused answers are not worth replaying
+CACHEABLE_STOP_REASONS = ("end_turn", "stop_sequence")
+
+
+def llm_cache_enabled() -> bool:
+    """True when LLM_CACHE is set to 1/true/yes."""
+    return os.environ.get("LLM_CACHE", "").strip().lower() in ("1", "true", "yes")
+
+
+def request_key(params: Dict) -> str:
+    """Stable hash of a messages.create() request."""
+    spec = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(spec.encode("utf-8")).hexdigest()
+
+
+class _CacheStats:
+    """Per-process hit/miss counters shared by both backends"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self),
+        }
+
+
+class LLMResponseCache(_CacheStats):
+    """SQLite-backed response cache with TTL and least-recently-used eviction"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            path: SQLite file (created on first use)
+            ttl: Seconds an entry stays valid
+            max_entries: Entries kept after each write (least recently used go first)
+        """
+        super().__init__()
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per operation keeps the cache safe across threads
+        return sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached response for `key`, or None (expired entries are dropped)."""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row:
+                conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+
+        self._count(row is not None)
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, response: Dict) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(response), now, now),
+            )
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries, then the least recently used beyond max_entries. Returns rows removed."""
+        with self._connect() as conn:
+            removed = conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)).rowcount
+            removed += conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        return removed
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class DictResponseCache(_CacheStats):
+    """Response cache in a modal.Dict (or dict) for containers without shared disk"""
+
+    def __init__(self, store: MutableMapping, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            store: modal.Dict or dict holding {key: {'response', 'created_at'}}
+            ttl: Seconds an entry stays valid
+            max_entries: Entries kept by evict()
+        """
+        super().__init__()
+        self.store = store
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self.store.get(key)
+        if entry and time.time() - entry["created_at"] > self.ttl:
+            self.store.pop(key, None)
+            entry = None
+
+        self._count(entry is not None)
+        return entry["response"] if entry else None
+
+    def put(self, key: str, response: Dict) -> None:
+        self.store[key] = {"response": response, "created_at": time.time()}
+
+    def evict(self) -> int:
+        """
+        Drop expired entries, then the oldest beyond max_entries.
+
+        Reads every entry, so call it once per run (e.g. from the orchestrator)
+        rather than after each write.
+        """
+        cutoff = time.time() - self.ttl
+        entries = sorted((entry["created_at"], key) for key, entry in self.store.items())
+        stale = [key for created_at, key in entries if created_at < cutoff]
+        live = [key for created_at, key in entries if created_at >= cutoff]
+        stale += live[:max(0, len(live) - self.max_entries)]
+        for key in stale:
+            self.store.pop(key, None)
+        return len(stale)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+
+class _CachedMessages:
+    """messages namespace of CachedAnthropic; everything but create() passes through"""
+
+    def __init__(self, owner: "CachedAnthropic"):
+        self._owner = owner
+        self._messages = owner.client.messages
+
+    def create(self, cache_bypass: bool = False, **params):
+        """
+        client.messages.create() with a cache lookup in front.
+
+        Args:
+            cache_bypass: Always call the API and don't store the answer
+            **params: Regular messages.create() parameters
+        """
+        with span("anthropic.messages.create", model=params.get("model")) as call_span:
+            message = self._create(params, cache_bypass, call_span)
+            usage = getattr(message, "usage", None)
+            if usage is not None:
+                call_span.set(
+                    input_tokens=getattr(usage, "input_tokens", None),
+                    output_tokens=getattr(usage, "output_tokens", None),
+                    cache_read_tokens=getattr(usage, "cache_read_input_tokens", None),
+                    cache_write_tokens=getattr(usage, "cache_creation_input_tokens", None),
+                    stop_reason=getattr(message, "stop_reason", None),
+                )
+            return message
+
+    def _create(self, params: Dict, cache_bypass: bool, call_span: Span):
+        cache = self._owner.cache
+        if cache is None or cache_bypass or params.get("stream"):
+            return self._messages.create(**params)
+
+        key = request_key(params)
+        try:
+            cached = cache.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            cached = None
+
+        call_span.set(cache_hit=cached is not None)
+        if cached is not None:
+            logger.info(f"♻️ LLM cache hit ({params.get('model')})")
+            return self._owner.rebuild(cached)
+
+        message = self._messages.create(**params)
+        if getattr(message, "stop_reason", None) in CACHEABLE_STOP_REASONS and hasattr(message, "model_dump"):
+            try:
+                cache.put(key, message.model_dump(mode="json"))
+            except Exception as e:
+                logger.warning(f"LLM cache write failed: {e}")
+        return message
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._messages, name)
+
+
+class CachedAnthropic:
+    """Anthropic client wrapper whose messages.create() consults a response cache"""
+
+    def __init__(self, client, cache=None):
+        """
+        Args:
+            client: anthropic.Anthropic instance
+            cache: LLMResponseCache / DictResponseCache, or None to pass every call through
+        """
+        self.client = client
+        self.cache = cache
+        self.messages = _CachedMessages(self)
+
+    @staticmethod
+    def rebuild(response: Dict):
+        """SDK Message from a cached dump, with zero usage (a hit costs nothing)."""
+        from anthropic.types import Message
+
+        return Message.model_validate({**response, "usage": {"input_tokens": 0, "output_tokens": 0}})
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+
+def cached_client(client, cache=None) -> CachedAnthropic:
+    """
+    Wrap `client` for opt-in caching.
+
+    With LLM_CACHE unset the wrapper passes every call straight through (so
+    call sites can always pass cache_bypass). `cache` defaults to the SQLite
+    cache at LLM_CACHE_PATH.
+    """
+    if not llm_cache_enabled():
+        return CachedAnthropic(client)
+    if cache is None:
+        cache = LLMResponseCache(os.environ.get("LLM_CACHE_PATH", DEFAULT_CACHE_PATH))
+    return CachedAnthropic(client, cache)
@@ -0,0 +1,342 @@
+"""
+Near-Duplicate Index: MinHash/LSH lookup for post duplicate and hook checks
+
+PostQualityChecker used to run difflib.SequenceMatcher against every post in
+the archive for every candidate post. NearDuplicateIndex keeps a MinHash
+signature of each post's word shingles, bucketed with LSH, so a lookup only
+touches posts that share a band with the new one. difflib then verifies the
+few best candidates, so reported similarities are still real difflib ratios.
+
+Hooks (first line of each post) get an inverted word index, which gives the
+same word-overlap numbers as the old pairwise loop without visiting every post.
+
+The index is persisted as JSON and synced incrementally: only records that are
+new or whose content changed get re-hashed. Only a complete Airtable listing
+(complete=True) removes posts, so a partial or failed fetch never empties it.
+
+Example:
+    index = NearDuplicateIndex(".tmp/near_duplicate_index.json").load()
+    if index.sync(existing_records, complete=True):
+        index.save()
+    similarity, title = index.max_similarity(content, verify=difflib_ratio)
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = ".tmp/near_duplicate_index.json"
+
+INDEX_VERSION = 1
+
+# 32 bands x 2 rows: a post sharing ~30% of its 3-word shingles with an
+# existing post becomes a candidate ~95% of the time; unrelated posts
+# (<5% overlap) rarely do
+NUM_PERM = 64
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+# Candidates verified with difflib, best MinHash estimate first
+VERIFY_TOP_K = 3
+
+_EMPTY = (1 << 64) - 1
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace (same normalization as the difflib check)."""
+    return ' '.join((text or '').lower().split())
+
+
+def hook_words(content: str) -> set:
+    """Word set of a post's first line, as used by the hook repetition check."""
+    lines = (content or '').split('\n')
+    hook = lines[0].strip() if lines else ''
+    return set(hook.lower().split())
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _shingles(normalized: str) -> set:
+    words = normalized.split()
+    if len(words) <= SHINGLE_SIZE:
+        return {_hash64(normalized)} if normalized else set()
+    return {_hash64(' '.join(words[i:i + SHINGLE_SIZE])) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(normalized: str) -> List[int]:
+    """
+    One-permutation MinHash over the word shingles of already-normalized text.
+
+    Each shingle is hashed once; the low bits pick one of NUM_PERM bins and
+    the bin keeps its minimum. Empty bins borrow from the next non-empty bin
+    (rotation densification), so two signatures still agree per position
+    with probability ~Jaccard, at ~1/NUM_PERM of the hashing cost.
+    """
+    signature = [_EMPTY] * NUM_PERM
+    for h in _shingles(normalized):
+        bin_index = h % NUM_PERM
+        value = h // NUM_PERM
+        if value < signature[bin_index]:
+            signature[bin_index] = value
+
+    filled = [i for i, value in enumerate(signature) if value != _EMPTY]
+    if not filled or len(filled) == NUM_PERM:
+        return signature
+
+    dense = list(signature)
+    for i in range(NUM_PERM):
+        if signature[i] == _EMPTY:
+            distance = 1
+            while signature[(i + distance) % NUM_PERM] == _EMPTY:
+                distance += 1
+            dense[i] = signature[(i + distance) % NUM_PERM] + distance * _EMPTY
+    return dense
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b((text or '').encode('utf-8'), digest_size=16).hexdigest()
+
+
+def record_key(record: Dict) -> str:
+    """Airtable record ID, or a content-derived key for not-yet-uploaded posts."""
+    if record.get('id'):
+        return record['id']
+    return f"pending:{_digest(record.get('fields', {}).get('Post Content', ''))}"
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index over post content plus an inverted index over hooks"""
+
+    def __init__(self, path: Optional[str] = DEFAULT_INDEX_PATH):
+        """
+        Args:
+            path: JSON file the index is persisted to (None keeps it in memory)
+        """
+        self.path = Path(path) if path else None
+        self.posts: Dict[str, Dict] = {}
+        self.synced_at = 0.0
+        self._buckets: Dict[tuple, set] = {}
+        self._hook_index: Dict[str, set] = {}
+        self._digests: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.posts)
+
+    # ---------- Persistence ----------
+
+    def load(self) -> "NearDuplicateIndex":
+        """Load the index from disk; a missing or outdated file starts empty."""
+        self.posts = {}
+        self.synced_at = 0.0
+        if self.path and self.path.exists():
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+                if data.get('version') == INDEX_VERSION and data.get('num_perm') == NUM_PERM:
+                    self.posts = data.get('posts', {})
+                    self.synced_at = data.get('synced_at', 0.0)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not load near-duplicate index, rebuilding: {e}")
+
+        self._rebuild_lookups()
+        return self
+
+    def save(self) -> None:
+        """Write the index to disk atomically."""
+        if not self.path:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'num_perm': NUM_PERM,
+                'synced_at': self.synced_at,
+                'posts': self.posts,
+            }, f)
+        tmp_path.replace(self.path)
+
+    def _rebuild_lookups(self) -> None:
+        self._buckets = {}
+        self._hook_index = {}
+        self._digests = {}
+        for key, entry in self.posts.items():
+            self._link(key, entry)
+
+    # ---------- Updates ----------
+
+    def _band_keys(self, signature: List[int]) -> List[tuple]:
+        return [(band, *signature[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+    def _link(self, key: str, entry: Dict) -> None:
+        self._digests[entry['digest']] = key
+        for band_key in self._band_keys(entry['sig']):
+            self._buckets.setdefault(band_key, set()).add(key)
+        for word in entry['hook']:
+            self._hook_index.setdefault(word, set()).add(key)
+
+    def _unlink(self, key: str, entry: Dict) -> None:
+        if self._digests.get(entry['digest']) == key:
+            del self._digests[entry['digest']]
+        for band_key in self._band_keys(entry['sig']):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+        for word in entry['hook']:
+            keys = self._hook_index.get(word)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._hook_index[word]
+
+    def add(self, key: str, title: str, content: str) -> bool:
+        """
+        Index one post (replacing any previous version under the same key).
+
+        Returns:
+            True if the index changed
+        """
+        digest = _digest(content)
+        existing = self.posts.get(key)
+        if existing and existing['digest'] == digest and existing['title'] == title:
+            return False
+
+        if existing:
+            self._unlink(key, existing)
+
+        normalized = normalize_text(content)
+        entry = {
+            'title': title,
+            'digest': digest,
+            'text': normalized,
+            'sig': minhash_signature(normalized),
+            'hook': sorted(hook_words(content)),
+        }
+        self.posts[key] = entry
+        self._link(key, entry)
+        return True
+
+    def remove(self, key: str) -> bool:
+        """Drop one post. Returns True if it was indexed."""
+        entry = self.posts.pop(key, None)
+        if entry is None:
+            return False
+        self._unlink(key, entry)
+        return True
+
+    def sync(self, records: Iterable[Dict], complete: bool = False) -> bool:
+        """
+        Add or refresh `records` (Airtable-shaped: id + fields).
+
+        Only new or edited posts are re-hashed. With complete=True, `records`
+        is the full Airtable listing: posts missing from it (deleted in
+        Airtable, or pending posts that were dropped) are removed and
+        synced_at is updated.
+
+        Returns:
+            True if the index changed
+        """
+        changed = False
+        seen = set()
+
+        for record in records:
+            fields = record.get('fields', {})
+            content = fields.get('Post Content', '')
+            if not content:
+                continue
+
+            key = record_key(record)
+            seen.add(key)
+            changed |= self.add(key, fields.get('Title', 'Unknown'), content)
+
+        if complete:
+            for key in [key for key in self.posts if key not in seen]:
+                changed |= self.remove(key)
+            self.synced_at = time.time()
+            changed = True
+
+        return changed
+
+    # ---------- Queries ----------
+
+    def candidates(self, content: str) -> List[Tuple[str, float]]:
+        """Posts sharing an LSH band with `content`, as (key, estimated Jaccard), best first."""
+        signature = minhash_signature(normalize_text(content))
+
+        keys = set()
+        for band_key in self._band_keys(signature):
+            keys |= self._buckets.get(band_key, set())
+
+        scored = []
+        for key in keys:
+            other = self.posts[key]['sig']
+            matches = sum(1 for a, b in zip(signature, other) if a == b)
+            scored.append((key, matches / NUM_PERM))
+
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored
+
+    def max_similarity(
+        self,
+        content: str,
+        verify: Callable[[str, str], float],
+        top_k: int = VERIFY_TOP_K,
+    ) -> Tuple[float, str]:
+        """
+        Highest verified similarity to any indexed post.
+
+        Args:
+            content: New post content
+            verify: Exact similarity function (text, existing_text) -> 0.0-1.0
+            top_k: Number of LSH candidates to verify
+
+        Returns:
+            (similarity, title of the closest post); (0.0, "") if no candidates
+        """
+        exact = self._digests.get(_digest(content))
+        if exact is not None:
+            return 1.0, self.posts[exact]['title']
+
+        best_similarity = 0.0
+        best_title = ""
+        for key, _ in self.candidates(content)[:top_k]:
+            entry = self.posts[key]
+            similarity = verify(content, entry['text'])
+            if similarity > best_similarity:
+                best_similarity = similarity
+                best_title = entry['title']
+
+        return best_similarity, best_title
+
+    def hook_overlaps(self, content: str) -> List[Tuple[str, int, float]]:
+        """
+        Hook word overlap with every indexed post that shares a hook word.
+
+        Returns:
+            [(title, common word count, overlap ratio)], highest ratio first;
+            the ratio is common / max(len(new hook), len(existing hook))
+        """
+        words = hook_words(content)
+        counts = Counter()
+        for word in words:
+            counts.update(self._hook_index.get(word, ()))
+
+        overlaps = []
+        for key, common in counts.items():
+            entry = self.posts[key]
+            overlaps.append((entry['title'], common, common / max(len(words), len(entry['hook']))))
+
+        overlaps.sort(key=lambda item: item[2], reverse=True)
+        return overlaps
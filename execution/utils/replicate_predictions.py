@@ -0,0 +1,203 @@
+"""
+Replicate Predictions: Non-blocking image generation helpers
+
+Callers used to create one prediction, then sleep-poll it for minutes before
+starting the next. This module provides:
+1. create_prediction() with an optional completion webhook, so a serverless
+   caller can return immediately and finish in the webhook handler
+2. run_batch(), which keeps up to `max_in_flight` predictions running at once
+   and polls all of them per round, so a batch takes about as long as its
+   slowest prediction instead of the sum of all of them
+3. One pooled session for all Replicate calls in a process
+
+Errors are logged and surface as None, like the Airtable helpers.
+
+Example:
+    replicate = ReplicateClient()
+    replicate.create_prediction(MODEL, {"prompt": prompt}, webhook=callback_url)
+
+    finals = replicate.run_batch(MODEL, [{"prompt": p} for p in prompts], max_in_flight=21)
+    urls = [output_url(p) for p in finals]
+"""
+
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+REPLICATE_API_URL = "https://api.replicate.com/v1"
+
+TERMINAL_STATUSES = ('succeeded', 'failed', 'canceled')
+
+# Predictions kept running at once by run_batch (Replicate queues the rest server-side anyway)
+DEFAULT_MAX_IN_FLIGHT = int(os.environ.get("REPLICATE_MAX_IN_FLIGHT", "24"))
+
+POLL_INTERVAL = 2.0
+
+_session: Optional[requests.Session] = None
+
+
+def get_session() -> requests.Session:
+    """Process-wide keep-alive session for Replicate calls."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+
+def output_url(prediction: Optional[Dict]) -> Optional[str]:
+    """First output URL of a succeeded prediction, or None."""
+    if not prediction or prediction.get('status') != 'succeeded':
+        return None
+    output = prediction.get('output')
+    if isinstance(output, list):
+        return output[0] if output else None
+    return output or None
+
+
+class ReplicateClient:
+    """Thin Replicate predictions client on the shared session"""
+
+    def __init__(
+        self,
+        api_token: Optional[str] = None,
+        api_url: Optional[str] = None,
+        timeout: int = 30,
+        session: Optional[requests.Session] = None,
+    ):
+        """
+        Args:
+            api_token: Replicate token (defaults to REPLICATE_API_TOKEN env var)
+            api_url: Override the API root (REPLICATE_API_URL env var, then the public API)
+            timeout: Per-request timeout in seconds
+            session: Override the shared session
+        """
+        self.api_token = api_token or os.environ.get("REPLICATE_API_TOKEN")
+        self.api_url = (api_url or os.environ.get("REPLICATE_API_URL") or REPLICATE_API_URL).rstrip("/")
+        self.timeout = timeout
+        self.session = session or get_session()
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Token {self.api_token}",
+            "Content-Type": "application/json",
+        }
+
+    def create_prediction(self, version: str, model_input: Dict, webhook: Optional[str] = None) -> Optional[Dict]:
+        """
+        Start a prediction and return it without waiting.
+
+        Args:
+            version: Model version or name
+            model_input: Model input
+            webhook: URL Replicate POSTs the finished prediction to
+
+        Returns:
+            The new prediction (with 'id'), or None on failure
+        """
+        if not self.api_token:
+            logger.error("REPLICATE_API_TOKEN not configured")
+            return None
+
+        payload = {"version": version, "input": model_input}
+        if webhook:
+            payload["webhook"] = webhook
+            payload["webhook_events_filter"] = ["completed"]
+
+        try:
+            response = self.session.post(f"{self.api_url}/predictions", json=payload, headers=self.headers, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to create prediction: {e}")
+            return None
+
+        if response.status_code != 201:
+            logger.error(f"Failed to create prediction: {response.status_code} - {response.text[:200]}")
+            return None
+        return response.json()
+
+    def get_prediction(self, prediction_id: str) -> Optional[Dict]:
+        """Current state of a prediction, or None on failure."""
+        try:
+            response = self.session.get(f"{self.api_url}/predictions/{prediction_id}", headers=self.headers, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error polling prediction {prediction_id}: {e}")
+            return None
+
+        if response.status_code != 200:
+            logger.error(f"Error polling prediction {prediction_id}: {response.status_code}")
+            return None
+        return response.json()
+
+    def wait(self, prediction_id: str, timeout: float = 300, poll_interval: float = POLL_INTERVAL) -> Optional[Dict]:
+        """Poll one prediction until it finishes (for callers without a webhook URL)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            prediction = self.get_prediction(prediction_id)
+            if prediction is None or prediction.get('status') in TERMINAL_STATUSES:
+                return prediction
+            time.sleep(poll_interval)
+
+        logger.error(f"Prediction {prediction_id} timed out after {timeout:.0f}s")
+        return None
+
+    def run_batch(
+        self,
+        version: str,
+        inputs: Sequence[Dict],
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        timeout: float = 300,
+        poll_interval: float = POLL_INTERVAL,
+    ) -> List[Optional[Dict]]:
+        """
+        Run many predictions with up to `max_in_flight` running at once.
+
+        New predictions are started as soon as running ones finish; each poll
+        round checks every running prediction, then sleeps once.
+
+        Args:
+            version: Model version or name
+            inputs: One model input per prediction
+            max_in_flight: Concurrent prediction cap
+            timeout: Per-prediction limit in seconds, from its creation
+            poll_interval: Seconds between poll rounds
+
+        Returns:
+            Final predictions aligned with `inputs` (None where creation,
+            polling or the timeout failed)
+        """
+        results: List[Optional[Dict]] = [None] * len(inputs)
+        pending = list(range(len(inputs)))
+        running: Dict[int, tuple] = {}  # index -> (prediction id, started at)
+
+        while pending or running:
+            while pending and len(running) < max(1, max_in_flight):
+                index = pending.pop(0)
+                prediction = self.create_prediction(version, inputs[index])
+                if prediction:
+                    running[index] = (prediction['id'], time.monotonic())
+                    logger.info(f"Prediction {index + 1}/{len(inputs)} started: {prediction['id']}")
+
+            if not running:
+                break
+
+            time.sleep(poll_interval)
+
+            for index, (prediction_id, started_at) in list(running.items()):
+                prediction = self.get_prediction(prediction_id)
+                if prediction is None:
+                    del running[index]
+                elif prediction.get('status') in TERMINAL_STATUSES:
+                    if prediction['status'] != 'succeeded':
+                        logger.error(f"Prediction {prediction_id} {prediction['status']}: {prediction.get('error')}")
+                    results[index] = prediction
+                    del running[index]
+                elif time.monotonic() - started_at > timeout:
+                    logger.error(f"Prediction {prediction_id} timed out after {timeout:.0f}s")
+                    del running[index]
+
+        return results
@@ -0,0 +1,190 @@
+"""
+Seen Jobs: Persistent index of Upwork job IDs already scraped and synced
+
+Every daily scrape used to walk every page of every search term, then dedupe
+against at most 500 'Job URL's pulled from Airtable. SeenJobIndex keeps the
+IDs of every job already in Airtable in a key-value store (a modal.Dict in
+production, a dict or JsonFileStore locally), plus a per-term high-water mark.
+
+Search results are sorted by recency, so once a term has been scraped before,
+the scraper can stop paginating that term when it reaches one of the newest
+jobs it saw for that term last time.
+Daily runs therefore cost roughly proportional to the number of new jobs.
+
+The index is reconciled with Airtable by reading only records created since
+the last reconcile (all of them on first use), so rows added by other sync
+paths are still deduped.
+
+Example:
+    index = SeenJobIndex(modal.Dict.from_name(SEEN_JOBS_DICT_NAME)).load()
+    index.reconcile(client)
+    new_jobs = [job for job in jobs if job['id'] not in index]
+    ...  # write to Airtable
+    index.add([job['id'] for job in synced])
+    index.set_watermark(term, top_ids)
+    index.save()
+"""
+
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, MutableMapping, Optional
+
+from .airtable_client import AirtableClient, AirtableError
+
+logger = logging.getLogger(__name__)
+
+# Shared by the scrape workers (readers) and daily_scrape_and_sync (writer)
+SEEN_JOBS_DICT_NAME = "upwork-seen-jobs"
+
+STATE_KEY = "state"
+
+# Newest job IDs remembered per search term
+WATERMARK_SIZE = 5
+
+# Jobs this old can't reappear at the top of a recency-sorted search
+RETENTION = timedelta(days=120)
+
+# Reconcile reads a little before the last reconcile to absorb clock skew
+RECONCILE_OVERLAP = timedelta(minutes=10)
+
+_JOB_ID_RE = re.compile(r'~(\w+)')
+
+
+def job_id_from_url(url: Optional[str]) -> Optional[str]:
+    """Extract the Upwork job ID ('~0123abc' part) from a job URL."""
+    if not url:
+        return None
+    match = _JOB_ID_RE.search(url)
+    return match.group(1) if match else None
+
+
+def _empty_state() -> Dict:
+    return {
+        'jobs': {},            # job_id -> ISO time first recorded
+        'terms': {},           # search term -> {'top_ids': [...], 'updated_at': ISO}
+        'reconciled_at': None, # ISO time of the last Airtable reconcile
+    }
+
+
+class SeenJobIndex:
+    """Seen job IDs plus per-term high-water marks, persisted in a key-value store"""
+
+    def __init__(self, store: MutableMapping, retention: timedelta = RETENTION):
+        """
+        Args:
+            store: modal.Dict, dict or JsonFileStore holding the persisted state
+            retention: How long job IDs are remembered
+        """
+        self.store = store
+        self.retention = retention
+        self.state = _empty_state()
+
+    # ---------- Persistence ----------
+
+    def load(self) -> "SeenJobIndex":
+        """Load state from the store."""
+        try:
+            stored = self.store.get(STATE_KEY)
+        except Exception as e:
+            logger.warning(f"Could not load seen job index: {e}")
+            stored = None
+
+        self.state = {**_empty_state(), **(stored or {})}
+        return self
+
+    def save(self, now: Optional[datetime] = None) -> None:
+        """Evict expired IDs and persist state to the store."""
+        self._evict(now or datetime.now(timezone.utc))
+        self.store[STATE_KEY] = self.state
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self.state['jobs']
+
+    def __len__(self) -> int:
+        return len(self.state['jobs'])
+
+    # ---------- Job IDs ----------
+
+    def add(self, job_ids: Iterable[str], now: Optional[datetime] = None) -> int:
+        """Record job IDs as seen. Returns how many were new."""
+        stamp = (now or datetime.now(timezone.utc)).isoformat()
+        jobs = self.state['jobs']
+        added = 0
+        for job_id in job_ids:
+            if job_id and job_id not in jobs:
+                jobs[job_id] = stamp
+                added += 1
+        return added
+
+    def _evict(self, now: datetime) -> None:
+        cutoff = (now - self.retention).isoformat()
+        self.state['jobs'] = {
+            job_id: seen_at for job_id, seen_at in self.state['jobs'].items() if seen_at >= cutoff
+        }
+
+    # ---------- Per-term high-water marks ----------
+
+    def has_watermark(self, term: str) -> bool:
+        return term in self.state['terms']
+
+    def should_stop(self, term: str, job_id: str) -> bool:
+        """
+        True once a recency-sorted scrape of `term` reaches its stored watermark.
+
+        Only a job among the term's own top_ids from the last run (and still
+        in the seen set) stops the scrape; a job known through another term
+        says nothing about what's below it in this one, so it's just skipped.
+        A new term walks all its pages to establish its watermark.
+        """
+        watermark = self.state['terms'].get(term)
+        return bool(watermark) and job_id in watermark.get('top_ids', []) and job_id in self.state['jobs']
+
+    def set_watermark(self, term: str, top_ids: List[str], now: Optional[datetime] = None) -> None:
+        """Remember the newest job IDs seen for `term` in this run."""
+        if not top_ids:
+            return
+        self.state['terms'][term] = {
+            'top_ids': list(top_ids[:WATERMARK_SIZE]),
+            'updated_at': (now or datetime.now(timezone.utc)).isoformat(),
+        }
+
+    def drop_watermark(self, term: str) -> None:
+        """Forget a term's watermark so its next scrape walks every page again."""
+        self.state['terms'].pop(term, None)
+
+    # ---------- Airtable reconcile ----------
+
+    def reconcile(self, client: AirtableClient, now: Optional[datetime] = None) -> int:
+        """
+        Add job IDs for Airtable rows created since the last reconcile.
+
+        The first reconcile reads every row (no 500-row cap); later ones only
+        read new rows. On Airtable errors nothing changes and the next run
+        retries.
+
+        Returns:
+            Number of job IDs added
+        """
+        now = now or datetime.now(timezone.utc)
+        reconciled_at = self.state['reconciled_at']
+
+        formula = None
+        if reconciled_at:
+            since = datetime.fromisoformat(reconciled_at) - RECONCILE_OVERLAP
+            formula = f"IS_AFTER(CREATED_TIME(), '{since.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')}')"
+
+        try:
+            job_ids = [
+                job_id_from_url(record.get('fields', {}).get('Job URL'))
+                for record in client.iter_records(formula=formula, fields=['Job URL'])
+            ]
+        except AirtableError as e:
+            logger.error(f"Seen job reconcile failed: {e}")
+            return 0
+
+        added = self.add(job_ids, now)
+        self.state['reconciled_at'] = now.isoformat()
+        if added:
+            logger.info(f"Seen job index reconciled: {added} job(s) from Airtable")
+        return added
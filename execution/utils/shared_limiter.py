@@ -0,0 +1,90 @@
+"""
+Shared Limiter: Concurrency cap for API calls spread across Modal containers
+
+A per-process semaphore can't limit calls made from many containers at once.
+SharedConcurrencyLimiter keeps its permits in a shared queue (a modal.Queue
+in production), so every worker that calls Anthropic draws from the same pool.
+
+The orchestrator resets the pool at the start of each run, which also
+reclaims permits leaked by a container that died mid-call.
+
+Example:
+    limiter = SharedConcurrencyLimiter(modal.Queue.from_name("anthropic-permits", create_if_missing=True))
+    limiter.reset(6)            # orchestrator, once per run
+
+    with limiter:               # worker, around each API call
+        client.messages.create(...)
+"""
+
+import logging
+import queue as queue_module
+import threading
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+PERMIT = 1
+
+
+class SharedConcurrencyLimiter:
+    """Context-manager semaphore whose permits live in a shared queue"""
+
+    def __init__(self, permit_queue: Any, timeout: Optional[float] = 600):
+        """
+        Args:
+            permit_queue: modal.Queue or queue.Queue holding one item per permit
+            timeout: Seconds to wait for a permit before proceeding without one
+        """
+        self.queue = permit_queue
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def reset(self, permits: int) -> None:
+        """Drop any leftover permits and refill the pool with `permits`."""
+        if hasattr(self.queue, "clear"):
+            self.queue.clear()
+        else:
+            while True:
+                try:
+                    self.queue.get(block=False)
+                except queue_module.Empty:
+                    break
+
+        if hasattr(self.queue, "put_many"):
+            self.queue.put_many([PERMIT] * permits)
+        else:
+            for _ in range(permits):
+                self.queue.put(PERMIT)
+
+    def acquire(self) -> bool:
+        """
+        Block until a permit is free.
+
+        Returns False if the wait timed out; the caller proceeds anyway so a
+        lost permit degrades throughput instead of hanging the run.
+        """
+        try:
+            item = self.queue.get(block=True, timeout=self.timeout)
+        except queue_module.Empty:
+            item = None
+
+        if item is None:
+            logger.warning(f"No permit after {self.timeout}s - proceeding without one")
+            return False
+        return True
+
+    def release(self) -> None:
+        self.queue.put(PERMIT)
+
+    def __enter__(self):
+        # Per-thread stack so one limiter can be shared by threads and nested
+        held = getattr(self._local, "held", None)
+        if held is None:
+            held = self._local.held = []
+        held.append(self.acquire())
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._local.held.pop():
+            self.release()
+        return False
@@ -0,0 +1,296 @@
+"""
+Slot Calendar: In-memory posting-window occupancy for LinkedIn scheduling
+
+Every scheduling path (SmartScheduler, schedule_approved_post, the scheduling
+issue fixer and LinkedInScheduler) used to rebuild "which windows are taken"
+by scanning a fresh copy of the table, once per post. SlotCalendar is built
+from a single filtered fetch and answers everything else from memory:
+
+1. One bitmask per day - bit i set means window i already holds a post
+2. next_free() - the lowest free bit of a day is one bit trick, and days
+   that fill up are skipped through path-compressed links, so finding the
+   next free window does not rescan full days
+3. assign_all() - places a whole approval queue in one pass, ready for a
+   single AirtableClient.batch_update()
+
+Windows are plain minute ranges so each caller keeps its own layout (the
+9/14/20 ET windows of the cloud scheduler, the 8-10/12-2/5-7 local slots of
+SmartScheduler, ...).
+
+Example:
+    calendar = SlotCalendar.load(client, centered_windows([9, 14, 20]), tz=pytz.timezone('America/New_York'))
+    assignments = calendar.assign_all(approved_records, after=datetime.now(calendar.tz))
+    client.batch_update([
+        {"id": record["id"], "fields": {"Scheduled Time": when.isoformat()}}
+        for record, when in assignments
+    ])
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .airtable_client import AirtableClient, formula_and, formula_in, formula_not_blank
+
+ONE_DAY = timedelta(days=1)
+
+# How far next_free() looks before giving up
+DEFAULT_HORIZON_DAYS = 60
+
+
+@dataclass(frozen=True)
+class Window:
+    """One posting window, in minutes after midnight"""
+    start: int      # a post at [start, end) occupies the window
+    end: int
+    earliest: int   # new posts are placed uniformly in [earliest, latest]
+    latest: int
+    label: str = ""
+
+    def contains(self, dt: datetime) -> bool:
+        seconds = dt.hour * 3600 + dt.minute * 60 + dt.second
+        return self.start * 60 <= seconds < self.end * 60
+
+
+def centered_windows(hours: Sequence[int], buffer_minutes: int = 30, jitter_minutes: int = 15) -> List[Window]:
+    """
+    Windows around whole hours, e.g. [9, 14, 20].
+
+    A post within buffer_minutes of the hour (inclusive) occupies it; new
+    posts land within ±jitter_minutes of the hour.
+    """
+    return [
+        Window(
+            start=hour * 60 - buffer_minutes,
+            end=hour * 60 + buffer_minutes + 1,
+            earliest=hour * 60 - jitter_minutes,
+            latest=hour * 60 + jitter_minutes,
+            label=f"{hour}:00",
+        )
+        for hour in hours
+    ]
+
+
+def parse_time(value: Optional[str], tz=None) -> Optional[datetime]:
+    """
+    Parse an Airtable 'Scheduled Time' value (ISO, with or without Z).
+
+    With tz the result is converted to (or, if naive, localized in) that zone;
+    without it the value is returned as written.
+    """
+    if not value:
+        return None
+
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+    if tz is None:
+        return dt
+    if dt.tzinfo is None:
+        return _localize(tz, dt)
+    return dt.astimezone(tz)
+
+
+def _localize(tz, dt: datetime) -> datetime:
+    if tz is None:
+        return dt
+    if hasattr(tz, 'localize'):  # pytz
+        return tz.localize(dt)
+    return dt.replace(tzinfo=tz)
+
+
+class SlotCalendar:
+    """Per-day window bitmaps with next-free lookups and bulk assignment"""
+
+    def __init__(self, windows: Sequence[Window], tz=None, rng: Optional[random.Random] = None):
+        """
+        Args:
+            windows: Posting windows in day order
+            tz: Zone the windows are expressed in (pytz or zoneinfo); None for naive local times
+            rng: Random source for placements (seed it for reproducible schedules)
+        """
+        self.windows = list(windows)
+        self.tz = tz
+        self.rng = rng or random.Random()
+        self.full_mask = (1 << len(self.windows)) - 1
+        self._days: Dict[date, int] = {}
+        self._skip: Dict[date, date] = {}  # full day -> a later day that may have room
+
+    # ============== Building ==============
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[Dict],
+        windows: Sequence[Window],
+        tz=None,
+        statuses: Optional[Iterable[str]] = None,
+        exclude: Iterable[str] = (),
+        time_field: str = 'Scheduled Time',
+        rng: Optional[random.Random] = None,
+    ) -> "SlotCalendar":
+        """
+        Calendar occupied by records that already have a time.
+
+        Args:
+            records: Airtable records
+            windows: Posting windows
+            tz: Zone the windows are expressed in
+            statuses: Only records in these statuses occupy a window (None = any)
+            exclude: Record IDs to ignore (e.g. the posts being rescheduled)
+            time_field: Field holding the scheduled time
+            rng: Random source for placements
+        """
+        calendar = cls(windows, tz=tz, rng=rng)
+        statuses = set(statuses) if statuses is not None else None
+        exclude = set(exclude)
+
+        for record in records:
+            fields = record.get('fields', {})
+            if record.get('id') in exclude:
+                continue
+            if statuses is not None and fields.get('Status') not in statuses:
+                continue
+            calendar.add(parse_time(fields.get(time_field), tz))
+
+        return calendar
+
+    @classmethod
+    def load(
+        cls,
+        client: AirtableClient,
+        windows: Sequence[Window],
+        tz=None,
+        statuses: Optional[Sequence[str]] = None,
+        time_field: str = 'Scheduled Time',
+        rng: Optional[random.Random] = None,
+    ) -> "SlotCalendar":
+        """Build the calendar from one filtered fetch of scheduled records."""
+        formula = formula_not_blank(time_field)
+        if statuses is not None:
+            formula = formula_and(formula, formula_in('Status', list(statuses)))
+
+        records = client.list_records(formula=formula, fields=['Status', time_field])
+        return cls.from_records(records, windows, tz=tz, statuses=statuses, time_field=time_field, rng=rng)
+
+    # ============== Occupancy ==============
+
+    def window_of(self, dt: Optional[datetime]) -> Optional[int]:
+        """Index of the window dt falls in, or None."""
+        if dt is None:
+            return None
+        for index, window in enumerate(self.windows):
+            if window.contains(dt):
+                return index
+        return None
+
+    def add(self, dt: Optional[datetime]) -> Optional[Tuple[date, int]]:
+        """Mark the window holding dt as taken; returns (day, window index) or None."""
+        index = self.window_of(dt)
+        if index is None:
+            return None
+        self.occupy(dt.date(), index)
+        return dt.date(), index
+
+    def occupy(self, day: date, index: int) -> None:
+        self._days[day] = self._days.get(day, 0) | (1 << index)
+
+    def is_free(self, day: date, index: int) -> bool:
+        return not self._days.get(day, 0) & (1 << index)
+
+    def used_windows(self, day: date) -> List[int]:
+        mask = self._days.get(day, 0)
+        return [i for i in range(len(self.windows)) if mask & (1 << i)]
+
+    def free_windows(self, day: date) -> List[int]:
+        mask = self._days.get(day, 0)
+        return [i for i in range(len(self.windows)) if not mask & (1 << i)]
+
+    # ============== Lookups ==============
+
+    def _first_open_day(self, day: date) -> date:
+        """First day on or after `day` with a free window (skips full days)."""
+        path = []
+        while self._days.get(day, 0) == self.full_mask:
+            path.append(day)
+            day = self._skip.get(day, day + ONE_DAY)
+        for full_day in path:
+            self._skip[full_day] = day
+        return day
+
+    def next_free(self, after: datetime, horizon_days: int = DEFAULT_HORIZON_DAYS) -> Optional[Tuple[date, int]]:
+        """
+        Earliest free (day, window index) a post could still be placed in after `after`.
+
+        On after's own day a window only counts if part of its placement range
+        is still ahead; later days take their lowest free window.
+        """
+        if not self.windows:
+            return None
+
+        after = self._in_zone(after)
+        today = after.date()
+        minute = after.hour * 60 + after.minute + 1
+
+        mask = self._days.get(today, 0)
+        for index, window in enumerate(self.windows):
+            if not mask & (1 << index) and window.latest >= minute:
+                return today, index
+
+        day = self._first_open_day(today + ONE_DAY)
+        if (day - today).days > horizon_days:
+            return None
+
+        mask = self._days.get(day, 0)
+        lowest_free = ~mask & (mask + 1)
+        return day, lowest_free.bit_length() - 1
+
+    def place(self, day: date, index: int, after: Optional[datetime] = None) -> datetime:
+        """Random time inside window `index` on `day` (later than `after` when given)."""
+        window = self.windows[index]
+        earliest = window.earliest
+        if after is not None:
+            after = self._in_zone(after)
+            if after.date() == day:
+                earliest = max(earliest, after.hour * 60 + after.minute + 1)
+
+        minute = self.rng.randint(earliest, max(earliest, window.latest))
+        naive = datetime.combine(day, time()) + timedelta(minutes=minute)
+        return _localize(self.tz, naive)
+
+    def take(self, after: datetime, horizon_days: int = DEFAULT_HORIZON_DAYS) -> Optional[datetime]:
+        """Claim the next free window after `after` and return the placed time."""
+        slot = self.next_free(after, horizon_days)
+        if slot is None:
+            return None
+
+        day, index = slot
+        self.occupy(day, index)
+        return self.place(day, index, after)
+
+    def assign_all(
+        self,
+        records: Sequence[Dict],
+        after: datetime,
+        horizon_days: int = DEFAULT_HORIZON_DAYS,
+    ) -> List[Tuple[Dict, datetime]]:
+        """
+        Give every record its own window, in order, starting after `after`.
+
+        Records that don't fit inside the horizon are left out of the result.
+        """
+        assignments = []
+        for record in records:
+            when = self.take(after, horizon_days)
+            if when is None:
+                break
+            assignments.append((record, when))
+        return assignments
+
+    def _in_zone(self, dt: datetime) -> datetime:
+        if self.tz is not None and dt.tzinfo is not None:
+            return dt.astimezone(self.tz)
+        return dt
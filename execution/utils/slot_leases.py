@@ -0,0 +1,208 @@
+"""
+Slot Leases: Compare-and-set reservations on posting windows
+
+Parallel schedule_approved_post calls each read Airtable, saw the same free
+window and wrote it, so every bulk approval ended with a detect-and-fix pass
+reshuffling double-bookings. SlotLeases puts a lease per (day, window) in a
+shared store before a window is written to Airtable:
+
+1. claim() - put-if-absent on "slot/<day>/<window>"; exactly one caller wins
+   (modal.Dict put(skip_if_exists=True), SQLite INSERT OR IGNORE, or a
+   lock-guarded dict in a single process)
+2. Leases expire after `ttl` - by then the winner's Airtable write is visible
+   to every SlotCalendar, which takes over as the record of occupancy. An
+   expired lease is taken over through a one-shot "<key>@<nonce>" claim, so
+   two callers can't both take over the same stale lease
+3. claim_record() - the same lease per record ID, so a duplicate webhook for
+   one post doesn't burn a second window
+4. claim_next() - walks a SlotCalendar, skipping windows leased by others
+
+Example:
+    leases = SlotLeases(modal.Dict.from_name(SLOT_LEASES_DICT_NAME, create_if_missing=True))
+    calendar = SlotCalendar.load(client, windows, tz=tz)
+    slot = leases.claim_next(calendar, now, owner=record_id)
+    if slot:
+        day, index, when = slot
+        ...  # write `when`; on failure leases.release(day, index, record_id)
+"""
+
+import json
+import logging
+import secrets
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .slot_calendar import DEFAULT_HORIZON_DAYS, SlotCalendar
+
+logger = logging.getLogger(__name__)
+
+# Shared by every container that schedules LinkedIn posts
+SLOT_LEASES_DICT_NAME = "linkedin-slot-leases"
+
+# Longer than a scheduling call (read, claim, write) takes
+DEFAULT_LEASE_TTL = 600
+
+_dict_lock = threading.Lock()
+
+
+def put_if_absent(store: Any, key: str, value: Dict) -> bool:
+    """Atomically store `value` unless `key` exists; True if it was stored."""
+    if hasattr(store, "put"):
+        # modal.Dict and SqliteLeaseStore
+        return bool(store.put(key, value, skip_if_exists=True))
+
+    # Plain dict / JsonFileStore: atomic within this process only
+    with _dict_lock:
+        if key in store:
+            return False
+        store[key] = value
+        return True
+
+
+class SqliteLeaseStore:
+    """Minimal modal.Dict stand-in on SQLite, for runs that share leases across local processes"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite file (created on first use)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        return conn
+
+    def put(self, key: str, value: Any, skip_if_exists: bool = False) -> bool:
+        verb = "INSERT OR IGNORE" if skip_if_exists else "INSERT OR REPLACE"
+        cursor = self._conn().execute(f"{verb} INTO leases (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+        return cursor.rowcount == 1
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self._conn().execute("SELECT value FROM leases WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def pop(self, key: str, *default) -> Any:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM leases WHERE key = ?", (key,)).fetchone()
+            conn.execute("DELETE FROM leases WHERE key = ?", (key,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if row:
+            return json.loads(row[0])
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.put(key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return self._conn().execute("SELECT 1 FROM leases WHERE key = ?", (key,)).fetchone() is not None
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for key, value in self._conn().execute("SELECT key, value FROM leases").fetchall():
+            yield key, json.loads(value)
+
+
+class SlotLeases:
+    """Expiring compare-and-set leases per (day, window) and per record"""
+
+    def __init__(self, store: Any, ttl: float = DEFAULT_LEASE_TTL):
+        """
+        Args:
+            store: modal.Dict, SqliteLeaseStore, or a dict (single process)
+            ttl: Seconds a lease blocks others before Airtable is trusted instead
+        """
+        self.store = store
+        self.ttl = ttl
+
+    @staticmethod
+    def slot_key(day: date, index: int) -> str:
+        return f"slot/{day.isoformat()}/{index}"
+
+    def _claim(self, key: str, owner: str) -> bool:
+        now = time.time()
+        lease = {"owner": owner, "expires": now + self.ttl, "nonce": secrets.token_hex(8)}
+        if put_if_absent(self.store, key, lease):
+            return True
+
+        current = self.store.get(key)
+        if current is None:
+            # Released between our put and get
+            return put_if_absent(self.store, key, lease)
+        if current.get("owner") == owner:
+            return True
+        if current.get("expires", 0) > now:
+            return False
+
+        # Stale lease: only the caller that wins the one-shot takeover key replaces it
+        if not put_if_absent(self.store, f"{key}@{current.get('nonce')}", {"owner": owner, "expires": now + self.ttl}):
+            return False
+        self.store[key] = lease
+        return True
+
+    def claim(self, day: date, index: int, owner: str) -> bool:
+        """Reserve window `index` on `day` for `owner`; False if someone else holds it."""
+        return self._claim(self.slot_key(day, index), owner)
+
+    def claim_record(self, record_id: str, owner: str) -> bool:
+        """Reserve the right to schedule `record_id` for one call (`owner` is unique per call)."""
+        return self._claim(f"record/{record_id}", owner)
+
+    def release(self, day: date, index: int, owner: str) -> None:
+        """Give a window back (e.g. after a failed Airtable write)."""
+        key = self.slot_key(day, index)
+        current = self.store.get(key)
+        if current and current.get("owner") == owner:
+            self.store.pop(key, None)
+
+    def release_record(self, record_id: str) -> None:
+        self.store.pop(f"record/{record_id}", None)
+
+    def claim_next(
+        self,
+        calendar: SlotCalendar,
+        after: datetime,
+        owner: str,
+        horizon_days: int = DEFAULT_HORIZON_DAYS,
+    ) -> Optional[Tuple[date, int, datetime]]:
+        """
+        Lease the earliest window that is free in `calendar` and not leased by anyone else.
+
+        Returns:
+            (day, window index, placed time) or None if nothing is free within the horizon
+        """
+        while True:
+            slot = calendar.next_free(after, horizon_days)
+            if slot is None:
+                return None
+
+            day, index = slot
+            calendar.occupy(day, index)
+            if self.claim(day, index, owner):
+                return day, index, calendar.place(day, index, after)
+            logger.info(f"Window {calendar.windows[index].label or index} on {day} is leased by another scheduler")
+
+    def prune(self) -> int:
+        """Delete leases expired for over a TTL (so none is mid-takeover); returns how many."""
+        cutoff = time.time() - self.ttl
+        expired = [key for key, value in list(self.store.items()) if (value or {}).get("expires", 0) <= cutoff]
+        for key in expired:
+            self.store.pop(key, None)
+        return len(expired)
@@ -0,0 +1,206 @@
+"""
+Tracing: Lightweight spans for the scrape → filter → sync → proposal → submit pipeline
+
+Logs say what happened but not where the time went. This module provides:
+1. span() - context manager timing a block, with a parent span (nesting via
+   contextvars; new threads start without one, so run pool work through
+   contextvars.copy_context().run to keep it in the same trace) and free-form
+   attributes (record_id, job_id, model, tokens, http.status...)
+2. traced() - the same as a decorator
+3. A JSONL exporter (one finished span per line) enabled by configure() or
+   the TRACE_FILE env var; without one, spans only cost a clock read
+4. to_otlp() - OTLP/JSON (resourceSpans) conversion for any OpenTelemetry
+   collector
+
+trace_report.py prints a per-stage p50/p95 breakdown of a run from the JSONL.
+
+Example:
+    configure(".tmp/traces.jsonl")
+
+    @traced("pipeline.filter")
+    def action_filter(): ...
+
+    with span("airtable.request", method="GET") as s:
+        response = session.get(url)
+        s.set(**{"http.status": response.status_code})
+"""
+
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_TRACE_FILE = ".tmp/traces.jsonl"
+
+SERVICE_NAME = "upwork-proposal-gen"
+
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_exporter: Optional["JsonlExporter"] = None
+
+
+class Span:
+    """One timed operation; finished spans are handed to the exporter"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict] = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    def set(self, **attributes) -> "Span":
+        """Add attributes (None values are skipped)."""
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+        return self
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class JsonlExporter:
+    """Appends finished spans to a JSONL file (thread-safe)"""
+
+    def __init__(self, path: str = DEFAULT_TRACE_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, finished: Span) -> None:
+        line = json.dumps(finished.to_dict(), default=str) + "\n"
+        with self._lock, open(self.path, "a") as f:
+            f.write(line)
+
+
+def configure(path: Optional[str] = DEFAULT_TRACE_FILE) -> None:
+    """Export spans to `path` (None turns exporting off)."""
+    global _exporter
+    _exporter = JsonlExporter(path) if path else None
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Time a block as a child of the current span.
+
+    Exceptions mark the span as errored and are re-raised.
+    """
+    current = Span(name, _current.get(), attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.error = f"{type(e).__name__}: {e}"[:500]
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current.reset(token)
+        if _exporter is not None:
+            try:
+                _exporter.export(current)
+            except OSError:
+                pass
+
+
+def traced(name: Optional[str] = None, **attributes) -> Callable:
+    """Decorator form of span(); the name defaults to the function's qualified name."""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def load_spans(path: str = DEFAULT_TRACE_FILE) -> List[Dict]:
+    """Read exported spans (skips unreadable lines)."""
+    spans = []
+    with open(path) as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except ValueError:
+                continue
+    return spans
+
+
+def _otlp_value(value: Any) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: Iterable[Dict], service_name: str = SERVICE_NAME) -> Dict:
+    """
+    OTLP/JSON export request for exported span dicts.
+
+    POST the result to a collector's /v1/traces endpoint, or load it into
+    any tool that reads the OTLP JSON encoding.
+    """
+    otlp_spans = []
+    for s in spans:
+        otlp_span = {
+            "traceId": s["trace_id"],
+            "spanId": s["span_id"],
+            "name": s["name"],
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(s["start_ns"]),
+            "endTimeUnixNano": str(s["end_ns"]),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in (s.get("attributes") or {}).items()],
+            "status": {"code": 2, "message": s.get("error") or ""} if s.get("status") == "error" else {"code": 1},
+        }
+        if s.get("parent_id"):
+            otlp_span["parentSpanId"] = s["parent_id"]
+        otlp_spans.append(otlp_span)
+
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{"scope": {"name": "utils.tracing"}, "spans": otlp_spans}],
+        }]
+    }
+
+
+if os.environ.get("TRACE_FILE"):
+    configure(os.environ["TRACE_FILE"])
@@ -14,6 +14,17 @@ Workflow:
   New → Under Review (auto-generates proposal)
       → Approved (auto-submits proposal with connects)
       → Applied (done!)
+
+Events go into a durable SQLite job queue (utils/job_queue.py) drained by
+bounded worker pools: a few parallel proposal generations, one browser
+submission at a time. When a queue is full the webhook answers 429.
+
+Webhook and poller can report the same transition; workers check a shared
+idempotency store (utils/idempotency.py) before calling Claude or opening a
+browser, so each (record, action, content) runs once.
+
+execution/webhook_gateway.py serves the same routes under /upwork/ from one
+async process; run this script with --no-server for the polling fallback.
 """
 
 import os
@@ -29,11 +40,14 @@ import requests
 
 # Add execution path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from utils.idempotency import IdempotencyStore, SqliteIdempotencyStore, content_version
+from utils.job_queue import ActionConfig, JobQueue, QueueFull
 
 from dotenv import load_dotenv
 load_dotenv()
 
 # Configure logging
+os.makedirs('logs', exist_ok=True)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
@@ -51,9 +65,15 @@ AIRTABLE_API_KEY = os.getenv('AIRTABLE_API_KEY')
 AIRTABLE_BASE_ID = os.getenv('AIRTABLE_UPWORK_BASE_ID') or os.getenv('AIRTABLE_BASE_ID')
 AIRTABLE_TABLE = 'Upwork Jobs'
 
-# Track processed records to avoid duplicates
-processed_records = {}
-COOLDOWN_SECONDS = 300  # 5 minutes cooldown per record
+# Shared with webhook_upwork_proposals.py, so either server's submission counts
+IDEMPOTENCY_PATH = os.getenv('UPWORK_IDEMPOTENCY_PATH', '.tmp/upwork_idempotency.sqlite')
+COOLDOWN_SECONDS = 300  # 5 minutes before a failed action may run again
+
+# Durable job queue (see utils/job_queue.py)
+JOB_QUEUE_PATH = os.getenv('UPWORK_JOB_QUEUE_PATH', '.tmp/upwork_webhook_jobs.sqlite')
+GENERATE_CONCURRENCY = int(os.getenv('UPWORK_GENERATE_CONCURRENCY', 4))  # parallel Claude calls
+SUBMIT_CONCURRENCY = int(os.getenv('UPWORK_SUBMIT_CONCURRENCY', 1))      # parallel Chrome instances
+SUBMIT_SPACING_SECONDS = 30  # Delay between submissions
 
 
 def load_settings():
@@ -195,15 +215,15 @@ def submit_proposal_for_job(job: dict, proposal_text: str) -> tuple[bool, str]:
         return False, str(e)
 
 
-def process_under_review(record_id: str, job: dict):
-    """Process a job that changed to 'Under Review' - generate proposal."""
+def process_under_review(record_id: str, job: dict) -> bool:
+    """Process a job that changed to 'Under Review' - generate proposal. False if generation failed."""
     job_title = job.get('Job Title', 'Unknown')
     logger.info(f"🔄 Generating proposal for: {job_title[:50]}...")
     
     # Check if proposal already exists
     if job.get('Proposal'):
         logger.info(f"Proposal already exists for {record_id}, skipping generation")
-        return
+        return True
     
     # Generate proposal
     proposal = generate_proposal_for_job(job)
@@ -215,15 +235,17 @@ def process_under_review(record_id: str, job: dict):
             'Notes': f"Proposal auto-generated at {datetime.now().strftime('%Y-%m-%d %H:%M')}"
         })
         logger.info(f"✓ Proposal saved for: {job_title[:40]}...")
+        return True
     else:
         update_airtable_record(record_id, {
             'Notes': f"Failed to generate proposal at {datetime.now().strftime('%Y-%m-%d %H:%M')}"
         })
         logger.error(f"✗ Failed to generate proposal for: {job_title[:40]}...")
+        return False
 
 
-def process_approved(record_id: str, job: dict):
-    """Process a job that changed to 'Approved' - submit proposal."""
+def process_approved(record_id: str, job: dict) -> bool:
+    """Process a job that changed to 'Approved' - submit proposal. True if it was submitted."""
     job_title = job.get('Job Title', 'Unknown')
     logger.info(f"📤 Submitting proposal for: {job_title[:50]}...")
     
@@ -238,7 +260,7 @@ def process_approved(record_id: str, job: dict):
                 'Status': 'Under Review',
                 'Notes': f"Submission failed - no proposal. {datetime.now().strftime('%Y-%m-%d %H:%M')}"
             })
-            return
+            return False
     
     # Add record_id for status updates
     job['_record_id'] = record_id
@@ -260,20 +282,82 @@ def process_approved(record_id: str, job: dict):
             'Notes': f"✗ Submission failed: {message} at {datetime.now().strftime('%Y-%m-%d %H:%M')}"
         })
         logger.error(f"✗ Submission failed for: {job_title[:40]}... - {message}")
+    
+    return success
 
 
-def check_cooldown(record_id: str, action: str) -> bool:
-    """Check if record is on cooldown to avoid duplicate processing."""
-    key = f"{record_id}:{action}"
-    last_processed = processed_records.get(key)
-    
-    if last_processed:
-        elapsed = (datetime.now() - last_processed).total_seconds()
-        if elapsed < COOLDOWN_SECONDS:
-            return False  # On cooldown
-    
-    processed_records[key] = datetime.now()
-    return True  # OK to process
+# ============== Job Queue ==============
+
+idempotency = IdempotencyStore(SqliteIdempotencyStore(IDEMPOTENCY_PATH))
+
+
+def generation_version(job: dict) -> str:
+    return content_version(job.get('Job Title'), job.get('Description'))
+
+
+def run_generate(payload: dict) -> bool:
+    """Generate a proposal unless this version of the job was already handled."""
+    record_id, job = payload['record_id'], payload['job']
+    key = idempotency.claim(record_id, 'generate_proposal', generation_version(job))
+    if key is None:
+        return True
+
+    ok = False
+    try:
+        ok = process_under_review(record_id, job)
+        return ok
+    finally:
+        # The queue retries failures; the cooldown starts after the last attempt
+        idempotency.finish(key, ok)
+
+
+def generation_failed(payload: dict, error: str) -> None:
+    key = idempotency.key(payload['record_id'], 'generate_proposal', generation_version(payload['job']))
+    idempotency.finish(key, False, cooldown=COOLDOWN_SECONDS)
+
+
+def run_submit(payload: dict) -> bool:
+    """Submit a proposal unless this proposal was already submitted."""
+    record_id, job = payload['record_id'], payload['job']
+    key = idempotency.claim(record_id, 'submit_proposal', content_version(job.get('Proposal')))
+    if key is None:
+        return True
+
+    submitted = False
+    try:
+        submitted = process_approved(record_id, job)
+    finally:
+        idempotency.finish(key, submitted, cooldown=COOLDOWN_SECONDS)
+    # A failed submission already reverted the record to Under Review; don't retry it
+    return True
+
+
+job_queue = JobQueue(JOB_QUEUE_PATH, {
+    # Generation failures are retried with backoff; submissions revert the
+    # record to Under Review themselves, so only crashes are retried
+    'generate_proposal': ActionConfig(
+        run_generate, concurrency=GENERATE_CONCURRENCY, max_pending=50, on_failed=generation_failed,
+    ),
+    'submit_proposal': ActionConfig(
+        run_submit, concurrency=SUBMIT_CONCURRENCY, max_pending=20, spacing=SUBMIT_SPACING_SECONDS,
+    ),
+})
+
+
+def enqueue_job(action: str, record_id: str, job: dict) -> Optional[int]:
+    """
+    Queue a record for generation or submission.
+
+    Returns the job ID, or None if the record is already queued for this action.
+    Raises QueueFull when the action's queue is at capacity.
+    """
+    return job_queue.enqueue(action, {'record_id': record_id, 'job': job}, key=f"{record_id}:{action}")
+
+
+def queue_full_response(e: QueueFull):
+    response = jsonify({'status': 'busy', 'error': str(e), 'retry_after': e.retry_after})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 429
 
 
 def poll_airtable():
@@ -299,9 +383,11 @@ def poll_airtable():
             records = response.json().get('records', [])
             for record in records:
                 record_id = record['id']
-                if check_cooldown(record_id, 'under_review'):
-                    job = record.get('fields', {})
-                    threading.Thread(target=process_under_review, args=(record_id, job)).start()
+                try:
+                    enqueue_job('generate_proposal', record_id, record.get('fields', {}))
+                except QueueFull as e:
+                    logger.warning(f"Not queueing more generations this poll: {e}")
+                    break
         
         # Check for "Approved" jobs ready to submit
         params = {
@@ -314,10 +400,12 @@ def poll_airtable():
             records = response.json().get('records', [])
             for record in records:
                 record_id = record['id']
-                if check_cooldown(record_id, 'approved'):
-                    job = record.get('fields', {})
-                    threading.Thread(target=process_approved, args=(record_id, job)).start()
-                    time.sleep(30)  # Delay between submissions
+                # Submissions are spaced by the queue's workers, not by sleeping here
+                try:
+                    enqueue_job('submit_proposal', record_id, record.get('fields', {}))
+                except QueueFull as e:
+                    logger.warning(f"Not queueing more submissions this poll: {e}")
+                    break
         
         # Check for "Rejected" jobs to auto-delete
         params = {
@@ -372,18 +460,19 @@ def handle_status_change():
         if not record_id:
             return jsonify({'error': 'No record_id'}), 400
         
+        # Duplicates of work already done are skipped by the workers (see run_generate/run_submit)
         if status == 'Under Review':
-            if check_cooldown(record_id, 'under_review'):
-                threading.Thread(target=process_under_review, args=(record_id, fields)).start()
-                return jsonify({'status': 'processing', 'action': 'generate_proposal'})
+            job_id = enqueue_job('generate_proposal', record_id, fields)
+            return jsonify({'status': 'queued', 'action': 'generate_proposal', 'job_id': job_id})
         
         elif status == 'Approved':
-            if check_cooldown(record_id, 'approved'):
-                threading.Thread(target=process_approved, args=(record_id, fields)).start()
-                return jsonify({'status': 'processing', 'action': 'submit_proposal'})
+            job_id = enqueue_job('submit_proposal', record_id, fields)
+            return jsonify({'status': 'queued', 'action': 'submit_proposal', 'job_id': job_id})
         
         return jsonify({'status': 'ignored', 'reason': f'Status is {status}'})
         
+    except QueueFull as e:
+        return queue_full_response(e)
     except Exception as e:
         logger.error(f"Webhook error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -406,9 +495,12 @@ def trigger_generate():
         return jsonify({'error': 'Record not found'}), 404
     
     job = response.json().get('fields', {})
-    threading.Thread(target=process_under_review, args=(record_id, job)).start()
+    try:
+        job_id = enqueue_job('generate_proposal', record_id, job)
+    except QueueFull as e:
+        return queue_full_response(e)
     
-    return jsonify({'status': 'processing', 'action': 'generate_proposal'})
+    return jsonify({'status': 'queued', 'action': 'generate_proposal', 'job_id': job_id})
 
 
 @app.route('/trigger/submit', methods=['POST'])
@@ -428,18 +520,22 @@ def trigger_submit():
         return jsonify({'error': 'Record not found'}), 404
     
     job = response.json().get('fields', {})
-    threading.Thread(target=process_approved, args=(record_id, job)).start()
+    try:
+        job_id = enqueue_job('submit_proposal', record_id, job)
+    except QueueFull as e:
+        return queue_full_response(e)
     
-    return jsonify({'status': 'processing', 'action': 'submit_proposal'})
+    return jsonify({'status': 'queued', 'action': 'submit_proposal', 'job_id': job_id})
 
 
 @app.route('/status', methods=['GET'])
 def get_status():
-    """Get server status and recent activity."""
+    """Get server status, queue depth and in-flight work."""
     return jsonify({
         'status': 'running',
-        'processed_count': len(processed_records),
+        'idempotency': idempotency.stats(),
         'cooldown_seconds': COOLDOWN_SECONDS,
+        'queues': job_queue.status(),
         'settings': load_settings()
     })
 
@@ -470,13 +566,16 @@ Endpoints:
   POST /webhook/status-change  - Airtable webhook
   POST /trigger/generate       - Manual proposal generation
   POST /trigger/submit         - Manual submission
-  GET  /status                 - Server status
+  GET  /status                 - Server status, queue depth, in-flight jobs
 
 Polling: Every {args.poll}s (checking Airtable for status changes)
 Port: {args.port}
 """)
     print("=" * 60 + "\n")
     
+    # Start the worker pools (also resumes jobs queued before a restart)
+    job_queue.start()
+    
     # Start polling thread
     if args.poll > 0:
         poll_thread = threading.Thread(target=polling_loop, args=(args.poll,), daemon=True)
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Webhook Gateway
+===============
+One async (FastAPI) server for the local webhook routes that used to live in
+separate synchronous servers, each blocking a worker on outbound Airtable,
+Anthropic or Modal calls:
+
+- webhook_server.py / airtable_webhook_server.py  - LinkedIn status changes → Modal
+- execution/webhook_airtable_automation.py        - Upwork proposal generation/submission
+- proposal_system/webhook_proposal_generator.py   - client proposals
+- linkedin_automation/execution/webhook_revise_automation.py - post revisions
+
+Handlers never wait on slow work. Modal functions are spawned with
+.spawn.aio(). Claude and browser work goes into the durable job queue
+(utils/job_queue.py) and the response is 202 with a job ID; GET /jobs/<id>
+reports the outcome. Airtable reads on the request path share one aiohttp
+session. One process absorbs hundreds of concurrent Airtable Automation
+deliveries without timeouts; when a queue is full the answer is 429.
+
+Routes:
+  POST     /webhook                          LinkedIn status change → Modal (job ID = Modal call ID)
+  POST     /upwork/webhook/status-change     Upwork "Under Review" / "Approved"
+  POST     /upwork/trigger/generate|submit   Manual Upwork triggers ({"record_id": ...})
+  POST     /proposals/analyze-transcript     → job
+  POST     /proposals/generate-proposal      → job
+  POST     /proposals/manual-input           answered directly
+  POST     /proposals/calculate-price        answered directly
+  GET|POST /revise/{record_id}               Airtable button → job (HTML page)
+  POST     /automation/revise                → job
+  GET|POST /revise-all                       → job
+  GET      /jobs/{job_id}                    Job status and result
+  GET      /status, /health
+
+The Upwork polling fallback and the LinkedIn auto-poster aren't webhooks;
+they keep running from webhook_airtable_automation.py --no-server and
+webhook_revise_automation.py --auto-poster.
+
+Run:
+    python execution/webhook_gateway.py --port 8000
+"""
+
+import asyncio
+import logging
+import os
+import sys
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import quote
+
+import aiohttp
+import modal
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse
+
+EXECUTION_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(EXECUTION_DIR))
+sys.path.insert(0, str(EXECUTION_DIR.parent))
+
+import webhook_airtable_automation as upwork
+from proposal_system import webhook_proposal_generator as proposals
+from utils.idempotency import content_version
+from utils.job_queue import ActionConfig, JobQueue, QueueFull
+
+logger = logging.getLogger(__name__)
+
+# Content revisions import their own helpers relative to this directory
+REVISIONS_DIR = EXECUTION_DIR.parent / 'linkedin_automation' / 'execution'
+
+AIRTABLE_API_URL = os.getenv('AIRTABLE_API_URL', 'https://api.airtable.com/v0').rstrip('/')
+MODAL_APP_NAME = "linkedin-automation"
+
+GATEWAY_JOB_QUEUE_PATH = os.getenv('GATEWAY_JOB_QUEUE_PATH', '.tmp/webhook_gateway_jobs.sqlite')
+CLAUDE_CONCURRENCY = int(os.getenv('GATEWAY_CLAUDE_CONCURRENCY', 4))      # parallel proposal/transcript calls
+REVISION_CONCURRENCY = int(os.getenv('GATEWAY_REVISION_CONCURRENCY', 2))
+
+# LinkedIn status → Modal function (what handle_webhook would spawn, minus the extra hop)
+LINKEDIN_ACTIONS = {
+    "Pending Review": "generate_images_for_post",
+    "Approved - Ready to Schedule": "schedule_approved_post",
+    "Rejected": "handle_rejected_post",
+}
+
+UPWORK_ACTIONS = {
+    'Under Review': 'generate_proposal',
+    'Approved': 'submit_proposal',
+}
+
+
+# ============== Job Handlers (run on queue workers) ==============
+
+def run_analyze_transcript(payload: dict) -> dict:
+    analysis = proposals.analyze_transcript_with_pricing(payload['transcript'])
+    if "error" in analysis:
+        raise RuntimeError(analysis["error"])
+    return analysis
+
+
+def run_build_proposal(payload: dict) -> dict:
+    return proposals.build_proposal(payload)
+
+
+def run_revisions(payload: dict) -> dict:
+    """Revise the given records (or every record with a Revision Prompt)."""
+    if str(REVISIONS_DIR) not in sys.path:
+        sys.path.insert(0, str(REVISIONS_DIR))
+    from content_revisions import ContentRevisionProcessor
+
+    revised = ContentRevisionProcessor().check_for_revisions(record_ids=payload.get('record_ids'))
+    return {'revised': revised or 0}
+
+
+job_queue = JobQueue(GATEWAY_JOB_QUEUE_PATH, {
+    # Same handlers, pools and idempotency checks as the standalone Upwork server
+    **upwork.job_queue.actions,
+    # A failed Claude call is reported on the job; the caller decides whether to resubmit
+    'analyze_transcript': ActionConfig(run_analyze_transcript, concurrency=CLAUDE_CONCURRENCY, max_attempts=1),
+    'generate_client_proposal': ActionConfig(run_build_proposal, concurrency=CLAUDE_CONCURRENCY, max_attempts=1),
+    'revise_posts': ActionConfig(run_revisions, concurrency=REVISION_CONCURRENCY, max_attempts=1),
+})
+
+
+# ============== App ==============
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+    job_queue.start()
+    logger.info("🚀 Webhook gateway ready")
+    try:
+        yield
+    finally:
+        await app.state.http.close()
+        job_queue.stop(timeout=1)
+
+
+app = FastAPI(title="Webhook Gateway", lifespan=lifespan)
+
+
+async def read_json(request: Request) -> Optional[Dict]:
+    """Request body as a dict, or None if it isn't a JSON object."""
+    try:
+        data = await request.json()
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def bad_request(message: str) -> JSONResponse:
+    return JSONResponse({'success': False, 'error': message}, status_code=400)
+
+
+def busy_response(e: QueueFull) -> JSONResponse:
+    return JSONResponse(
+        {'status': 'busy', 'error': str(e), 'retry_after': e.retry_after},
+        status_code=429,
+        headers={'Retry-After': str(e.retry_after)},
+    )
+
+
+async def enqueue(action: str, payload: Dict, key: Optional[str] = None) -> JSONResponse:
+    """Queue a job and answer 202 (429 when the action's queue is full)."""
+    try:
+        # SQLite may wait on a writer lock; keep that off the event loop
+        job_id = await asyncio.to_thread(job_queue.enqueue, action, payload, key)
+    except QueueFull as e:
+        return busy_response(e)
+
+    return JSONResponse({
+        'status': 'queued' if job_id else 'already_queued',
+        'action': action,
+        'job_id': job_id,
+        'status_url': f"/jobs/{job_id}" if job_id else None,
+    }, status_code=202)
+
+
+@app.get('/health')
+async def health():
+    return {'status': 'healthy', 'service': 'webhook-gateway', 'timestamp': datetime.now().isoformat()}
+
+
+@app.get('/status')
+async def status():
+    return {
+        'status': 'running',
+        'queues': await asyncio.to_thread(job_queue.status),
+        'idempotency': upwork.idempotency.stats(),
+    }
+
+
+@app.get('/jobs/{job_id}')
+async def get_job(job_id: str):
+    """Local queue jobs by number; Modal calls (fc-...) by their call ID."""
+    if job_id.isdigit():
+        job = await asyncio.to_thread(job_queue.get, int(job_id))
+        if job is None:
+            return JSONResponse({'error': 'Job not found'}, status_code=404)
+        return job
+
+    try:
+        call = modal.FunctionCall.from_id(job_id)
+        result = await call.get.aio(timeout=0)
+    except TimeoutError:
+        return {'id': job_id, 'status': 'running'}
+    except Exception as e:
+        return {'id': job_id, 'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+    return {'id': job_id, 'status': 'done', 'result': result}
+
+
+# ============== LinkedIn (Modal) ==============
+
+@app.post('/webhook')
+async def linkedin_webhook(request: Request):
+    """Airtable Automation: {"record_id", "status", "base_id"?, "table_id"?} → spawn the Modal handler."""
+    data = await read_json(request)
+    if data is None:
+        return bad_request('Body must be a JSON object')
+
+    record_id = data.get('record_id')
+    status_name = data.get('status')
+    base_id = data.get('base_id') or os.environ.get('AIRTABLE_BASE_ID')
+    table_id = data.get('table_id') or os.environ.get('AIRTABLE_LINKEDIN_TABLE_ID')
+
+    if not all([record_id, status_name, base_id, table_id]):
+        return bad_request('Missing required fields: record_id, status, base_id, table_id')
+
+    function_name = LINKEDIN_ACTIONS.get(status_name)
+    if not function_name:
+        return bad_request(f"Unknown status: {status_name}")
+
+    logger.info(f"LinkedIn webhook: {record_id} → {status_name}")
+    try:
+        function = modal.Function.from_name(MODAL_APP_NAME, function_name)
+        call = await function.spawn.aio(record_id, base_id, table_id)
+    except Exception as e:
+        logger.error(f"Could not spawn {function_name} for {record_id}: {e}")
+        return JSONResponse({'success': False, 'error': str(e)}, status_code=502)
+
+    return JSONResponse({
+        'success': True,
+        'action': function_name,
+        'record_id': record_id,
+        'status': status_name,
+        'job_id': call.object_id,
+        'status_url': f"/jobs/{call.object_id}",
+    }, status_code=202)
+
+
+# ============== Upwork ==============
+
+async def fetch_upwork_record(record_id: str) -> Optional[Dict]:
+    """Fields of one Upwork job through the shared session, or None."""
+    url = f"{AIRTABLE_API_URL}/{upwork.AIRTABLE_BASE_ID}/{quote(upwork.AIRTABLE_TABLE)}/{record_id}"
+    try:
+        async with app.state.http.get(url, headers=upwork.get_airtable_headers()) as response:
+            if response.status != 200:
+                logger.error(f"Airtable returned {response.status} for {record_id}")
+                return None
+            return (await response.json()).get('fields', {})
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"Error fetching {record_id}: {e}")
+        return None
+
+
+async def enqueue_upwork(action: str, record_id: str, fields: Dict) -> JSONResponse:
+    # Same payload and key as webhook_airtable_automation.enqueue_job
+    return await enqueue(action, {'record_id': record_id, 'job': fields}, key=f"{record_id}:{action}")
+
+
+@app.post('/upwork/webhook/status-change')
+async def upwork_status_change(request: Request):
+    data = await read_json(request)
+    if data is None:
+        return bad_request('Body must be a JSON object')
+
+    record_id = data.get('record_id') or data.get('id')
+    fields = data.get('fields', data)
+    status_name = fields.get('Status', '')
+    if not record_id:
+        return bad_request('No record_id')
+
+    action = UPWORK_ACTIONS.get(status_name)
+    if not action:
+        return {'status': 'ignored', 'reason': f'Status is {status_name}'}
+    return await enqueue_upwork(action, record_id, fields)
+
+
+async def upwork_trigger(request: Request, action: str) -> JSONResponse:
+    data = await read_json(request)
+    record_id = (data or {}).get('record_id')
+    if not record_id:
+        return bad_request('record_id required')
+
+    fields = await fetch_upwork_record(record_id)
+    if fields is None:
+        return JSONResponse({'error': 'Record not found'}, status_code=404)
+    return await enqueue_upwork(action, record_id, fields)
+
+
+@app.post('/upwork/trigger/generate')
+async def upwork_trigger_generate(request: Request):
+    return await upwork_trigger(request, 'generate_proposal')
+
+
+@app.post('/upwork/trigger/submit')
+async def upwork_trigger_submit(request: Request):
+    return await upwork_trigger(request, 'submit_proposal')
+
+
+# ============== Client Proposals ==============
+
+@app.post('/proposals/analyze-transcript')
+async def analyze_transcript(request: Request):
+    data = await read_json(request) or {}
+    transcript = data.get('transcript', '')
+    if not transcript:
+        return bad_request('No transcript provided')
+    if len(transcript) < 100:
+        return bad_request('Transcript too short')
+
+    # A redelivered transcript joins the job already queued for it
+    return await enqueue('analyze_transcript', {'transcript': transcript},
+                         key=f"transcript:{content_version(transcript)}")
+
+
+@app.post('/proposals/generate-proposal')
+async def generate_proposal(request: Request):
+    data = await read_json(request) or {}
+    if not data.get('pain_points'):
+        return bad_request('No pain points provided')
+    return await enqueue('generate_client_proposal', data, key=f"proposal:{content_version(data)}")
+
+
+@app.post('/proposals/manual-input')
+async def manual_input(request: Request):
+    data = await read_json(request) or {}
+    if not data.get('pain_points'):
+        return bad_request('No pain points provided')
+    return proposals.process_manual_input(data)
+
+
+@app.post('/proposals/calculate-price')
+async def calculate_price(request: Request):
+    return proposals.calculate_price_from_request(await read_json(request) or {})
+
+
+# ============== Content Revisions ==============
+
+def revision_page(success: bool, message: str, status_code: int = 202) -> HTMLResponse:
+    """Small page for the Airtable button tab; closes itself."""
+    color = "#10B981" if success else "#EF4444"
+    return HTMLResponse(f"""<!DOCTYPE html>
+<html><head><title>Revision Status</title></head>
+<body style="font-family: -apple-system, sans-serif; display: flex; justify-content: center; align-items: center; height: 100vh; margin: 0;">
+  <div style="text-align: center;">
+    <div style="color: {color}; font-size: 24px; font-weight: 600;">{'Revision Queued' if success else 'Try Again Shortly'}</div>
+    <div style="color: #6B7280; font-size: 14px; margin-top: 8px;">{message}</div>
+  </div>
+  <script>setTimeout(function() {{ window.close(); }}, 3000);</script>
+</body></html>""", status_code=status_code)
+
+
+@app.api_route('/revise/{record_id}', methods=['GET', 'POST'])
+async def revise_record(record_id: str):
+    try:
+        job_id = await asyncio.to_thread(
+            job_queue.enqueue, 'revise_posts', {'record_ids': [record_id]}, f"revise:{record_id}"
+        )
+    except QueueFull as e:
+        return revision_page(False, f"The revision queue is full - try again in {e.retry_after}s.", status_code=429)
+
+    note = f"job {job_id}" if job_id else "already queued"
+    return revision_page(True, f"Content will be regenerated in the background ({note}). Check Airtable shortly!")
+
+
+@app.post('/automation/revise')
+async def automation_revise(request: Request):
+    data = await read_json(request)
+    if not data or 'record_id' not in data:
+        return bad_request('Missing record_id in request body')
+
+    record_id = data['record_id']
+    logger.info(f"Automation triggered revision for record: {record_id}")
+    return await enqueue('revise_posts', {'record_ids': [record_id]}, key=f"revise:{record_id}")
+
+
+@app.api_route('/revise-all', methods=['GET', 'POST'])
+async def revise_all():
+    return await enqueue('revise_posts', {'record_ids': None}, key="revise:all")
+
+
+def main():
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description='Async webhook gateway')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.getenv('WEBHOOK_GATEWAY_PORT', 8000)))
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print("WEBHOOK GATEWAY")
+    print("=" * 60)
+    print(f"  http://{args.host}:{args.port}  (see module docstring for routes)")
+    print(f"  Job queue: {GATEWAY_JOB_QUEUE_PATH}")
+    print("=" * 60 + "\n")
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == '__main__':
+    main()
@@ -14,12 +14,17 @@ Workflow:
 2. Change Status to "Approved" for jobs you want to apply to
 3. Webhook triggers automatic proposal submission
 4. Status updates to "Applied" or stays "Under Review" if failed
+
+Approved jobs go into a durable SQLite job queue (utils/job_queue.py) and are
+submitted by a bounded pool (one browser at a time by default); when the
+queue is full the webhooks answer 429. Each proposal is submitted once: the
+worker claims it in the idempotency store shared with
+webhook_airtable_automation.py before opening a browser.
 """
 
 import os
 import json
 import logging
-import threading
 from datetime import datetime
 from flask import Flask, request, jsonify
 from dotenv import load_dotenv
@@ -28,6 +33,8 @@ from dotenv import load_dotenv
 import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from upwork_proposal_submitter import UpworkProposalSubmitter
+from utils.idempotency import IdempotencyStore, SqliteIdempotencyStore, content_version
+from utils.job_queue import ActionConfig, JobQueue, QueueFull
 
 load_dotenv()
 
@@ -44,9 +51,14 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
-# Track submissions to avoid duplicates
-recent_submissions = {}
-SUBMISSION_COOLDOWN = 300  # 5 minutes cooldown per job
+# Submissions already made (or in flight) - shared with webhook_airtable_automation.py
+IDEMPOTENCY_PATH = os.getenv('UPWORK_IDEMPOTENCY_PATH', '.tmp/upwork_idempotency.sqlite')
+SUBMISSION_COOLDOWN = 300  # 5 minutes before a failed submission may run again
+idempotency = IdempotencyStore(SqliteIdempotencyStore(IDEMPOTENCY_PATH))
+
+# Durable job queue (see utils/job_queue.py)
+JOB_QUEUE_PATH = os.getenv('UPWORK_JOB_QUEUE_PATH', '.tmp/upwork_proposal_jobs.sqlite')
+SUBMIT_CONCURRENCY = int(os.getenv('UPWORK_SUBMIT_CONCURRENCY', 1))  # parallel Chrome instances
 
 
 def load_proposal_settings():
@@ -62,19 +74,18 @@ def load_proposal_settings():
 
 
 def process_job_async(job_data: dict, settings: dict):
-    """Process job submission in background thread."""
+    """Process job submission (runs on a job queue worker)."""
     job_id = job_data.get('Job ID', 'unknown')
     
-    # Check cooldown
-    last_submission = recent_submissions.get(job_id)
-    if last_submission:
-        elapsed = (datetime.now() - last_submission).total_seconds()
-        if elapsed < SUBMISSION_COOLDOWN:
-            logger.info(f"Job {job_id} on cooldown ({int(SUBMISSION_COOLDOWN - elapsed)}s remaining)")
-            return
+    # Skip proposals already submitted (by either Upwork server) or cooling down after a failure
+    key = idempotency.claim(job_data.get('_record_id') or job_id, 'submit_proposal',
+                            content_version(job_data.get('Proposal')))
+    if key is None:
+        return
     
     logger.info(f"Processing approved job: {job_data.get('Job Title', 'Unknown')[:50]}...")
     
+    success = False
     try:
         # Initialize submitter with settings
         boost = settings.get('connects', {}).get('boost_amount', 4)
@@ -83,9 +94,6 @@ def process_job_async(job_data: dict, settings: dict):
         # Submit proposal
         success, message = submitter.submit_proposal(job_data)
         
-        # Track submission
-        recent_submissions[job_id] = datetime.now()
-        
         if success:
             logger.info(f"✓ Successfully submitted proposal for job {job_id}")
         else:
@@ -95,6 +103,34 @@ def process_job_async(job_data: dict, settings: dict):
         
     except Exception as e:
         logger.error(f"Error processing job {job_id}: {e}")
+    finally:
+        idempotency.finish(key, success, cooldown=SUBMISSION_COOLDOWN)
+
+
+def _default_spacing() -> float:
+    settings = load_proposal_settings()
+    return settings.get('submission_limits', {}).get('delay_between_submissions', 30)
+
+
+job_queue = JobQueue(JOB_QUEUE_PATH, {
+    # Failed submissions are reported, not retried; only crashes are retried
+    'submit_proposal': ActionConfig(
+        lambda payload: process_job_async(payload['job'], load_proposal_settings()),
+        concurrency=SUBMIT_CONCURRENCY, max_pending=20, spacing=_default_spacing(),
+    ),
+})
+
+
+def enqueue_submission(fields: dict):
+    """Queue an approved job; returns the job ID or None if it's already queued. Raises QueueFull."""
+    key = f"{fields.get('_record_id') or fields.get('Job ID') or fields.get('Job URL')}:submit_proposal"
+    return job_queue.enqueue('submit_proposal', {'job': fields}, key=key)
+
+
+def queue_full_response(e: QueueFull, **extra):
+    response = jsonify({'status': 'busy', 'error': str(e), 'retry_after': e.retry_after, **extra})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 429
 
 
 @app.route('/health', methods=['GET'])
@@ -146,23 +182,18 @@ def handle_upwork_webhook():
         # Add record ID to fields
         fields['_record_id'] = record_id
         
-        # Load settings
-        settings = load_proposal_settings()
-        
-        # Process in background thread
-        thread = threading.Thread(
-            target=process_job_async,
-            args=(fields, settings)
-        )
-        thread.daemon = True
-        thread.start()
+        # Hand off to the submission workers
+        job_id = enqueue_submission(fields)
         
         return jsonify({
             'status': 'accepted',
-            'message': 'Job queued for proposal submission',
+            'message': 'Job queued for proposal submission' if job_id else 'Job already queued',
+            'job_id': job_id,
             'job_title': fields.get('Job Title', 'Unknown')[:50]
         })
         
+    except QueueFull as e:
+        return queue_full_response(e)
     except Exception as e:
         logger.error(f"Webhook error: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -197,13 +228,11 @@ def handle_batch_webhook():
             record_id = job_data.get('record_id') or job_data.get('id')
             fields['_record_id'] = record_id
             
-            thread = threading.Thread(
-                target=process_job_async,
-                args=(fields, settings)
-            )
-            thread.daemon = True
-            thread.start()
-            queued += 1
+            try:
+                if enqueue_submission(fields):
+                    queued += 1
+            except QueueFull as e:
+                return queue_full_response(e, queued=queued)
         
         return jsonify({
             'status': 'accepted',
@@ -269,7 +298,7 @@ def manual_submission():
 
 @app.route('/status', methods=['GET'])
 def get_status():
-    """Get current submission status and recent activity."""
+    """Get current submission status, queue depth and in-flight work."""
     settings = load_proposal_settings()
     
     return jsonify({
@@ -278,8 +307,9 @@ def get_status():
             'boost_connects': settings.get('connects', {}).get('boost_amount', 4),
             'max_per_run': settings.get('submission_limits', {}).get('max_per_run', 5),
         },
-        'recent_submissions': len(recent_submissions),
-        'cooldown_seconds': SUBMISSION_COOLDOWN
+        'idempotency': idempotency.stats(),
+        'cooldown_seconds': SUBMISSION_COOLDOWN,
+        'queues': job_queue.status()
     })
 
 
@@ -295,12 +325,15 @@ def main():
     print(f"  POST /webhook/upwork  - Airtable webhook for approvals")
     print(f"  POST /webhook/batch   - Process multiple jobs")
     print(f"  POST /submit/manual   - Manual job submission")
-    print(f"  GET  /status          - Check server status")
+    print(f"  GET  /status          - Server status, queue depth, in-flight jobs")
     print(f"  GET  /health          - Health check")
     print(f"\nTo expose publicly:")
     print(f"  ngrok http {port}")
     print("=" * 60 + "\n")
     
+    # Start the submission workers (also resumes jobs queued before a restart)
+    job_queue.start()
+    
     app.run(host='0.0.0.0', port=port, debug=False)
 
 
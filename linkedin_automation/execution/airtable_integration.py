@@ -12,16 +12,22 @@ import json
 import logging
 from typing import List, Dict, Optional
 import os
+import sys
 from datetime import datetime
 from dotenv import load_dotenv
-import requests
 
-# Configure logging
+# Shared pooled Airtable client lives in execution/utils at the project root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+from execution.utils.airtable_client import AirtableClient, AirtableError, formula_and, formula_eq
+
+# Configure logging (log dir is relative to this file, not the working directory)
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'logs')
+os.makedirs(LOG_DIR, exist_ok=True)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('../logs/linkedin_automation.log'),
+        logging.FileHandler(os.path.join(LOG_DIR, 'linkedin_automation.log')),
         logging.StreamHandler()
     ]
 )
@@ -45,10 +51,7 @@ class AirtableIntegration:
         self.base_id = os.getenv('AIRTABLE_BASE_ID', 'appw88uD6ZM0ckF8f')
         self.table_id = 'tbljg75KMQWDo2Hgu'  # LinkedIn Posts table
         self.base_url = "https://api.airtable.com/v0"
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        self.airtable = AirtableClient(self.base_id, self.table_id, api_key=self.api_key)
         
         # Table name to ID mapping
         self.tables = {
@@ -74,26 +77,11 @@ class AirtableIntegration:
             return None
         
         try:
-            url = f"{self.base_url}/{self.base_id}/{self.table_id}"
-            
-            payload = {
-                "records": [
-                    {
-                        "fields": fields
-                    }
-                ]
-            }
-            
-            response = requests.post(url, json=payload, headers=self.headers, timeout=30)
+            record = self.airtable.create_record(fields)
             
-            if response.status_code in [200, 201]:
-                result = response.json()
-                record = result.get('records', [{}])[0]
+            if record:
                 self.logger.info(f"Created record in {table_name}: {record.get('id')}")
-                return record
-            else:
-                self.logger.error(f"Error creating record: {response.status_code} - {response.text}")
-                return None
+            return record
                 
         except Exception as e:
             self.logger.error(f"Error creating Airtable record: {e}")
@@ -121,33 +109,24 @@ class AirtableIntegration:
             return None
         
         try:
-            url = f"{self.base_url}/{self.base_id}/{table_id}/{record_id}"
-            
-            payload = {
-                "fields": fields
-            }
+            result = AirtableClient(self.base_id, table_id, api_key=self.api_key).update_record(record_id, fields)
             
-            response = requests.patch(url, json=payload, headers=self.headers, timeout=30)
-            
-            if response.status_code in [200, 201]:
-                result = response.json()
+            if result:
                 self.logger.info(f"Updated record in {table_name}: {record_id}")
-                return result
-            else:
-                self.logger.error(f"Error updating record: {response.status_code} - {response.text}")
-                return None
+            return result
                 
         except Exception as e:
             self.logger.error(f"Error updating Airtable record: {e}")
             return None
     
-    def get_records(self, table_name: str, filter_formula: str = None) -> List[Dict]:
+    def get_records(self, table_name: str, filter_formula: str = None, fields: List[str] = None) -> List[Dict]:
         """
-        Get records from Airtable
+        Get records from Airtable (all pages)
         
         Args:
             table_name: Name of the table
             filter_formula: Optional Airtable filter formula
+            fields: Optional list of fields to return (defaults to all)
         
         Returns:
             List of records
@@ -162,23 +141,14 @@ class AirtableIntegration:
             return []
         
         try:
-            url = f"{self.base_url}/{self.base_id}/{table_id}"
-            
-            params = {}
-            if filter_formula:
-                params['filterByFormula'] = filter_formula
-            
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            
-            if response.status_code == 200:
-                result = response.json()
-                records = result.get('records', [])
-                self.logger.info(f"Retrieved {len(records)} records from {table_name}")
-                return records
-            else:
-                self.logger.error(f"Error getting records: {response.status_code}")
-                return []
-                
+            client = AirtableClient(self.base_id, table_id, api_key=self.api_key)
+            records = list(client.iter_records(formula=filter_formula, fields=fields))
+            self.logger.info(f"Retrieved {len(records)} records from {table_name}")
+            return records
+        
+        except AirtableError as e:
+            self.logger.error(f"Error getting records: {e.status_code}")
+            return []
         except Exception as e:
             self.logger.error(f"Error getting Airtable records: {e}")
             return []
@@ -389,27 +359,19 @@ class AirtableIntegration:
             True if successful
         """
         try:
-            import requests
-            
-            url = f"{self.base_url}/{self.base_id}/{self.table_id}/{record_id}"
-            
-            payload = {
-                "fields": {
-                    "Status": status
-                }
+            fields = {
+                "Status": status
             }
             
             if status == "Posted":
-                payload["fields"]["Posted Time"] = datetime.now().isoformat()
-            
-            response = requests.patch(url, json=payload, headers=self.headers, timeout=30)
+                fields["Posted Time"] = datetime.now().isoformat()
             
-            if response.status_code == 200:
+            if self.airtable.update_record(record_id, fields) is not None:
                 self.logger.info(f"Updated post {record_id} status to: {status}")
                 return True
-            else:
-                self.logger.error(f"Failed to update status: {response.status_code} - {response.text}")
-                return False
+            
+            self.logger.error(f"Failed to update status for {record_id}")
+            return False
                 
         except Exception as e:
             self.logger.error(f"Error updating post status: {e}")
@@ -426,34 +388,26 @@ class AirtableIntegration:
             Number of records deleted
         """
         try:
-            import requests
             from datetime import timedelta
             
             cutoff_date = datetime.now() - timedelta(days=days_to_keep)
             cutoff_str = cutoff_date.strftime('%Y-%m-%d')
             
             # Get all posted records older than cutoff
-            formula = f"AND({{Status}}='Posted', IS_BEFORE({{Posted Time}}, '{cutoff_str}'))"
+            formula = formula_and(formula_eq('Status', 'Posted'), f"IS_BEFORE({{Posted Time}}, '{cutoff_str}')")
             
-            url = f"{self.base_url}/{self.base_id}/{self.table_id}"
-            params = {"filterByFormula": formula}
-            
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            
-            if response.status_code != 200:
-                self.logger.error(f"Failed to fetch old posts: {response.status_code}")
+            try:
+                records = list(self.airtable.iter_records(formula=formula, fields=['Status']))
+            except AirtableError as e:
+                self.logger.error(f"Failed to fetch old posts: {e.status_code}")
                 return 0
             
-            records = response.json().get('records', [])
             deleted_count = 0
             
             for record in records:
                 record_id = record.get('id')
-                delete_url = f"{url}/{record_id}"
-                
-                del_response = requests.delete(delete_url, headers=self.headers, timeout=30)
                 
-                if del_response.status_code == 200:
+                if self.airtable.delete_record(record_id):
                     deleted_count += 1
                     self.logger.info(f"Deleted old post: {record_id}")
             
@@ -472,24 +426,16 @@ class AirtableIntegration:
             List of approved posts without scheduled times
         """
         try:
-            import requests
-            
             # Posts with "Approved - Ready to Schedule" status
-            formula = "{Status}='Approved - Ready to Schedule'"
-            
-            url = f"{self.base_url}/{self.base_id}/{self.table_id}"
-            params = {"filterByFormula": formula}
+            formula = formula_eq('Status', 'Approved - Ready to Schedule')
             
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            
-            if response.status_code == 200:
-                records = response.json().get('records', [])
-                self.logger.info(f"Found {len(records)} approved posts ready for scheduling")
-                return records
-            else:
-                self.logger.error(f"Failed to get approved posts: {response.status_code}")
-                return []
-                
+            records = list(self.airtable.iter_records(formula=formula))
+            self.logger.info(f"Found {len(records)} approved posts ready for scheduling")
+            return records
+        
+        except AirtableError as e:
+            self.logger.error(f"Failed to get approved posts: {e.status_code}")
+            return []
         except Exception as e:
             self.logger.error(f"Error getting approved posts for scheduling: {e}")
             return []
@@ -16,18 +16,22 @@ from dotenv import load_dotenv
 # Path: linkedin_automation/execution/content_revisions.py -> need to go up to project root
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 from execution.utils.cost_optimizer import CostTracker, PromptCache, PromptCompressor
+from execution.utils.airtable_client import AirtableError
+from execution.utils.image_cache import attach_image
 
 # Import will happen in __init__ to avoid circular imports
 # from research_content import ContentResearcher
 # from generate_images import ImageGenerator
 # from airtable_integration import AirtableIntegration
 
-# Configure logging
+# Configure logging (log dir is relative to this file, not the working directory)
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'logs')
+os.makedirs(LOG_DIR, exist_ok=True)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('../logs/linkedin_automation.log'),
+        logging.FileHandler(os.path.join(LOG_DIR, 'linkedin_automation.log')),
         logging.StreamHandler()
     ]
 )
@@ -73,30 +77,24 @@ class ContentRevisionProcessor:
             Number of posts revised
         """
         try:
-            import requests
+            client = self.airtable.airtable
             
             # If specific record IDs provided, fetch only those
             if record_ids:
                 records = []
                 for rec_id in record_ids:
-                    url = f"{self.airtable.base_url}/{self.airtable.base_id}/{self.airtable.table_id}/{rec_id}"
-                    response = requests.get(url, headers=self.airtable.headers, timeout=30)
-                    if response.status_code == 200:
-                        records.append(response.json())
+                    record = client.get_record(rec_id)
+                    if record:
+                        records.append(record)
             else:
                 # Get all posts with non-empty Revision Prompt that aren't "Posted"
                 formula = "AND({Revision Prompt}!='', {Status}!='Posted')"
                 
-                url = f"{self.airtable.base_url}/{self.airtable.base_id}/{self.airtable.table_id}"
-                params = {"filterByFormula": formula}
-                
-                response = requests.get(url, headers=self.airtable.headers, params=params, timeout=30)
-                
-                if response.status_code != 200:
-                    self.logger.error(f"Failed to fetch posts for revision: {response.status_code}")
+                try:
+                    records = list(client.iter_records(formula=formula))
+                except AirtableError as e:
+                    self.logger.error(f"Failed to fetch posts for revision: {e.status_code}")
                     return 0
-                
-                records = response.json().get('records', [])
             revised_count = 0
             
             for record in records:
@@ -383,14 +381,16 @@ Output: ONLY the revised image prompt."""
                 cached_tokens=message.usage.cache_read_input_tokens if hasattr(message.usage, 'cache_read_input_tokens') else 0
             )
 
-            # Generate new image with revised prompt
-            image_obj = self.image_gen.generate_image(new_prompt)
+            # Generate new image with revised prompt (identical prompts come from the image cache,
+            # which can upload the bytes itself once the hosted URL has expired)
+            image_obj = self.image_gen.generate_image(new_prompt, require_url=False)
 
             if image_obj:
                 self.logger.info(f"Regenerated image with new prompt")
                 return {
                     'image_url': image_obj.get('image_url'),
-                    'image_prompt': new_prompt
+                    'image_prompt': new_prompt,
+                    'cached': image_obj.get('cached')
                 }
 
             return None
@@ -402,23 +402,15 @@ Output: ONLY the revised image prompt."""
     def _update_post_content(self, record_id: str, new_content: str) -> bool:
         """Update post content in Airtable"""
         try:
-            import requests
-            
-            url = f"{self.airtable.base_url}/{self.airtable.base_id}/{self.airtable.table_id}/{record_id}"
-            
-            payload = {
-                "fields": {
-                    "Post Content": new_content
-                }
+            fields = {
+                "Post Content": new_content
             }
             
-            response = requests.patch(url, json=payload, headers=self.airtable.headers, timeout=30)
-            
-            if response.status_code == 200:
+            if self.airtable.airtable.update_record(record_id, fields) is not None:
                 self.logger.info(f"Updated post content for record {record_id}")
                 return True
             else:
-                self.logger.error(f"Failed to update post: {response.status_code}")
+                self.logger.error(f"Failed to update post {record_id}")
                 return False
                 
         except Exception as e:
@@ -428,25 +420,27 @@ Output: ONLY the revised image prompt."""
     def _update_image(self, record_id: str, image_data: Dict) -> bool:
         """Update image in Airtable"""
         try:
-            import requests
-            
-            url = f"{self.airtable.base_url}/{self.airtable.base_id}/{self.airtable.table_id}/{record_id}"
-            
-            payload = {
-                "fields": {
-                    "Image URL": image_data.get('image_url'),
-                    "Image Prompt": image_data.get('image_prompt'),
-                    "Image": [{"url": image_data.get('image_url')}]
-                }
+            if image_data.get('cached') and not image_data.get('image_url'):
+                # Cached image whose hosted URL expired: upload the bytes instead
+                fields = {"Image Prompt": image_data.get('image_prompt')}
+                if attach_image(self.airtable.airtable, record_id, image_data['cached'], extra_fields=fields,
+                                url_field="Image URL"):
+                    self.logger.info(f"Updated image for record {record_id} from cache")
+                    return True
+                self.logger.error(f"Failed to update image for {record_id}")
+                return False
+
+            fields = {
+                "Image URL": image_data.get('image_url'),
+                "Image Prompt": image_data.get('image_prompt'),
+                "Image": [{"url": image_data.get('image_url')}]
             }
             
-            response = requests.patch(url, json=payload, headers=self.airtable.headers, timeout=30)
-            
-            if response.status_code == 200:
+            if self.airtable.airtable.update_record(record_id, fields) is not None:
                 self.logger.info(f"Updated image for record {record_id}")
                 return True
             else:
-                self.logger.error(f"Failed to update image: {response.status_code}")
+                self.logger.error(f"Failed to update image for {record_id}")
                 return False
                 
         except Exception as e:
@@ -456,10 +450,6 @@ Output: ONLY the revised image prompt."""
     def _log_revision_and_clear_prompt(self, record_id: str, original_prompt: str, revision_type: str, change_summary: str = None) -> bool:
         """Log revision details in Notes and clear Revision Prompt field"""
         try:
-            import requests
-            
-            url = f"{self.airtable.base_url}/{self.airtable.base_id}/{self.airtable.table_id}/{record_id}"
-            
             timestamp = datetime.now().strftime("%Y-%m-%d %I:%M %p")
             
             # Build detailed log message
@@ -469,16 +459,12 @@ Output: ONLY the revised image prompt."""
             log_message += f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
             log_message += f"🔄 Changes Made:\n{change_summary if change_summary else 'Changes applied as requested.'}"
             
-            payload = {
-                "fields": {
-                    "Revision Prompt": "",  # Clear prompt after processing
-                    "Notes": log_message  # Log detailed changes
-                }
+            fields = {
+                "Revision Prompt": "",  # Clear prompt after processing
+                "Notes": log_message  # Log detailed changes
             }
             
-            response = requests.patch(url, json=payload, headers=self.airtable.headers, timeout=30)
-            
-            if response.status_code == 200:
+            if self.airtable.airtable.update_record(record_id, fields) is not None:
                 self.logger.info(f"Logged revision and cleared prompt for record {record_id}")
                 return True
             else:
@@ -9,18 +9,28 @@ import json
 import logging
 from typing import Dict, Optional
 import os
+import sys
 from datetime import datetime
 from dotenv import load_dotenv
 import requests
 import base64
-import time
 
-# Configure logging
+# Shared Replicate helpers live in execution/utils
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../execution'))
+from utils.image_cache import ImageCache, image_cache_key
+from utils.replicate_predictions import DEFAULT_MAX_IN_FLIGHT, ReplicateClient, output_url
+
+# Generated images keyed by model + prompt + size, shared by every local run
+IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR', os.path.join(os.path.dirname(__file__), '../../.tmp/image_cache'))
+
+# Configure logging (log dir is relative to this file, not the working directory)
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'logs')
+os.makedirs(LOG_DIR, exist_ok=True)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('../logs/linkedin_automation.log'),
+        logging.FileHandler(os.path.join(LOG_DIR, 'linkedin_automation.log')),
         logging.StreamHandler()
     ]
 )
@@ -40,142 +50,104 @@ class ImageGenerator:
             api_key: Replicate API token (defaults to REPLICATE_API_TOKEN env var)
         """
         self.api_key = api_key or os.getenv('REPLICATE_API_TOKEN')
-        self.base_url = "https://api.replicate.com/v1"
+        self.replicate = ReplicateClient(api_token=self.api_key)
+        self.cache = ImageCache(IMAGE_CACHE_DIR)
         # Using Google Nano Banana Pro for high-quality business images
         self.model_version = "google/nano-banana-pro"
         self.logger = logger
+
+    def _build_input(self, prompt: str, width: int = 1024, height: int = 1024,
+                     negative_prompt: str = None) -> Dict:
+        """Replicate input for a prompt (enhanced for better results)"""
+        return {
+            "prompt": self._enhance_prompt(prompt),
+            "width": width,
+            "height": height,
+            "num_inference_steps": 30,
+            "guidance_scale": 7.5,
+            "negative_prompt": negative_prompt or "low quality, blurry, distorted, ugly, text, watermark"
+        }
+
+    def _image_obj(self, image_url: str, model_input: Dict) -> Dict:
+        return {
+            "image_url": image_url,
+            "prompt": model_input["prompt"],
+            "generated_at": datetime.now().isoformat(),
+            "width": model_input["width"],
+            "height": model_input["height"],
+            "status": "GENERATED"
+        }
+
+    def _cache_key(self, model_input: Dict) -> str:
+        return image_cache_key(self.model_version, model_input["prompt"], model_input["width"],
+                               model_input["height"], model_input["negative_prompt"])
+
+    def _cached_image(self, model_input: Dict, require_url: bool) -> Optional[Dict]:
+        """
+        Image object for a previously generated identical request, or None.
+
+        With require_url, only entries whose hosted URL is still live count
+        (callers that hand the URL to Airtable); otherwise the cached file
+        path is returned for callers that can upload bytes.
+        """
+        cached = self.cache.get(self._cache_key(model_input))
+        if not cached or (require_url and not cached.url_is_fresh()):
+            return None
+
+        self.logger.info("♻️ Image cache hit - skipping Replicate")
+        image_obj = self._image_obj(cached.url if cached.url_is_fresh() else None, model_input)
+        image_obj["cached"] = cached
+        image_obj["status"] = "CACHED"
+        return image_obj
+
+    def _store_in_cache(self, model_input: Dict, image_url: str) -> None:
+        try:
+            self.cache.put_from_url(self._cache_key(model_input), image_url)
+        except OSError as e:
+            self.logger.warning(f"Could not cache image: {e}")
     
     def generate_image(self, prompt: str, width: int = 1024, height: int = 1024, 
-                      negative_prompt: str = None) -> Optional[Dict]:
+                      negative_prompt: str = None, require_url: bool = True) -> Optional[Dict]:
         """
-        Generate an image using Replicate
+        Generate an image using Replicate (or reuse an identical cached one)
         
         Args:
             prompt: Detailed image prompt
             width: Image width (default 1024 for SDXL)
             height: Image height (default 1024 for square format)
             negative_prompt: What to avoid in the image
+            require_url: Only reuse cached images whose hosted URL is still live
         
         Returns:
-            Dict with image URL and metadata, or None if failed
+            Dict with image URL and metadata, or None if failed. Cache hits
+            also carry the CachedImage under 'cached' (image_url may be None
+            when require_url is False)
         """
+        model_input = self._build_input(prompt, width, height, negative_prompt)
+        cached = self._cached_image(model_input, require_url)
+        if cached:
+            return cached
+        
         if not self.api_key:
             self.logger.error("REPLICATE_API_TOKEN not configured")
             return None
         
-        try:
-            # Enhance prompt for better results
-            enhanced_prompt = self._enhance_prompt(prompt)
-            
-            payload = {
-                "version": self.model_version,
-                "input": {
-                    "prompt": enhanced_prompt,
-                    "width": width,
-                    "height": height,
-                    "num_inference_steps": 30,
-                    "guidance_scale": 7.5,
-                    "negative_prompt": negative_prompt or "low quality, blurry, distorted, ugly, text, watermark"
-                }
-            }
-            
-            headers = {
-                "Authorization": f"Token {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            self.logger.info(f"Requesting image generation from Replicate")
-            
-            # Create prediction
-            response = requests.post(
-                f"{self.base_url}/predictions",
-                json=payload,
-                headers=headers,
-                timeout=30
-            )
-            
-            if response.status_code == 201:
-                prediction = response.json()
-                prediction_id = prediction.get('id')
-                
-                # Poll for completion
-                self.logger.info(f"Prediction created: {prediction_id}, waiting for completion...")
-                image_url = self._wait_for_prediction(prediction_id, headers)
-                
-                if image_url:
-                    image_obj = {
-                        "image_url": image_url,
-                        "prompt": enhanced_prompt,
-                        "generated_at": datetime.now().isoformat(),
-                        "width": width,
-                        "height": height,
-                        "status": "GENERATED"
-                    }
-                    
-                    self.logger.info("Image generated successfully")
-                    return image_obj
-                else:
-                    self.logger.error("Failed to get image URL from prediction")
-                    return None
-            else:
-                self.logger.error(f"Image generation failed: {response.status_code} - {response.text}")
-                return None
-                
-        except requests.Timeout:
-            self.logger.error("Image generation request timed out")
-            return None
-        except Exception as e:
-            self.logger.error(f"Error generating image: {e}")
+        self.logger.info(f"Requesting image generation from Replicate")
+        
+        prediction = self.replicate.create_prediction(self.model_version, model_input)
+        if not prediction:
             return None
-    
-    def _wait_for_prediction(self, prediction_id: str, headers: dict, max_wait: int = 120) -> Optional[str]:
-        """
-        Poll Replicate API until prediction is complete
         
-        Args:
-            prediction_id: ID of the prediction to poll
-            headers: Request headers with auth
-            max_wait: Maximum seconds to wait
+        self.logger.info(f"Prediction created: {prediction['id']}, waiting for completion...")
+        image_url = output_url(self.replicate.wait(prediction['id'], timeout=120))
         
-        Returns:
-            Image URL or None if failed/timeout
-        """
-        start_time = time.time()
-        
-        while time.time() - start_time < max_wait:
-            try:
-                response = requests.get(
-                    f"{self.base_url}/predictions/{prediction_id}",
-                    headers=headers,
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    status = result.get('status')
-                    
-                    if status == 'succeeded':
-                        output = result.get('output')
-                        if output and isinstance(output, list) and len(output) > 0:
-                            return output[0]  # First image URL
-                        elif isinstance(output, str):
-                            return output
-                    elif status == 'failed':
-                        self.logger.error(f"Prediction failed: {result.get('error')}")
-                        return None
-                    
-                    # Still processing, wait and retry
-                    time.sleep(2)
-                else:
-                    self.logger.error(f"Error polling prediction: {response.status_code}")
-                    return None
-                    
-            except Exception as e:
-                self.logger.error(f"Error polling prediction: {e}")
-                return None
+        if not image_url:
+            self.logger.error("Failed to get image URL from prediction")
+            return None
         
-        self.logger.error("Prediction timed out")
-        return None
+        self.logger.info("Image generated successfully")
+        self._store_in_cache(model_input, image_url)
+        return self._image_obj(image_url, model_input)
     
     def _enhance_prompt(self, prompt: str) -> str:
         """
@@ -232,6 +204,19 @@ class ImageGenerator:
             self.logger.error(f"Error downloading image: {e}")
             return None
     
+    def save_cached_image(self, cached, filename: str,
+                          output_dir: str = "../.tmp/linkedin_images/") -> Optional[str]:
+        """Copy a cached image to the local images folder (no download)"""
+        os.makedirs(output_dir, exist_ok=True)
+        filepath = os.path.join(output_dir, filename)
+        try:
+            with open(filepath, 'wb') as f:
+                f.write(cached.read_bytes())
+            return filepath
+        except OSError as e:
+            self.logger.error(f"Error saving cached image: {e}")
+            return None
+    
     def generate_for_post(self, post: Dict, save_locally: bool = True) -> Dict:
         """
         Generate image for a LinkedIn post
@@ -249,66 +234,96 @@ class ImageGenerator:
             return post
         
         try:
-            # Generate image
-            image_obj = self.generate_image(image_prompt)
+            return self._apply_image(post, self.generate_image(image_prompt), save_locally)
+        except Exception as e:
+            self.logger.error(f"Error in generate_for_post: {e}")
+            post['image_status'] = "ERROR"
+            return post
+    
+    def _apply_image(self, post: Dict, image_obj: Optional[Dict], save_locally: bool) -> Dict:
+        """Record a generated image (or the failure) on the post object"""
+        if image_obj:
+            image_url = image_obj.get('image_url')
             
-            if image_obj:
-                image_url = image_obj.get('image_url')
-                
-                if save_locally and image_url:
-                    # Download and save locally
-                    filename = f"{post.get('title', 'post')[:30].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                    image_path = self.download_image(image_url, filename=filename)
-                    
-                    if image_path:
-                        post['image_local_path'] = image_path
-                        post['image_url'] = image_url  # Keep both local and remote
-                    else:
-                        post['image_url'] = image_url  # Just use remote URL
+            if save_locally and image_url:
+                # Download (or copy from the image cache) and save locally
+                filename = f"{post.get('title', 'post')[:30].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+                if image_obj.get('cached'):
+                    image_path = self.save_cached_image(image_obj['cached'], filename=filename)
                 else:
-                    post['image_url'] = image_url
-                
-                post['image_generated_at'] = image_obj.get('generated_at')
-                post['image_status'] = "READY"
+                    image_path = self.download_image(image_url, filename=filename)
                 
-                self.logger.info(f"Image generated for post: {post.get('title')}")
+                if image_path:
+                    post['image_local_path'] = image_path
+                    post['image_url'] = image_url  # Keep both local and remote
+                else:
+                    post['image_url'] = image_url  # Just use remote URL
             else:
-                post['image_status'] = "FAILED"
-                self.logger.warning(f"Failed to generate image for post: {post.get('title')}")
+                post['image_url'] = image_url
             
-            return post
+            post['image_generated_at'] = image_obj.get('generated_at')
+            post['image_status'] = "READY"
             
-        except Exception as e:
-            self.logger.error(f"Error in generate_for_post: {e}")
-            post['image_status'] = "ERROR"
-            return post
+            self.logger.info(f"Image generated for post: {post.get('title')}")
+        else:
+            post['image_status'] = "FAILED"
+            self.logger.warning(f"Failed to generate image for post: {post.get('title')}")
+        
+        return post
     
-    def generate_batch_images(self, posts: list, save_locally: bool = True) -> list:
+    def generate_batch_images(self, posts: list, save_locally: bool = True,
+                              max_in_flight: int = DEFAULT_MAX_IN_FLIGHT) -> list:
         """
         Generate images for multiple posts
         
+        Predictions run in parallel (up to `max_in_flight` at once), so a
+        batch takes about as long as its slowest image.
+        
         Args:
             posts: List of post objects
             save_locally: Whether to save images to disk
+            max_in_flight: Predictions running at once
         
         Returns:
             Updated posts with image data
         """
-        updated_posts = []
+        with_prompts = [post for post in posts if post.get('image_prompt')]
+        for post in posts:
+            if not post.get('image_prompt'):
+                self.logger.warning("No image prompt provided for post")
         
-        for i, post in enumerate(posts):
-            self.logger.info(f"Generating image {i+1}/{len(posts)}")
-            
-            # Add delay between requests to avoid rate limiting
-            if i > 0:
-                time.sleep(2)
-            
-            updated_post = self.generate_for_post(post, save_locally=save_locally)
-            updated_posts.append(updated_post)
+        # Identical prompts generated recently come from the image cache (no API key needed)
+        to_generate = []
+        for post in with_prompts:
+            model_input = self._build_input(post['image_prompt'])
+            cached = self._cached_image(model_input, require_url=True)
+            if cached:
+                self._apply_image(post, cached, save_locally)
+            else:
+                to_generate.append((post, model_input))
         
-        self.logger.info(f"Generated images for {len(updated_posts)} posts")
-        return updated_posts
-    
+        if to_generate and not self.api_key:
+            self.logger.error("REPLICATE_API_TOKEN not configured")
+            to_generate = []
+        
+        inputs = [model_input for _, model_input in to_generate]
+        self.logger.info(f"Generating {len(inputs)} images ({min(len(inputs), max_in_flight)} at a time)")
+        finals = self.replicate.run_batch(self.model_version, inputs, max_in_flight=max_in_flight, timeout=120)
+        
+        for (post, model_input), prediction in zip(to_generate, finals):
+            image_url = output_url(prediction)
+            image_obj = None
+            if image_url:
+                self._store_in_cache(model_input, image_url)
+                image_obj = self._image_obj(image_url, model_input)
+            try:
+                self._apply_image(post, image_obj, save_locally)
+            except Exception as e:
+                self.logger.error(f"Error saving image for {post.get('title')}: {e}")
+                post['image_status'] = "ERROR"
+        
+        self.logger.info(f"Generated images for {len(posts)} posts")
+        return posts
 
 
 
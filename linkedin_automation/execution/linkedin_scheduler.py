@@ -9,12 +9,17 @@ import json
 import logging
 from typing import List, Dict, Optional
 import os
+import sys
 from datetime import datetime, timedelta
 import random
 from dotenv import load_dotenv
 from pytz import timezone as tz
 from linkedin_poster_selenium import LinkedInPosterSelenium
 
+# Shared slot calendar lives in execution/utils at the project root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../execution'))
+from utils.slot_calendar import SlotCalendar, Window
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -49,6 +54,23 @@ class LinkedInScheduler:
         self.timezone_str = 'America/New_York'
         self.logger = logger
         self.timezone = tz(self.timezone_str)
+        self.windows = [
+            Window(start=sh * 60 + sm, end=eh * 60 + em + 1, earliest=sh * 60 + sm, latest=eh * 60 + em,
+                   label=f"{sh}:{sm:02d}-{eh}:{em:02d}")
+            for sh, sm, eh, em in self.time_windows
+        ]
+
+    def build_calendar(self, records: List[Dict] = ()) -> SlotCalendar:
+        """
+        Slot calendar for this scheduler's windows
+
+        Args:
+            records: Airtable records whose 'Scheduled Time' already holds a window
+
+        Returns:
+            SlotCalendar with those windows marked as taken
+        """
+        return SlotCalendar.from_records(records, self.windows, tz=self.timezone)
     
     def get_random_time_in_window(self, start_hour: int, start_min: int, 
                                    end_hour: int, end_min: int, base_date: datetime) -> datetime:
@@ -78,36 +100,37 @@ class LinkedInScheduler:
         
         return base_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
     
-    def get_schedule_times(self, base_date: datetime = None, days_ahead: int = 7) -> List[datetime]:
+    def get_schedule_times(self, base_date: datetime = None, days_ahead: int = 7,
+                           calendar: SlotCalendar = None) -> List[datetime]:
         """
-        Get randomized posting times for the next N days
+        Get randomized posting times for the next N days' worth of windows
         
         Args:
             base_date: Starting date (defaults to tomorrow)
             days_ahead: Number of days to schedule (default 7)
+            calendar: Windows already taken (see build_calendar); they are skipped
         
         Returns:
-            List of datetime objects with randomized times in specified windows
+            List of days_ahead × 3 datetimes, one per free window, in order
         """
         if not base_date:
             # Start from tomorrow
             base_date = datetime.now(self.timezone).replace(hour=0, minute=0, second=0, microsecond=0)
             base_date += timedelta(days=1)
         
-        scheduled_times = []
+        if calendar is None:
+            calendar = self.build_calendar()
         
-        for day_offset in range(days_ahead):
-            current_day = base_date + timedelta(days=day_offset)
-            
-            # Generate 3 random times for this day (one in each window)
-            for window in self.time_windows:
-                random_time = self.get_random_time_in_window(
-                    window[0], window[1], window[2], window[3], current_day
-                )
-                scheduled_times.append(random_time)
+        # Claim the next free window repeatedly (one per window when nothing is taken)
+        scheduled_times = []
+        for _ in range(days_ahead * len(self.windows)):
+            scheduled_time = calendar.take(base_date - timedelta(minutes=1))
+            if scheduled_time is None:
+                break
+            scheduled_times.append(scheduled_time)
         
         self.logger.info(f"Generated {len(scheduled_times)} randomized posting times over {days_ahead} days")
-        return sorted(scheduled_times)
+        return scheduled_times
     
     def schedule_post(self, post_content: Dict, scheduled_time: datetime) -> Optional[Dict]:
         """
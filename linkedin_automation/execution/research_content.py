@@ -19,12 +19,14 @@ import anthropic
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from utils.cost_optimizer import CostTracker, PromptCache, PromptCompressor
 
-# Configure logging
+# Configure logging (log dir is relative to this file, not the working directory)
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'logs')
+os.makedirs(LOG_DIR, exist_ok=True)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('../logs/linkedin_automation.log'),
+        logging.FileHandler(os.path.join(LOG_DIR, 'linkedin_automation.log')),
         logging.StreamHandler()
     ]
 )
@@ -48,6 +50,71 @@ WRITING_FRAMEWORKS = [
 ]
 
 
+# Per-framework structure; the chosen one goes in the post-writing system prompt
+FRAMEWORK_INSTRUCTIONS = {
+    "PAS (Problem-Agitate-Solution)": """
+Structure your post as:
+- Problem: Identify a pain point your audience faces
+- Agitate: Emphasize the consequences of not solving it
+- Solution: Present the solution/insight""",
+    
+    "AIDA (Attention-Interest-Desire-Action)": """
+Structure your post as:
+- Attention: Hook with a bold statement or question
+- Interest: Share intriguing facts or story
+- Desire: Show benefits and outcomes
+- Action: Clear call-to-action""",
+    
+    "BAB (Before-After-Bridge)": """
+Structure your post as:
+- Before: Describe the current painful state
+- After: Paint the ideal outcome picture
+- Bridge: Explain how to get from before to after""",
+    
+    "Storytelling": """
+Structure your post as a narrative:
+- Set the scene with a relatable situation
+- Build tension or challenge
+- Share the turning point/insight
+- End with lesson learned and takeaway""",
+    
+    "How-To Guide": """
+Structure your post as actionable steps:
+- Start with what the reader will learn
+- Break down into clear, numbered steps
+- Each step should be specific and actionable
+- End with encouragement to try it""",
+    
+    "Listicle": """
+Structure your post as a list:
+- Open with context on why this list matters
+- Present 3-7 items with brief explanations
+- Use numbers or bullet points for clarity
+- Close with a synthesis or call-to-action""",
+    
+    "Case Study": """
+Structure your post as a real example:
+- Introduce the situation/challenge
+- Detail the approach taken
+- Share specific results with numbers if possible
+- Extract the universal lesson""",
+    
+    "Question-Answer": """
+Structure your post around a key question:
+- Open with a thought-provoking question
+- Acknowledge common misconceptions
+- Provide your answer with reasoning
+- Invite discussion with follow-up question"""
+}
+
+# Post-writing system prompt, filled in with the chosen framework only (well
+# under Sonnet's 1,024-token cache minimum, so it is sent uncached)
+POST_SYSTEM_INSTRUCTION = """Generate LinkedIn posts using {framework} framework.
+Requirements: 150-300 words, attention-grabbing, practical value, subtle CTA, professional but conversational tone, 2-3 hashtags.
+Output: ONLY post text.
+{steps}"""
+
+
 class ContentResearcher:
     """Research and generate LinkedIn post ideas using Claude AI"""
     
@@ -83,30 +150,25 @@ class ContentResearcher:
 Respond ONLY with valid JSON array, no markdown.
 Format: {{"type": "Type", "title": "Title", "description": "1-2 sentences", "key_points": ["P1", "P2", "P3"], "image_concept": "Concept", "engagement_level": "high/medium/low"}}"""
 
-            message = self.client.messages.create(
-                model="claude-sonnet-4-5",  # CHANGED: Opus → Sonnet (40% savings)
-                max_tokens=2000,  # CHANGED: Reduced from 4000
-                system=[
-                    PromptCache.add_cache_control(system_instruction, ttl="ephemeral")  # ADDED: Caching
-                ],
-                messages=[
-                    {
-                        "role": "user",
-                        "content": f"Generate {count} LinkedIn post ideas about: {topic}"
-                    }
-                ]
-            )
+            with cost_tracker.timer() as timing:
+                message = self.client.messages.create(
+                    model="claude-sonnet-4-5",  # CHANGED: Opus → Sonnet (40% savings)
+                    max_tokens=2000,  # CHANGED: Reduced from 4000
+                    system=[
+                        PromptCache.add_cache_control(system_instruction, ttl="ephemeral")  # ADDED: Caching
+                    ],
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": f"Generate {count} LinkedIn post ideas about: {topic}"
+                        }
+                    ]
+                )
 
             response_text = message.content[0].text
 
             # Log cost for this API call
-            cost_tracker.log_call(
-                model="claude-sonnet-4-5",
-                input_tokens=message.usage.input_tokens,
-                output_tokens=message.usage.output_tokens,
-                endpoint="research_single_topic",
-                cached_tokens=message.usage.cache_read_input_tokens if hasattr(message.usage, 'cache_read_input_tokens') else 0
-            )
+            cost_tracker.log_message(message, model="claude-sonnet-4-5", endpoint="research_single_topic", latency_ms=timing.latency_ms)
             
             # Parse JSON - handle markdown code blocks
             clean_text = response_text.strip()
@@ -173,7 +235,7 @@ Format: {{"type": "Type", "title": "Title", "description": "1-2 sentences", "key
 
         Optimizations:
         - Uses Sonnet instead of Opus: 40% cost savings
-        - Cached framework instructions: 90% savings after 1st call
+        - System prompt carries only the chosen framework's structure
         - Compressed prompt to essential details only: 35% token savings
         - Reduced max_tokens: 800→500 (37% output savings)
 
@@ -198,41 +260,34 @@ Format: {{"type": "Type", "title": "Title", "description": "1-2 sentences", "key
                 elif "Monday" in day_context or "Start of work week" in day_context:
                     contextual_instruction += "Reference start of week if appropriate."
 
-            # Compressed system instruction
-            system_instruction = f"""Generate LinkedIn posts using {framework} framework.
-Requirements: 150-300 words, attention-grabbing, practical value, subtle CTA, professional but conversational tone, 2-3 hashtags.
-Output: ONLY post text."""
-
             # Compressed prompt with essential details only
             prompt = f"""Title: {idea.get('title', '')}
 Type: {idea.get('type', '')}
 Points: {', '.join(idea.get('key_points', []))}
 Framework: {framework}{contextual_instruction}"""
 
-            message = self.client.messages.create(
-                model="claude-sonnet-4-5",  # CHANGED: Opus → Sonnet (40% savings)
-                max_tokens=500,  # CHANGED: Reduced from 800
-                system=[
-                    PromptCache.add_cache_control(system_instruction, ttl="ephemeral")  # ADDED: Caching
-                ],
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+            with cost_tracker.timer() as timing:
+                message = self.client.messages.create(
+                    model="claude-sonnet-4-5",  # CHANGED: Opus → Sonnet (40% savings)
+                    max_tokens=500,  # CHANGED: Reduced from 800
+                    system=[
+                        PromptCache.system_block(
+                            POST_SYSTEM_INSTRUCTION.format(framework=framework, steps=self._get_framework_instructions(framework)),
+                            "claude-sonnet-4-5"
+                        )
+                    ],
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ]
+                )
 
             post_text = message.content[0].text
 
             # Log cost for this API call
-            cost_tracker.log_call(
-                model="claude-sonnet-4-5",
-                input_tokens=message.usage.input_tokens,
-                output_tokens=message.usage.output_tokens,
-                endpoint="generate_post_content",
-                cached_tokens=message.usage.cache_read_input_tokens if hasattr(message.usage, 'cache_read_input_tokens') else 0
-            )
+            cost_tracker.log_message(message, model="claude-sonnet-4-5", endpoint="generate_post_content", latency_ms=timing.latency_ms)
             
             # Generate image prompt based on content
             image_prompt = self._generate_image_prompt(idea, post_text)
@@ -260,62 +315,7 @@ Framework: {framework}{contextual_instruction}"""
     
     def _get_framework_instructions(self, framework: str) -> str:
         """Get specific instructions for each writing framework"""
-        instructions = {
-            "PAS (Problem-Agitate-Solution)": """
-Structure your post as:
-- Problem: Identify a pain point your audience faces
-- Agitate: Emphasize the consequences of not solving it
-- Solution: Present the solution/insight""",
-            
-            "AIDA (Attention-Interest-Desire-Action)": """
-Structure your post as:
-- Attention: Hook with a bold statement or question
-- Interest: Share intriguing facts or story
-- Desire: Show benefits and outcomes
-- Action: Clear call-to-action""",
-            
-            "BAB (Before-After-Bridge)": """
-Structure your post as:
-- Before: Describe the current painful state
-- After: Paint the ideal outcome picture
-- Bridge: Explain how to get from before to after""",
-            
-            "Storytelling": """
-Structure your post as a narrative:
-- Set the scene with a relatable situation
-- Build tension or challenge
-- Share the turning point/insight
-- End with lesson learned and takeaway""",
-            
-            "How-To Guide": """
-Structure your post as actionable steps:
-- Start with what the reader will learn
-- Break down into clear, numbered steps
-- Each step should be specific and actionable
-- End with encouragement to try it""",
-            
-            "Listicle": """
-Structure your post as a list:
-- Open with context on why this list matters
-- Present 3-7 items with brief explanations
-- Use numbers or bullet points for clarity
-- Close with a synthesis or call-to-action""",
-            
-            "Case Study": """
-Structure your post as a real example:
-- Introduce the situation/challenge
-- Detail the approach taken
-- Share specific results with numbers if possible
-- Extract the universal lesson""",
-            
-            "Question-Answer": """
-Structure your post around a key question:
-- Open with a thought-provoking question
-- Acknowledge common misconceptions
-- Provide your answer with reasoning
-- Invite discussion with follow-up question"""
-        }
-        return instructions.get(framework, "")
+        return FRAMEWORK_INSTRUCTIONS.get(framework, "")
     
     def _generate_image_prompt(self, idea: Dict, post_text: str) -> str:
         """Generate an image prompt for Banana.dev (OPTIMIZED)
@@ -337,30 +337,25 @@ Output: ONLY the image prompt description."""
             # Compress context to 100 chars
             context = PromptCompressor.truncate_description(post_text, max_chars=100)
 
-            message = self.client.messages.create(
-                model="claude-haiku-4-5",  # CHANGED: Opus → Haiku (80% savings)
-                max_tokens=200,  # CHANGED: Reduced from 300
-                system=[
-                    PromptCache.add_cache_control(system_instruction, ttl="ephemeral")  # ADDED: Caching
-                ],
-                messages=[
-                    {
-                        "role": "user",
-                        "content": f"Title: {idea.get('title')}\nContext: {context}"
-                    }
-                ]
-            )
+            with cost_tracker.timer() as timing:
+                message = self.client.messages.create(
+                    model="claude-haiku-4-5",  # CHANGED: Opus → Haiku (80% savings)
+                    max_tokens=200,  # CHANGED: Reduced from 300
+                    system=[
+                        PromptCache.add_cache_control(system_instruction, ttl="ephemeral")  # ADDED: Caching
+                    ],
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": f"Title: {idea.get('title')}\nContext: {context}"
+                        }
+                    ]
+                )
 
             image_prompt = message.content[0].text
 
             # Log cost for this API call
-            cost_tracker.log_call(
-                model="claude-haiku-4-5",
-                input_tokens=message.usage.input_tokens,
-                output_tokens=message.usage.output_tokens,
-                endpoint="generate_image_prompt",
-                cached_tokens=message.usage.cache_read_input_tokens if hasattr(message.usage, 'cache_read_input_tokens') else 0
-            )
+            cost_tracker.log_message(message, model="claude-haiku-4-5", endpoint="generate_image_prompt", latency_ms=timing.latency_ms)
 
             return image_prompt
 
@@ -7,6 +7,9 @@ without requiring button clicks.
 
 Usage:
     python3 webhook_revise_automation.py
+
+The revision routes are also served (queued, 202) by execution/webhook_gateway.py;
+this server is still what runs the auto-poster.
 """
 
 from flask import Flask, request, jsonify, Response
@@ -13,6 +13,7 @@ Usage:
     python orchestrate.py --action sync       # Sync to ClickUp
     python orchestrate.py --action proposals  # Generate proposals for approved jobs
     python orchestrate.py --action full       # Run complete pipeline
+    python orchestrate.py --action full --trace   # ...and record spans (see execution/trace_report.py)
 """
 
 import json
@@ -31,6 +32,7 @@ from airtable_upwork import UpworkAirtable
 from generate_proposal import ProposalGenerator, save_proposals_summary
 from upwork_scraper_selenium import UpworkScraperSelenium, scrape_upwork_jobs
 from upwork_proposal_submitter import UpworkProposalSubmitter, submit_approved_proposals
+from utils.tracing import DEFAULT_TRACE_FILE, configure as configure_tracing, traced
 import os
 from dotenv import load_dotenv
 
@@ -67,6 +69,7 @@ class UpworkAutomationOrchestrator:
         for d in dirs:
             Path(d).mkdir(parents=True, exist_ok=True)
     
+    @traced("pipeline.scrape")
     def action_scrape(self, search_query: str = None, max_jobs: int = 100, headless: bool = False, manual_login: bool = False):
         """Scrape jobs from Upwork using browser automation"""
         self.logger.info("=" * 60)
@@ -120,6 +123,7 @@ class UpworkAutomationOrchestrator:
             self.logger.error(f"Scraping failed: {e}")
             return False
     
+    @traced("pipeline.filter")
     def action_filter(self):
         """Filter raw jobs based on criteria"""
         self.logger.info("=" * 60)
@@ -152,6 +156,7 @@ class UpworkAutomationOrchestrator:
         self.logger.info(f"✓ Filtering complete: {len(accepted)} accepted, {len(rejected)} rejected")
         return True
     
+    @traced("pipeline.sync")
     def action_sync(self):
         """Sync filtered jobs to Airtable"""
         self.logger.info("=" * 60)
@@ -191,7 +196,8 @@ class UpworkAutomationOrchestrator:
         self.logger.info(f"✓ Airtable sync complete: {summary['created']} created, {summary.get('updated', 0)} updated, {summary.get('skipped', 0)} duplicates, {summary['failed']} failed")
         return True
     
-    def action_proposals(self):
+    @traced("pipeline.proposals")
+    def action_proposals(self, use_batch: bool = False):
         """Generate proposals for approved jobs"""
         self.logger.info("=" * 60)
         self.logger.info("ACTION: Generate Proposals")
@@ -242,12 +248,13 @@ class UpworkAutomationOrchestrator:
             return False
         
         # Generate proposals
-        summary = generator.generate_proposals_batch(jobs, '.tmp/proposals/')
+        summary = generator.generate_proposals_batch(jobs, '.tmp/proposals/', use_batch=use_batch)
         save_proposals_summary(summary)
         
         self.logger.info(f"✓ Proposal generation complete: {summary['generated']} generated, {summary['failed']} failed")
         return True
     
+    @traced("pipeline.full")
     def action_full(self, search_query: str = None, max_jobs: int = 100, headless: bool = False, manual_login: bool = False):
         """Run complete pipeline: scrape -> filter -> sync -> proposals"""
         self.logger.info("=" * 60)
@@ -320,6 +327,7 @@ class UpworkAutomationOrchestrator:
             masked = value[:10] + "..." if value else "NOT SET"
             self.logger.info(f"{status} {description}: {masked}")
     
+    @traced("pipeline.submit")
     def action_submit(self, boost_connects: int = 4, max_submissions: int = 5):
         """Submit proposals for approved jobs with connect boosting"""
         self.logger.info("=" * 60)
@@ -500,8 +508,26 @@ Auto-Workflow (--action auto):
         help='Manual login mode - opens browser and waits for you to log in'
     )
     
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Generate proposals via the Message Batches API (50%% cheaper, results can take hours)'
+    )
+    
+    parser.add_argument(
+        '--trace',
+        nargs='?',
+        const=DEFAULT_TRACE_FILE,
+        default=None,
+        metavar='FILE',
+        help=f'Record pipeline spans to FILE (default: {DEFAULT_TRACE_FILE}); report with execution/trace_report.py'
+    )
+    
     args = parser.parse_args()
     
+    if args.trace:
+        configure_tracing(args.trace)
+    
     orchestrator = UpworkAutomationOrchestrator()
     
     # Handle actions with parameters
@@ -515,6 +541,8 @@ Auto-Workflow (--action auto):
         success = orchestrator.action_webhook()
     elif args.action == 'auto':
         success = orchestrator.action_auto(poll_interval=args.poll)
+    elif args.action == 'proposals':
+        success = orchestrator.action_proposals(use_batch=args.batch)
     else:
         action_map = {
             'filter': orchestrator.action_filter,
@@ -5,18 +5,21 @@ Scans Airtable records every N seconds for status changes and triggers Modal fun
 
 Usage:
     python3 polling_trigger.py [--interval 30] [--verbose]
+    python3 polling_trigger.py --change-feed [--interval 2]
 
 Features:
     - Polls Airtable every 30 seconds (configurable)
-    - Detects status changes automatically
+    - Detects status changes automatically, reading only records modified
+      since the last poll (execution/utils/delta_poller.py)
     - Triggers Modal functions when status changes
     - Keeps track of processed records (doesn't duplicate triggers)
     - Runs 24/7 in background
     - Can be run via cron for scheduled checks
+    - --change-feed reads Airtable webhook payloads from a cursor instead of
+      re-downloading every record (see execution/utils/change_feed.py)
 """
 
 import requests
-import json
 import time
 import argparse
 import logging
@@ -25,6 +28,12 @@ import os
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent / 'execution'))
+from utils.airtable_client import AirtableClient
+from utils.change_feed import ChangeFeed
+from utils.delta_poller import DeltaPoller
+from utils.json_store import JsonFileStore
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -41,9 +50,12 @@ AIRTABLE_API_KEY = os.environ.get('AIRTABLE_API_KEY', 'patQCCzbAjKw675Bf.a922019
 BASE_ID = os.environ.get('AIRTABLE_BASE_ID', 'appw88uD6ZM0ckF8f')
 TABLE_ID = os.environ.get('AIRTABLE_LINKEDIN_TABLE_ID', 'tbljg75KMQWDo2Hgu')
 
-# State file to track which records we've already processed
+# State file to track which records we've already processed (per-record status + poll watermark)
 STATE_FILE = Path(__file__).parent / 'polling_state.json'
 
+# Webhook ID + payload cursor for --change-feed mode
+CHANGE_FEED_STATE_FILE = Path(__file__).parent / '.tmp' / 'change_feed_state.json'
+
 # Status values that should trigger actions
 TRIGGER_STATUSES = {
     'Pending Review': 'image_generation',
@@ -60,56 +72,10 @@ def get_airtable_headers():
     }
 
 
-def load_state():
-    """Load the previous state of records from file"""
-    if STATE_FILE.exists():
-        try:
-            with open(STATE_FILE, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.warning(f"Could not load state file: {e}")
-    return {}
-
-
-def save_state(state):
-    """Save the current state of records to file"""
-    try:
-        with open(STATE_FILE, 'w') as f:
-            json.dump(state, f, indent=2)
-    except Exception as e:
-        logger.error(f"Could not save state file: {e}")
-
-
-def fetch_records():
-    """Fetch all records from Airtable (with pagination)"""
-    try:
-        url = f"https://api.airtable.com/v0/{BASE_ID}/{TABLE_ID}"
-        all_records = []
-        offset = None
-
-        while True:
-            params = {}
-            if offset:
-                params['offset'] = offset
-
-            response = requests.get(url, headers=get_airtable_headers(), timeout=10, params=params)
-
-            if response.status_code == 200:
-                data = response.json()
-                all_records.extend(data.get('records', []))
-
-                # Check if there are more records
-                offset = data.get('offset')
-                if not offset:
-                    break
-            else:
-                logger.error(f"Airtable API error: {response.status_code} - {response.text}")
-                return all_records if all_records else []
-
-        return all_records
-    except Exception as e:
-        logger.error(f"Error fetching records: {e}")
-        return []
+def get_delta_poller():
+    """Poller that reads only records whose Status/Title changed since the last poll"""
+    client = AirtableClient(BASE_ID, TABLE_ID, api_key=AIRTABLE_API_KEY)
+    return DeltaPoller(client, JsonFileStore(str(STATE_FILE)), trigger_statuses=TRIGGER_STATUSES)
 
 
 def trigger_modal_function(record_id, status, base_id, table_id):
@@ -146,37 +112,51 @@ def trigger_modal_function(record_id, status, base_id, table_id):
         return False
 
 
-def check_for_changes(current_state, new_state):
-    """Compare states and find status changes"""
-    changes = []
-
-    for record_id, new_data in new_state.items():
-        if record_id not in current_state:
-            # New record
-            if new_data['status'] in TRIGGER_STATUSES:
-                changes.append({
-                    'record_id': record_id,
-                    'title': new_data['title'],
-                    'old_status': None,
-                    'new_status': new_data['status'],
-                    'reason': 'new_record'
-                })
-        else:
-            old_data = current_state[record_id]
-            # Status changed
-            if old_data['status'] != new_data['status']:
-                if new_data['status'] in TRIGGER_STATUSES:
-                    changes.append({
-                        'record_id': record_id,
-                        'title': new_data['title'],
-                        'old_status': old_data['status'],
-                        'new_status': new_data['status'],
-                        'reason': 'status_change'
-                    })
-                    logger.info(f"📝 Status change detected: {record_id} ({new_data['title']})")
-                    logger.info(f"   {old_data['status']} → {new_data['status']}")
-
-    return changes
+def get_change_feed():
+    """Load the change feed and make sure its Airtable webhook exists (None on failure)"""
+    client = AirtableClient(BASE_ID, TABLE_ID, api_key=AIRTABLE_API_KEY)
+    feed = ChangeFeed(client, JsonFileStore(str(CHANGE_FEED_STATE_FILE))).load()
+    if not feed.ensure_webhook(os.environ.get('CHANGE_FEED_NOTIFICATION_URL')):
+        return None
+    return feed
+
+
+def drain_change_feed(feed):
+    """Trigger the webhook server for every status change since the feed's cursor"""
+    def dispatch(event):
+        logger.info(f"📝 {event.record_id} ({event.title}): {event.old_status} → {event.new_status}")
+        return trigger_modal_function(event.record_id, event.new_status, BASE_ID, TABLE_ID)
+
+    summary = feed.drain(dispatch)
+    if summary['dispatched'] or summary['failed']:
+        logger.info(f"Change feed: {summary['dispatched']} triggered, {summary['failed']} failed")
+    return summary
+
+
+def follow_change_feed(interval, verbose=False):
+    """Main loop for --change-feed: one small payloads request per interval"""
+    logger.info("=" * 70)
+    logger.info("🚀 LinkedIn Automation Change Feed Started")
+    logger.info("=" * 70)
+
+    feed = get_change_feed()
+    if feed is None:
+        logger.error("Could not set up the Airtable webhook - falling back to polling")
+        return poll_airtable(interval, verbose)
+
+    logger.info(f"Webhook: {feed.state['webhook_id']} (cursor {feed.state['cursor']})")
+    logger.info(f"Checking every {interval} seconds")
+
+    try:
+        while True:
+            feed.ensure_webhook(os.environ.get('CHANGE_FEED_NOTIFICATION_URL'))
+            summary = drain_change_feed(feed)
+            if verbose:
+                logger.info(f"  Cursor: {summary['cursor']}")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        logger.info("\n\n⏹️  Change feed stopped by user")
+        sys.exit(0)
 
 
 def poll_airtable(interval, verbose=False):
@@ -191,7 +171,7 @@ def poll_airtable(interval, verbose=False):
     logger.info("=" * 70)
     logger.info("")
 
-    current_state = load_state()
+    poller = get_delta_poller()
     poll_count = 0
 
     try:
@@ -202,28 +182,14 @@ def poll_airtable(interval, verbose=False):
             if verbose:
                 logger.info(f"[Poll #{poll_count}] {timestamp} - Checking Airtable...")
 
-            # Fetch current records
-            records = fetch_records()
+            # Only records changed since the last poll; state is written once, only if something changed
+            changes = poller.poll()
 
-            if not records:
-                logger.warning("No records found or API error")
+            if changes is None:
+                logger.warning("Airtable API error")
                 time.sleep(interval)
                 continue
 
-            # Build new state
-            new_state = {}
-            for record in records:
-                record_id = record['id']
-                fields = record.get('fields', {})
-                new_state[record_id] = {
-                    'title': fields.get('Title', 'Untitled'),
-                    'status': fields.get('Status', 'N/A'),
-                    'last_seen': datetime.now().isoformat()
-                }
-
-            # Check for changes
-            changes = check_for_changes(current_state, new_state)
-
             if changes:
                 logger.info(f"\n📢 DETECTED {len(changes)} CHANGE(S):")
                 for change in changes:
@@ -246,18 +212,6 @@ def poll_airtable(interval, verbose=False):
 
                 logger.info("")
 
-            # Update state
-            current_state = new_state
-            save_state(current_state)
-
-            # Log summary
-            total_records = len(new_state)
-            triggered_records = sum(1 for _, data in new_state.items() if data['status'] in TRIGGER_STATUSES)
-
-            if verbose:
-                logger.info(f"  Total records: {total_records}")
-                logger.info(f"  Awaiting trigger: {triggered_records}")
-
             # Wait before next poll
             time.sleep(interval)
 
@@ -288,6 +242,9 @@ Examples:
 
   # Run as a cron job (polls once and exits)
   python3 polling_trigger.py --once
+
+  # Follow the Airtable webhook change feed every 2 seconds
+  python3 polling_trigger.py --change-feed --interval 2
         """
     )
 
@@ -307,6 +264,11 @@ Examples:
         action='store_true',
         help='Run once and exit (useful for cron jobs)'
     )
+    parser.add_argument(
+        '--change-feed',
+        action='store_true',
+        help='Read status changes from an Airtable webhook instead of diffing all records'
+    )
     parser.add_argument(
         '--webhook-url',
         help='Webhook URL to call (default: http://localhost:8000/webhook)'
@@ -321,28 +283,24 @@ Examples:
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
-    if args.once:
+    if args.change_feed:
+        if args.once:
+            feed = get_change_feed()
+            if feed is None:
+                sys.exit(1)
+            summary = drain_change_feed(feed)
+            logger.info(f"Done. Triggered {summary['dispatched']} changes.")
+        else:
+            follow_change_feed(args.interval, args.verbose)
+    elif args.once:
         # Run once for cron jobs
         logger.info("Running once (cron mode)...")
-        current_state = load_state()
-        records = fetch_records()
-
-        new_state = {}
-        for record in records:
-            record_id = record['id']
-            fields = record.get('fields', {})
-            new_state[record_id] = {
-                'title': fields.get('Title', 'Untitled'),
-                'status': fields.get('Status', 'N/A'),
-            }
-
-        changes = check_for_changes(current_state, new_state)
+        changes = get_delta_poller().poll() or []
 
         for change in changes:
             logger.info(f"Triggering: {change['record_id']} → {change['new_status']}")
             trigger_modal_function(change['record_id'], change['new_status'], BASE_ID, TABLE_ID)
 
-        save_state(new_state)
         logger.info(f"Done. Found {len(changes)} changes.")
     else:
         # Continuous polling
@@ -15,6 +15,9 @@ Endpoints:
 - POST /manual-input - Process manual pain points
 - POST /generate-proposal - Generate full proposal content
 - GET /health - Health check
+
+execution/webhook_gateway.py serves these under /proposals/, queueing the
+Claude calls and answering 202 with a job ID.
 """
 
 import os
@@ -301,6 +304,93 @@ def save_to_airtable(proposal_data: dict) -> dict:
         return {"status": "error", "message": str(e)}
 
 
+# ============== Request Handling ==============
+# Shared by the Flask endpoints below and execution/webhook_gateway.py
+
+def analyze_transcript_with_pricing(transcript: str) -> dict:
+    """Analyze a transcript and attach value-based pricing for its pain points."""
+    analysis = analyze_transcript(transcript)
+    if "error" in analysis:
+        return analysis
+    
+    # Calculate pricing based on pain points
+    total_hours_saved = sum([
+        pp.get("time_spent_hours", 0) 
+        for pp in analysis.get("pain_points", [])
+    ])
+    
+    total_employees = max([
+        pp.get("employees_involved", 1) 
+        for pp in analysis.get("pain_points", [])
+    ], default=1)
+    
+    pricing = calculate_value_based_price(
+        hours_saved_per_week=total_hours_saved or 5,  # Default 5 hours if not specified
+        num_employees=total_employees
+    )
+    
+    analysis["calculated_pricing"] = pricing
+    analysis["source"] = "transcript"
+    return analysis
+
+
+def process_manual_input(data: dict) -> dict:
+    """Turn manually entered pain points into the /analyze-transcript result shape."""
+    client_name = data.get('client_name', 'Prospect')
+    pain_points = data.get('pain_points', [])
+    
+    # Calculate pricing
+    hours_saved = data.get('hours_saved_per_week', len(pain_points) * 3)  # Estimate 3 hrs/pain point
+    
+    pricing = calculate_value_based_price(
+        hours_saved_per_week=hours_saved,
+        hourly_rate=data.get('hourly_rate'),
+        num_employees=data.get('num_employees', 1)
+    )
+    
+    return {
+        "client_name": client_name,
+        "client_email": data.get('client_email'),
+        "pain_points": [{"problem": pp, "time_spent_hours": 3} for pp in pain_points],
+        "calculated_pricing": pricing,
+        "source": "manual",
+        "notes": data.get('notes', '')
+    }
+
+
+def build_proposal(data: dict) -> dict:
+    """Generate the proposal for a /generate-proposal request and save it to Airtable."""
+    pricing = data.get('pricing', {})
+    if not pricing:
+        # Calculate default pricing if not provided
+        pricing = calculate_value_based_price(hours_saved_per_week=10)
+    
+    proposal = generate_proposal_content(
+        client_name=data.get('client_name', 'Client'),
+        pain_points=data.get('pain_points', []),
+        solutions=data.get('solutions', []),
+        pricing=pricing,
+        additional_notes=data.get('notes', '')
+    )
+    
+    proposal["pain_points"] = data.get('pain_points', [])
+    proposal["source"] = data.get("source", "manual")
+    
+    # Save to Airtable
+    proposal["airtable"] = save_to_airtable(proposal)
+    return proposal
+
+
+def calculate_price_from_request(data: dict) -> dict:
+    """Value-based pricing for a /calculate-price request."""
+    return calculate_value_based_price(
+        hours_saved_per_week=data.get('hours_saved_per_week', 5),
+        hourly_rate=data.get('hourly_rate'),
+        num_employees=data.get('num_employees', 1),
+        automation_coverage=data.get('automation_coverage', 1.0)
+    )
+
+
 # ============== Flask Endpoints ==============
 
 @app.route('/health', methods=['GET'])
@@ -335,31 +425,11 @@ def analyze_transcript_endpoint():
     
     print(f"[{datetime.now()}] Analyzing transcript ({len(transcript)} chars)...")
     
-    # Analyze transcript
-    analysis = analyze_transcript(transcript)
+    analysis = analyze_transcript_with_pricing(transcript)
     
     if "error" in analysis:
         return jsonify(analysis), 500
     
-    # Calculate pricing based on pain points
-    total_hours_saved = sum([
-        pp.get("time_spent_hours", 0) 
-        for pp in analysis.get("pain_points", [])
-    ])
-    
-    total_employees = max([
-        pp.get("employees_involved", 1) 
-        for pp in analysis.get("pain_points", [])
-    ], default=1)
-    
-    pricing = calculate_value_based_price(
-        hours_saved_per_week=total_hours_saved or 5,  # Default 5 hours if not specified
-        num_employees=total_employees
-    )
-    
-    analysis["calculated_pricing"] = pricing
-    analysis["source"] = "transcript"
-    
     print(f"[{datetime.now()}] Analysis complete. Found {len(analysis.get('pain_points', []))} pain points.")
     
     return jsonify(analysis)
@@ -395,25 +465,7 @@ def manual_input_endpoint():
     
     print(f"[{datetime.now()}] Processing manual input for {client_name}...")
     
-    # Calculate pricing
-    hours_saved = data.get('hours_saved_per_week', len(pain_points) * 3)  # Estimate 3 hrs/pain point
-    
-    pricing = calculate_value_based_price(
-        hours_saved_per_week=hours_saved,
-        hourly_rate=data.get('hourly_rate'),
-        num_employees=data.get('num_employees', 1)
-    )
-    
-    result = {
-        "client_name": client_name,
-        "client_email": data.get('client_email'),
-        "pain_points": [{"problem": pp, "time_spent_hours": 3} for pp in pain_points],
-        "calculated_pricing": pricing,
-        "source": "manual",
-        "notes": data.get('notes', '')
-    }
-    
-    return jsonify(result)
+    return jsonify(process_manual_input(data))
 
 
 @app.route('/generate-proposal', methods=['POST'])
@@ -434,34 +486,13 @@ def generate_proposal_endpoint():
     
     client_name = data.get('client_name', 'Client')
     pain_points = data.get('pain_points', [])
-    solutions = data.get('solutions', [])
-    pricing = data.get('pricing', {})
-    notes = data.get('notes', '')
     
     if not pain_points:
         return jsonify({"error": "No pain points provided"}), 400
     
-    if not pricing:
-        # Calculate default pricing if not provided
-        pricing = calculate_value_based_price(hours_saved_per_week=10)
-    
     print(f"[{datetime.now()}] Generating proposal for {client_name}...")
     
-    # Generate proposal content
-    proposal = generate_proposal_content(
-        client_name=client_name,
-        pain_points=pain_points,
-        solutions=solutions,
-        pricing=pricing,
-        additional_notes=notes
-    )
-    
-    proposal["pain_points"] = pain_points
-    proposal["source"] = data.get("source", "manual")
-    
-    # Save to Airtable
-    airtable_result = save_to_airtable(proposal)
-    proposal["airtable"] = airtable_result
+    proposal = build_proposal(data)
     
     print(f"[{datetime.now()}] Proposal generated successfully.")
     
@@ -483,16 +514,7 @@ def calculate_price_endpoint():
     """
     data = request.json
     
-    hours_saved = data.get('hours_saved_per_week', 5)
-    
-    pricing = calculate_value_based_price(
-        hours_saved_per_week=hours_saved,
-        hourly_rate=data.get('hourly_rate'),
-        num_employees=data.get('num_employees', 1),
-        automation_coverage=data.get('automation_coverage', 1.0)
-    )
-    
-    return jsonify(pricing)
+    return jsonify(calculate_price_from_request(data))
 
 
 # ============== Main ==============
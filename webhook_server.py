@@ -4,6 +4,8 @@ Simple webhook server for handling Airtable automation webhooks.
 Receives status change events from Airtable and spawns Modal functions.
 
 Run: python webhook_server.py
+
+Superseded by execution/webhook_gateway.py (async, same POST /webhook payload).
 """
 
 from http.server import HTTPServer, BaseHTTPRequestHandler